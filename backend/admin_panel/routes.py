@@ -5,7 +5,6 @@ import os
 import shutil
 import subprocess
 import sys
-import time
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -56,7 +55,31 @@ async def get_db():
 
 
 try:
-    from services.scheduler_service import get_scheduler
+    # Same module the lifespan refresh task uses, so both share its lock
+    from backend.services.dashboard_metrics_service import (
+        DashboardMetricsService, empty_snapshot)
+
+    METRICS_AVAILABLE = True
+except Exception as e:
+    logger.warning(f"Dashboard metrics service not available: {e}")
+
+    def empty_snapshot():
+        return {
+            "total_jobs": 0,
+            "active_jobs": 0,
+            "new_jobs_24h": 0,
+            "jobs_today": 0,
+            "remote_jobs": 0,
+            "total_companies": 0,
+            "active_api_sources": 0,
+            "latest_sync": None,
+            "as_of": None,
+        }
+
+    METRICS_AVAILABLE = False
+
+try:
+    from backend.services.scheduler_service import get_scheduler
 
     SCHEDULER_AVAILABLE = True
 except Exception as e:
@@ -80,9 +103,6 @@ templates = Jinja2Templates(directory=templates_path)
 
 admin_router = APIRouter()
 
-# Cache for dashboard stats
-CACHE_DURATION = 300  # 5 minutes in seconds
-_dashboard_cache = {"data": None, "timestamp": 0}
 
 
 # Admin Authentication Middleware
@@ -135,29 +155,25 @@ async def admin_dashboard(request: Request):
 
     try:
         db = await get_db()
-        if not DATABASE_AVAILABLE or db is None:
+        if not DATABASE_AVAILABLE or not METRICS_AVAILABLE or db is None:
             # Demo stats when database is not available
-            total_jobs = 36531
-            active_jobs = 36531
-            new_jobs_24h = 1250
+            metrics = {
+                **empty_snapshot(),
+                "total_jobs": 36531,
+                "active_jobs": 36531,
+                "new_jobs_24h": 1250,
+                "active_api_sources": 8,
+            }
         else:
-            # Get basic statistics using async db connection
-            total_jobs = await db.jobs.count_documents({})
-            active_jobs = await db.jobs.count_documents({"is_active": True})
+            # Served from the shared metrics snapshot, refreshed on a schedule
+            metrics = await DashboardMetricsService(db).get_snapshot()
 
-            # Jobs added in last 24 hours
-            yesterday = datetime.now() - timedelta(days=1)
-            # Try multiple date fields to find recently added jobs
-            new_jobs_24h = await db.jobs.count_documents(
-                {
-                    "$or": [
-                        {"created_at": {"$gte": yesterday}},
-                        {"created_at": {"$gte": yesterday.isoformat()}},
-                        {"last_updated": {"$gte": yesterday.isoformat()}},
-                        {"posted_date": {"$gte": yesterday.isoformat()}},
-                    ]
-                }
-            )
+        total_jobs = metrics["total_jobs"]
+        active_jobs = metrics["active_jobs"]
+        new_jobs_24h = metrics["new_jobs_24h"]
+        active_api_sources = metrics["active_api_sources"] or 8
+        latest_sync = metrics["latest_sync"] or datetime.now() - timedelta(hours=1)
+        as_of = metrics.get("as_of") or datetime.now()
 
         # Get scheduler status
         scheduler = get_scheduler()
@@ -167,46 +183,6 @@ async def admin_dashboard(request: Request):
             else {"status": "not_available", "jobs": []}
         )
 
-        # Get real API sources stats
-        try:
-            if DATABASE_AVAILABLE and db:
-                # Get active API sources from database
-                sources_pipeline = [
-                    {
-                        "$group": {
-                            "_id": "$source_type",
-                            "count": {"$sum": 1},
-                            "latest": {"$max": "$last_updated"},
-                        }
-                    },
-                    {"$match": {"count": {"$gt": 0}}},
-                ]
-                sources_result = await db.jobs.aggregate(sources_pipeline).to_list(20)
-                active_api_sources = len(sources_result)
-
-                # Get last successful sync
-                latest_sync = datetime.now() - timedelta(hours=1)  # Default
-                if sources_result:
-                    latest_times = [
-                        s.get("latest") for s in sources_result if s.get("latest")
-                    ]
-                    if latest_times:
-                        try:
-                            latest_sync = (
-                                max(latest_times)
-                                if isinstance(latest_times[0], datetime)
-                                else datetime.fromisoformat(max(latest_times))
-                            )
-                        except:
-                            latest_sync = datetime.now() - timedelta(hours=1)
-            else:
-                active_api_sources = 8
-                latest_sync = datetime.now() - timedelta(hours=1)
-        except Exception as api_error:
-            logger.warning(f"API stats error: {api_error}")
-            active_api_sources = 8
-            latest_sync = datetime.now() - timedelta(hours=1)
-
         # Build HTML response directly
         html_content = f"""
         <!DOCTYPE html>
@@ -280,7 +256,7 @@ async def admin_dashboard(request: Request):
                     <p><span class="status-indicator {'status-active' if DATABASE_AVAILABLE else 'status-inactive'}"></span>
                        Database: {'Connected' if DATABASE_AVAILABLE else 'Disconnected'}</p>
                     <p><span class="status-indicator status-active"></span>
-                       API Services: 8 Active</p>
+                       API Services: {active_api_sources} Active (last sync {latest_sync.strftime('%Y-%m-%d %H:%M')})</p>
                     <p><span class="status-indicator {'status-active' if scheduler_status.get('status') == 'running' else 'status-inactive'}"></span>
                        Scheduler: {scheduler_status.get('status', 'unknown').title()}</p>
                 </div>
@@ -317,7 +293,7 @@ async def admin_dashboard(request: Request):
                 </div>
                 
                 <div style="text-align: center; margin-top: 40px; color: #666; border-top: 1px solid #eee; padding-top: 20px;">
-                    <p>🚀 <strong>Buzz2Remote Admin Panel</strong> - Last updated: <span id="lastUpdated">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</span></p>
+                    <p>🚀 <strong>Buzz2Remote Admin Panel</strong> - Metrics as of: <span id="lastUpdated">{as_of.strftime('%Y-%m-%d %H:%M:%S')}</span></p>
                     <p>👤 Logged in as: Admin | <a href="/admin/logout">Logout</a></p>
                 </div>
             </div>
@@ -1811,82 +1787,36 @@ async def get_job_details(job_id: str) -> dict:
 
 
 async def get_dashboard_stats():
-    """Get real dashboard statistics from MongoDB with caching"""
-    global _dashboard_cache
-
-    # Check cache
-    current_time = time.time()
-    if (
-        _dashboard_cache["data"] is not None
-        and current_time - _dashboard_cache["timestamp"] < CACHE_DURATION
-    ):
-        return _dashboard_cache["data"]
-
-    # If cache miss, get fresh data
-    if not DATABASE_AVAILABLE:
-        stats = {
-            "total_jobs": 27743,
-            "total_companies": 470,
-            "active_apis": 8,
-            "jobs_today": 22755,
-            "active_jobs": 27743,
-            "remote_jobs": 27743,
-        }
-    else:
-        try:
-            async with get_async_db() as db:
-                # Get total jobs
-                total_jobs = await db.jobs.count_documents({})
-
-                # Get total companies
-                total_companies_list = await db.jobs.distinct("company")
-                total_companies_count = (
-                    len(total_companies_list) if total_companies_list else 0
-                )
-
-                # Get jobs today
-                today = datetime.now().replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                )
-                jobs_today = await db.jobs.count_documents(
-                    {"created_at": {"$gte": today}}
-                )
-
-                # Get active jobs
-                active_jobs = await db.jobs.count_documents({"is_active": True})
-
-                # Get remote jobs
-                remote_jobs = await db.jobs.count_documents(
-                    {"location": {"$regex": "remote", "$options": "i"}}
-                )
-
-                # Active APIs (hardcoded for now)
-                active_apis = 8
-
-                stats = {
-                    "total_jobs": total_jobs,
-                    "total_companies": total_companies_count,
-                    "active_apis": active_apis,
-                    "jobs_today": jobs_today,
-                    "active_jobs": active_jobs,
-                    "remote_jobs": remote_jobs,
-                }
-        except Exception as e:
-            print(f"Error getting dashboard stats: {e}")
-            stats = {
-                "total_jobs": 27743,
-                "total_companies": 470,
-                "active_apis": 8,
-                "jobs_today": 22755,
-                "active_jobs": 27743,
-                "remote_jobs": 27743,
-            }
-
-    # Update cache
-    _dashboard_cache["data"] = stats
-    _dashboard_cache["timestamp"] = current_time
+    """Get dashboard statistics from the shared metrics snapshot"""
+    fallback = {
+        "total_jobs": 27743,
+        "total_companies": 470,
+        "active_apis": 8,
+        "jobs_today": 22755,
+        "active_jobs": 27743,
+        "remote_jobs": 27743,
+        "as_of": None,
+    }
+    if not DATABASE_AVAILABLE or not METRICS_AVAILABLE:
+        return fallback
 
-    return stats
+    try:
+        db = await get_db()
+        if db is None:
+            return fallback
+        snapshot = await DashboardMetricsService(db).get_snapshot()
+        return {
+            "total_jobs": snapshot["total_jobs"],
+            "total_companies": snapshot["total_companies"],
+            "active_apis": snapshot["active_api_sources"],
+            "jobs_today": snapshot["jobs_today"],
+            "active_jobs": snapshot["active_jobs"],
+            "remote_jobs": snapshot["remote_jobs"],
+            "as_of": snapshot.get("as_of"),
+        }
+    except Exception as e:
+        logger.error(f"Error getting dashboard stats: {e}")
+        return fallback
 
 
 @admin_router.get("/status", response_class=HTMLResponse)
@@ -3808,6 +3738,33 @@ async def get_cache_stats(admin_auth: bool = Depends(get_admin_auth)):
         }
 
 
+@admin_router.get("/api/query-profile")
+async def get_query_profile(
+    limit: int = 20, explain: bool = True, admin_auth: bool = Depends(get_admin_auth)
+):
+    """Slowest MongoDB query shapes with sampled plans and index suggestions"""
+    try:
+        from backend.services.query_profiler import get_query_profiler
+
+        db = await get_db()
+        report = await get_query_profiler().report(
+            db, limit=min(max(limit, 1), 100), explain=explain
+        )
+        return {
+            "success": True,
+            **report,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting query profile: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "shapes": [],
+            "index_suggestions": []
+        }
+
+
 @admin_router.post("/api/cache/clear")
 async def clear_cache(admin_auth: bool = Depends(get_admin_auth)):
     """Clear cache API endpoint"""
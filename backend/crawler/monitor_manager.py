@@ -275,9 +275,9 @@ class MonitorManager:
         details = await self.job_crawler.get_job_details(job_data.get("url", ""))
         job_data.update(details)
 
-        # Save to database
-        # TODO: Save to database and get job_id
-        job_id = 1  # Sample ID
+        # Save to database through the shared ingest pipeline. The monitor
+        # sends its own notification below, so the default hook is disabled.
+        job_id = await self._ingest_job(monitor, job_data)
 
         # Create change log
         change_log = {
@@ -295,6 +295,29 @@ class MonitorManager:
         if monitor.notify_on_change:
             await self._send_notification(monitor, "new", job_data)
 
+    async def _ingest_job(self, monitor: Monitor, job_data: Dict[str, Any]):
+        """
+        Pushes a monitored job into the ingest pipeline and returns its id
+        """
+        from backend.database import get_database
+        from backend.services.ingest_pipeline import build_ingest_pipeline
+
+        new_jobs: List[Dict[str, Any]] = []
+
+        async def collect_new_jobs(batch: List[Dict[str, Any]]):
+            new_jobs.extend(batch)
+
+        db = await get_database()
+        pipeline = build_ingest_pipeline(
+            db,
+            source=f"monitor_{monitor.id}",
+            id_field=None,
+            hooks=[collect_new_jobs],
+            notify=False,
+        )
+        await pipeline.run([job_data])
+        return new_jobs[0]["_id"] if new_jobs else None
+
     async def _mark_job_removed(self, monitor: Monitor, job: Job):
         """
         Marks the job as removed
@@ -47,7 +47,15 @@ async def get_database_client() -> AsyncIOMotorClient:
                     )
                     logger.info("Using optimized MongoDB client for testing")
                 else:
-                    _client = AsyncIOMotorClient(MONGODB_URI)
+                    from backend.services.query_profiler import \
+                        get_query_profiler
+                    from backend.services.request_metrics import \
+                        db_timing_listener
+
+                    listeners = [db_timing_listener]
+                    if os.getenv("DISABLE_QUERY_PROFILER") != "true":
+                        listeners.append(get_query_profiler())
+                    _client = AsyncIOMotorClient(MONGODB_URI, event_listeners=listeners)
                     logger.info("Using real MongoDB client")
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
@@ -56,6 +64,22 @@ async def get_database_client() -> AsyncIOMotorClient:
     return _client
 
 
+def create_loop_database() -> AsyncIOMotorDatabase:
+    """Database on a new client, for code running on another event loop.
+
+    Motor clients are bound to the loop they first run on, so work moved off
+    the application loop (the scheduler's JobExecutor) cannot share ``_client``.
+    """
+    if os.getenv("PYTEST_CURRENT_TEST"):
+        try:
+            import mongomock_motor
+
+            return mongomock_motor.AsyncMongoMockClient()[DATABASE_NAME]
+        except ImportError:
+            pass
+    return AsyncIOMotorClient(MONGODB_URI)[DATABASE_NAME]
+
+
 @asynccontextmanager
 async def get_database_context() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
     """Get database instance as async context manager."""
@@ -138,6 +162,45 @@ async def ensure_indexes():
         await safe_create_index(db.jobs, "company")
         await safe_create_index(db.jobs, "location")
         await safe_create_index(db.jobs, "created_at")
+        await safe_create_index(
+            db.jobs,
+            [("source", 1), ("source_id", 1)],
+            unique=True,
+            name="source_source_id_unique",
+            partialFilterExpression={
+                "source": {"$exists": True},
+                "source_id": {"$exists": True},
+            },
+        )
+
+        # Structured locations (equality filters) and the autocomplete table
+        await safe_create_index(db.jobs, [("geo.countries", 1), ("is_active", 1)])
+        await safe_create_index(db.jobs, [("geo.regions", 1), ("is_active", 1)])
+        await safe_create_index(db.jobs, "geo.city")
+        await safe_create_index(db.jobs, "geo.remote_scope")
+        await safe_create_index(db.location_suggestions, [("terms", 1), ("total", -1)])
+
+        # Materialized job statistics counters (top-N reads)
+        await safe_create_index(db.job_stats, [("dimension", 1), ("total", -1)])
+
+        # Digest queries: exact keys within the created_at window
+        await safe_create_index(db.jobs, [("skill_keys", 1), ("created_at", 1)])
+        await safe_create_index(db.jobs, [("company_key", 1), ("created_at", 1)])
+        await safe_create_index(db.jobs, [("title_group", 1), ("created_at", 1)])
+
+        # Digest subscriptions, grouped by preference signature per frequency
+        await safe_create_index(
+            db.digest_subscriptions, [("channel", 1), ("address", 1)], unique=True
+        )
+        await safe_create_index(
+            db.digest_subscriptions, [("frequency", 1), ("active", 1), ("signature", 1)]
+        )
+
+        # Per-user application statistics ($group breakdown)
+        await safe_create_index(
+            db.user_applications,
+            [("user_id", 1), ("status", 1), ("application_type", 1), ("applied_at", -1)],
+        )
 
         # Companies collection indexes
         await safe_create_index(db.companies, "name")
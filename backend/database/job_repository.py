@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
@@ -255,39 +256,31 @@ class JobRepository:
             logger.error(f"Error getting similar jobs: {e}")
             raise
 
-    def archive_old_jobs(self, days_threshold: int = 30) -> int:
+    def archive_old_jobs(
+        self, days_threshold: Optional[int] = None, max_chunks: Optional[int] = None
+    ) -> int:
         """
-        Archive jobs older than the specified threshold
+        Archive jobs past the ``jobs`` retention rule
+
+        Delegates to the same chunked, checkpointed JobArchiver the retention
+        job and the admin endpoint use, so there is one archiving rule. Call
+        it from synchronous code only (scripts, shells), not inside an event
+        loop.
 
         Args:
-            days_threshold (int, optional): Age threshold in days. Defaults to 30.
+            days_threshold (int, optional): Age threshold in days. Defaults to
+                the retention rule's ``keep_days``.
+            max_chunks (int, optional): Stop after this many chunks; the next
+                call resumes. Defaults to running to completion.
 
         Returns:
-            int: Number of jobs archived
+            int: Number of jobs archived by the run so far
 
         Raises:
-            PyMongoError: If a database error occurs
+            Exception: If archiving fails; the checkpoint keeps its progress
         """
-        try:
-            # Calculate the cutoff date
-            cutoff_date = datetime.utcnow().replace(
-                hour=0, minute=0, second=0, microsecond=0
-            ) - timedelta(days=days_threshold)
-
-            # Get jobs older than the cutoff date
-            query = {"date_posted": {"$lt": cutoff_date}, "archived": {"$ne": True}}
-
-            # Update to mark as archived
-            result = self.collection.update_many(
-                query, {"$set": {"archived": True, "updated_at": datetime.utcnow()}}
-            )
-
-            archived_count = result.modified_count
-            logger.info(
-                f"Archived {archived_count} jobs older than {days_threshold} days"
-            )
+        from utils.job_archiver import archive_old_jobs
 
-            return archived_count
-        except PyMongoError as e:
-            logger.error(f"Error archiving old jobs: {e}")
-            raise
+        report = asyncio.run(archive_old_jobs(max_chunks=max_chunks, days=days_threshold))
+        logger.info(f"Archived {report['archived']} old jobs")
+        return report["archived"]
@@ -15,8 +15,11 @@ from urllib.parse import urljoin, urlparse
 import aiohttp
 from bs4 import BeautifulSoup
 
+from pymongo import UpdateOne
+
 # Import from current backend directory
-from backend.database import get_db
+from backend.database import get_database
+from backend.services.ingest_pipeline import build_ingest_pipeline
 
 # Setup logging
 logging.basicConfig(
@@ -24,6 +27,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Jobs this crawler saved before they carried (source, source_id). They were
+# looked up by external_id, which is not stable, so they are matched on the
+# apply URL instead; JobDataManager's jobs with the same source_type are the
+# ones with application_urls.
+LEGACY_DISTILL_QUERY = {"source_type": "distill_crawler", "application_urls": {"$exists": False}}
+LEGACY_DISTILL_FIELDS = ("apply_url", "title", "company")
+
 
 @dataclass
 class JobListing:
@@ -981,119 +991,74 @@ class DistillCrawler:
 
         return all_jobs
 
-    def save_jobs_to_database(self, jobs: List[JobListing]):
-        """Save jobs and company information to MongoDB database"""
+    async def save_jobs_to_database(self, jobs: List[JobListing]):
+        """Save jobs through the ingest pipeline and upsert company information"""
         try:
-            db = get_db()
-            jobs_collection = db["jobs"]
-            companies_collection = db["companies"]
-
-            new_jobs = 0
-            updated_jobs = 0
-            new_companies = 0
-            updated_companies = 0
-
-            # Track processed companies to avoid duplicates
-            processed_companies = set()
+            db = await get_database()
+
+            # external_id hashes apply_url with hash(), which differs between
+            # processes, so the key is derived from apply URL, title and company
+            pipeline = build_ingest_pipeline(
+                db,
+                source="distill_crawler",
+                id_field=None,
+                legacy_query=LEGACY_DISTILL_QUERY,
+                legacy_fields=LEGACY_DISTILL_FIELDS,
+            )
+            report = await pipeline.run(jobs)
 
+            # One upsert per distinct company, sent as a single bulk write
+            companies_by_name = {c.get("name"): c for c in self.companies_data}
+            job_counts: Dict[str, int] = {}
+            career_pages: Dict[str, str] = {}
             for job in jobs:
-                # Save job
-                existing_job = jobs_collection.find_one(
-                    {"external_id": job.external_id, "source_url": job.source_url}
-                )
-
-                job_data = {
-                    "title": job.title,
-                    "company": job.company,
-                    "location": job.location,
-                    "job_type": job.job_type,
-                    "salary": job.salary,
-                    "description": job.description,
-                    "requirements": job.requirements or [],
-                    "posted_date": job.posted_date,
-                    "apply_url": job.apply_url,
-                    "remote_type": job.remote_type,
-                    "skills": job.skills or [],
-                    "source_url": job.source_url,
-                    "external_id": job.external_id,
-                    "is_active": True,
-                    "last_updated": datetime.now(),
-                    "source_type": "distill_crawler",
-                }
-
-                if existing_job:
-                    jobs_collection.update_one(
-                        {"_id": existing_job["_id"]}, {"$set": job_data}
-                    )
-                    updated_jobs += 1
-                else:
-                    job_data["created_at"] = datetime.now()
-                    jobs_collection.insert_one(job_data)
-                    new_jobs += 1
-
-                # Save company if not already processed
-                if job.company not in processed_companies:
-                    # Find company in companies_data
-                    company_data = next(
-                        (
-                            c
-                            for c in self.companies_data
-                            if c.get("name") == job.company
-                        ),
-                        None,
-                    )
+                if job.company in companies_by_name:
+                    job_counts[job.company] = job_counts.get(job.company, 0) + 1
+                    career_pages.setdefault(job.company, job.source_url)
 
-                    if company_data:
-                        company_doc = {
-                            "name": job.company,
-                            "website": company_data.get(
-                                "uri", ""
-                            ),  # Use URI as website
-                            "careerPage": job.source_url,  # Use job source URL as career page
-                            "description": company_data.get("description", ""),
-                            "location": "Remote",  # Default to Remote
-                            "size": "Unknown",  # Default size
-                            "industry": "Technology",  # Default industry
-                            "is_active": True,
-                            "created_at": datetime.now(),
-                            "updated_at": datetime.now(),
-                            "jobs_count": 1,  # Will be updated later
-                            "remote_policy": "Remote-first",  # Default policy
-                        }
-
-                        # Check if company exists
-                        existing_company = companies_collection.find_one(
-                            {"name": job.company}
-                        )
-
-                        if existing_company:
-                            # Update company
-                            companies_collection.update_one(
-                                {"_id": existing_company["_id"]},
-                                {
-                                    "$set": {
-                                        "website": company_doc["website"],
-                                        "careerPage": company_doc["careerPage"],
-                                        "updated_at": datetime.now(),
-                                    },
-                                    "$inc": {"jobs_count": 1},
+            new_companies = 0
+            updated_companies = 0
+            if job_counts:
+                now = datetime.now()
+                operations = []
+                for name, count in job_counts.items():
+                    company_data = companies_by_name[name]
+                    operations.append(
+                        UpdateOne(
+                            {"name": name},
+                            {
+                                "$set": {
+                                    "website": company_data.get("uri", ""),
+                                    "careerPage": career_pages[name],
+                                    "updated_at": now,
                                 },
-                            )
-                            updated_companies += 1
-                        else:
-                            # Insert new company
-                            companies_collection.insert_one(company_doc)
-                            new_companies += 1
-
-                        processed_companies.add(job.company)
+                                "$inc": {"jobs_count": count},
+                                "$setOnInsert": {
+                                    "description": company_data.get("description", ""),
+                                    "location": "Remote",  # Default to Remote
+                                    "size": "Unknown",  # Default size
+                                    "industry": "Technology",  # Default industry
+                                    "is_active": True,
+                                    "created_at": now,
+                                    "remote_policy": "Remote-first",  # Default policy
+                                },
+                            },
+                            upsert=True,
+                        )
+                    )
+                company_result = await db["companies"].bulk_write(
+                    operations, ordered=False
+                )
+                new_companies = company_result.upserted_count
+                updated_companies = company_result.matched_count
 
             logger.info(
-                f"💾 Database save completed: {new_jobs} new jobs, {updated_jobs} updated jobs, {new_companies} new companies, {updated_companies} updated companies"
+                f"💾 Database save completed: {report.new_jobs} new jobs, {report.updated_jobs} updated jobs, {new_companies} new companies, {updated_companies} updated companies"
             )
 
             return {
-                "new_jobs": new_jobs,
-                "updated_jobs": updated_jobs,
+                "new_jobs": report.new_jobs,
+                "updated_jobs": report.updated_jobs,
                 "new_companies": new_companies,
                 "updated_companies": updated_companies,
                 "total_processed": len(jobs),
@@ -1271,7 +1236,7 @@ async def main():
 
     # Save to database
     if jobs:
-        result = crawler.save_jobs_to_database(jobs)
+        result = await crawler.save_jobs_to_database(jobs)
         print(f"\n💾 Saved to database: {result}")
 
 
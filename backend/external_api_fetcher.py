@@ -1,22 +1,24 @@
 import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import aiohttp
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from config import MONGODB_URL
+from backend.services.ingest_pipeline import build_ingest_pipeline
+from config import settings
 
 logger = logging.getLogger(__name__)
 
 
 class ExternalAPIFetcher:
     def __init__(self):
-        self.client = AsyncIOMotorClient(MONGODB_URL)
+        self.client = AsyncIOMotorClient(settings.MONGODB_URL)
         self.db = self.client.buzz2remote
         self.jobs_collection = self.db.jobs
         self.companies_collection = self.db.companies
+        self.last_report: Dict[str, Dict[str, Any]] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
 
         # Configure external APIs
         self.apis = {
@@ -25,13 +27,31 @@ class ExternalAPIFetcher:
             "github": "https://jobs.github.com/positions.json",
         }
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared, connection-pooled HTTP session"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=60)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     async def fetch_all_apis(self):
         """Fetch jobs from all configured external APIs"""
         tasks = []
         for api_name, api_url in self.apis.items():
             tasks.append(self.fetch_api(api_name, api_url))
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self.close()
 
         # Log results
         for api_name, result in zip(self.apis.keys(), results):
@@ -43,14 +63,15 @@ class ExternalAPIFetcher:
     async def fetch_api(self, api_name: str, api_url: str) -> int:
         """Fetch jobs from a specific API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url) as response:
-                    if response.status != 200:
-                        raise Exception(f"API returned status {response.status}")
-
-                    jobs = await response.json()
-                    processed_jobs = await self.process_jobs(api_name, jobs)
-                    return len(processed_jobs)
+            session = self._get_session()
+            async with session.get(api_url) as response:
+                if response.status != 200:
+                    raise Exception(f"API returned status {response.status}")
+
+                jobs = await response.json()
+
+            processed_jobs = await self.process_jobs(api_name, jobs)
+            return len(processed_jobs)
         except Exception as e:
             logger.error(f"Error fetching {api_name}: {str(e)}")
             raise
@@ -58,33 +79,21 @@ class ExternalAPIFetcher:
     async def process_jobs(
         self, api_name: str, jobs: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Process and store jobs from an API"""
+        """Process jobs from an API and push them through the ingest pipeline"""
         processed_jobs = []
 
         for job in jobs:
             try:
                 # Transform job data to our format
-                processed_job = self.transform_job(api_name, job)
-
-                # Check if job already exists
-                existing_job = await self.jobs_collection.find_one(
-                    {"source": api_name, "source_id": processed_job["source_id"]}
-                )
-
-                if existing_job:
-                    # Update existing job
-                    await self.jobs_collection.update_one(
-                        {"_id": existing_job["_id"]}, {"$set": processed_job}
-                    )
-                else:
-                    # Insert new job
-                    await self.jobs_collection.insert_one(processed_job)
-
-                processed_jobs.append(processed_job)
+                processed_jobs.append(self.transform_job(api_name, job))
             except Exception as e:
                 logger.error(f"Error processing job from {api_name}: {str(e)}")
                 continue
 
+        pipeline = build_ingest_pipeline(self.db, source=api_name)
+        report = await pipeline.run(processed_jobs)
+        self.last_report[api_name] = report.to_dict()
+
         return processed_jobs
 
     def transform_job(self, api_name: str, job: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,9 +107,7 @@ class ExternalAPIFetcher:
             "url": job.get("url", ""),
             "source": api_name,
             "source_id": str(job.get("id", "")),
-            "posted_at": job.get("posted_at", datetime.utcnow()),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
+            "posted_at": job.get("posted_at"),
             "status": "active",
         }
 
@@ -82,6 +82,17 @@ class ServiceNotifier:
             logger.info(f"Notification (disabled): {message}")
             return
 
+        # Inside the app, hand off to the durable, rate-limited outbox
+        try:
+            from backend.services.telegram_outbox import get_telegram_outbox
+
+            outbox = get_telegram_outbox()
+        except ImportError:
+            outbox = None
+        if outbox is not None:
+            outbox.submit_nowait(outbox.enqueue(self.telegram_chat_id, message))
+            return
+
         try:
             url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
             payload = {
@@ -4,6 +4,7 @@ import os
 import sys
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from typing import Any, Dict, Union
 
 # Sentry configuration for error monitoring
 try:
@@ -19,7 +20,7 @@ from fastapi import Body, Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import (FileResponse, HTMLResponse, JSONResponse,
-                               RedirectResponse)
+                               PlainTextResponse, RedirectResponse)
 from fastapi.staticfiles import StaticFiles
 from motor.motor_asyncio import AsyncIOMotorDatabase
 # Sentry integrations
@@ -95,7 +96,8 @@ from backend.routes.profile_auto_fill import router as profile_auto_fill_router
 from backend.routes.salary_estimation import router as salary_estimation_router
 from backend.routes.sentry_webhook import router as sentry_webhook_router
 from backend.routes.skills_extraction import router as skills_extraction_router
-from backend.utils.auth import get_current_user
+from backend.services.job_stats_materializer import JobStatsMaterializer
+from backend.utils.auth import get_current_admin, get_current_user
 
 # Import Telegram bot and scheduler with error handling
 try:
@@ -119,12 +121,18 @@ except ImportError:
 # Global instances
 telegram_bot = None
 scheduler = None
+dashboard_metrics_task = None
+metrics_rollup_task = None
+email_queue = None
+telegram_outbox = None
+interaction_recorder = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Modern lifespan context manager for FastAPI startup and shutdown."""
-    global telegram_bot, scheduler
+    global telegram_bot, scheduler, dashboard_metrics_task, metrics_rollup_task
+    global email_queue, telegram_outbox, interaction_recorder
 
     logger.info("Application startup...")
 
@@ -142,6 +150,19 @@ async def lifespan(app: FastAPI):
     # Disable bot and scheduler in test environment
     is_testing = os.getenv("TESTING", "false").lower() == "true"
 
+    # Share rate limit counters between workers through MongoDB
+    if os.getenv("RATE_LIMIT_STORAGE", "memory://").startswith("mongodb"):
+        try:
+            from backend.middleware.rate_limiter import MongoRateLimitStore
+            from backend.middleware.rate_limiting import limiter
+
+            store = MongoRateLimitStore(await get_async_db())
+            await store.ensure_indexes()
+            limiter.store = store
+            logger.info("✅ Rate limits shared through MongoDB")
+        except Exception as e:
+            logger.error(f"❌ Failed to set up shared rate limit storage: {e}")
+
     if (
         not is_testing
         and os.getenv("DISABLE_TELEGRAM") != "true"
@@ -156,9 +177,91 @@ async def lifespan(app: FastAPI):
     ):
         scheduler = await start_scheduler()
 
+    # Keep the admin dashboard metrics snapshot fresh in the background
+    if not is_testing and os.getenv("DISABLE_DASHBOARD_METRICS") != "true":
+        try:
+            from backend.services.dashboard_metrics_service import \
+                DashboardMetricsService
+
+            dashboard_metrics_task = asyncio.create_task(
+                DashboardMetricsService(await get_async_db()).run_periodic()
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to start dashboard metrics refresh: {e}")
+
+    # Fold request latency histograms into MongoDB rollups
+    if not is_testing and os.getenv("DISABLE_METRICS_ROLLUP") != "true":
+        try:
+            from backend.services.request_metrics import MetricsRollupService
+
+            metrics_rollup_task = asyncio.create_task(
+                MetricsRollupService(await get_async_db()).run_periodic()
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to start metrics rollup: {e}")
+
+    # Deliver emails from the persistent outbox instead of blocking requests
+    if not is_testing and os.getenv("DISABLE_EMAIL_QUEUE") != "true":
+        try:
+            from backend.services.email_queue import create_email_queue
+            from backend.services.mailgun_service import mailgun_service
+
+            email_queue = create_email_queue(await get_async_db())
+            await email_queue.start()
+            mailgun_service.attach_queue(email_queue)
+            logger.info("✅ Email queue started")
+        except Exception as e:
+            logger.error(f"❌ Failed to start email queue: {e}")
+            email_queue = None
+
+    # Rate-limited, durable Telegram delivery for notifications and digests
+    if not is_testing and os.getenv("TELEGRAM_BOT_TOKEN"):
+        try:
+            from backend.services.telegram_outbox import (
+                create_telegram_outbox, set_telegram_outbox)
+
+            telegram_outbox = create_telegram_outbox(await get_async_db())
+            await telegram_outbox.start()
+            set_telegram_outbox(telegram_outbox)
+            logger.info("✅ Telegram outbox started")
+        except Exception as e:
+            logger.error(f"❌ Failed to start Telegram outbox: {e}")
+            telegram_outbox = None
+
+    # Buffer job interaction events and fold them into per-day counters
+    if not is_testing:
+        try:
+            from backend.services.interaction_analytics import (
+                InteractionRecorder, set_interaction_recorder)
+
+            interaction_recorder = InteractionRecorder(await get_async_db())
+            await interaction_recorder.start()
+            set_interaction_recorder(interaction_recorder)
+        except Exception as e:
+            logger.error(f"❌ Failed to start interaction recorder: {e}")
+            interaction_recorder = None
+
     yield
 
     logger.info("Application shutdown...")
+    if interaction_recorder:
+        # Flushes whatever is still buffered
+        await interaction_recorder.stop()
+    if telegram_outbox:
+        await telegram_outbox.stop()
+    if dashboard_metrics_task:
+        dashboard_metrics_task.cancel()
+    if metrics_rollup_task:
+        metrics_rollup_task.cancel()
+        try:
+            from backend.services.request_metrics import MetricsRollupService
+
+            await MetricsRollupService(await get_async_db()).rollup()
+        except Exception as e:
+            logger.error(f"❌ Final metrics rollup failed: {e}")
+
+    if email_queue:
+        await email_queue.stop()
     if scheduler:
         await stop_scheduler()
 
@@ -270,50 +373,45 @@ app.add_middleware(
 )
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-from slowapi.errors import RateLimitExceeded
-
-# Add rate limiting middleware
-from backend.middleware.rate_limiting import custom_rate_limit_handler, limiter
+# Endpoint-level limits (RateLimits decorators) raise RateLimitExceeded
+from backend.middleware.rate_limiter import RateLimitExceeded
+from backend.middleware.rate_limiting import (RateLimitingMiddleware,
+                                              custom_rate_limit_handler)
 
-app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, custom_rate_limit_handler)
 
-# Add enhanced security headers middleware
-from backend.middleware.security_headers import initialize_security_middleware
-
-security_headers, security_reporting = initialize_security_middleware(app)
-app.add_middleware(type(security_headers))
-app.add_middleware(type(security_reporting))
-
-# Add response caching middleware
-from backend.middleware.response_cache import initialize_cache_middleware
-
-cache_middleware = initialize_cache_middleware(app)
-app.add_middleware(type(cache_middleware))
-
-# Add comprehensive error handling middleware
+# Security headers, response caching, error handling, input validation, rate
+# limiting, activity tracking and performance monitoring run as stages of one
+# pure-ASGI middleware, listed outermost first
+from backend.middleware.activity_middleware import ActivityTrackingMiddleware
 from backend.middleware.error_handler import initialize_error_handler
-
-error_handler = initialize_error_handler(app)
-app.add_middleware(type(error_handler))
-
-# Add input validation middleware (gradual rollout)
 from backend.middleware.input_validation import \
     initialize_input_validation_middleware
-
-input_validation = initialize_input_validation_middleware(app)
-app.add_middleware(type(input_validation))
-
-# Add activity tracking middleware
-from backend.middleware.activity_middleware import ActivityTrackingMiddleware
-
-app.add_middleware(ActivityTrackingMiddleware)
-
-# Add performance monitoring middleware
 from backend.middleware.performance_monitoring import initialize_performance_monitoring
+from backend.middleware.pipeline import RequestPipelineMiddleware
+from backend.middleware.response_cache import initialize_cache_middleware
+from backend.middleware.security_headers import initialize_security_middleware
 
-performance_middleware = initialize_performance_monitoring(app)
-app.add_middleware(type(performance_middleware))
+security_headers, security_reporting = initialize_security_middleware()
+cache_middleware = initialize_cache_middleware()
+error_handler = initialize_error_handler()
+input_validation = initialize_input_validation_middleware()
+performance_middleware = initialize_performance_monitoring()
+rate_limiting = RateLimitingMiddleware()
+
+app.add_middleware(
+    RequestPipelineMiddleware,
+    stages=[
+        performance_middleware,
+        ActivityTrackingMiddleware(),
+        rate_limiting,
+        input_validation,
+        error_handler,
+        cache_middleware,
+        security_reporting,
+        security_headers,
+    ],
+)
 
 # Add session middleware
 app.add_middleware(
@@ -458,20 +556,11 @@ async def clear_cache_pattern(pattern: str):
 async def performance_stats():
     """Get performance monitoring statistics."""
     try:
-        # Get performance stats from middleware
-        performance_middleware = getattr(app.state, "performance_middleware", None)
-        if performance_middleware:
-            stats = performance_middleware.get_performance_stats()
-        else:
-            stats = {
-                "total_requests": 0,
-                "slow_requests": 0,
-                "average_response_time": 0.0,
-                "slow_request_percentage": 0.0
-            }
-        
+        from backend.middleware.performance_monitoring import \
+            get_performance_stats
+
         return {
-            "performance_stats": stats,
+            "performance_stats": get_performance_stats(),
             "timestamp": datetime.utcnow().isoformat(),
             "status": "active"
         }
@@ -484,6 +573,17 @@ async def performance_stats():
         }
 
 
+@app.get("/metrics", tags=["Performance"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request latency histograms in the Prometheus text exposition format."""
+    from backend.services.request_metrics import get_metrics_registry
+
+    return PlainTextResponse(
+        get_metrics_registry().render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 @app.get("/api/error-stats", tags=["Monitoring"])
 async def error_stats():
     """Get error statistics and monitoring data"""
@@ -545,22 +645,14 @@ async def get_job_statistics():
     """Get job statistics for frontend dashboard."""
     try:
         db = await get_async_db()
-        jobs_col = db["jobs"]
-
-        total_jobs = await jobs_col.count_documents({})
-        active_jobs = await jobs_col.count_documents({"is_active": True})
-        remote_jobs = await jobs_col.count_documents({"work_type": "remote"})
-
-        # Get recent jobs count (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_jobs = await jobs_col.count_documents({"created_at": {"$gte": week_ago}})
+        summary = await JobStatsMaterializer(db).get_summary()
 
         return {
-            "total_positions": total_jobs,
-            "active_positions": active_jobs,
-            "remote_positions": remote_jobs,
-            "recent_positions": recent_jobs,
-            "last_updated": datetime.utcnow().isoformat(),
+            "total_positions": summary.get("total_jobs", 0),
+            "active_positions": summary.get("active_jobs", 0),
+            "remote_positions": summary.get("remote_jobs", 0),
+            "recent_positions": summary.get("recent_jobs", 0),
+            "last_updated": summary.get("updated_at", datetime.utcnow()).isoformat(),
         }
     except Exception as e:
         logger.error(f"Error getting job statistics: {e}")
@@ -578,17 +670,10 @@ async def get_job_statistics_v1():
     """Get job statistics for frontend dashboard with companies count."""
     try:
         db = await get_async_db()
-        jobs_col = db["jobs"]
         companies_col = db["companies"]
 
-        # Job statistics
-        total_jobs = await jobs_col.count_documents({})
-        active_jobs = await jobs_col.count_documents({"is_active": True})
-        remote_jobs = await jobs_col.count_documents({"work_type": "remote"})
-
-        # Get recent jobs count (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_jobs = await jobs_col.count_documents({"created_at": {"$gte": week_ago}})
+        # Job statistics come from the materialized job_stats summary
+        summary = await JobStatsMaterializer(db).get_summary()
 
         # Companies statistics
         total_companies = await companies_col.count_documents({})
@@ -596,42 +681,20 @@ async def get_job_statistics_v1():
             {"is_active": {"$ne": False}}
         )
 
-        # Count unique companies from jobs
-        unique_companies_pipeline = [
-            {"$group": {"_id": "$company"}},
-            {"$count": "total"},
-        ]
-        unique_companies_result = await jobs_col.aggregate(
-            unique_companies_pipeline
-        ).to_list(length=None)
-        unique_companies_count = (
-            unique_companies_result[0]["total"] if unique_companies_result else 0
-        )
-
-        # Countries count (estimate based on unique locations)
-        unique_locations_pipeline = [
-            {"$group": {"_id": "$location"}},
-            {"$count": "total"},
-        ]
-        unique_locations_result = await jobs_col.aggregate(
-            unique_locations_pipeline
-        ).to_list(length=None)
-        countries_count = (
-            unique_locations_result[0]["total"] if unique_locations_result else 0
-        )
-
         return {
-            "total_jobs": total_jobs,
-            "active_jobs": active_jobs,
-            "remote_jobs": remote_jobs,
-            "recent_jobs": recent_jobs,
+            "total_jobs": summary.get("total_jobs", 0),
+            "active_jobs": summary.get("active_jobs", 0),
+            "remote_jobs": summary.get("remote_jobs", 0),
+            "recent_jobs": summary.get("recent_jobs", 0),
             "companies_count": max(
-                unique_companies_count, active_companies, 820
+                summary.get("companies_count", 0), active_companies, 820
             ),  # Use the higher value
-            "countries_count": max(countries_count, 150),  # Minimum 150 countries
+            "countries_count": max(
+                summary.get("locations_count", 0), 150
+            ),  # Minimum 150 countries
             "total_companies": total_companies,
             "active_companies": active_companies,
-            "last_updated": datetime.utcnow().isoformat(),
+            "last_updated": summary.get("updated_at", datetime.utcnow()).isoformat(),
         }
     except Exception as e:
         logger.error(f"Error getting job statistics v1: {e}")
@@ -1307,24 +1370,21 @@ stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 webhook_secret = os.getenv("STRIPE_WEBHOOK_SECRET")
 
 
-@app.post("/api/admin/trigger-job-statistics", tags=["Admin"])
-async def trigger_job_statistics():
-    """Manually trigger job statistics job for testing"""
+@app.post(
+    "/api/admin/trigger-job-statistics",
+    tags=["Admin"],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def trigger_job_statistics(current_admin: dict = Depends(get_current_admin)):
+    """Start the job statistics job in the background"""
     try:
-        from backend.services.scheduler_service import get_scheduler
-
-        scheduler = get_scheduler()
-
-        if not scheduler:
-            raise HTTPException(status_code=500, detail="Scheduler not available")
-
-        # Trigger the job statistics job
-        await scheduler._job_statistics_job()
+        from backend.services.scheduler_service import run_job_now
 
+        run = await run_job_now("job_statistics", source="manual")
         return {
-            "status": "success",
-            "message": "Job statistics job triggered successfully",
-            "timestamp": datetime.now().isoformat(),
+            "status": run["status"],
+            "message": "Job statistics job started",
+            "timestamp": run["timestamp"],
         }
     except Exception as e:
         logger.error(f"Error triggering job statistics: {e}")
@@ -1377,6 +1437,30 @@ def verify_render_ip(request: Request):
     return True
 
 
+async def run_cron_job(job_name: str, message: str) -> Union[Dict[str, Any], JSONResponse]:
+    """Start a scheduler job for an external cron trigger and return at once.
+
+    The run goes through the job's scheduler lease, so a trigger arriving
+    while the job runs on any worker is skipped instead of running it twice;
+    the outcome is in the scheduler logs (see /api/v1/cron/status).
+    """
+    if not SCHEDULER_AVAILABLE:
+        logger.info(f"🔄 {job_name} cron trigger ignored: scheduler not available")
+        return {
+            "status": "scheduler_not_available",
+            "message": "Scheduler service not available",
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+    from backend.services.scheduler_service import run_job_now
+
+    run = await run_job_now(job_name, source="http")
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"status": run["status"], "message": message, "timestamp": run["timestamp"]},
+    )
+
+
 @app.post("/api/v1/cron/health-check", tags=["Cron Jobs"])
 async def cron_health_check(request: Request):
     """Cron job endpoint for health check - keeps Render awake"""
@@ -1391,28 +1475,7 @@ async def cron_health_check(request: Request):
         else:
             logger.warning(f"⚠️ Health check from non-Render IP: {request.client.host}")
 
-        if SCHEDULER_AVAILABLE:
-            try:
-                from backend.services.scheduler_service import get_scheduler
-
-                scheduler = get_scheduler()
-                if scheduler:
-                    await scheduler._health_check_job()
-                    return {
-                        "status": "success",
-                        "message": "Health check completed",
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-            except Exception as scheduler_error:
-                logger.warning(f"Scheduler not available: {scheduler_error}")
-
-        # Fallback if scheduler not available
-        logger.info("🔄 Health check cron job executed")
-        return {
-            "status": "success",
-            "message": "Health check completed",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        return await run_cron_job("health_check", "Health check started")
     except HTTPException:
         raise
     except Exception as e:
@@ -1431,28 +1494,7 @@ async def cron_external_api_crawler(request: Request):
         # Verify API key
         verify_cron_api_key(request)
 
-        if SCHEDULER_AVAILABLE:
-            try:
-                from backend.services.scheduler_service import get_scheduler
-
-                scheduler = get_scheduler()
-                if scheduler:
-                    await scheduler._external_api_crawler_job()
-                    return {
-                        "status": "success",
-                        "message": "External API crawler completed",
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-            except Exception as scheduler_error:
-                logger.warning(f"Scheduler not available: {scheduler_error}")
-
-        # Fallback if scheduler not available
-        logger.info("🔄 External API crawler cron job executed")
-        return {
-            "status": "success",
-            "message": "External API crawler completed",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        return await run_cron_job("external_api_crawler", "External API crawler started")
     except HTTPException:
         raise
     except Exception as e:
@@ -1511,28 +1553,7 @@ async def cron_database_cleanup(request: Request):
         # Verify API key
         verify_cron_api_key(request)
 
-        if SCHEDULER_AVAILABLE:
-            try:
-                from backend.services.scheduler_service import get_scheduler
-
-                scheduler = get_scheduler()
-                if scheduler:
-                    await scheduler._database_cleanup_job()
-                    return {
-                        "status": "success",
-                        "message": "Database cleanup completed",
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-            except Exception as scheduler_error:
-                logger.warning(f"Scheduler not available: {scheduler_error}")
-
-        # Fallback if scheduler not available
-        logger.info("🔄 Database cleanup cron job executed")
-        return {
-            "status": "success",
-            "message": "Database cleanup completed",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        return await run_cron_job("database_cleanup", "Database cleanup started")
     except HTTPException:
         raise
     except Exception as e:
@@ -1551,28 +1572,7 @@ async def cron_job_statistics(request: Request):
         # Verify API key
         verify_cron_api_key(request)
 
-        if SCHEDULER_AVAILABLE:
-            try:
-                from backend.services.scheduler_service import get_scheduler
-
-                scheduler = get_scheduler()
-                if scheduler:
-                    await scheduler._job_statistics_job()
-                    return {
-                        "status": "success",
-                        "message": "Job statistics completed",
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-            except Exception as scheduler_error:
-                logger.warning(f"Scheduler not available: {scheduler_error}")
-
-        # Fallback if scheduler not available
-        logger.info("🔄 Job statistics cron job executed")
-        return {
-            "status": "success",
-            "message": "Job statistics completed",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        return await run_cron_job("job_statistics", "Job statistics started")
     except HTTPException:
         raise
     except Exception as e:
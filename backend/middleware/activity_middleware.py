@@ -1,112 +1,84 @@
-import json
 import logging
 import time
 import uuid
-from datetime import datetime
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Dict, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
 
 from ..services.activity_logger import activity_logger
+from .pipeline import STATIC_PREFIXES, PipelineStage, RequestContext
 
 logger = logging.getLogger(__name__)
 
 
-class ActivityTrackingMiddleware(BaseHTTPMiddleware):
+class ActivityTrackingMiddleware(PipelineStage):
     """Middleware to track all user activities and API calls"""
 
-    def __init__(self, app, exclude_paths: list = None):
-        super().__init__(app)
-        self.exclude_paths = exclude_paths or [
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/favicon.ico",
-            "/health",
-            "/admin/static",
-            "/static",
-        ]
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip tracking for excluded paths
-        if any(request.url.path.startswith(path) for path in self.exclude_paths):
-            return await call_next(request)
+    name = "activity"
 
-        # Start tracking
-        start_time = time.time()
-        request_id = str(uuid.uuid4())
+    def __init__(self, app=None, exclude_paths: list = None):
+        self.exclude_paths = tuple(exclude_paths or (*STATIC_PREFIXES, "/health"))
 
-        # Extract user info from request
-        user_id = await self._extract_user_id(request)
-        session_id = await self._extract_session_id(request)
+    def route_config(self, path: str) -> Optional[bool]:
+        """Skip tracking for excluded paths"""
+        if path.startswith(self.exclude_paths):
+            return None
+        return True
 
-        # Prepare request data for logging
-        request_data = {
-            "request_id": request_id,
-            "method": request.method,
-            "endpoint": request.url.path,
-            "query_params": dict(request.query_params),
-            "headers": {
-                k: v
-                for k, v in request.headers.items()
-                if k.lower() not in ["authorization", "cookie"]
-            },
-            "ip_address": self._get_client_ip(request),
-            "user_agent": request.headers.get("user-agent", ""),
-            "referer": request.headers.get("referer", ""),
+    async def on_request(self, ctx: RequestContext, config: bool) -> None:
+        # Start tracking
+        request = ctx.request
+        ctx.data[self.name] = {
+            "start_time": time.time(),
+            "request_id": str(uuid.uuid4()),
+            # Extract user info from request
+            "user_id": await self._extract_user_id(request),
+            "session_id": await self._extract_session_id(request),
         }
 
-        # Process request
-        response = None
-        error_occurred = False
-        error_message = None
-
-        try:
-            response = await call_next(request)
-        except Exception as e:
-            error_occurred = True
-            error_message = str(e)
-            logger.error(f"Request {request_id} failed: {error_message}")
-            raise
-        finally:
-            # Calculate response time
-            process_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-
-            # Log the activity
-            try:
-                await self._log_request_activity(
-                    request_data=request_data,
-                    user_id=user_id,
-                    session_id=session_id,
-                    response_time_ms=process_time,
-                    status_code=response.status_code if response else 500,
-                    error_occurred=error_occurred,
-                    error_message=error_message,
-                )
-            except Exception as log_error:
-                logger.error(f"Failed to log activity: {str(log_error)}")
+    def on_response_start(
+        self, ctx: RequestContext, config: bool, headers: MutableHeaders
+    ) -> None:
+        tracking = ctx.data[self.name]
+        process_time = (time.time() - tracking["start_time"]) * 1000
 
         # Add response headers
-        if response:
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Response-Time"] = f"{process_time:.2f}ms"
-
-        return response
+        headers["X-Request-ID"] = tracking["request_id"]
+        headers["X-Response-Time"] = f"{process_time:.2f}ms"
 
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract real client IP from request"""
-        # Check proxy headers
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
+    async def on_complete(self, ctx: RequestContext, config: bool) -> None:
+        """Log the activity once the response has been sent"""
+        tracking = ctx.data[self.name]
+        process_time = (time.time() - tracking["start_time"]) * 1000  # Convert to milliseconds
+        headers = ctx.headers
 
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
+        # Prepare request data for logging
+        request_data = {
+            "request_id": tracking["request_id"],
+            "method": ctx.method,
+            "endpoint": ctx.path,
+            "query_params": dict(ctx.query_params),
+            "ip_address": ctx.client_ip,
+            "user_agent": headers.get("user-agent", ""),
+            "referer": headers.get("referer", ""),
+        }
 
-        # Fallback to client IP
-        return request.client.host if request.client else "unknown"
+        error_occurred = not ctx.response_started
+        try:
+            await self._log_request_activity(
+                request_data=request_data,
+                user_id=tracking["user_id"],
+                session_id=tracking["session_id"],
+                response_time_ms=process_time,
+                status_code=ctx.status,
+                error_occurred=error_occurred,
+                error_message="Request failed before a response was sent"
+                if error_occurred
+                else None,
+            )
+        except Exception as log_error:
+            logger.error(f"Failed to log activity: {str(log_error)}")
 
     async def _extract_user_id(self, request: Request) -> Optional[str]:
         """Extract user ID from JWT token or session"""
@@ -13,43 +13,46 @@ from typing import Any, Dict, Optional
 
 from fastapi import HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.middleware.pipeline import PipelineStage, RequestContext
 
 logger = logging.getLogger(__name__)
 
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+class ErrorHandlingMiddleware(PipelineStage):
     """Comprehensive error handling and logging middleware"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    name = "error_handler"
+
+    def __init__(self, app=None):
         self.error_counts = {}
         self.error_patterns = {}
 
-    async def dispatch(self, request: Request, call_next):
-        """Process request with comprehensive error handling"""
-        start_time = time.time()
-        error_id = str(uuid.uuid4())[:8]
-
-        try:
-            # Add error ID to request state
-            request.state.error_id = error_id
-            request.state.start_time = start_time
-
-            response = await call_next(request)
-
-            # Log successful requests for monitoring
-            if response.status_code >= 400:
-                await self._log_error_response(request, response, start_time, error_id)
+    async def on_request(self, ctx: RequestContext, config) -> None:
+        """Add error ID to request state"""
+        ctx.state["error_id"] = uuid.uuid4().hex[:8]
+        ctx.state["start_time"] = time.time()
 
-            return response
-
-        except HTTPException as exc:
-            return await self._handle_http_exception(request, exc, start_time, error_id)
+    async def on_error(
+        self, ctx: RequestContext, config, exc: Exception
+    ) -> JSONResponse:
+        """Turn exceptions from the endpoint into standardized responses"""
+        error_id = ctx.state["error_id"]
+        start_time = ctx.state["start_time"]
+        ctx.data[self.name] = True
+        if isinstance(exc, HTTPException):
+            return await self._handle_http_exception(
+                ctx.request, exc, start_time, error_id
+            )
+        return await self._handle_generic_exception(
+            ctx.request, exc, start_time, error_id
+        )
 
-        except Exception as exc:
-            return await self._handle_generic_exception(
-                request, exc, start_time, error_id
+    async def on_complete(self, ctx: RequestContext, config) -> None:
+        """Log error responses returned by endpoints for monitoring"""
+        if ctx.status >= 400 and self.name not in ctx.data:
+            await self._log_error_response(
+                ctx.request, ctx.status, ctx.state["start_time"], ctx.state["error_id"]
             )
 
     async def _handle_http_exception(
@@ -181,7 +184,7 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
         logger.error(f"Unhandled Exception: {json.dumps(log_data, indent=2)}")
 
     async def _log_error_response(
-        self, request: Request, response, start_time: float, error_id: str
+        self, request: Request, status_code: int, start_time: float, error_id: str
     ):
         """Log error responses from endpoints"""
 
@@ -189,7 +192,7 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
 
         log_data = {
             "error_id": error_id,
-            "status_code": response.status_code,
+            "status_code": status_code,
             "path": request.url.path,
             "method": request.method,
             "duration_ms": round(duration * 1000, 2),
@@ -197,9 +200,9 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
             "timestamp": datetime.now(UTC).isoformat(),
         }
 
-        if response.status_code >= 500:
+        if status_code >= 500:
             logger.error(f"Error Response: {json.dumps(log_data)}")
-        elif response.status_code >= 400:
+        elif status_code >= 400:
             logger.warning(f"Client Error Response: {json.dumps(log_data)}")
 
     def _track_error(self, status_code: int, path: str):
@@ -390,8 +393,8 @@ def get_error_handler() -> Optional[ErrorHandlingMiddleware]:
     return error_handler_middleware
 
 
-def initialize_error_handler(app) -> ErrorHandlingMiddleware:
-    """Initialize and return error handler middleware"""
+def initialize_error_handler(app=None) -> ErrorHandlingMiddleware:
+    """Initialize and return the error handling stage"""
     global error_handler_middleware
-    error_handler_middleware = ErrorHandlingMiddleware(app)
+    error_handler_middleware = ErrorHandlingMiddleware()
     return error_handler_middleware
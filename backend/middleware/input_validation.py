@@ -13,7 +13,9 @@ from typing import Any, Dict, List, Optional, Union
 
 from fastapi import HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.middleware.pipeline import (STATIC_PREFIXES, PipelineStage,
+                                         RequestContext)
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +85,17 @@ class InputValidator:
             r"\\windows\\system32",
         ]
 
+        # One compiled alternation per category instead of a search per pattern
+        self._malicious_checks = [
+            (label, re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE))
+            for label, patterns in (
+                ("XSS", self.xss_patterns),
+                ("SQL injection", self.sql_patterns),
+                ("Command injection", self.cmd_patterns),
+                ("Path traversal", self.path_patterns),
+            )
+        ]
+
         # Email validation pattern
         self.email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
 
@@ -233,39 +246,10 @@ class InputValidator:
 
     def _check_malicious_patterns(self, data: str):
         """Check for malicious patterns in input"""
-        data_lower = data.lower()
-
-        # Check XSS patterns
-        for pattern in self.xss_patterns:
-            if re.search(pattern, data_lower, re.IGNORECASE):
-                logger.warning(f"XSS pattern detected: {pattern}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Potentially malicious input detected",
-                )
-
-        # Check SQL injection patterns
-        for pattern in self.sql_patterns:
-            if re.search(pattern, data_lower, re.IGNORECASE):
-                logger.warning(f"SQL injection pattern detected: {pattern}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Potentially malicious input detected",
-                )
-
-        # Check command injection patterns
-        for pattern in self.cmd_patterns:
-            if re.search(pattern, data_lower, re.IGNORECASE):
-                logger.warning(f"Command injection pattern detected: {pattern}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Potentially malicious input detected",
-                )
-
-        # Check path traversal patterns
-        for pattern in self.path_patterns:
-            if re.search(pattern, data_lower, re.IGNORECASE):
-                logger.warning(f"Path traversal pattern detected: {pattern}")
+        for label, pattern in self._malicious_checks:
+            match = pattern.search(data)
+            if match:
+                logger.warning(f"{label} pattern detected: {match.group(0)!r}")
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Potentially malicious input detected",
@@ -341,11 +325,12 @@ class InputValidator:
 input_validator = InputValidator()
 
 
-class InputValidationMiddleware(BaseHTTPMiddleware):
+class InputValidationMiddleware(PipelineStage):
     """Middleware for automatic input validation"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    name = "input_validation"
+
+    def __init__(self, app=None):
         self.validator = input_validator
 
         # Endpoints that need special validation
@@ -361,68 +346,58 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
             "/api/v1/profile": {"email": "email", "phone": "phone", "website": "url"},
         }
 
-    async def dispatch(self, request: Request, call_next):
+    def route_config(self, path: str) -> Optional[Dict[str, Any]]:
+        """Docs and static assets are not validated"""
+        if path.startswith(STATIC_PREFIXES):
+            return None
+        return {
+            "rules": self.validation_rules.get(path, {}),
+            "search": "search" in path,
+        }
+
+    async def on_request(
+        self, ctx: RequestContext, config: Dict[str, Any]
+    ) -> Optional[JSONResponse]:
         """Process request with input validation"""
         try:
-            # Get request path
-            path = request.url.path
-            method = request.method
-
-            # Skip validation for GET requests without query params
-            if method == "GET" and not request.query_params:
-                return await call_next(request)
-
             # Validate query parameters
-            if request.query_params:
-                await self._validate_query_params(request, path)
+            if ctx.scope.get("query_string"):
+                self._validate_query_params(ctx, config)
 
             # Validate request body for POST/PUT requests
-            if method in ["POST", "PUT", "PATCH"]:
-                await self._validate_request_body(request, path)
+            if ctx.method in ("POST", "PUT", "PATCH"):
+                await self._validate_request_body(ctx)
 
-            response = await call_next(request)
-            return response
-
-        except HTTPException:
-            raise
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
         except Exception as e:
             logger.warning(f"Input validation middleware error: {e}")
             # Continue without validation on error
-            return await call_next(request)
+        return None
 
-    async def _validate_query_params(self, request: Request, path: str):
+    def _validate_query_params(self, ctx: RequestContext, config: Dict[str, Any]):
         """Validate query parameters"""
-        for key, value in request.query_params.items():
-            if key == "q" and "search" in path:
+        for key, value in ctx.query_params.multi_items():
+            if key == "q" and config["search"]:
                 # Special handling for search queries
                 self.validator.validate_search_query(value)
             else:
                 # General validation
                 self.validator.sanitize_string(value, max_length=500)
 
-    async def _validate_request_body(self, request: Request, path: str):
-        """Validate request body"""
+    async def _validate_request_body(self, ctx: RequestContext):
+        """Validate the JSON body, parsed once and shared with later stages"""
+        if "application/json" not in ctx.headers.get("content-type", ""):
+            return
         try:
-            # Get content type
-            content_type = request.headers.get("content-type", "")
-
-            if "application/json" in content_type:
-                # Read and validate JSON body
-                body = await request.body()
-                if body:
-                    try:
-                        data = json.loads(body)
-                        self.validator.validate_json_data(data)
-                    except json.JSONDecodeError:
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Invalid JSON format",
-                        )
-
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.warning(f"Request body validation error: {e}")
+            data = await ctx.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid JSON format",
+            )
+        if data is not None:
+            self.validator.validate_json_data(data)
 
 
 # Create middleware instance (placeholder - will be initialized when app is created)
@@ -430,11 +405,11 @@ input_validation_middleware = None
 
 
 # Initialize middleware instance
-def initialize_input_validation_middleware(app):
-    """Initialize input validation middleware instance with app"""
+def initialize_input_validation_middleware(app=None):
+    """Initialize the input validation stage"""
     global input_validation_middleware
 
-    input_validation_middleware = InputValidationMiddleware(app)
+    input_validation_middleware = InputValidationMiddleware()
 
     return input_validation_middleware
 
@@ -1,77 +1,84 @@
-import time
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+
+from starlette.datastructures import MutableHeaders
+
+from backend.middleware.pipeline import PipelineStage, RequestContext
+from backend.services.query_profiler import get_query_profiler
+from backend.services.request_metrics import (UNMATCHED_ROUTE,
+                                              get_metrics_registry)
 
 logger = logging.getLogger(__name__)
 
 
-class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
+def route_template(scope) -> str:
+    """Route path template (e.g. /api/v1/jobs/{job_id}) to bound label cardinality."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class PerformanceMonitoringMiddleware(PipelineStage):
     """
     Middleware for monitoring API performance and response times.
+
+    Latencies are recorded into the shared metrics registry as per-route,
+    per-method, per-status histograms with the MongoDB share broken out.
     """
 
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
+    name = "performance"
+
+    def __init__(self, app=None):
         self.slow_query_threshold = 1.0  # 1 second
-        self.performance_stats = {
-            "total_requests": 0,
-            "slow_requests": 0,
-            "average_response_time": 0.0,
-            "total_response_time": 0.0
-        }
-
-    async def dispatch(self, request: Request, call_next):
-        # Record start time
-        start_time = time.time()
-        
-        # Process the request
-        response = await call_next(request)
-        
-        # Calculate response time
-        process_time = time.time() - start_time
-        
-        # Update performance stats
-        self.performance_stats["total_requests"] += 1
-        self.performance_stats["total_response_time"] += process_time
-        self.performance_stats["average_response_time"] = (
-            self.performance_stats["total_response_time"] / 
-            self.performance_stats["total_requests"]
-        )
-        
+        self.registry = get_metrics_registry()
+        self.profiler = get_query_profiler()
+
+    async def on_request(self, ctx: RequestContext, config) -> None:
+        ctx.data[self.name] = self.registry.start_request(ctx.method)
+
+    def on_response_start(
+        self, ctx: RequestContext, config, headers: MutableHeaders
+    ) -> None:
         # Add response time header
-        response.headers["X-Response-Time"] = f"{process_time:.3f}s"
-        response.headers["X-Process-Time"] = f"{process_time * 1000:.2f}ms"
-        
+        process_time = ctx.elapsed
+        headers["X-Response-Time"] = f"{process_time:.3f}s"
+        headers["X-Process-Time"] = f"{process_time * 1000:.2f}ms"
+
+    async def on_complete(self, ctx: RequestContext, config) -> None:
+        timing, token = ctx.data[self.name]
+        route = route_template(ctx.scope)
+        process_time = self.registry.finish_request(
+            timing, token, route, ctx.method, ctx.status
+        )
+        if timing.query_shapes:
+            self.profiler.attribute(route, timing.query_shapes)
+
         # Log slow requests
         if process_time > self.slow_query_threshold:
-            self.performance_stats["slow_requests"] += 1
             logger.warning(
-                f"🐌 Slow request detected: {request.method} {request.url.path} "
-                f"took {process_time:.3f}s from {request.client.host}"
+                f"🐌 Slow request detected: {ctx.method} {ctx.path} "
+                f"took {process_time:.3f}s (db {timing.db_time_us / 1000:.1f}ms "
+                f"in {timing.db_calls} commands) from {ctx.client_ip}"
             )
-        
-        # Log performance metrics for high-traffic endpoints
-        if request.url.path in ["/api/v1/jobs/search", "/api/v1/jobs/", "/api/v1/jobs/quick-search-count"]:
-            logger.info(
-                f"📊 Performance: {request.method} {request.url.path} "
-                f"took {process_time:.3f}s (avg: {self.performance_stats['average_response_time']:.3f}s)"
-            )
-        
-        return response
 
     def get_performance_stats(self):
         """Get current performance statistics."""
-        return {
-            **self.performance_stats,
-            "slow_request_percentage": (
-                (self.performance_stats["slow_requests"] / 
-                 max(self.performance_stats["total_requests"], 1)) * 100
-            )
-        }
+        return get_performance_stats(self.slow_query_threshold)
+
+
+def get_performance_stats(slow_threshold: float = 1.0):
+    """Aggregate request statistics from the shared metrics registry."""
+    registry = get_metrics_registry()
+    slow = 0
+    for series in registry.series.values():
+        slow += series.total.count_at_least(int(slow_threshold * 1_000_000))
+    summary = registry.summary()
+    return {
+        **summary,
+        "slow_requests": slow,
+        "slow_request_percentage": slow / max(summary["total_requests"], 1) * 100,
+        "routes": registry.routes()[:20],
+    }
 
 
-def initialize_performance_monitoring(app: ASGIApp) -> PerformanceMonitoringMiddleware:
-    """Initialize performance monitoring middleware."""
-    return PerformanceMonitoringMiddleware(app) 
\ No newline at end of file
+def initialize_performance_monitoring(app=None) -> PerformanceMonitoringMiddleware:
+    """Initialize the performance monitoring stage."""
+    return PerformanceMonitoringMiddleware()
@@ -0,0 +1,245 @@
+"""
+Request Pipeline Middleware
+Runs the security, caching, validation, activity and performance stages in a
+single pure-ASGI middleware with shared per-request state
+"""
+
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.middleware.rate_limiter import resolve_client_ip
+
+logger = logging.getLogger(__name__)
+
+# Docs and static assets skip request-level processing such as validation
+STATIC_PREFIXES = ("/docs", "/redoc", "/openapi.json", "/favicon.ico", "/admin/static", "/static")
+
+
+class RequestContext:
+    """Per-request state shared by every pipeline stage.
+
+    Headers, query params, the body and its JSON are parsed at most once and
+    handed to whichever stage asks first.
+    """
+
+    __slots__ = (
+        "scope",
+        "method",
+        "path",
+        "started",
+        "status",
+        "response_headers",
+        "response_started",
+        "capture_body",
+        "response_body",
+        "data",
+        "_receive",
+        "_body",
+        "_json",
+        "_headers",
+        "_query",
+        "_request",
+        "_replayed",
+    )
+
+    _UNPARSED = object()
+
+    def __init__(self, scope: Scope, receive: Receive):
+        self.scope = scope
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.started = time.perf_counter()
+        self.status = 500
+        self.response_headers: Optional[MutableHeaders] = None
+        self.response_started = False
+        self.capture_body = False
+        self.response_body: List[bytes] = []
+        # Stage-private values, keyed by stage name
+        self.data: Dict[str, Any] = {}
+        self._receive = receive
+        self._body: Optional[bytes] = None
+        self._json: Any = self._UNPARSED
+        self._headers: Optional[Headers] = None
+        self._query: Optional[QueryParams] = None
+        self._request: Optional[Request] = None
+        self._replayed = False
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        return self.scope.setdefault("state", {})
+
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers(scope=self.scope)
+        return self._headers
+
+    @property
+    def query_params(self) -> QueryParams:
+        if self._query is None:
+            self._query = QueryParams(self.scope.get("query_string", b""))
+        return self._query
+
+    @property
+    def request(self) -> Request:
+        """Starlette request view over the same scope, for helpers that need one."""
+        if self._request is None:
+            self._request = Request(self.scope, self.receive)
+        return self._request
+
+    @property
+    def client_ip(self) -> str:
+        """Resolved once per request and shared with handlers as ``request.state.client_ip``."""
+        state = self.state
+        if "client_ip" not in state:
+            client = self.scope.get("client")
+            state["client_ip"] = resolve_client_ip(
+                client[0] if client else None,
+                self.headers.get("x-forwarded-for"),
+                self.headers.get("x-real-ip"),
+            )
+        return state["client_ip"]
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    async def body(self) -> bytes:
+        """Read the request body once; downstream receives a replay of it."""
+        if self._body is None:
+            chunks = []
+            more_body = True
+            while more_body:
+                message = await self._receive()
+                if message["type"] != "http.request":
+                    break
+                chunks.append(message.get("body", b""))
+                more_body = message.get("more_body", False)
+            self._body = b"".join(chunks)
+        return self._body
+
+    async def json(self) -> Any:
+        """Parsed JSON body, also exposed to handlers as ``request.state.json_body``."""
+        if self._json is self._UNPARSED:
+            body = await self.body()
+            self._json = json.loads(body) if body else None
+            self.state["json_body"] = self._json
+        return self._json
+
+    async def receive(self) -> Message:
+        if self._body is not None and not self._replayed:
+            self._replayed = True
+            return {"type": "http.request", "body": self._body, "more_body": False}
+        return await self._receive()
+
+
+class PipelineStage:
+    """Base class for pipeline stages; every hook is optional.
+
+    ``route_config`` is consulted once per distinct path through the route
+    table; returning None skips the stage for that path entirely.
+    """
+
+    name = "stage"
+
+    def route_config(self, path: str) -> Optional[Any]:
+        return True
+
+    async def on_request(self, ctx: RequestContext, config: Any) -> Optional[Response]:
+        return None
+
+    def on_response_start(self, ctx: RequestContext, config: Any, headers: MutableHeaders) -> None:
+        pass
+
+    async def on_error(self, ctx: RequestContext, config: Any, exc: Exception) -> Optional[Response]:
+        return None
+
+    async def on_complete(self, ctx: RequestContext, config: Any) -> None:
+        pass
+
+
+class RouteTable:
+    """Resolve which stages run for a path, memoised per path."""
+
+    def __init__(self, stages: Sequence[PipelineStage], max_paths: int = 4096):
+        self.stages = list(stages)
+        self.lookup = lru_cache(maxsize=max_paths)(self._resolve)
+
+    def _resolve(self, path: str) -> Tuple[Tuple[PipelineStage, Any], ...]:
+        active = []
+        for stage in self.stages:
+            config = stage.route_config(path)
+            if config is not None:
+                active.append((stage, config))
+        return tuple(active)
+
+
+class RequestPipelineMiddleware:
+    """Pure-ASGI middleware running ``stages`` outermost first.
+
+    Stages see requests in order and responses in reverse order, like a
+    stack of middlewares, but without a task and stream per layer.
+    """
+
+    def __init__(self, app: ASGIApp, stages: Sequence[PipelineStage] = ()):
+        self.app = app
+        self.routes = RouteTable(stages)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = RequestContext(scope, receive)
+        active = self.routes.lookup(ctx.path)
+        responders = active
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                ctx.status = message["status"]
+                message["headers"] = list(message.get("headers", []))
+                headers = MutableHeaders(raw=message["headers"])
+                ctx.response_headers = headers
+                for stage, config in reversed(responders):
+                    stage.on_response_start(ctx, config, headers)
+                ctx.response_started = True
+            elif message["type"] == "http.response.body" and ctx.capture_body:
+                ctx.response_body.append(message.get("body", b""))
+            await send(message)
+
+        entered = 0
+        try:
+            for stage, config in active:
+                entered += 1
+                response = await stage.on_request(ctx, config)
+                if response is not None:
+                    responders = active[: entered - 1]
+                    await response(scope, ctx.receive, send_wrapper)
+                    return
+
+            try:
+                await self.app(scope, ctx.receive, send_wrapper)
+            except Exception as exc:
+                if ctx.response_started:
+                    raise
+                for stage, config in reversed(active):
+                    response = await stage.on_error(ctx, config, exc)
+                    if response is not None:
+                        await response(scope, ctx.receive, send_wrapper)
+                        break
+                else:
+                    raise
+        finally:
+            for stage, config in active[:entered]:
+                try:
+                    await stage.on_complete(ctx, config)
+                except Exception as e:
+                    logger.error(f"Pipeline stage {stage.name} failed on completion: {e}")
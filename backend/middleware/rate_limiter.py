@@ -1,133 +1,299 @@
 """
-Rate Limiting Middleware
-Handles rate limiting for API endpoints with special handling for cron jobs
+Rate Limiting Engine
+Sliding-window counters with O(1) cost per request, shared across workers
 """
 
-import time
+import ipaddress
 import logging
-from collections import defaultdict
-from typing import Dict, Tuple, Optional
-from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 logger = logging.getLogger(__name__)
 
-class RateLimiter:
-    def __init__(self):
-        self.requests: Dict[str, list] = defaultdict(list)
-        self.cron_ips = {
-            "165.227.83.0/24",  # cron-job.org IP range
-            "159.89.49.0/24",   # cron-job.org IP range
-            "127.0.0.1",        # localhost
-            "::1"               # localhost IPv6
-        }
-        
-    def is_cron_request(self, request: Request) -> bool:
-        """Check if request is from cron-job.org or local"""
-        client_ip = request.client.host if request.client else "unknown"
-        
-        # Check if IP is in cron-job.org range
-        for cron_ip in self.cron_ips:
-            if self._ip_in_range(client_ip, cron_ip):
-                return True
-        
-        # Check for cron-job.org user agent
-        user_agent = request.headers.get("user-agent", "").lower()
-        if "cron-job.org" in user_agent:
-            return True
-            
-        # Check for cron token in query params or headers
-        cron_token = request.query_params.get("token") or request.headers.get("x-api-key")
-        if cron_token and cron_token in ["buzz2remote-cron-2024", "buzz2remote_cron_2024"]:
-            return True
-            
+RATE_LIMIT_COLLECTION = "rate_limits"
+
+PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`amount` requests per `period` seconds."""
+
+    amount: int
+    period: float
+    text: str = field(default="", compare=False)
+
+    def __str__(self) -> str:
+        return self.text or f"{self.amount}/{self.period:g}s"
+
+
+@lru_cache(maxsize=256)
+def parse_rate_limit(value: str) -> RateLimit:
+    """Parse limits like "30/minute", "1000/hour" or "10/5 minutes"."""
+    amount, _, per = value.partition("/")
+    per = per.strip().lower()
+    multiplier, _, unit = per.rpartition(" ")
+    unit = unit.rstrip("s")
+    if unit not in PERIODS:
+        raise ValueError(f"Unknown rate limit period: {value}")
+    return RateLimit(
+        int(amount), PERIODS[unit] * (int(multiplier) if multiplier else 1), value
+    )
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+
+class RateLimitExceeded(Exception):
+    """Raised by endpoint-level limits; rendered by custom_rate_limit_handler."""
+
+    def __init__(self, limit: RateLimit, retry_after: float):
+        self.limit = limit
+        self.detail = str(limit)
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Rate limit exceeded: {self.detail}")
+
+
+@lru_cache(maxsize=4096)
+def _parse_ip(ip: str):
+    try:
+        return ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+
+
+def parse_networks(networks: Iterable[str]) -> tuple:
+    """Single addresses are treated as /32 (or /128) networks."""
+    return tuple(ipaddress.ip_network(network, strict=False) for network in networks)
+
+
+def ip_in_networks(ip: str, networks: tuple) -> bool:
+    """CIDR membership check; unparseable addresses never match."""
+    address = _parse_ip(ip)
+    if address is None:
         return False
-    
-    def _ip_in_range(self, ip: str, ip_range: str) -> bool:
-        """Check if IP is in range (simple implementation)"""
-        if "/" not in ip_range:
-            return ip == ip_range
-        
-        # Simple CIDR check
-        base_ip = ip_range.split("/")[0]
-        return ip == base_ip
-    
-    def check_rate_limit(
-        self, 
-        request: Request, 
-        max_requests: int = 100, 
-        window_seconds: int = 60,
-        cron_max_requests: int = 10,
-        cron_window_seconds: int = 300  # 5 minutes for cron jobs
-    ) -> bool:
-        """
-        Check rate limit for request
-        
-        Args:
-            request: FastAPI request object
-            max_requests: Maximum requests per window for normal users
-            window_seconds: Time window in seconds for normal users
-            cron_max_requests: Maximum requests per window for cron jobs
-            cron_window_seconds: Time window in seconds for cron jobs
-        """
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
-        
-        # Use different limits for cron jobs
-        if self.is_cron_request(request):
-            max_req = cron_max_requests
-            window = cron_window_seconds
-            logger.info(f"Cron request detected from {client_ip}, using cron limits: {max_req}/{window}s")
+    return any(
+        address.version == network.version and address in network
+        for network in networks
+    )
+
+
+# Peers whose X-Forwarded-For / X-Real-IP headers are believed. The default
+# covers loopback and private ranges, where the hosting load balancer sits.
+TRUSTED_PROXIES = parse_networks(
+    network.strip()
+    for network in os.getenv(
+        "TRUSTED_PROXIES",
+        "127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7",
+    ).split(",")
+    if network.strip()
+)
+
+
+def resolve_client_ip(
+    peer: Optional[str],
+    forwarded_for: Optional[str] = None,
+    real_ip: Optional[str] = None,
+    trusted: tuple = TRUSTED_PROXIES,
+) -> str:
+    """The address of the client, as seen by the first untrusted hop.
+
+    Forwarding headers are only read when the connecting peer is a trusted
+    proxy. X-Forwarded-For is walked from the right, skipping trusted hops,
+    so addresses a client prepends itself are never used.
+    """
+    if not peer:
+        return "unknown"
+    if not ip_in_networks(peer, trusted):
+        return peer
+    if forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if _parse_ip(hop) is None:
+                break
+            if not ip_in_networks(hop, trusted):
+                return hop
+        return peer
+    if real_ip and _parse_ip(real_ip.strip()) is not None:
+        return real_ip.strip()
+    return peer
+
+
+class MemoryRateLimitStore:
+    """Per-process counters, used for single-worker setups and tests.
+
+    Keys are kept in least-recently-used order so idle keys are evicted from
+    the front in amortized O(1) once their previous window can no longer
+    affect a decision.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> [window index, current count, previous count, period]
+        self._windows: "OrderedDict[str, list]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    async def hit(self, key: str, period: float, now: float) -> Tuple[int, int]:
+        """Count one request; return (current, previous) window counts."""
+        index = int(now // period)
+        windows = self._windows
+        entry = windows.get(key)
+        if entry is None:
+            entry = windows[key] = [index, 0, 0, period]
         else:
-            max_req = max_requests
-            window = window_seconds
-        
-        # Clean old requests
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if current_time - req_time < window
-        ]
-        
-        # Check if limit exceeded
-        if len(self.requests[client_ip]) >= max_req:
-            logger.warning(f"Rate limit exceeded for {client_ip}: {len(self.requests[client_ip])}/{max_req} requests in {window}s")
-            return False
-        
-        # Add current request
-        self.requests[client_ip].append(current_time)
-        return True
-
-# Global rate limiter instance
-rate_limiter = RateLimiter()
-
-def rate_limit_middleware(request: Request, call_next):
-    """Rate limiting middleware"""
-    
-    # Skip rate limiting for certain endpoints
-    skip_endpoints = [
-        "/health",
-        "/api/health", 
-        "/api/v1/health",
-        "/api/monitor/health",
-        "/api/monitor/status"
-    ]
-    
-    if any(request.url.path.endswith(endpoint) for endpoint in skip_endpoints):
-        return call_next(request)
-    
-    # Check rate limit
-    if not rate_limiter.check_rate_limit(request):
-        return JSONResponse(
-            status_code=429,
-            content={
-                "error": "Too Many Requests",
-                "message": "Rate limit exceeded. Please try again later.",
-                "retry_after": 60
-            }
+            windows.move_to_end(key)
+            if entry[0] != index:
+                entry[2] = entry[1] if entry[0] == index - 1 else 0
+                entry[0] = index
+                entry[1] = 0
+        entry[1] += 1
+        self._evict(now)
+        return entry[1], entry[2]
+
+    def _evict(self, now: float) -> None:
+        windows = self._windows
+        while windows:
+            key, (index, _, _, period) = next(iter(windows.items()))
+            if len(windows) <= self.max_keys and now < (index + 2) * period:
+                break
+            del windows[key]
+
+
+class MongoRateLimitStore:
+    """Counters shared by every worker through one MongoDB document per key.
+
+    A request costs a single conditional ``$inc``; only the first request of
+    a new window rolls the document over. Idle keys expire through a TTL
+    index on ``expires_at``.
+    """
+
+    name = "mongodb"
+
+    def __init__(self, db, collection: str = RATE_LIMIT_COLLECTION):
+        self.collection = db[collection]
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"Could not create rate limit indexes: {e}")
+
+    async def hit(
+        self, key: str, period: float, now: float, retry: bool = True
+    ) -> Tuple[int, int]:
+        index = int(now // period)
+        doc = await self.collection.find_one_and_update(
+            {"_id": key, "window": index},
+            {"$inc": {"current": 1}},
+            return_document=ReturnDocument.AFTER,
         )
-    
-    return call_next(request)
+        if doc:
+            return doc["current"], doc["previous"]
+
+        try:
+            before = await self.collection.find_one_and_update(
+                {"_id": key, "window": {"$lt": index}},
+                {
+                    "$set": {
+                        "window": index,
+                        "current": 1,
+                        "previous": 0,
+                        "expires_at": datetime.fromtimestamp((index + 2) * period, UTC),
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # Another worker rolled the window first (or its clock is ahead);
+            # count against that window, never an older one
+            doc = await self.collection.find_one_and_update(
+                {"_id": key, "window": {"$gte": index}},
+                {"$inc": {"current": 1}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc:
+                return doc["current"], doc["previous"]
+            if retry:
+                # The document expired in between; start the window again
+                return await self.hit(key, period, now, retry=False)
+            raise
+
+        previous = before["current"] if before and before["window"] == index - 1 else 0
+        if previous:
+            await self.collection.update_one(
+                {"_id": key, "window": index}, {"$set": {"previous": previous}}
+            )
+        return 1, previous
+
+
+class RateLimiter:
+    """Approximate sliding-window limiter.
+
+    The previous fixed window's count is weighted by how much of it still
+    overlaps the sliding window, so only two counters are kept per key.
+    Rejected requests are counted too, so a client hammering past its limit
+    stays throttled.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else MemoryRateLimitStore()
+
+    async def hit(
+        self, key: str, limit: RateLimit, now: Optional[float] = None
+    ) -> RateLimitResult:
+        now = time.time() if now is None else now
+        period = limit.period
+        try:
+            current, previous = await self.store.hit(key, period, now)
+        except Exception as e:
+            # Fail open: an unavailable store must not take the API down
+            logger.warning(f"Rate limit store error for {key}: {e}")
+            return RateLimitResult(True, limit.amount, limit.amount, period, 0.0)
+
+        elapsed = now - int(now // period) * period
+        used = previous * (1 - elapsed / period) + current
+        allowed = used <= limit.amount
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit.amount,
+            remaining=max(0, int(limit.amount - used)),
+            reset_after=period - elapsed,
+            retry_after=0.0 if allowed else _retry_after(limit, current, previous, elapsed),
+        )
+
 
-def get_rate_limiter() -> RateLimiter:
-    """Get rate limiter instance"""
-    return rate_limiter 
\ No newline at end of file
+def _retry_after(limit: RateLimit, current: int, previous: int, elapsed: float) -> float:
+    """Seconds until one more request fits under the weighted count."""
+    period = limit.period
+    free = limit.amount - current - 1
+    if free >= 0 and previous:
+        # Wait for the previous window's weight to decay enough
+        return max(0.0, period * (1 - free / previous) - elapsed)
+    if limit.amount < 1:
+        return period
+    # The current window becomes the previous one and has to decay as well
+    return period - elapsed + period * max(0.0, 1 - (limit.amount - 1) / current)
@@ -3,29 +3,73 @@ Rate Limiting Middleware
 Implements comprehensive API rate limiting for production security
 """
 
+import functools
+import hashlib
 import logging
+import math
 import os
-from typing import Optional
+from datetime import datetime, UTC
+from functools import lru_cache
+from typing import Optional, Tuple
 
-from fastapi import HTTPException, Request
+import jwt
+from fastapi import Request
 from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+from starlette.datastructures import MutableHeaders
+
+from backend.middleware.pipeline import (STATIC_PREFIXES, PipelineStage,
+                                         RequestContext)
+from backend.middleware.rate_limiter import (RateLimit, RateLimiter,
+                                             RateLimitExceeded,
+                                             ip_in_networks, parse_networks,
+                                             parse_rate_limit,
+                                             resolve_client_ip)
 
 logger = logging.getLogger(__name__)
 
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
+ALGORITHM = "HS256"
+
+# Paths that are never rate limited
+EXEMPT_PATHS = (
+    "/health",
+    "/api/health",
+    "/api/v1/health",
+    "/api/monitor/health",
+    "/api/monitor/status",
+)
+
+# cron-job.org ranges and localhost get their own, slower budget
+CRON_NETWORKS = parse_networks(
+    ["165.227.83.0/24", "159.89.49.0/24", "127.0.0.1", "::1"]
+)
+CRON_TOKENS = ("buzz2remote-cron-2024", "buzz2remote_cron_2024")
+CRON_LIMIT = RateLimit(10, 300, "10/5 minutes")
+
+
+def get_client_ip(request: Request) -> str:
+    """Client address resolved by the request pipeline, or from the request itself"""
+    client_ip = getattr(request.state, "client_ip", None)
+    if client_ip is None:
+        client_ip = request.state.client_ip = resolve_client_ip(
+            request.client.host if request.client else None,
+            request.headers.get("x-forwarded-for"),
+            request.headers.get("x-real-ip"),
+        )
+    return client_ip
+
 
 # Rate limiter configuration
 def get_client_id(request: Request) -> str:
     """
     Get client identifier for rate limiting
-    Priority: API key > User ID > IP address
+    Priority: API key > User ID > IP address (trusted proxy hops only)
     """
     # Check for API key in headers
-    api_key = request.headers.get("X-API-Key") or request.headers.get("Authorization")
+    api_key = request.headers.get("X-API-Key")
     if api_key:
-        return f"api:{api_key[:10]}..."  # Truncate for privacy
+        # Hashed so each key gets its own bucket without storing the secret
+        return f"api:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
 
     # Check for authenticated user
     user_id = getattr(request.state, "user_id", None)
@@ -33,18 +77,37 @@ def get_client_id(request: Request) -> str:
         return f"user:{user_id}"
 
     # Fall back to IP address
-    return f"ip:{get_remote_address(request)}"
+    return f"ip:{get_client_ip(request)}"
 
 
-# Initialize limiter with custom key function
-limiter = Limiter(
-    key_func=get_client_id,
-    default_limits=["100/minute", "1000/hour"],  # Default limits
-    storage_uri=os.getenv(
-        "RATE_LIMIT_STORAGE", "memory://"
-    ),  # Can use Redis: redis://localhost:6379
-    strategy="fixed-window",  # or "moving-window"
-)
+# One engine for the whole app; main.py swaps in the shared MongoDB store
+# when RATE_LIMIT_STORAGE=mongodb
+limiter = RateLimiter()
+
+
+def rate_limiting_enabled() -> bool:
+    """Limits are off in the test environment or when explicitly disabled"""
+    return (
+        os.getenv("TESTING", "false").lower() != "true"
+        and os.getenv("DISABLE_RATE_LIMITING") != "true"
+    )
+
+
+def _rate_limit_response(
+    request: Request, detail: str, retry_after: int
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={
+            "error": "Rate limit exceeded",
+            "message": "Too many requests. Please try again later.",
+            "detail": detail,
+            "retry_after": retry_after,
+            "endpoint": request.url.path,
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
+        headers={"Retry-After": str(retry_after)},
+    )
 
 
 # Custom rate limit exceeded handler
@@ -57,20 +120,7 @@ async def custom_rate_limit_handler(request: Request, exc: RateLimitExceeded):
         f"Rate limit exceeded for {client_id} on {endpoint}. " f"Limit: {exc.detail}"
     )
 
-    response = JSONResponse(
-        status_code=429,
-        content={
-            "error": "Rate limit exceeded",
-            "message": "Too many requests. Please try again later.",
-            "detail": exc.detail,
-            "retry_after": getattr(exc, "retry_after", 60),
-            "endpoint": endpoint,
-            "timestamp": None,  # Will be added by error handler
-        },
-        headers={"Retry-After": str(getattr(exc, "retry_after", 60))},
-    )
-
-    return response
+    return _rate_limit_response(request, exc.detail, exc.retry_after)
 
 
 def get_rate_limits():
@@ -128,119 +178,207 @@ def get_rate_limits():
     }
 
 
+def _user_flag(user, name: str) -> bool:
+    if isinstance(user, dict):
+        return bool(user.get(name, False))
+    return bool(getattr(user, name, False))
+
+
 def get_user_tier(request: Request) -> str:
     """Determine user tier for rate limiting"""
     # Check if user is authenticated
     user = getattr(request.state, "user", None)
     if not user:
-        return "public"
+        # A valid bearer token without a loaded user is still authenticated
+        return "authenticated" if getattr(request.state, "user_id", None) else "public"
 
     # Check user type
-    user_type = getattr(user, "account_type", "basic")
-    is_admin = getattr(user, "is_admin", False)
-    is_premium = getattr(user, "is_premium", False)
+    is_admin = _user_flag(user, "is_admin")
+    is_premium = _user_flag(user, "is_premium")
 
     if is_admin:
         return "admin"
     elif is_premium:
         return "premium"
-    elif user:
-        return "authenticated"
     else:
-        return "public"
-
+        return "authenticated"
 
-def apply_dynamic_limits(request: Request) -> Optional[str]:
-    """Apply dynamic rate limits based on endpoint and user"""
-    endpoint = request.url.path
-    method = request.method
-    user_tier = get_user_tier(request)
 
+@lru_cache(maxsize=4096)
+def resolve_rate_limit(endpoint: str, method: str, user_tier: str) -> Tuple[str, str]:
+    """Pick the (scope, limit) for an endpoint; cached per path, method and tier"""
     limits = get_rate_limits()
 
+    # Versioned routes share the policy of their unversioned paths
+    if endpoint.startswith("/api/v1/"):
+        endpoint = "/api/" + endpoint[len("/api/v1/") :]
+
     # Critical authentication endpoints
     if endpoint.startswith("/api/auth/"):
         if "login" in endpoint:
-            return limits["critical"]["auth_login"]
+            return "auth_login", limits["critical"]["auth_login"]
         elif "register" in endpoint:
-            return limits["critical"]["auth_register"]
+            return "auth_register", limits["critical"]["auth_register"]
         elif "reset" in endpoint:
-            return limits["critical"]["password_reset"]
+            return "password_reset", limits["critical"]["password_reset"]
         elif "verify" in endpoint:
-            return limits["critical"]["email_verification"]
+            return "email_verification", limits["critical"]["email_verification"]
 
     # Job search endpoints
-    elif endpoint.startswith("/api/jobs") or endpoint.startswith("/api/v1/jobs"):
+    elif endpoint.startswith("/api/jobs"):
         if method == "GET":
             if user_tier in limits:
-                return limits[user_tier].get(
+                return "jobs_search", limits[user_tier].get(
                     "jobs_search", limits["public"]["jobs_search"]
                 )
 
     # Application endpoints
     elif endpoint.startswith("/api/applications"):
         if user_tier in limits:
-            return limits[user_tier].get("applications", "10/minute")
+            return "applications", limits[user_tier].get("applications", "10/minute")
 
     # AI service endpoints
     elif "/ai/" in endpoint or "/cv-analysis" in endpoint:
-        return limits["intensive"]["cv_analysis"]
+        return "cv_analysis", limits["intensive"]["cv_analysis"]
 
     # Admin endpoints
     elif endpoint.startswith("/api/admin"):
         if user_tier == "admin":
-            return limits["admin"]["admin_actions"]
+            return "admin_actions", limits["admin"]["admin_actions"]
         else:
-            return "0/minute"  # Block non-admin access
+            # Access control is the endpoint's job; just keep probing slow
+            return "admin_probe", "10/minute"
 
     # File upload endpoints
     elif "/upload" in endpoint:
         if user_tier in limits:
-            return limits[user_tier].get("file_upload", "2/minute")
+            return "file_upload", limits[user_tier].get("file_upload", "2/minute")
 
     # Default based on user tier
-    if user_tier == "premium":
-        return "200/minute"
+    if user_tier == "admin":
+        return "default", limits["admin"]["admin_actions"]
+    elif user_tier == "premium":
+        return "default", "200/minute"
     elif user_tier == "authenticated":
-        return "100/minute"
+        return "default", "100/minute"
     else:
-        return "30/minute"
+        return "default", "30/minute"
+
+
+def apply_dynamic_limits(request: Request) -> Optional[str]:
+    """Apply dynamic rate limits based on endpoint and user"""
+    return resolve_rate_limit(
+        request.url.path, request.method, get_user_tier(request)
+    )[1]
+
 
+def _user_id_from_token(authorization: Optional[str]) -> Optional[str]:
+    """Subject of a valid bearer token, without touching the database"""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+    return payload.get("sub")
 
-class RateLimitingMiddleware:
+
+def is_cron_request(ctx: RequestContext) -> bool:
+    """Check if request is from cron-job.org or local"""
+    if ip_in_networks(ctx.client_ip, CRON_NETWORKS):
+        return True
+
+    # Check for cron-job.org user agent
+    headers = ctx.headers
+    if "cron-job.org" in headers.get("user-agent", "").lower():
+        return True
+
+    # Check for cron token in query params or headers
+    cron_token = ctx.query_params.get("token") or headers.get("x-api-key")
+    return cron_token in CRON_TOKENS
+
+
+class RateLimitingMiddleware(PipelineStage):
     """Enhanced rate limiting middleware"""
 
-    def __init__(self):
-        self.limiter = limiter
+    name = "rate_limit"
+
+    def __init__(self, app=None, engine: RateLimiter = None):
+        self.limiter = engine or limiter
         self.limits_config = get_rate_limits()
 
-    async def __call__(self, request: Request, call_next):
-        """Process request with rate limiting"""
-        try:
-            # Apply dynamic rate limiting
-            dynamic_limit = apply_dynamic_limits(request)
-            if dynamic_limit:
-                # This would require custom implementation
-                # For now, we'll use the decorator approach
-                pass
+    def route_config(self, path: str) -> Optional[bool]:
+        if not rate_limiting_enabled():
+            return None
+        if path.endswith(EXEMPT_PATHS) or path.startswith(STATIC_PREFIXES):
+            return None
+        return True
 
-            response = await call_next(request)
-            return response
+    async def on_request(
+        self, ctx: RequestContext, config: bool
+    ) -> Optional[JSONResponse]:
+        """Process request with rate limiting"""
+        user_id = _user_id_from_token(ctx.headers.get("authorization"))
+        if user_id:
+            ctx.state["user_id"] = user_id
+        request = ctx.request
 
-        except RateLimitExceeded as e:
-            return await custom_rate_limit_handler(request, e)
-        except Exception as e:
-            logger.error(f"Rate limiting middleware error: {e}")
-            # Continue without rate limiting on error
-            return await call_next(request)
+        if is_cron_request(ctx):
+            scope, limit = "cron", CRON_LIMIT
+        else:
+            scope, limit_text = resolve_rate_limit(
+                ctx.path, ctx.method, get_user_tier(request)
+            )
+            limit = parse_rate_limit(limit_text)
+
+        client_id = get_client_id(request)
+        result = await self.limiter.hit(f"{scope}:{client_id}", limit)
+        rate_limit_stats.record_request(client_id, scope, blocked=not result.allowed)
+
+        if not result.allowed:
+            logger.warning(
+                f"Rate limit exceeded for {client_id} on {ctx.path}. Limit: {limit}"
+            )
+            retry_after = max(1, math.ceil(result.retry_after))
+            return _rate_limit_response(request, str(limit), retry_after)
+
+        ctx.data[self.name] = result
+        ctx.state["rate_limit_remaining"] = result.remaining
+        ctx.state["rate_limit_reset"] = math.ceil(result.reset_after)
+        return None
+
+    def on_response_start(
+        self, ctx: RequestContext, config: bool, headers: MutableHeaders
+    ) -> None:
+        result = ctx.data.get(self.name)
+        if result is None:
+            return
+        headers["X-RateLimit-Limit"] = str(result.limit)
+        headers["X-RateLimit-Remaining"] = str(result.remaining)
+        headers["X-RateLimit-Reset"] = str(ctx.state["rate_limit_reset"])
 
 
 # Decorator factory for easy application
 def rate_limit(limit: str):
     """Decorator factory for applying rate limits to endpoints"""
+    parsed = parse_rate_limit(limit)
 
     def decorator(func):
-        return limiter.limit(limit)(func)
+        scope = f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not rate_limiting_enabled():
+                return await func(*args, **kwargs)
+            request = kwargs.get("request")
+            if request is None:
+                request = next(arg for arg in args if isinstance(arg, Request))
+            result = await limiter.hit(f"{scope}:{get_client_id(request)}", parsed)
+            if not result.allowed:
+                raise RateLimitExceeded(parsed, result.retry_after)
+            return await func(*args, **kwargs)
+
+        return wrapper
 
     return decorator
 
@@ -280,6 +418,9 @@ class RateLimits:
 
 
 # Usage statistics tracking
+MAX_TRACKED_CLIENTS = 10_000
+
+
 class RateLimitStats:
     """Track rate limiting statistics"""
 
@@ -306,8 +447,10 @@ class RateLimitStats:
         if blocked:
             self.stats["endpoints"][endpoint]["blocked"] += 1
 
-        # Track by client
+        # Track by client (bounded so scanners can't grow it forever)
         if client_id not in self.stats["clients"]:
+            if len(self.stats["clients"]) >= MAX_TRACKED_CLIENTS:
+                return
             self.stats["clients"][client_id] = {"total": 0, "blocked": 0}
 
         self.stats["clients"][client_id]["total"] += 1
@@ -351,9 +494,5 @@ def get_rate_limit_health():
         "blocked_requests": blocked_requests,
         "block_rate_percent": round(block_rate, 2),
         "active_limits": len(get_rate_limits()),
-        "storage_type": (
-            "memory"
-            if "memory://" in os.getenv("RATE_LIMIT_STORAGE", "memory://")
-            else "redis"
-        ),
+        "storage_type": limiter.store.name,
     }
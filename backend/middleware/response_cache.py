@@ -12,9 +12,10 @@ import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+
+from backend.middleware.pipeline import PipelineStage, RequestContext
 
 logger = logging.getLogger(__name__)
 
@@ -110,11 +111,12 @@ class InMemoryCache:
         }
 
 
-class ResponseCacheMiddleware(BaseHTTPMiddleware):
+class ResponseCacheMiddleware(PipelineStage):
     """Response caching middleware with intelligent cache strategy"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    name = "response_cache"
+
+    def __init__(self, app=None):
         self.cache = InMemoryCache(max_size=500, default_ttl=300)  # 5 minutes default
 
         # Cache configuration for different endpoints
@@ -149,71 +151,65 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
         # Methods that should be cached
         self.cacheable_methods = {"GET"}
 
-        # Headers to exclude from cache key
-        self.exclude_headers = {
-            "authorization",
-            "cookie",
-            "user-agent",
-            "accept-encoding",
-            "connection",
-            "host",
-        }
-
-    async def dispatch(self, request: Request, call_next):
-        """Process request with caching logic"""
-        try:
-            # Check if request should be cached
-            if not await self._should_cache(request):
-                return await call_next(request)
+    def route_config(self, path: str) -> Optional[Dict[str, Any]]:
+        """Only paths with an enabled cache entry run this stage"""
+        config = self._get_cache_config(path)
+        if config and config.get("enabled", False):
+            return config
+        return None
 
-            # Generate cache key
-            cache_key = await self._generate_cache_key(request)
+    async def on_request(
+        self, ctx: RequestContext, config: Dict[str, Any]
+    ) -> Optional[Response]:
+        """Serve cache hits without calling the endpoint"""
+        if ctx.method not in self.cacheable_methods:
+            return None
 
-            # Try to get from cache
+        try:
+            cache_key = self._generate_cache_key(ctx, config)
             cached_response = await self.cache.get(cache_key)
             if cached_response:
-                return await self._create_cached_response(cached_response, request)
-
-            # Process request
-            response = await call_next(request)
-
-            # Cache successful responses
-            if await self._should_cache_response(response):
-                await self._cache_response(cache_key, response, request)
-
-            # Add cache headers
-            await self._add_cache_headers(response, request, cached=False)
-
-            return response
-
+                return self._create_cached_response(cached_response)
         except Exception as e:
             logger.error(f"Cache middleware error: {e}")
-            return await call_next(request)
-
-    async def _should_cache(self, request: Request) -> bool:
-        """Determine if request should be cached"""
-        # Check method
-        if request.method not in self.cacheable_methods:
-            return False
-
-        # Check if endpoint is configured for caching
-        path = request.url.path
-        config = self._get_cache_config(path)
-
-        return config and config.get("enabled", False)
+            return None
 
-    async def _should_cache_response(self, response: Response) -> bool:
-        """Determine if response should be cached"""
-        # Only cache successful responses
-        if response.status_code != 200:
-            return False
+        ctx.data[self.name] = cache_key
+        ctx.capture_body = True
+        return None
 
-        # Check content type
-        content_type = response.headers.get("content-type", "")
-        if "application/json" not in content_type:
-            return False
+    def on_response_start(
+        self, ctx: RequestContext, config: Dict[str, Any], headers: MutableHeaders
+    ) -> None:
+        """Add cache-related headers to responses computed by the endpoint"""
+        if self.name not in ctx.data:
+            return
+        ttl = config.get("ttl", 300)
+        headers["X-Cache"] = "MISS"
+        headers["Cache-Control"] = f"public, max-age={ttl}"
+        headers["X-Cache-TTL"] = str(ttl)
+        # Snapshot before outer stages add per-request headers
+        ctx.data[f"{self.name}.headers"] = dict(headers)
+
+    async def on_complete(self, ctx: RequestContext, config: Dict[str, Any]) -> None:
+        """Cache successful JSON responses"""
+        cache_key = ctx.data.get(self.name)
+        if cache_key is None or ctx.status != 200:
+            return
+        headers = ctx.data.get(f"{self.name}.headers", {})
+        if "application/json" not in headers.get("content-type", ""):
+            return
 
-        return True
+        await self.cache.set(
+            cache_key,
+            {
+                "body": b"".join(ctx.response_body),
+                "headers": headers,
+                "status_code": ctx.status,
+                "cached_at": datetime.utcnow().isoformat(),
+            },
+            config.get("ttl", 300),
+        )
 
     def _get_cache_config(self, path: str) -> Optional[Dict[str, Any]]:
         """Get cache configuration for path"""
@@ -228,23 +224,24 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
 
         return None
 
-    async def _generate_cache_key(self, request: Request) -> str:
+    def _generate_cache_key(self, ctx: RequestContext, config: Dict[str, Any]) -> str:
         """Generate unique cache key for request"""
-        path = request.url.path
-        config = self._get_cache_config(path)
-
         # Start with path
-        key_parts = [path]
+        key_parts = [ctx.path]
 
         # Add query parameters based on config
-        if config and "vary_by" in config:
-            for param in config["vary_by"]:
-                value = request.query_params.get(param)
-                if value:
-                    key_parts.append(f"{param}={value}")
+        query_params = ctx.query_params
+        for param in config.get("vary_by", []):
+            value = query_params.get(param)
+            if value:
+                key_parts.append(f"{param}={value}")
+
+        # GZip runs inside this stage, so stored bodies may be compressed
+        if "gzip" in ctx.headers.get("accept-encoding", ""):
+            key_parts.append("enc=gzip")
 
         # Add user context if authenticated
-        user_id = getattr(request.state, "user_id", None)
+        user_id = ctx.state.get("user_id")
         if user_id:
             key_parts.append(f"user={user_id}")
 
@@ -252,87 +249,20 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
         key_string = "|".join(key_parts)
         return hashlib.md5(key_string.encode()).hexdigest()
 
-    async def _cache_response(
-        self, cache_key: str, response: Response, request: Request
-    ):
-        """Cache response data"""
-        try:
-            path = request.url.path
-            config = self._get_cache_config(path)
-            ttl = config.get("ttl", 300) if config else 300
-
-            # Read response body
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-
-            # Parse JSON if possible
-            try:
-                data = json.loads(body.decode())
-            except:
-                data = body.decode()
-
-            # Store in cache
-            cache_data = {
-                "data": data,
-                "headers": dict(response.headers),
-                "status_code": response.status_code,
-                "cached_at": datetime.utcnow().isoformat(),
-            }
-
-            await self.cache.set(cache_key, cache_data, ttl)
-
-            # Recreate response with body
-            response.body_iterator = self._iter_body(body)
-
-        except Exception as e:
-            logger.error(f"Cache store error: {e}")
+    def _create_cached_response(self, cached_data: Dict[str, Any]) -> Response:
+        """Create response from cached bytes without re-serializing"""
+        headers = dict(cached_data.get("headers", {}))
+        headers.pop("content-length", None)
 
-    def _iter_body(self, body: bytes):
-        """Create body iterator from bytes"""
-        yield body
+        # Add cache hit headers (snapshot keys are lower-cased)
+        headers["x-cache"] = "HIT"
+        headers["x-cache-date"] = cached_data.get("cached_at", "")
 
-    async def _create_cached_response(
-        self, cached_data: Dict[str, Any], request: Request
-    ) -> Response:
-        """Create response from cached data"""
-        try:
-            headers = cached_data.get("headers", {})
-
-            # Add cache hit headers
-            headers["X-Cache"] = "HIT"
-            headers["X-Cache-Date"] = cached_data.get("cached_at", "")
-
-            # Create JSON response
-            return JSONResponse(
-                content=cached_data["data"],
-                status_code=cached_data.get("status_code", 200),
-                headers=headers,
-            )
-
-        except Exception as e:
-            logger.error(f"Cache response creation error: {e}")
-            # Return None to force fresh request
-            return None
-
-    async def _add_cache_headers(
-        self, response: Response, request: Request, cached: bool = False
-    ):
-        """Add cache-related headers to response"""
-        try:
-            path = request.url.path
-            config = self._get_cache_config(path)
-
-            if not cached:
-                response.headers["X-Cache"] = "MISS"
-
-            if config:
-                ttl = config.get("ttl", 300)
-                response.headers["Cache-Control"] = f"public, max-age={ttl}"
-                response.headers["X-Cache-TTL"] = str(ttl)
-
-        except Exception as e:
-            logger.error(f"Cache headers error: {e}")
+        return Response(
+            content=cached_data["body"],
+            status_code=cached_data.get("status_code", 200),
+            headers=headers,
+        )
 
 
 # Cache management utilities
@@ -409,11 +339,11 @@ def get_cache_manager() -> Optional[CacheManager]:
     return cache_manager
 
 
-def initialize_cache_middleware(app) -> ResponseCacheMiddleware:
-    """Initialize and return cache middleware instance"""
+def initialize_cache_middleware(app=None) -> ResponseCacheMiddleware:
+    """Initialize and return the response cache stage"""
     global response_cache_middleware, cache_manager
 
-    response_cache_middleware = ResponseCacheMiddleware(app)
+    response_cache_middleware = ResponseCacheMiddleware()
     cache_manager = CacheManager(response_cache_middleware)
 
     return response_cache_middleware
@@ -3,19 +3,24 @@ Security Headers Middleware
 Implements comprehensive security headers for production protection
 """
 
+import logging
 import os
-from typing import Dict, Optional
+import re
+from typing import Dict, Optional, Tuple
 
-from fastapi import Request
-from fastapi.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 
+from backend.middleware.pipeline import PipelineStage, RequestContext
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+logger = logging.getLogger(__name__)
+
+
+class SecurityHeadersMiddleware(PipelineStage):
     """Comprehensive security headers middleware"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    name = "security_headers"
+
+    def __init__(self, app=None):
         self.environment = os.getenv("ENVIRONMENT", "development")
 
         # Base security headers (always applied)
@@ -146,140 +151,108 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "xr-spatial-tracking=()"
         )
 
-    async def dispatch(self, request: Request, call_next):
-        """Apply security headers to all responses"""
-        try:
-            # Process the request
-            response = await call_next(request)
-
-            # Add security headers to response
-            for header_name, header_value in self.security_headers.items():
-                response.headers[header_name] = header_value
-
-            # Add additional headers based on content type
-            content_type = response.headers.get("content-type", "")
-
-            # JSON API responses
-            if "application/json" in content_type:
-                response.headers["X-API-Version"] = "1.0"
-                response.headers["X-Response-Time"] = str(
-                    getattr(request.state, "response_time", 0)
-                )
-
-            # HTML responses
-            elif "text/html" in content_type:
-                response.headers["X-UA-Compatible"] = "IE=edge"
-
-            # Add rate limiting headers if available
-            if hasattr(request.state, "rate_limit_remaining"):
-                response.headers["X-RateLimit-Remaining"] = str(
-                    request.state.rate_limit_remaining
-                )
-                response.headers["X-RateLimit-Reset"] = str(
-                    getattr(request.state, "rate_limit_reset", 0)
-                )
+    def on_response_start(
+        self, ctx: RequestContext, config, headers: MutableHeaders
+    ) -> None:
+        """Apply security headers to all responses, including error responses"""
+        for header_name, header_value in self.security_headers.items():
+            headers[header_name] = header_value
 
-            return response
+        # Add additional headers based on content type
+        content_type = headers.get("content-type", "")
 
-        except Exception as e:
-            # Ensure security headers are added even on errors
-            from fastapi.responses import JSONResponse
+        # JSON API responses
+        if "application/json" in content_type:
+            headers["X-API-Version"] = "1.0"
 
-            error_response = JSONResponse(
-                status_code=500, content={"error": "Internal server error"}
-            )
+        # HTML responses
+        elif "text/html" in content_type:
+            headers["X-UA-Compatible"] = "IE=edge"
 
-            # Add security headers to error response
-            for header_name, header_value in self.security_headers.items():
-                error_response.headers[header_name] = header_value
+        # Add rate limiting headers if available
+        state = ctx.state
+        if "rate_limit_remaining" in state:
+            headers["X-RateLimit-Remaining"] = str(state["rate_limit_remaining"])
+            headers["X-RateLimit-Reset"] = str(state.get("rate_limit_reset", 0))
 
-            return error_response
 
-
-class SecurityReportingMiddleware(BaseHTTPMiddleware):
+class SecurityReportingMiddleware(PipelineStage):
     """Security reporting and monitoring middleware"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    name = "security_reporting"
+
+    REQUIRED_HEADERS = (
+        "X-Content-Type-Options",
+        "X-Frame-Options",
+        "X-XSS-Protection",
+        "Content-Security-Policy",
+    )
+    SUSPICIOUS_USER_AGENTS = (
+        "sqlmap",
+        "nmap",
+        "nikto",
+        "dirb",
+        "gobuster",
+        "burp",
+        "owasp",
+        "scanner",
+        "crawler",
+    )
+    SUSPICIOUS_PATHS = (
+        "admin",
+        "phpmyadmin",
+        "wp-admin",
+        "config",
+        ".env",
+        ".git",
+        "backup",
+        "dump",
+    )
+
+    def __init__(self, app=None):
         self.security_violations = []
         self.max_violations = 100  # Keep last 100 violations
+        self._user_agent_pattern = re.compile(
+            "|".join(re.escape(p) for p in self.SUSPICIOUS_USER_AGENTS)
+        )
 
-    async def dispatch(self, request: Request, call_next):
-        """Monitor for security violations"""
-        response = await call_next(request)
-
-        # Check for potential security issues
-        await self._check_security_violations(request, response)
-
-        return response
+    def route_config(self, path: str) -> Tuple[str, ...]:
+        """Path violations only depend on the path, so the route table caches them"""
+        lowered = path.lower()
+        if any(suspicious in lowered for suspicious in self.SUSPICIOUS_PATHS):
+            return (f"Suspicious path access: {lowered}",)
+        return ()
 
-    async def _check_security_violations(self, request: Request, response: Response):
-        """Check for potential security violations"""
-        violations = []
+    def on_response_start(
+        self, ctx: RequestContext, config: Tuple[str, ...], headers: MutableHeaders
+    ) -> None:
+        """Monitor for security violations"""
+        violations = list(config)
 
         # Check for missing security headers
-        security_headers = [
-            "X-Content-Type-Options",
-            "X-Frame-Options",
-            "X-XSS-Protection",
-            "Content-Security-Policy",
-        ]
-
-        for header in security_headers:
-            if header not in response.headers:
+        for header in self.REQUIRED_HEADERS:
+            if header not in headers:
                 violations.append(f"Missing security header: {header}")
 
         # Check for suspicious user agents
-        user_agent = request.headers.get("user-agent", "").lower()
-        suspicious_patterns = [
-            "sqlmap",
-            "nmap",
-            "nikto",
-            "dirb",
-            "gobuster",
-            "burp",
-            "owasp",
-            "scanner",
-            "crawler",
-        ]
-
-        for pattern in suspicious_patterns:
-            if pattern in user_agent:
-                violations.append(f"Suspicious user agent: {pattern}")
-
-        # Check for suspicious request patterns
-        path = request.url.path.lower()
-        suspicious_paths = [
-            "admin",
-            "phpmyadmin",
-            "wp-admin",
-            "config",
-            ".env",
-            ".git",
-            "backup",
-            "dump",
-        ]
-
-        for suspicious in suspicious_paths:
-            if suspicious in path:
-                violations.append(f"Suspicious path access: {path}")
+        user_agent = ctx.headers.get("user-agent", "").lower()
+        if user_agent:
+            for match in set(self._user_agent_pattern.findall(user_agent)):
+                violations.append(f"Suspicious user agent: {match}")
 
         # Log violations
         if violations:
-            self._log_security_violation(request, violations)
+            self._log_security_violation(ctx, violations)
 
-    def _log_security_violation(self, request: Request, violations: list):
+    def _log_security_violation(self, ctx: RequestContext, violations: list):
         """Log security violations"""
+        client = ctx.scope.get("client")
         violation_data = {
-            "timestamp": str(
-                request.state.timestamp
-                if hasattr(request.state, "timestamp")
-                else "unknown"
-            ),
-            "ip": request.client.host if request.client else "unknown",
-            "user_agent": request.headers.get("user-agent", "unknown"),
-            "path": request.url.path,
-            "method": request.method,
+            "timestamp": str(ctx.state.get("timestamp", "unknown")),
+            "ip": client[0] if client else "unknown",
+            "user_agent": ctx.headers.get("user-agent", "unknown"),
+            "path": ctx.path,
+            "method": ctx.method,
             "violations": violations,
         }
 
@@ -289,9 +262,6 @@ class SecurityReportingMiddleware(BaseHTTPMiddleware):
             self.security_violations.pop(0)
 
         # Log to console (in production, send to security monitoring)
-        import logging
-
-        logger = logging.getLogger(__name__)
         logger.warning(f"Security violation detected: {violation_data}")
 
     def get_violations(self) -> list:
@@ -305,12 +275,12 @@ security_reporting_middleware = None
 
 
 # Initialize middleware instances
-def initialize_security_middleware(app):
-    """Initialize security middleware instances with app"""
+def initialize_security_middleware(app=None):
+    """Initialize the security pipeline stages"""
     global security_headers_middleware, security_reporting_middleware
 
-    security_headers_middleware = SecurityHeadersMiddleware(app)
-    security_reporting_middleware = SecurityReportingMiddleware(app)
+    security_headers_middleware = SecurityHeadersMiddleware()
+    security_reporting_middleware = SecurityReportingMiddleware()
 
     return security_headers_middleware, security_reporting_middleware
 
@@ -528,6 +528,12 @@ class UserNotificationUpdate(BaseModel):
     read_at: Optional[datetime] = None
 
 
+class DigestSubscriptionRequest(BaseModel):
+    frequency: str = Field("weekly", pattern="^(daily|weekly)$")
+    # Defaults to the user's profile (job titles, skills, location, work types)
+    preferences: Optional[Dict[str, Any]] = None
+
+
 class JobApplicationMongo(BaseModel):
     """MongoDB Job Application model using Pydantic"""
 
@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -6,6 +7,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..database.db import get_async_db
 from ..services.ai_job_matching_service import AIJobMatchingService
+from ..services.job_analytics_store import WINDOWS, JobAnalyticsStore
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -148,43 +150,16 @@ async def get_skills_demand_analysis(
     """Get market demand analysis for skills"""
     try:
         db = await get_async_db()
+        days = WINDOWS.get(time_period, 30)
 
-        # Aggregate skills from recent job postings
-        days_map = {"7d": 7, "30d": 30, "90d": 90}
-        days = days_map.get(time_period, 30)
-
-        # Simple aggregation pipeline for skills demand
-        pipeline = [
-            {"$unwind": "$skills_required"},
-            {
-                "$group": {
-                    "_id": "$skills_required",
-                    "job_count": {"$sum": 1},
-                    "avg_salary": {"$avg": "$salary_max"},
-                    "companies": {"$addToSet": "$company"},
-                }
-            },
-            {"$sort": {"job_count": -1}},
-            {"$limit": limit},
-        ]
-
-        skills_data = []
-        async for skill in db.jobs.aggregate(pipeline):
-            skills_data.append(
-                {
-                    "skill": skill["_id"],
-                    "demand_count": skill["job_count"],
-                    "average_salary": round(skill.get("avg_salary", 0) or 0),
-                    "company_count": len(skill.get("companies", [])),
-                    "trend": "increasing",  # Placeholder
-                }
-            )
+        # Merged from the day buckets kept up to date at ingest
+        skills_data = await JobAnalyticsStore(db).skills_demand(days=days, limit=limit)
 
         return {
             "time_period": time_period,
             "total_skills_analyzed": len(skills_data),
             "skills_demand": skills_data,
-            "analysis_date": "2025-06-24T20:00:00Z",
+            "analysis_date": datetime.utcnow().isoformat() + "Z",
         }
     except Exception as e:
         logger.error(f"Error analyzing skills demand: {e}")
@@ -200,47 +175,27 @@ async def get_salary_insights(
     experience_level: Optional[str] = Query(
         None, description="Experience level filter"
     ),
+    time_period: str = Query(
+        "90d", description="Time period for analysis (7d, 30d, 90d)"
+    ),
     ai_service: AIJobMatchingService = Depends(get_ai_service),
 ):
     """Get salary market insights and trends"""
     try:
         db = await get_async_db()
+        insights = await JobAnalyticsStore(db).salary_insights(
+            days=WINDOWS.get(time_period, 90),
+            position=position,
+            location=location,
+            experience_level=experience_level,
+        )
 
-        # Build match criteria
-        match_criteria = {}
-        if position:
-            match_criteria["title"] = {"$regex": position, "$options": "i"}
-        if location:
-            match_criteria["location"] = {"$regex": location, "$options": "i"}
-        if experience_level:
-            match_criteria["experience_level"] = experience_level
-
-        # Aggregation pipeline for salary insights
-        pipeline = [
-            {"$match": match_criteria},
-            {
-                "$group": {
-                    "_id": None,
-                    "avg_salary": {"$avg": {"$avg": ["$salary_min", "$salary_max"]}},
-                    "min_salary": {"$min": "$salary_min"},
-                    "max_salary": {"$max": "$salary_max"},
-                    "median_salary": {"$avg": {"$avg": ["$salary_min", "$salary_max"]}},
-                    "job_count": {"$sum": 1},
-                    "companies": {"$addToSet": "$company"},
-                }
-            },
-        ]
-
-        result = None
-        async for doc in db.jobs.aggregate(pipeline):
-            result = doc
-            break
-
-        if not result:
+        if not insights:
             return {
                 "position": position,
                 "location": location,
                 "experience_level": experience_level,
+                "time_period": time_period,
                 "salary_insights": {
                     "message": "No salary data found for the specified criteria"
                 },
@@ -250,22 +205,9 @@ async def get_salary_insights(
             "position": position,
             "location": location,
             "experience_level": experience_level,
-            "salary_insights": {
-                "average_salary": round(result.get("avg_salary", 0) or 0),
-                "salary_range": {
-                    "min": result.get("min_salary", 0),
-                    "max": result.get("max_salary", 0),
-                },
-                "median_salary": round(result.get("median_salary", 0) or 0),
-                "total_jobs_analyzed": result.get("job_count", 0),
-                "companies_offering": len(result.get("companies", [])),
-                "market_trend": "stable",  # Placeholder
-                "percentiles": {
-                    "25th": round((result.get("avg_salary", 0) or 0) * 0.8),
-                    "75th": round((result.get("avg_salary", 0) or 0) * 1.2),
-                },
-            },
-            "analysis_date": "2025-06-24T20:00:00Z",
+            "time_period": time_period,
+            "salary_insights": insights,
+            "analysis_date": datetime.utcnow().isoformat() + "Z",
         }
     except Exception as e:
         logger.error(f"Error getting salary insights: {e}")
@@ -45,7 +45,7 @@ async def parse_resume(
         file_content = await file.read()
 
         # Parse resume
-        parsed_data = resume_parser.parse_resume(file_content, file_extension)
+        parsed_data = await resume_parser.parse_resume_async(file_content, file_extension)
 
         if "error" in parsed_data:
             raise HTTPException(status_code=400, detail=parsed_data["error"])
@@ -86,7 +86,9 @@ async def parse_resume_base64(
             )
 
         # Parse resume
-        parsed_data = resume_parser.parse_resume_from_base64(base64_content, file_type)
+        parsed_data = await resume_parser.parse_resume_from_base64_async(
+            base64_content, file_type
+        )
 
         if "error" in parsed_data:
             raise HTTPException(status_code=400, detail=parsed_data["error"])
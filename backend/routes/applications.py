@@ -1,6 +1,6 @@
 import logging
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
@@ -447,7 +447,7 @@ async def get_application(
     },
 )
 async def get_application_stats(
-    db=Depends(get_async_db), current_user: dict = Depends(get_current_user_dependency)
+    current_user: dict = Depends(get_current_user_dependency),
 ):
     """
     Get user's application statistics
@@ -475,58 +475,9 @@ async def get_application_stats(
     - `automated`: AI-assisted automated applications
     """
     try:
-        current_user_id = current_user["_id"]
-
-        # Total applications
-        total_applications = await db.job_applications.count_documents(
-            {"user_id": current_user_id}
-        )
-
-        # Applications by status
-        status_counts = {}
-        statuses = ["applied", "viewed", "rejected", "hired", "withdrawn"]
-
-        for app_status in statuses:
-            count = await db.job_applications.count_documents(
-                {"user_id": current_user_id, "status": app_status}
-            )
-            status_counts[app_status] = count
-
-        # Applications by type
-        type_counts = {}
-        types = ["external", "scraped", "automated"]
-
-        for app_type in types:
-            count = await db.job_applications.count_documents(
-                {"user_id": current_user_id, "application_type": app_type}
-            )
-            type_counts[app_type] = count
-
-        # Recent applications (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_applications = await db.job_applications.count_documents(
-            {"user_id": current_user_id, "applied_at": {"$gte": week_ago}}
-        )
-
-        # Response rate (applications with company response)
-        responded_applications = await db.job_applications.count_documents(
-            {"user_id": current_user_id, "company_response": {"$ne": None}}
-        )
-
-        response_rate = (
-            (responded_applications / total_applications * 100)
-            if total_applications > 0
-            else 0
-        )
-
-        return {
-            "total_applications": total_applications,
-            "status_breakdown": status_counts,
-            "type_breakdown": type_counts,
-            "recent_applications": recent_applications,
-            "response_rate": round(response_rate, 2),
-            "responded_applications": responded_applications,
-        }
+        # One aggregation (or a counter point read) instead of a count per metric
+        service = get_user_application_service()
+        return await service.get_application_stats(current_user["_id"])
 
     except Exception as e:
         logger.error(f"Error fetching application stats: {str(e)}")
@@ -3,7 +3,6 @@ import json
 import logging
 import os
 import re
-from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
@@ -20,9 +19,23 @@ from backend.schemas.job import (ApplicationCreate, Job, JobCreate,
                                  JobListResponse, JobResponse, JobSearchQuery,
                                  JobUpdate)
 from backend.services.auto_application_service import AutoApplicationService
+from backend.services.backfill import (BACKFILLS, BackfillError,
+                                       get_backfill_manager)
 from backend.services.cache_service import cache
+from backend.services.interaction_analytics import (
+    InteractionRecorder, get_interaction_recorder, job_interaction_counts)
+from backend.services.job_archive import (ArchiveInProgressError,
+                                          JobArchiver, build_archive_sink)
 from backend.services.job_scraping_service import JobScrapingService
+from backend.services.job_stats_materializer import JobStatsMaterializer
 from backend.services.job_title_parser import job_title_parser
+from backend.services.location_index import LocationIndex
+from backend.services.location_normalizer import geo_filters
+from backend.services.skill_taxonomy import \
+    search_skills as taxonomy_search_skills
+from backend.services.title_grouping import (TitleGroups, clean_job_title,
+                                             group_job_titles,
+                                             normalize_job_title)
 from backend.utils.auth import (get_current_active_user, get_current_admin,
                                 get_current_user)
 from backend.utils.html_cleaner import clean_job_data
@@ -142,6 +155,7 @@ async def search_jobs(
     job_titles: Optional[str] = Query(None, description="Specific job titles filter"),
     salary_range: Optional[str] = Query(None, description="Salary range filter"),
     country: Optional[str] = Query(None, description="Country filter"),
+    region: Optional[str] = Query(None, description="Region filter (e.g. europe, EMEA)"),
     exact_title: Optional[str] = Query(
         None, description="Exact job title to search for"
     ),
@@ -359,26 +373,15 @@ async def search_jobs(
             if experience_or:
                 query["$or"] = query.get("$or", []) + experience_or
 
-        # Location Filter
-        if location:
-            query["location"] = {"$regex": location, "$options": "i"}
+        # Location, Country and Region Filters - equality on the indexed geo fields
+        geo_clauses = geo_filters(location, country, region)
+        if geo_clauses:
+            query["$and"] = query.get("$and", []) + geo_clauses
 
         # Company Filter
         if company:
             query["company"] = {"$regex": company, "$options": "i"}
 
-        # Country Filter - NEW
-        if country:
-            # Country filter can be applied to location field
-            if not location:  # Only apply if location filter is not already set
-                query["location"] = {"$regex": country, "$options": "i"}
-            else:
-                # If both location and country are set, combine them
-                query["location"] = {
-                    "$regex": f"{location}.*{country}|{country}.*{location}",
-                    "$options": "i",
-                }
-
         # Salary Range Filter - Enhanced
         if salary_range:
             try:
@@ -613,10 +616,16 @@ async def search_jobs(
 @router.get("/search/grouped", response_model=dict)
 async def search_jobs_grouped(
     q: str = Query("", description="Search query"),
-    limit: int = Query(5000, ge=1, le=5000, description="Number of results per page"),
+    page: int = Query(1, ge=1, description="Page of title groups"),
+    per_page: int = Query(50, ge=1, le=200, description="Title groups per page"),
+    variations: int = Query(5, ge=1, le=50, description="Top title variations per group"),
     db: AsyncIOMotorDatabase = Depends(get_async_db),
 ):
-    """Advanced job search with title grouping"""
+    """Advanced job search with title grouping
+
+    Groups are computed in MongoDB from the stored ``title_group`` key, so
+    memory use does not depend on how many jobs match.
+    """
     try:
         # Build query same as regular search
         query = {}
@@ -629,34 +638,10 @@ async def search_jobs_grouped(
                 {"company": {"$regex": q, "$options": "i"}},
             ]
 
-        # Get all matching jobs
-        cursor = db.jobs.find(query).sort("created_at", -1).limit(limit)
-        jobs = await cursor.to_list(length=limit)
-
-        # Get total count
-        total = await db.jobs.count_documents(query)
-
-        # Convert ObjectIds to strings
-        for job in jobs:
-            if "_id" in job and isinstance(job["_id"], ObjectId):
-                job["id"] = str(job["_id"])
-                job["_id"] = str(job["_id"])
-
-        # Group jobs by normalized titles
-        grouped_titles = group_job_titles(jobs)
-
-        # Sort by job count (most common titles first)
-        sorted_groups = sorted(
-            grouped_titles.items(), key=lambda x: x[1]["count"], reverse=True
+        grouped = await TitleGroups(db).search(
+            query, page=page, per_page=per_page, variations=variations
         )
-
-        return {
-            "query": q,
-            "total_jobs": total,
-            "unique_titles": len(grouped_titles),
-            "grouped_titles": dict(sorted_groups),
-            "sample_jobs": jobs[:10],  # Show first 10 actual jobs for reference
-        }
+        return {"query": q, **grouped}
 
     except Exception as e:
         logger.error(f"Error in grouped job search: {str(e)}")
@@ -664,8 +649,10 @@ async def search_jobs_grouped(
             "query": q,
             "total_jobs": 0,
             "unique_titles": 0,
+            "page": page,
+            "per_page": per_page,
+            "pages": 0,
             "grouped_titles": {},
-            "sample_jobs": [],
             "error": str(e),
         }
 
@@ -711,46 +698,12 @@ async def delete_job(job_id: str, db: AsyncIOMotorDatabase = Depends(get_async_d
 
 @router.get("/statistics", response_model=dict)
 async def get_job_statistics(db: AsyncIOMotorDatabase = Depends(get_async_db)):
-    """Get statistics about jobs."""
+    """Get statistics about jobs from the materialized job_stats summary."""
     try:
-        total_jobs = await db.jobs.count_documents({})
-
-        # Get unique companies count from company field
-        unique_companies = await db.jobs.aggregate(
-            [
-                {"$match": {"company": {"$ne": None, "$ne": "", "$exists": True}}},
-                {"$group": {"_id": "$company"}},
-                {"$count": "total"},
-            ]
-        ).to_list(length=None)
-        companies_count = unique_companies[0]["total"] if unique_companies else 0
-
-        # Get unique countries count from location field (since country field might be empty)
-        unique_countries = await db.jobs.aggregate(
-            [
-                {"$match": {"location": {"$ne": None, "$ne": "", "$exists": True}}},
-                {"$group": {"_id": "$location"}},
-                {"$count": "total"},
-            ]
-        ).to_list(length=None)
-        countries_count = unique_countries[0]["total"] if unique_countries else 0
-
-        jobs_by_company = await db.jobs.aggregate(
-            [{"$group": {"_id": "$company", "count": {"$sum": 1}}}]
-        ).to_list(length=None)
-
-        jobs_by_location = await db.jobs.aggregate(
-            [{"$group": {"_id": "$location", "count": {"$sum": 1}}}]
-        ).to_list(length=None)
-
-        # Add jobs by position/title for autocomplete - en popüler 8 pozisyon
-        jobs_by_position = await db.jobs.aggregate(
-            [
-                {"$group": {"_id": "$title", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 8},  # Top 8 most common positions for autocomplete
-            ]
-        ).to_list(length=None)
+        summary = await JobStatsMaterializer(db).get_summary()
+
+        # Top 8 most common positions for autocomplete
+        jobs_by_position = summary.get("top_titles", [])[:8]
 
         # Format positions for frontend autocomplete with categories
         positions = []
@@ -791,13 +744,20 @@ async def get_job_statistics(db: AsyncIOMotorDatabase = Depends(get_async_db)):
                 )
 
         return {
-            "total_jobs": total_jobs,
-            "active_jobs": total_jobs,  # Assuming all jobs are active for now
-            "companies_count": companies_count,
-            "countries_count": countries_count,
-            "jobs_by_company": jobs_by_company,
-            "jobs_by_location": jobs_by_location,
+            "total_jobs": summary.get("total_jobs", 0),
+            "active_jobs": summary.get("active_jobs", 0),
+            "companies_count": summary.get("companies_count", 0),
+            "countries_count": summary.get("locations_count", 0),
+            "jobs_by_company": [
+                {"_id": item["_id"], "count": item["count"]}
+                for item in summary.get("top_companies", [])
+            ],
+            "jobs_by_location": [
+                {"_id": item["_id"], "count": item["count"]}
+                for item in summary.get("top_locations", [])
+            ],
             "positions": positions,  # New field for position autocomplete
+            "last_updated": summary.get("updated_at"),
         }
     except Exception as e:
         logging.error(f"Error getting job statistics: {str(e)}")
@@ -1290,7 +1250,7 @@ async def search_locations(
 ):
     """
     Search for locations in job listings.
-    Uses caching for popular locations to improve performance.
+    Reads the precomputed location_suggestions table; popular lookups are cached.
     """
     if not q:
         return []
@@ -1312,216 +1272,9 @@ async def search_locations(
             )
             return cached_result
 
-        # If not in cache, query database
+        # If not in cache, read the precomputed suggestion table
         logger.info(f"🔍 Cache miss for locations search: {q}, querying database...")
-
-        # Escape special characters in the query to prevent regex errors
-        safe_q = re.escape(q)
-
-        # Aggregation pipeline to find distinct locations matching the query
-        pipeline = [
-            {"$match": {"location": {"$regex": safe_q, "$options": "i"}}},
-            {"$group": {"_id": "$location", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": limit},
-            {"$project": {"name": "$_id", "count": 1, "_id": 0}},
-        ]
-
-        cursor = db.jobs.aggregate(pipeline)
-        locations = await cursor.to_list(length=limit)
-
-        # Add flag emojis to locations
-        country_flags = {
-            "united states": "🇺🇸",
-            "usa": "🇺🇸",
-            "us": "🇺🇸",
-            "united kingdom": "🇬🇧",
-            "uk": "🇬🇧",
-            "germany": "🇩🇪",
-            "deutschland": "🇩🇪",
-            "canada": "🇨🇦",
-            "france": "🇫🇷",
-            "spain": "🇪🇸",
-            "italy": "🇮🇹",
-            "netherlands": "🇳🇱",
-            "sweden": "🇸🇪",
-            "norway": "🇳🇴",
-            "denmark": "🇩🇰",
-            "finland": "🇫🇮",
-            "switzerland": "🇨🇭",
-            "austria": "🇦🇹",
-            "belgium": "🇧🇪",
-            "poland": "🇵🇱",
-            "czech republic": "🇨🇿",
-            "hungary": "🇭🇺",
-            "romania": "🇷🇴",
-            "bulgaria": "🇧🇬",
-            "greece": "🇬🇷",
-            "portugal": "🇵🇹",
-            "ireland": "🇮🇪",
-            "australia": "🇦🇺",
-            "new zealand": "🇳🇿",
-            "japan": "🇯🇵",
-            "south korea": "🇰🇷",
-            "singapore": "🇸🇬",
-            "india": "🇮🇳",
-            "brazil": "🇧🇷",
-            "mexico": "🇲🇽",
-            "argentina": "🇦🇷",
-            "chile": "🇨🇱",
-            "colombia": "🇨🇴",
-            "peru": "🇵🇪",
-            "venezuela": "🇻🇪",
-            "uruguay": "🇺🇾",
-            "paraguay": "🇵🇾",
-            "bolivia": "🇧🇴",
-            "ecuador": "🇪🇨",
-            "guyana": "🇬🇾",
-            "suriname": "🇸🇷",
-            "russia": "🇷🇺",
-            "ukraine": "🇺🇦",
-            "belarus": "🇧🇾",
-            "moldova": "🇲🇩",
-            "latvia": "🇱🇻",
-            "lithuania": "🇱🇹",
-            "estonia": "🇪🇪",
-            "georgia": "🇬🇪",
-            "armenia": "🇦🇲",
-            "azerbaijan": "🇦🇿",
-            "kazakhstan": "🇰🇿",
-            "uzbekistan": "🇺🇿",
-            "turkmenistan": "🇹🇲",
-            "kyrgyzstan": "🇰🇬",
-            "tajikistan": "🇹🇯",
-            "china": "🇨🇳",
-            "taiwan": "🇹🇼",
-            "hong kong": "🇭🇰",
-            "macau": "🇲🇴",
-            "mongolia": "🇲🇳",
-            "north korea": "🇰🇵",
-            "vietnam": "🇻🇳",
-            "thailand": "🇹🇭",
-            "malaysia": "🇲🇾",
-            "indonesia": "🇮🇩",
-            "philippines": "🇵🇭",
-            "cambodia": "🇰🇭",
-            "laos": "🇱🇦",
-            "myanmar": "🇲🇲",
-            "brunei": "🇧🇳",
-            "east timor": "🇹🇱",
-            "pakistan": "🇵🇰",
-            "bangladesh": "🇧🇩",
-            "sri lanka": "🇱🇰",
-            "nepal": "🇳🇵",
-            "bhutan": "🇧🇹",
-            "maldives": "🇲🇻",
-            "afghanistan": "🇦🇫",
-            "iran": "🇮🇷",
-            "iraq": "🇮🇶",
-            "syria": "🇸🇾",
-            "lebanon": "🇱🇧",
-            "jordan": "🇯🇴",
-            "israel": "🇮🇱",
-            "palestine": "🇵🇸",
-            "saudi arabia": "🇸🇦",
-            "yemen": "🇾🇪",
-            "oman": "🇴🇲",
-            "uae": "🇦🇪",
-            "united arab emirates": "🇦🇪",
-            "qatar": "🇶🇦",
-            "kuwait": "🇰🇼",
-            "bahrain": "🇧🇭",
-            "egypt": "🇪🇬",
-            "libya": "🇱🇾",
-            "tunisia": "🇹🇳",
-            "algeria": "🇩🇿",
-            "morocco": "🇲🇦",
-            "sudan": "🇸🇩",
-            "south sudan": "🇸🇸",
-            "ethiopia": "🇪🇹",
-            "somalia": "🇸🇴",
-            "djibouti": "🇩🇯",
-            "eritrea": "🇪🇷",
-            "kenya": "🇰🇪",
-            "tanzania": "🇹🇿",
-            "uganda": "🇺🇬",
-            "rwanda": "🇷🇼",
-            "burundi": "🇧🇮",
-            "congo": "🇨🇬",
-            "dr congo": "🇨🇩",
-            "democratic republic of the congo": "🇨🇩",
-            "central african republic": "🇨🇫",
-            "chad": "🇹🇩",
-            "cameroon": "🇨🇲",
-            "gabon": "🇬🇦",
-            "equatorial guinea": "🇬🇶",
-            "sao tome and principe": "🇸🇹",
-            "nigeria": "🇳🇬",
-            "niger": "🇳🇪",
-            "mali": "🇲🇱",
-            "burkina faso": "🇧🇫",
-            "senegal": "🇸🇳",
-            "gambia": "🇬🇲",
-            "guinea-bissau": "🇬🇼",
-            "guinea": "🇬🇳",
-            "sierra leone": "🇸🇱",
-            "liberia": "🇱🇷",
-            "ivory coast": "🇨🇮",
-            "cote d'ivoire": "🇨🇮",
-            "ghana": "🇬🇭",
-            "togo": "🇹🇬",
-            "benin": "🇧🇯",
-            "angola": "🇦🇴",
-            "namibia": "🇳🇦",
-            "botswana": "🇧🇼",
-            "zimbabwe": "🇿🇼",
-            "zambia": "🇿🇲",
-            "malawi": "🇲🇼",
-            "mozambique": "🇲🇿",
-            "madagascar": "🇲🇬",
-            "mauritius": "🇲🇺",
-            "seychelles": "🇸🇨",
-            "comoros": "🇰🇲",
-            "mayotte": "🇾🇹",
-            "reunion": "🇷🇪",
-            "south africa": "🇿🇦",
-            "lesotho": "🇱🇸",
-            "eswatini": "🇸🇿",
-            "swaziland": "🇸🇿",
-            "turkey": "🇹🇷",
-            "türkiye": "🇹🇷",
-        }
-
-        def get_flag_emoji(location_name: str) -> str:
-            name = location_name.lower()
-
-            # Check exact match first
-            if name in country_flags:
-                return country_flags[name]
-
-            # Check partial matches
-            for country, flag in country_flags.items():
-                if name in country or country in name:
-                    return flag
-
-            # Default flags for continents/regions
-            if "europe" in name:
-                return "🇪🇺"
-            if "asia" in name:
-                return "🌏"
-            if "africa" in name:
-                return "🌍"
-            if "america" in name:
-                return "🌎"
-            if "oceania" in name:
-                return "🌏"
-
-            # Default for cities
-            return "🏙️"
-
-        # Add flag to each location
-        for location in locations:
-            location["flag"] = get_flag_emoji(location["name"])
+        locations = await LocationIndex(db).search(q, limit)
 
         # Prepare result with cache timestamp
         result = {"suggestions": locations, "cached_at": datetime.utcnow().isoformat()}
@@ -1547,66 +1300,8 @@ async def search_skills(
 ):
     """Search for skills"""
     try:
-        # Common skills - in production this could come from a database
-        common_skills = [
-            {"id": "1", "name": "JavaScript"},
-            {"id": "2", "name": "Python"},
-            {"id": "3", "name": "React"},
-            {"id": "4", "name": "Node.js"},
-            {"id": "5", "name": "TypeScript"},
-            {"id": "6", "name": "HTML"},
-            {"id": "7", "name": "CSS"},
-            {"id": "8", "name": "Java"},
-            {"id": "9", "name": "C++"},
-            {"id": "10", "name": "C#"},
-            {"id": "11", "name": "PHP"},
-            {"id": "12", "name": "Ruby"},
-            {"id": "13", "name": "Go"},
-            {"id": "14", "name": "Rust"},
-            {"id": "15", "name": "Swift"},
-            {"id": "16", "name": "Kotlin"},
-            {"id": "17", "name": "SQL"},
-            {"id": "18", "name": "PostgreSQL"},
-            {"id": "19", "name": "MySQL"},
-            {"id": "20", "name": "MongoDB"},
-            {"id": "21", "name": "Redis"},
-            {"id": "22", "name": "Docker"},
-            {"id": "23", "name": "Kubernetes"},
-            {"id": "24", "name": "AWS"},
-            {"id": "25", "name": "Azure"},
-            {"id": "26", "name": "Google Cloud"},
-            {"id": "27", "name": "Git"},
-            {"id": "28", "name": "Jenkins"},
-            {"id": "29", "name": "CI/CD"},
-            {"id": "30", "name": "Linux"},
-            {"id": "31", "name": "Vue.js"},
-            {"id": "32", "name": "Angular"},
-            {"id": "33", "name": "Django"},
-            {"id": "34", "name": "Flask"},
-            {"id": "35", "name": "Express.js"},
-            {"id": "36", "name": "Spring Boot"},
-            {"id": "37", "name": "Laravel"},
-            {"id": "38", "name": "Ruby on Rails"},
-            {"id": "39", "name": "TensorFlow"},
-            {"id": "40", "name": "PyTorch"},
-            {"id": "41", "name": "Machine Learning"},
-            {"id": "42", "name": "Data Science"},
-            {"id": "43", "name": "Artificial Intelligence"},
-            {"id": "44", "name": "REST API"},
-            {"id": "45", "name": "GraphQL"},
-            {"id": "46", "name": "Microservices"},
-            {"id": "47", "name": "Agile"},
-            {"id": "48", "name": "Scrum"},
-            {"id": "49", "name": "Unit Testing"},
-            {"id": "50", "name": "Test Driven Development"},
-        ]
-
-        # Filter skills based on search query
-        filtered_skills = [
-            skill for skill in common_skills if q.lower() in skill["name"].lower()
-        ]
-
-        return filtered_skills[:limit]
+        # Prefix index over canonical names and aliases of the skill taxonomy
+        return [skill.to_dict() for skill in taxonomy_search_skills(q, limit)]
 
     except Exception as e:
         logger.error(f"Error searching skills: {str(e)}")
@@ -2081,19 +1776,25 @@ async def restore_job_admin(
 
 @router.post("/archive-old", status_code=status.HTTP_200_OK)
 async def archive_old_jobs_endpoint(
+    max_chunks: int = Query(20, ge=1, le=200, description="Stop after this many chunks; the next call resumes"),
     current_user: dict = Depends(get_current_admin),
     db: AsyncIOMotorDatabase = Depends(get_async_db),
 ):
     """
     Manually trigger the archiving of old jobs (admin only).
+
+    Each call archives at most ``max_chunks`` chunks so it stays within the
+    request timeout; while ``completed`` is false, call again to resume from
+    the checkpoint. The nightly retention job finishes whatever is left.
     """
     try:
-        jobs_col = db["jobs"]
-        archived_count = await jobs_col.count_documents({"is_archived": True})
-        await jobs_col.update_many(
-            {"is_archived": True}, {"$set": {"is_archived": False}}
-        )
-        return {"message": f"Archived {archived_count} old jobs"}
+        report = await JobArchiver(db, build_archive_sink(db)).run(max_chunks=max_chunks)
+        message = f"Archived {report.archived} old jobs"
+        if not report.completed:
+            message += "; more remain, call again to continue"
+        return {"message": message, **report.to_dict()}
+    except ArchiveInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -2441,57 +2142,88 @@ async def cleanup_inactive_jobs(
         )
 
 
-@router.post("/admin/update-job-skills")
+@router.post("/admin/update-job-skills", status_code=status.HTTP_202_ACCEPTED)
 async def update_job_skills(
+    dry_run: bool = Query(False, description="Report changes without writing them"),
     current_user: dict = Depends(get_current_admin),
     db: AsyncIOMotorDatabase = Depends(get_async_db),
 ):
     """
-    Re-process all jobs to update extracted skills (admin only).
+    Re-process all active jobs to update extracted skills (admin only).
+
+    Runs as a background backfill; poll ``/admin/backfills/runs/{run_id}`` for progress.
     """
     try:
-        from utils.job_crawler import JobCrawler
+        return await get_backfill_manager().enqueue(db, "job_skills", dry_run=dry_run)
+    except BackfillError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
-        jobs_col = db["jobs"]
 
-        crawler = JobCrawler()
-        updated_count = 0
+@router.get("/admin/backfills")
+async def list_backfills(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncIOMotorDatabase = Depends(get_async_db),
+):
+    """Available backfills and the most recent runs (admin only)."""
+    return {
+        "backfills": {name: backfill.description for name, backfill in BACKFILLS.items()},
+        "runs": await get_backfill_manager().list_runs(db, limit),
+    }
 
-        # Process jobs in batches
-        batch_size = 100
-        skip = 0
 
-        while True:
-            jobs = (
-                await jobs_col.find({"is_active": True})
-                .skip(skip)
-                .limit(batch_size)
-                .to_list(length=batch_size)
-            )
+@router.post("/admin/backfills/{name}", status_code=status.HTTP_202_ACCEPTED)
+async def start_backfill(
+    name: str,
+    dry_run: bool = Query(False, description="Report changes without writing them"),
+    batch_size: int = Query(500, ge=10, le=5000),
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncIOMotorDatabase = Depends(get_async_db),
+):
+    """Start a named backfill in the background (admin only)."""
+    try:
+        return await get_backfill_manager().enqueue(
+            db, name, dry_run=dry_run, batch_size=batch_size
+        )
+    except BackfillError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
-            if not jobs:
-                break
 
-            for job in jobs:
-                # Extract skills from description
-                new_skills = crawler._extract_skills(job.get("description", ""))
+@router.get("/admin/backfills/runs/{run_id}")
+async def get_backfill_run(
+    run_id: str,
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncIOMotorDatabase = Depends(get_async_db),
+):
+    """Progress, counters and dry-run samples of a backfill run (admin only)."""
+    run = await get_backfill_manager().status(db, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Backfill run not found")
+    return run
 
-                # Update job with new skills
-                await jobs_col.update_one(
-                    {"_id": job["_id"]}, {"$set": {"skills": new_skills}}
-                )
-                updated_count += 1
 
-            skip += batch_size
+@router.post("/admin/backfills/runs/{run_id}/resume", status_code=status.HTTP_202_ACCEPTED)
+async def resume_backfill_run(
+    run_id: str,
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncIOMotorDatabase = Depends(get_async_db),
+):
+    """Continue an interrupted backfill run from its last checkpoint (admin only)."""
+    try:
+        return await get_backfill_manager().resume(db, run_id)
+    except BackfillError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
-        return {"message": f"Skills update completed", "updated_jobs": updated_count}
 
-    except Exception as e:
-        logger.error(f"Error updating job skills: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update job skills: {str(e)}",
-        )
+@router.post("/admin/backfills/runs/{run_id}/cancel")
+async def cancel_backfill_run(
+    run_id: str,
+    current_user: dict = Depends(get_current_admin),
+):
+    """Stop a backfill running in this process; it can be resumed later (admin only)."""
+    if not get_backfill_manager().cancel(run_id):
+        raise HTTPException(status_code=404, detail="Backfill run is not running here")
+    return {"id": run_id, "status": "cancelling"}
 
 
 @router.get("/admin/deployment-status")
@@ -2801,16 +2533,20 @@ async def track_job_interaction(
     Track user interactions with job postings for analytics
     """
     try:
-        interaction_record = {
-            "job_id": job_id,
-            "action": tracking_data.get("action"),
-            "timestamp": tracking_data.get("timestamp"),
-            "user_agent": tracking_data.get("user_agent"),
-            "ip_address": tracking_data.get("ip_address"),
-            "session_id": tracking_data.get("session_id"),
-        }
-
-        await db["job_interactions"].insert_one(interaction_record)
+        recorder = get_interaction_recorder()
+        buffered = recorder is not None
+        if not buffered:
+            recorder = InteractionRecorder(db)
+        recorder.record(
+            job_id,
+            tracking_data.get("action"),
+            client_timestamp=tracking_data.get("timestamp"),
+            user_agent=tracking_data.get("user_agent"),
+            ip_address=tracking_data.get("ip_address"),
+            session_id=tracking_data.get("session_id"),
+        )
+        if not buffered:
+            await recorder.flush()
 
         return {"success": True, "message": "Interaction tracked"}
 
@@ -2832,46 +2568,37 @@ async def get_job_application_analytics(
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        # Get application statistics
-        applications = await db["applications"].find({"job_id": job_id}).to_list(None)
-        interactions = (
-            await db["job_interactions"].find({"job_id": job_id}).to_list(None)
-        )
+        # Counted by the database and the interaction counters, not in Python
+        methods = {
+            row["_id"]: row["count"]
+            async for row in db["applications"].aggregate(
+                [
+                    {"$match": {"job_id": job_id}},
+                    {"$group": {"_id": "$application_method", "count": {"$sum": 1}}},
+                ]
+            )
+        }
+        total_applications = sum(methods.values())
+        interactions = await job_interaction_counts(db, job_id)
 
         analytics = {
-            "total_applications": len(applications),
+            "total_applications": total_applications,
             "application_methods": {
-                "external_redirect": len(
-                    [
-                        a
-                        for a in applications
-                        if a.get("application_method") == "external"
-                    ]
-                ),
-                "scraped_form": len(
-                    [
-                        a
-                        for a in applications
-                        if a.get("application_method") == "scraped_form"
-                    ]
-                ),
-                "automated": len(
-                    [
-                        a
-                        for a in applications
-                        if a.get("application_method") == "automated"
-                    ]
-                ),
+                "external_redirect": methods.get("external", 0),
+                "scraped_form": methods.get("scraped_form", 0),
+                "automated": methods.get("automated", 0),
             },
-            "total_views": len([i for i in interactions if i.get("action") == "view"]),
-            "total_clicks": len(
-                [i for i in interactions if i.get("action") == "external_redirect"]
-            ),
-            "conversion_rate": len(applications) / max(len(interactions), 1) * 100,
+            "total_views": interactions["actions"].get("view", 0),
+            "total_clicks": interactions["actions"].get("external_redirect", 0),
+            "interactions_by_action": interactions["actions"],
+            "daily_interactions": interactions["daily"],
+            "conversion_rate": total_applications / max(interactions["total"], 1) * 100,
         }
 
         return analytics
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting application analytics for job {job_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2910,119 +2637,6 @@ async def get_job(job_id: str, db: AsyncIOMotorDatabase = Depends(get_async_db))
         )
 
 
-def clean_job_title(title: str) -> str:
-    """Clean and normalize job titles"""
-    if not title:
-        return ""
-
-    # Remove common unwanted patterns
-    unwanted_patterns = [
-        r"Current Open Jobs",
-        r"Open Applications",
-        r"Customer Support",
-        r"On-site",
-        r"Full Time",
-        r"Part Time",
-        r"Contract",
-        r"Freelance",
-        r"Remote",
-        r"Hybrid",
-        r"Relocate to [A-Za-z\s]+",
-        r"Front Office",
-        r"Back Office",
-        r"—[A-Za-z\s]+",
-        r"-[A-Za-z\s]+",
-        r"\([^)]*\)",
-        r"\[[^\]]*\]",
-        r"[A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+",  # Remove long name patterns
-    ]
-
-    for pattern in unwanted_patterns:
-        title = re.sub(pattern, "", title, flags=re.IGNORECASE)
-
-    # Remove extra whitespace and normalize
-    title = re.sub(r"\s+", " ", title).strip()
-
-    # Remove leading/trailing punctuation
-    title = title.strip(".,;:-_|")
-
-    # Filter out titles that are too short or too generic
-    if len(title) < 3 or title.lower() in ["developers", "jobs", "positions", "roles"]:
-        return ""
-
-    return title
-
-
-def normalize_job_title(title: str) -> str:
-    """Normalize job titles for grouping"""
-    cleaned = clean_job_title(title)
-    if not cleaned:
-        return ""
-
-    # Convert to lowercase for comparison
-    normalized = cleaned.lower()
-
-    # Remove common prefixes/suffixes for grouping
-    prefixes = [
-        "senior",
-        "sr",
-        "junior",
-        "jr",
-        "lead",
-        "principal",
-        "staff",
-        "associate",
-        "assistant",
-    ]
-    suffixes = ["i", "ii", "iii", "iv", "1", "2", "3", "4", "5"]
-
-    # Remove level indicators
-    words = normalized.split()
-    filtered_words = []
-
-    for word in words:
-        # Skip common level indicators
-        if word not in prefixes and word not in suffixes:
-            filtered_words.append(word)
-
-    return " ".join(filtered_words)
-
-
-def group_job_titles(jobs: list) -> dict:
-    """Group jobs by normalized titles and return statistics"""
-    title_groups = defaultdict(list)
-
-    for job in jobs:
-        original_title = job.get("title", "")
-        normalized_title = normalize_job_title(original_title)
-
-        if normalized_title:
-            title_groups[normalized_title].append(
-                {
-                    "original_title": original_title,
-                    "job_id": job.get("_id", job.get("id")),
-                    "company": job.get("company", ""),
-                }
-            )
-
-    # Convert to summary format
-    grouped_results = {}
-    for normalized_title, job_list in title_groups.items():
-        original_titles = [job["original_title"] for job in job_list]
-        title_counts = Counter(original_titles)
-
-        grouped_results[normalized_title] = {
-            "count": len(job_list),
-            "variations": dict(title_counts),
-            "most_common": (
-                title_counts.most_common(1)[0][0] if title_counts else normalized_title
-            ),
-            "job_ids": [job["job_id"] for job in job_list],
-        }
-
-    return grouped_results
-
-
 @router.get("/cache/stats", tags=["Admin"])
 async def get_cache_stats():
     """Get cache statistics for monitoring."""
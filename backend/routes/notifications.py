@@ -7,8 +7,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from backend.database import get_async_db
-from backend.models.models import (UserNotification, UserNotificationCreate,
+from backend.models.models import (DigestSubscriptionRequest,
+                                   UserNotification, UserNotificationCreate,
                                    UserNotificationUpdate)
+from backend.services.digest_service import (DigestSubscriptionStore,
+                                             user_digest_preferences)
 from backend.utils.auth import get_current_user
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
@@ -90,6 +93,64 @@ async def get_unread_count(
         )
 
 
+@router.put("/digest")
+async def subscribe_email_digest(
+    subscription: DigestSubscriptionRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_async_db),
+):
+    """
+    Subscribe the current user's email address to the daily or weekly job digest
+    """
+    email = current_user.get("email")
+    if not email:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="User has no email address"
+        )
+    preferences = subscription.preferences
+    if preferences is None:
+        preferences = user_digest_preferences(current_user)
+    try:
+        await DigestSubscriptionStore(db).subscribe(
+            "email",
+            email,
+            subscription.frequency,
+            preferences,
+            name=current_user.get("name"),
+            user_id=str(current_user["_id"]),
+        )
+        return {"message": "Digest subscription saved", "frequency": subscription.frequency}
+
+    except Exception as e:
+        logger.error(f"Error saving digest subscription: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save digest subscription",
+        )
+
+
+@router.delete("/digest")
+async def unsubscribe_email_digest(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_async_db),
+):
+    """
+    Stop the job digest for the current user's email address
+    """
+    try:
+        removed = await DigestSubscriptionStore(db).unsubscribe(
+            "email", current_user.get("email") or ""
+        )
+        return {"message": "Digest subscription cancelled", "unsubscribed": removed}
+
+    except Exception as e:
+        logger.error(f"Error cancelling digest subscription: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to cancel digest subscription",
+        )
+
+
 @router.post("/", response_model=UserNotification)
 async def create_notification(
     notification: UserNotificationCreate,
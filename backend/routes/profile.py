@@ -16,6 +16,7 @@ from ..core.security import get_current_user
 from ..database.db import get_async_db, get_database
 from ..models.user import UserResponse as User
 from ..services.cv_parser_service import cv_parser_service
+from ..services.document_parser import DocumentError
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/profile", tags=["profile"])
@@ -51,8 +52,13 @@ async def upload_and_parse_cv(
         # Read file content
         file_content = await file.read()
 
-        # Parse CV
-        parsed_data = cv_parser_service.parse_cv(file_content, file.filename)
+        # Parse CV in the document worker pool
+        try:
+            parsed_data = await cv_parser_service.parse_cv_async(
+                file_content, file.filename
+            )
+        except DocumentError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
 
         # Save file to uploads directory
         upload_dir = "uploads/cv"
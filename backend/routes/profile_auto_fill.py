@@ -13,6 +13,7 @@ from ..core.security import get_current_user
 from ..database.db import get_async_db
 from ..models.user import UserResponse as User
 from ..services.cv_parser_service import cv_parser_service
+from ..services.document_parser import DocumentError
 from ..utils.linkedin import LinkedInIntegration
 from ..utils.premium import is_premium_user
 
@@ -39,7 +40,7 @@ class ProfileAutoFillService:
         """Extract profile information from uploaded CV"""
         try:
             # Parse CV using existing service
-            parsed_data = self.cv_parser.parse_cv(file_content, filename)
+            parsed_data = await self.cv_parser.parse_cv_async(file_content, filename)
 
             # Enhance with AI if available
             enhanced_data = await self._enhance_with_ai(parsed_data, user)
@@ -55,6 +56,8 @@ class ProfileAutoFillService:
                 "extracted_at": datetime.now().isoformat(),
             }
 
+        except DocumentError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
         except Exception as e:
             logger.error(f"Error extracting profile from CV: {str(e)}")
             raise HTTPException(
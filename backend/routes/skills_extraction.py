@@ -12,6 +12,10 @@ from fastapi.responses import JSONResponse
 from ..core.security import get_current_user
 from ..database.db import get_async_db
 from ..models.user import UserResponse as User
+from ..services.document_parser import DocumentError
+from ..services.document_processing import document_processor
+from ..services.skill_taxonomy import (SKILLS_BY_KEY, extract_skills,
+                                       lookup_skill, search_skills)
 from ..utils.premium import is_premium_user
 
 logger = logging.getLogger(__name__)
@@ -24,136 +28,20 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 class SkillsExtractionService:
     """Service for extracting skills from CV content"""
 
-    def __init__(self):
-        self.technical_skills = {
-            "programming_languages": [
-                "Python",
-                "JavaScript",
-                "TypeScript",
-                "Java",
-                "C++",
-                "C#",
-                "PHP",
-                "Ruby",
-                "Go",
-                "Rust",
-                "Swift",
-                "Kotlin",
-                "Scala",
-                "R",
-                "MATLAB",
-            ],
-            "frameworks": [
-                "React",
-                "Angular",
-                "Vue",
-                "Svelte",
-                "Node.js",
-                "Express",
-                "Django",
-                "Flask",
-                "Spring",
-                "ASP.NET",
-                "Laravel",
-                "Rails",
-                "FastAPI",
-            ],
-            "databases": [
-                "MySQL",
-                "PostgreSQL",
-                "MongoDB",
-                "Redis",
-                "Elasticsearch",
-                "SQLite",
-                "Oracle",
-                "SQL Server",
-                "Cassandra",
-                "DynamoDB",
-            ],
-            "cloud_platforms": [
-                "AWS",
-                "Azure",
-                "GCP",
-                "Google Cloud",
-                "Heroku",
-                "DigitalOcean",
-                "Vercel",
-                "Netlify",
-                "Firebase",
-            ],
-            "devops_tools": [
-                "Docker",
-                "Kubernetes",
-                "Jenkins",
-                "Travis CI",
-                "CircleCI",
-                "GitHub Actions",
-                "Terraform",
-                "Ansible",
-                "GitLab CI",
-            ],
-            "version_control": ["Git", "GitHub", "GitLab", "Bitbucket", "SVN"],
-            "api_technologies": [
-                "REST",
-                "GraphQL",
-                "gRPC",
-                "WebSockets",
-                "SOAP",
-                "API",
-            ],
-            "architecture": [
-                "Microservices",
-                "Serverless",
-                "Monolith",
-                "Event-Driven",
-                "Domain-Driven Design",
-            ],
-            "methodologies": [
-                "CI/CD",
-                "DevOps",
-                "Agile",
-                "Scrum",
-                "Kanban",
-                "TDD",
-                "BDD",
-                "Lean",
-            ],
-        }
-
-        self.soft_skills = [
-            "Leadership",
-            "Communication",
-            "Teamwork",
-            "Problem Solving",
-            "Critical Thinking",
-            "Time Management",
-            "Adaptability",
-            "Creativity",
-            "Emotional Intelligence",
-            "Negotiation",
-            "Project Management",
-            "Customer Service",
-            "Analytical Thinking",
-            "Strategic Planning",
-        ]
+    # Pattern-matching confidence per taxonomy group
+    PATTERN_CONFIDENCE = {"technical": 85, "tools": 85, "soft": 80, "languages": 90}
 
-        self.languages = [
-            "English",
-            "Turkish",
-            "German",
-            "French",
-            "Spanish",
-            "Italian",
-            "Portuguese",
-            "Russian",
-            "Chinese",
-            "Japanese",
-            "Korean",
-            "Arabic",
-            "Dutch",
-            "Swedish",
-            "Norwegian",
-        ]
+    def __init__(self):
+        self.technical_skills: Dict[str, List[str]] = {}
+        self.soft_skills: List[str] = []
+        self.languages: List[str] = []
+        for skill in SKILLS_BY_KEY.values():
+            if skill.group == "soft":
+                self.soft_skills.append(skill.name)
+            elif skill.group == "languages":
+                self.languages.append(skill.name)
+            else:
+                self.technical_skills.setdefault(skill.category, []).append(skill.name)
 
     async def extract_skills_from_cv(
         self, cv_content: str, user: Dict[str, Any]
@@ -284,48 +172,16 @@ class SkillsExtractionService:
             return []
 
     def _extract_skills_with_patterns(self, cv_content: str) -> List[Dict[str, Any]]:
-        """Extract skills using pattern matching"""
-        skills = []
-        content_lower = cv_content.lower()
-
-        # Extract technical skills
-        for category, skill_list in self.technical_skills.items():
-            for skill in skill_list:
-                if skill.lower() in content_lower:
-                    skills.append(
-                        {
-                            "name": skill,
-                            "category": "technical",
-                            "confidence": 85,
-                            "source": "cv",
-                        }
-                    )
-
-        # Extract soft skills
-        for skill in self.soft_skills:
-            if skill.lower() in content_lower:
-                skills.append(
-                    {
-                        "name": skill,
-                        "category": "soft",
-                        "confidence": 80,
-                        "source": "cv",
-                    }
-                )
-
-        # Extract languages
-        for language in self.languages:
-            if language.lower() in content_lower:
-                skills.append(
-                    {
-                        "name": language,
-                        "category": "languages",
-                        "confidence": 90,
-                        "source": "cv",
-                    }
-                )
-
-        return skills
+        """Extract skills using the skill taxonomy"""
+        return [
+            {
+                "name": skill.name,
+                "category": skill.group,
+                "confidence": self.PATTERN_CONFIDENCE.get(skill.group, 80),
+                "source": "cv",
+            }
+            for skill in extract_skills(cv_content)
+        ]
 
     def _merge_skills(
         self, ai_skills: List[Dict], pattern_skills: List[Dict]
@@ -340,6 +196,10 @@ class SkillsExtractionService:
 
         # Add AI skills, preferring AI results for conflicts
         for skill in ai_skills:
+            known = lookup_skill(skill["name"])
+            if known:
+                # "React.js" and "React" are the same skill
+                skill["name"] = known.name
             key = skill["name"].lower()
             if key in merged:
                 # If AI confidence is higher, replace
@@ -360,21 +220,11 @@ class SkillsExtractionService:
 
     def _determine_category(self, skill_name: str) -> str:
         """Determine the category of a skill based on its name"""
+        skill = lookup_skill(skill_name)
+        if skill:
+            return skill.group
         skill_lower = skill_name.lower()
 
-        # Check technical skills
-        for category, skills in self.technical_skills.items():
-            if skill_lower in [s.lower() for s in skills]:
-                return "technical"
-
-        # Check soft skills
-        if skill_lower in [s.lower() for s in self.soft_skills]:
-            return "soft"
-
-        # Check languages
-        if skill_lower in [s.lower() for s in self.languages]:
-            return "languages"
-
         # Default to tools if it looks like a tool/platform
         if any(
             keyword in skill_lower
@@ -609,9 +459,12 @@ async def extract_skills_from_file(
         # Read file content
         file_content = await file.read()
 
-        # For now, we'll assume text content
-        # In a real implementation, you'd use a PDF/DOC parser
-        cv_content = file_content.decode("utf-8", errors="ignore")
+        # Extract text in the document worker pool
+        try:
+            parsed = await document_processor.parse(file_content, file.filename)
+        except DocumentError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        cv_content = parsed.raw_text
 
         # Get user data
         user = await db.users.find_one({"_id": current_user.id})
@@ -729,23 +582,7 @@ async def get_skill_suggestions(
         if not query or len(query) < 2:
             return {"suggestions": []}
 
-        # Combine all available skills
-        all_skills = []
-
-        # Add technical skills
-        for category, skills in skills_service.technical_skills.items():
-            all_skills.extend(skills)
-
-        # Add soft skills
-        all_skills.extend(skills_service.soft_skills)
-
-        # Add languages
-        all_skills.extend(skills_service.languages)
-
-        # Filter by query
-        suggestions = [skill for skill in all_skills if query.lower() in skill.lower()][
-            :limit
-        ]
+        suggestions = [skill.name for skill in search_skills(query, limit)]
 
         return {"suggestions": suggestions, "query": query}
 
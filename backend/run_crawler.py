@@ -10,7 +10,7 @@ async def main():
     crawler = DistillCrawler()
     crawler.load_companies_data()
     jobs = await crawler.crawl_all_companies()
-    result = crawler.save_jobs_to_database(jobs)
+    result = await crawler.save_jobs_to_database(jobs)
     print(f"Crawling completed: {result}")
 
 
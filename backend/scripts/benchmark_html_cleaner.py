@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark job text cleaning throughput.
+
+Compares the previous BeautifulSoup-based cleaner (unescape, full
+``html.parser`` tree, ``get_text``, whitespace collapse) with the streaming
+``html_to_text`` engine on the shapes ``clean_job_data`` sees during ingest:
+plain titles and company names, short HTML snippets, and long descriptions
+truncated to ``max_length``. The batch row runs ``clean_many`` in-process and
+in a process pool.
+
+Usage: python -m backend.scripts.benchmark_html_cleaner [--items 2000] [--workers 4]
+"""
+
+import argparse
+import html
+import random
+import re
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+
+from backend.utils.html_cleaner import clean_many, html_to_text
+
+
+def legacy_clean(text, max_length=None):
+    text = html.unescape(text)
+    clean = re.sub(r"\s+", " ", BeautifulSoup(text, "html.parser").get_text()).strip()
+    if max_length is not None and len(clean) > max_length:
+        clean = clean[: max_length - 3] + "..."
+    return clean
+
+
+def make_description(rng: random.Random, size: int) -> str:
+    words = ["Python", "remote", "team", "&amp;", "async", "APIs", "we", "build", "ship", "data"]
+    sections = []
+    while sum(map(len, sections)) < size:
+        items = "".join(
+            f"<li>{' '.join(rng.choices(words, k=8))}</li>" for _ in range(rng.randint(3, 6))
+        )
+        sections.append(
+            f"<h3>{rng.choice(words[:3]).title()}</h3>"
+            f"<p class=\"body\">{' '.join(rng.choices(words, k=60))} <strong>now</strong>.</p>"
+            f"<ul>{items}</ul>"
+        )
+    return "<div>" + "".join(sections) + "</div>"
+
+
+def make_corpus(items: int):
+    rng = random.Random(42)
+    return {
+        "plain title": [f"Senior Python Developer {i}" for i in range(items)],
+        "html snippet": [f"<strong>Acme &amp; Co</strong> {i}" for i in range(items)],
+        "20KB description": [make_description(rng, 20_000) for _ in range(items // 20 or 1)],
+    }
+
+
+def measure(func, texts, rounds: int = 3) -> float:
+    """Median items per second over several rounds."""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func(texts)
+        samples.append(len(texts) / (time.perf_counter() - started))
+    return statistics.median(samples)
+
+
+def main(items: int, workers: int) -> None:
+    corpus = make_corpus(items)
+    scenarios = [
+        ("plain title", None),
+        ("html snippet", None),
+        ("20KB description", None),
+        ("20KB description", 2000),
+    ]
+
+    print(f"{'scenario':<26}{'legacy/s':>12}{'engine/s':>12}{'speedup':>10}")
+    for name, max_length in scenarios:
+        texts = corpus[name]
+        for text in texts[:50]:
+            assert html_to_text(text, max_length) == legacy_clean(text, max_length)
+        legacy = measure(lambda batch: [legacy_clean(t, max_length) for t in batch], texts)
+        engine = measure(lambda batch: [html_to_text(t, max_length) for t in batch], texts)
+        label = name if max_length is None else f"{name} (max {max_length})"
+        print(f"{label:<26}{legacy:>12.0f}{engine:>12.0f}{engine / legacy:>9.1f}x")
+
+    texts = corpus["20KB description"] * 20
+    clean_many(texts[:64], workers=workers, chunksize=16)  # start the pool outside the timing
+    serial = measure(lambda batch: clean_many(batch), texts, rounds=1)
+    pooled = measure(lambda batch: clean_many(batch, workers=workers, chunksize=16), texts, rounds=1)
+    print(f"{'clean_many 20KB':<26}{serial:>12.0f}{pooled:>12.0f}{pooled / serial:>9.1f}x  ({workers} workers)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.items, args.workers)
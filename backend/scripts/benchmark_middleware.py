@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request overhead of the middleware stack.
+
+Compares a bare FastAPI app, the same pipeline stages mounted as one
+BaseHTTPMiddleware each (the previous layout), and the pure-ASGI
+RequestPipelineMiddleware. Requests are driven straight through the ASGI
+interface so no network or server time is included. The activity stage is
+left out because its cost is a database insert, identical in both layouts.
+
+Usage: python -m backend.scripts.benchmark_middleware [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from backend.middleware.error_handler import ErrorHandlingMiddleware
+from backend.middleware.input_validation import InputValidationMiddleware
+from backend.middleware.performance_monitoring import \
+    PerformanceMonitoringMiddleware
+from backend.middleware.pipeline import (RequestContext,
+                                         RequestPipelineMiddleware)
+from backend.middleware.response_cache import ResponseCacheMiddleware
+from backend.middleware.security_headers import (SecurityHeadersMiddleware,
+                                                 SecurityReportingMiddleware)
+
+
+def make_stages():
+    return [
+        PerformanceMonitoringMiddleware(),
+        InputValidationMiddleware(),
+        ErrorHandlingMiddleware(),
+        ResponseCacheMiddleware(),
+        SecurityReportingMiddleware(),
+        SecurityHeadersMiddleware(),
+    ]
+
+
+class LegacyStageAdapter(BaseHTTPMiddleware):
+    """Runs one stage the way the old per-concern BaseHTTPMiddleware did."""
+
+    def __init__(self, app, stage):
+        super().__init__(app)
+        self.stage = stage
+
+    async def dispatch(self, request: Request, call_next):
+        stage = self.stage
+        config = stage.route_config(request.url.path)
+        if config is None:
+            return await call_next(request)
+
+        receive = request.receive
+        if request.method in ("POST", "PUT", "PATCH"):
+            # Each layer re-read and re-parsed the body
+            body = await request.body()
+            json.loads(body)
+
+            async def receive():
+                return {"type": "http.request", "body": body, "more_body": False}
+
+        ctx = RequestContext(request.scope, receive)
+        response = await stage.on_request(ctx, config)
+        if response is None:
+            response = await call_next(request)
+        ctx.status = response.status_code
+        stage.on_response_start(ctx, config, response.headers)
+        if ctx.capture_body:
+            chunks = [chunk async for chunk in response.body_iterator]
+            ctx.response_body = chunks
+            response = Response(
+                b"".join(chunks), response.status_code, dict(response.headers)
+            )
+        await stage.on_complete(ctx, config)
+        return response
+
+
+def build_app(layout: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/jobs/statistics")
+    async def statistics_endpoint():
+        return {"total": 42, "remote": 40}
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/api/v1/items")
+    async def create_item(request: Request):
+        return {"echo": await request.json()}
+
+    if layout == "pipeline":
+        app.add_middleware(RequestPipelineMiddleware, stages=make_stages())
+    elif layout == "legacy":
+        for stage in reversed(make_stages()):
+            app.add_middleware(LegacyStageAdapter, stage=stage)
+    return app
+
+
+async def call(app, method: str, path: str, body: bytes = b"") -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"page=1",
+        "root_path": "",
+        "headers": [
+            (b"host", b"bench"),
+            (b"user-agent", b"bench/1.0"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, method, path, body, requests: int, rounds: int = 5) -> float:
+    """Median microseconds per request over several rounds."""
+    for _ in range(200):
+        await call(app, method, path, body)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(requests):
+            await call(app, method, path, body)
+        samples.append((time.perf_counter() - started) / requests * 1_000_000)
+    return statistics.median(samples)
+
+
+async def main(requests: int) -> None:
+    scenarios = [
+        ("cached GET", "GET", "/api/v1/jobs/statistics", b""),
+        ("uncached GET", "GET", "/api/v1/ping", b""),
+        ("JSON POST", "POST", "/api/v1/items", json.dumps({"title": "Python developer"}).encode()),
+    ]
+    apps = {layout: build_app(layout) for layout in ("bare", "legacy", "pipeline")}
+
+    print(f"{'scenario':<14}{'bare µs':>10}{'legacy µs':>12}{'pipeline µs':>14}{'overhead cut':>14}")
+    for name, method, path, body in scenarios:
+        results = {
+            layout: await measure(app, method, path, body, requests)
+            for layout, app in apps.items()
+        }
+        legacy_overhead = results["legacy"] - results["bare"]
+        pipeline_overhead = results["pipeline"] - results["bare"]
+        cut = 1 - pipeline_overhead / legacy_overhead if legacy_overhead > 0 else 0
+        print(
+            f"{name:<14}{results['bare']:>10.1f}{results['legacy']:>12.1f}"
+            f"{results['pipeline']:>14.1f}{cut:>13.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Reproducible in-process benchmarks for the hot endpoints and services.
+
+Seeds a deterministic synthetic corpus (jobs, users, applications) into
+mongomock, or into a scratch database on a real MongoDB with ``--mongo-url``,
+and times each hot path at every corpus size:
+
+- ``/jobs/search``, the autocomplete endpoints and ``/jobs/statistics``,
+  driven through the ASGI interface of an app holding the jobs router;
+- ``JobTitleParser.parse_job_title``, ``clean_job_data`` and
+  ``JobMatchingService.get_top_matches`` on corpus jobs;
+- the crawler save path (the shared ingest pipeline) for new and
+  unchanged batches, and per-user application statistics.
+
+Results are written as JSON (``--output``). With ``--baseline`` the run is
+compared against a stored result file and the script exits non-zero when a
+benchmark's median slowed down by more than ``--threshold``. Baselines are
+only comparable on the same machine and backend; the metadata block records
+both. mongomock has no indexes, so its write-path numbers grow with the
+corpus; use ``--mongo-url`` for representative crawler save timings.
+
+Usage: python -m backend.scripts.benchmark_suite [--sizes 1000,5000] [--repeat 5]
+           [--mongo-url mongodb://localhost:27017] [--only search]
+           [--output results.json] [--baseline backend/scripts/data/benchmark_baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI
+
+from backend.database.db import get_async_db
+from backend.routes import jobs as jobs_routes
+from backend.services.application_stats import ApplicationStatsEngine
+from backend.services.cache_service import get_cache_service
+from backend.services.ingest_pipeline import build_ingest_pipeline
+from backend.services.job_matching_service import JobMatchingService
+from backend.services.job_stats_materializer import JobStatsMaterializer
+from backend.services.job_title_parser import JobTitleParser
+from backend.services.location_index import LocationIndex
+from backend.utils.html_cleaner import clean_job_data
+
+SEED = 42
+DEFAULT_SIZES = (1000, 5000)
+DEFAULT_THRESHOLD = 0.25
+ITEM_BATCH = 200
+CRAWL_BATCH = 50
+
+SENIORITY = ["", "Junior ", "Senior ", "Lead ", "Staff ", "Principal ", "Sr. "]
+ROLES = [
+    "Python Developer", "Backend Engineer", "Frontend Developer", "Full Stack Engineer",
+    "Data Scientist", "DevOps Engineer", "Product Manager", "UX Designer",
+    "Machine Learning Engineer", "Site Reliability Engineer", "QA Engineer",
+    "Mobile Developer", "Data Engineer", "Customer Success Manager",
+]
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Django", "FastAPI", "Node.js",
+    "PostgreSQL", "MongoDB", "Redis", "AWS", "Docker", "Kubernetes", "Go", "Java",
+    "Terraform", "GraphQL", "Figma", "Kafka", "Spark",
+]
+LOCATIONS = [
+    "Remote", "Berlin, Germany", "London, UK", "New York, NY", "San Francisco, CA",
+    "Amsterdam, Netherlands", "Toronto, Canada", "Remote - Europe", "Lisbon, Portugal",
+    "Istanbul, Turkey", "Austin, TX", "Remote (US only)",
+]
+JOB_TYPES = ["Full-time", "Part-time", "Contract"]
+LEVELS = ["junior", "mid", "senior", "lead"]
+WORK_TYPES = ["remote", "hybrid", "onsite"]
+STATUSES = ["applied", "viewed", "interview", "rejected", "offer"]
+
+# Autocomplete prefixes cycled through by the endpoint benchmarks
+PREFIXES = ["py", "dev", "eng", "dat", "man", "ber", "rem", "lon", "ac", "glo"]
+
+
+def _description(rng: random.Random, title: str, skills: List[str]) -> str:
+    bullets = "".join(f"<li>{skill} in production &amp; at scale</li>" for skill in skills)
+    filler = " ".join(rng.choices(["we", "build", "remote", "team", "ship", "data", "APIs"], k=60))
+    return f"<h2>{title}</h2><p>{filler}</p><ul>{bullets}</ul><p><strong>Apply now</strong></p>"
+
+
+def make_corpus(
+    size: int, seed: int = SEED, now: Optional[datetime] = None
+) -> Dict[str, List[Dict]]:
+    """Deterministic jobs, users and applications for a corpus of ``size`` jobs."""
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    brands = ["Acme", "Globex", "Initech", "Umbrella", "Hooli"]
+    companies = [f"{rng.choice(brands)} {i}" for i in range(max(size // 20, 5))]
+
+    jobs = []
+    for i in range(size):
+        title = f"{rng.choice(SENIORITY)}{rng.choice(ROLES)}"
+        skills = rng.sample(SKILLS, rng.randint(2, 6))
+        salary_min = rng.randrange(40_000, 140_000, 5_000)
+        location = rng.choice(LOCATIONS)
+        work_type = "remote" if "Remote" in location else rng.choice(WORK_TYPES)
+        jobs.append(
+            {
+                "external_id": f"bench-{i}",
+                "source_id": f"bench-{i}",
+                "source": "benchmark",
+                "title": title,
+                "company": rng.choice(companies),
+                "location": location,
+                "description": _description(rng, title, skills),
+                "skills": skills,
+                "job_type": rng.choice(JOB_TYPES),
+                "experience_level": rng.choice(LEVELS),
+                "work_type": work_type,
+                "salary_min": salary_min,
+                "salary_max": salary_min + rng.randrange(10_000, 60_000, 5_000),
+                "salary_currency": "USD",
+                "is_active": rng.random() > 0.1,
+                "url": f"https://jobs.example.com/{i}",
+                "created_at": now - timedelta(minutes=rng.randrange(60 * 24 * 90)),
+            }
+        )
+
+    users = [
+        {
+            "_id": f"user-{i}",
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "skills": rng.sample(SKILLS, 5),
+            "location": rng.choice(LOCATIONS),
+        }
+        for i in range(max(size // 10, 10))
+    ]
+    applications = [
+        {
+            "user_id": rng.choice(users)["_id"],
+            "job_id": jobs[rng.randrange(size)]["external_id"] if size else f"job-{i}",
+            "status": rng.choice(STATUSES),
+            "application_type": rng.choice(["external", "automated"]),
+            "applied_at": now - timedelta(days=rng.randrange(120)),
+            "company_response": "Thanks!" if rng.random() < 0.2 else None,
+        }
+        for i in range(size * 2)
+    ]
+    return {"jobs": jobs, "users": users, "applications": applications}
+
+
+def resume_for(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Parsed-resume shape JobMatchingService expects, built from a corpus user."""
+    return {
+        "personal_info": {
+            "name": user["name"],
+            "email": user["email"],
+            "location": user["location"],
+        },
+        "skills": {"programming": [skill.lower() for skill in user["skills"]]},
+        "experience": [
+            {"position": "Software Engineer", "start_date": "2018", "end_date": "Present"}
+        ],
+        "education": [
+            {"degree": "Bachelor of Science", "institution": "Technical University"}
+        ],
+    }
+
+
+async def seed(db, corpus: Dict[str, List[Dict]]) -> None:
+    """Load the corpus and build the materialized tables the endpoints read."""
+    await db.jobs.insert_many([dict(job) for job in corpus["jobs"]])
+    await db.users.insert_many([dict(user) for user in corpus["users"]])
+    await db.user_applications.insert_many([dict(app) for app in corpus["applications"]])
+    await JobStatsMaterializer(db).reconcile()
+    await LocationIndex(db).rebuild()
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    size: int
+    runs: int
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    ops_per_sec: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.size}"
+
+
+Runner = Callable[[int], Awaitable[Any]]
+Setup = Callable[[], Awaitable[Any]]
+
+
+async def measure(run: Runner, repeat: int, setup: Optional[Setup] = None) -> List[float]:
+    """Seconds per call for ``repeat`` timed calls after one warm-up call."""
+    samples = []
+    for i in range(repeat + 1):
+        if setup is not None:
+            await setup()
+        started = time.perf_counter()
+        await run(i)
+        if i:
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(name: str, size: int, samples: List[float]) -> BenchmarkResult:
+    ordered = sorted(samples)
+    median = statistics.median(ordered)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return BenchmarkResult(
+        name=name,
+        size=size,
+        runs=len(samples),
+        median_ms=round(median * 1000, 3),
+        p95_ms=round(p95 * 1000, 3),
+        min_ms=round(ordered[0] * 1000, 3),
+        ops_per_sec=round(1 / median, 2) if median else 0.0,
+    )
+
+
+def make_app(db) -> FastAPI:
+    app = FastAPI()
+    app.include_router(jobs_routes.router, prefix="/api/v1")
+    app.dependency_overrides[get_async_db] = lambda: db
+    return app
+
+
+class Suite:
+    """Benchmarks for one seeded corpus."""
+
+    def __init__(self, db, corpus: Dict[str, List[Dict]]):
+        self.db = db
+        self.corpus = corpus
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=make_app(db)), base_url="http://bench"
+        )
+        self.title_parser = JobTitleParser()
+        self.matcher = JobMatchingService()
+        self.jobs = corpus["jobs"]
+        self.items = self.jobs[:ITEM_BATCH]
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def _get(self, path: str, **params) -> Any:
+        response = await self.client.get(f"/api/v1/jobs{path}", params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def _clear_cache(self) -> None:
+        await get_cache_service().clear()
+
+    def benchmarks(self) -> List[Tuple[str, Runner, Optional[Setup]]]:
+        """(name, timed call, untimed setup) for every benchmark."""
+
+        def endpoint(path: str, params: Callable[[int], Dict[str, Any]]) -> Runner:
+            return lambda i: self._get(path, **params(i))
+
+        def prefix(i: int) -> Dict[str, Any]:
+            return {"q": PREFIXES[i % len(PREFIXES)]}
+
+        keywords = ["python", "engineer", "data"]
+        filtered = {
+            "q": "developer",
+            "work_type": "remote",
+            "job_type": "Full-time",
+            "experience": "senior",
+        }
+        # Title and location lookups are cached; clear first to time the query
+        cold = self._clear_cache
+        return [
+            ("search.newest", endpoint("/search", lambda i: {"page": i % 5 + 1}), None),
+            ("search.keyword", endpoint("/search", lambda i: {"q": keywords[i % 3]}), None),
+            ("search.filtered", endpoint("/search", lambda i: filtered), None),
+            ("autocomplete.titles", endpoint("/job-titles/search", prefix), cold),
+            ("autocomplete.companies", endpoint("/companies/search", prefix), None),
+            ("autocomplete.locations", endpoint("/locations/search", prefix), cold),
+            ("autocomplete.skills", endpoint("/skills/search", prefix), None),
+            ("statistics", endpoint("/statistics", lambda i: {}), None),
+            ("title_parser.batch", self._parse_titles, None),
+            ("clean_job_data.batch", self._clean_jobs, None),
+            ("matching.top_matches", self._top_matches, None),
+            ("crawler_save.new", self._save_new, None),
+            ("crawler_save.unchanged", self._save_unchanged, None),
+            ("application_stats.user", self._application_stats, None),
+        ]
+
+    async def _parse_titles(self, i: int) -> None:
+        for job in self.items:
+            self.title_parser.parse_job_title(job["title"])
+
+    async def _clean_jobs(self, i: int) -> None:
+        for job in self.items:
+            clean_job_data(dict(job))
+
+    async def _top_matches(self, i: int) -> None:
+        user = self.corpus["users"][i % len(self.corpus["users"])]
+        self.matcher.get_top_matches(resume_for(user), self.jobs, limit=10)
+
+    def _crawled(self, i: int) -> List[Dict[str, Any]]:
+        return [
+            {**job, "external_id": f"{job['external_id']}-crawl-{i}", "source_id": None}
+            for job in self.items[:CRAWL_BATCH]
+        ]
+
+    def _pipeline(self):
+        # Same shape as JobCrawler.save_jobs_to_database, without notifications
+        return build_ingest_pipeline(
+            self.db, source="benchmark", id_field="external_id", notify=False
+        )
+
+    async def _save_new(self, i: int) -> None:
+        await self._pipeline().run(self._crawled(i + 1))
+
+    async def _save_unchanged(self, i: int) -> None:
+        await self._pipeline().run(self._crawled(0))
+
+    async def _application_stats(self, i: int) -> None:
+        users = self.corpus["users"]
+        engine = ApplicationStatsEngine(self.db.user_applications, self.db.application_stats)
+        await engine.aggregate(users[i % len(users)]["_id"])
+
+
+def open_database(size: int, mongo_url: Optional[str]):
+    if mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(mongo_url)
+        name = f"benchmark_{size}"
+        return client[name], lambda: client.drop_database(name)
+
+    from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+    async def noop():
+        return None
+
+    return AsyncMockDatabase(), noop
+
+
+async def _run_size(
+    size: int,
+    repeat: int,
+    only: Optional[str],
+    mongo_url: Optional[str],
+    seed_value: int,
+    log: Callable[[str], None],
+) -> Dict[str, Dict[str, Any]]:
+    db, drop = open_database(size, mongo_url)
+    await drop()
+    corpus = make_corpus(size, seed_value)
+    started = time.perf_counter()
+    await seed(db, corpus)
+    log(f"seeded {size} jobs in {time.perf_counter() - started:.1f}s")
+
+    results = {}
+    suite = Suite(db, corpus)
+    try:
+        for name, run, setup in suite.benchmarks():
+            if only and only not in name:
+                continue
+            result = summarize(name, size, await measure(run, repeat, setup))
+            results[result.key] = asdict(result)
+            log(f"{result.key:<36}{result.median_ms:>10.2f} ms{result.p95_ms:>10.2f} ms p95")
+    finally:
+        await suite.close()
+        await drop()
+    return results
+
+
+async def run_suite(
+    sizes: List[int],
+    repeat: int = 5,
+    only: Optional[str] = None,
+    mongo_url: Optional[str] = None,
+    seed_value: int = SEED,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Run every benchmark at every corpus size and return the result document."""
+    results: Dict[str, Dict[str, Any]] = {}
+    # The endpoints are called far above their public rate limits
+    previous = os.environ.get("DISABLE_RATE_LIMITING")
+    os.environ["DISABLE_RATE_LIMITING"] = "true"
+    try:
+        for size in sizes:
+            results.update(await _run_size(size, repeat, only, mongo_url, seed_value, log))
+    finally:
+        if previous is None:
+            os.environ.pop("DISABLE_RATE_LIMITING", None)
+        else:
+            os.environ["DISABLE_RATE_LIMITING"] = previous
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "backend": "mongodb" if mongo_url else "mongomock",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed_value,
+            "repeat": repeat,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Median-to-median comparison of two result documents."""
+    report: Dict[str, List[Dict[str, Any]]] = {
+        "regressions": [],
+        "improvements": [],
+        "unchanged": [],
+        "missing": [],
+    }
+    base_results = baseline.get("results", {})
+    for key, result in current.get("results", {}).items():
+        base = base_results.get(key)
+        if base is None or not base.get("median_ms"):
+            report["missing"].append({"key": key})
+            continue
+        ratio = result["median_ms"] / base["median_ms"]
+        row = {
+            "key": key,
+            "baseline_ms": base["median_ms"],
+            "current_ms": result["median_ms"],
+            "ratio": round(ratio, 3),
+        }
+        if ratio > 1 + threshold:
+            report["regressions"].append(row)
+        elif ratio < 1 - threshold:
+            report["improvements"].append(row)
+        else:
+            report["unchanged"].append(row)
+    return report
+
+
+def print_comparison(
+    report: Dict[str, List[Dict[str, Any]]], baseline_meta: Dict[str, Any], meta: Dict[str, Any]
+) -> None:
+    if baseline_meta.get("backend") != meta.get("backend"):
+        print(f"warning: baseline backend {baseline_meta.get('backend')} != {meta.get('backend')}")
+    print(f"\n{'benchmark':<36}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    markers = {"regressions": "  SLOWER", "improvements": "  faster", "unchanged": ""}
+    for label, marker in markers.items():
+        for row in report[label]:
+            print(
+                f"{row['key']:<36}{row['baseline_ms']:>10.2f}ms"
+                f"{row['current_ms']:>10.2f}ms{row['ratio']:>8.2f}{marker}"
+            )
+    for row in report["missing"]:
+        print(f"{row['key']:<36}{'(new)':>12}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Run benchmarks whose name contains this text")
+    parser.add_argument(
+        "--mongo-url", help="Benchmark against a real MongoDB (scratch database per size)"
+    )
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a stored results JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    current = asyncio.run(run_suite(sizes, args.repeat, args.only, args.mongo_url, args.seed))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(current, handle, indent=2, sort_keys=True)
+        print(f"results written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    report = compare(current, baseline, args.threshold)
+    print_comparison(report, baseline.get("meta", {}), current["meta"])
+    if report["regressions"]:
+        print(
+            f"\n{len(report['regressions'])} benchmark(s) slower than baseline "
+            f"by more than {args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
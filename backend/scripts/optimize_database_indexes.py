@@ -104,6 +104,17 @@ class DatabaseIndexOptimizer:
                 [("location", ASCENDING), ("remote", ASCENDING)],
                 name="location_remote_compound",
             ),
+            # Structured location fields resolved at ingest
+            IndexModel(
+                [("geo.countries", ASCENDING), ("is_active", ASCENDING)],
+                name="geo_countries_active_compound",
+            ),
+            IndexModel(
+                [("geo.regions", ASCENDING), ("is_active", ASCENDING)],
+                name="geo_regions_active_compound",
+            ),
+            IndexModel([("geo.city", ASCENDING)], name="geo_city_asc"),
+            IndexModel([("geo.remote_scope", ASCENDING)], name="geo_remote_scope_asc"),
             # Job status and active filtering
             IndexModel([("status", ASCENDING)], name="status_asc"),
             IndexModel([("is_active", ASCENDING)], name="is_active_asc"),
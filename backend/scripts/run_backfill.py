@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Run a job backfill from the command line
+
+Backfills walk the jobs collection in _id order, write only changed fields
+with bulk writes and checkpoint into ``backfill_runs`` after every batch, so
+an interrupted run can be continued with --resume.
+
+Usage:
+    python -m backend.scripts.run_backfill --list
+    python -m backend.scripts.run_backfill job_title_parsing --dry-run
+    python -m backend.scripts.run_backfill html_clean --workers 4
+    python -m backend.scripts.run_backfill --resume <run_id>
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.database.db import get_database
+from backend.services.backfill import (BACKFILLS, DEFAULT_BATCH_SIZE,
+                                       RUNS_COLLECTION, BackfillRunner,
+                                       get_backfill, public_state)
+
+
+async def run(args) -> int:
+    db = await get_database()
+    if args.resume:
+        state = await db[RUNS_COLLECTION].find_one({"_id": args.resume})
+        if state is None:
+            print(f"Unknown backfill run: {args.resume}")
+            return 1
+        runner = BackfillRunner(
+            db, get_backfill(state["name"]), run_id=args.resume, workers=args.workers
+        )
+    else:
+        runner = BackfillRunner(
+            db,
+            get_backfill(args.name),
+            dry_run=args.dry_run,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    print(f"Backfill run {runner.run_id}")
+    state = public_state(await runner.run())
+
+    print(
+        f"{state['name']}: {state['status']} - {state['scanned']}/{state['total']} scanned, "
+        f"{state['changed']} changed, {state['written']} written, {state['errors']} errors"
+    )
+    if state["dry_run"]:
+        for sample in state["samples"][: args.samples]:
+            print(json.dumps(sample, default=str, ensure_ascii=False, indent=2))
+    return 0 if state["status"] == "completed" else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("name", nargs="?", choices=sorted(BACKFILLS), help="Backfill to run")
+    parser.add_argument("--list", action="store_true", help="List available backfills")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Continue an interrupted run")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=0, help="Transform worker processes")
+    parser.add_argument("--samples", type=int, default=5, help="Dry-run diffs to print")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, backfill in sorted(BACKFILLS.items()):
+            print(f"{name:20} {backfill.description}")
+        return 0
+    if not args.name and not args.resume:
+        parser.error("a backfill name or --resume is required")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
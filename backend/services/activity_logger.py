@@ -11,6 +11,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from backend.database import get_async_db
 from backend.models.user_activity import (ActivitySummary, ActivityType,
                                           UserActivity, UserSession)
+from backend.services.retention import ensure_ttl_index
+from backend.services.retention_rules import get_rule
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +51,6 @@ class ActivityLogger:
             )
             await self.db.user_activities.create_index([("session_id", 1)])
             await self.db.user_activities.create_index([("activity_type", 1)])
-            await self.db.user_activities.create_index([("timestamp", 1)])  # For TTL
 
             # User sessions indexes
             await self.db.user_sessions.create_index(
@@ -68,10 +69,8 @@ class ActivityLogger:
                 [("period_type", 1), ("date", -1)]
             )
 
-            # TTL index - automatically delete activities older than 30 days
-            await self.db.user_activities.create_index(
-                [("timestamp", 1)], expireAfterSeconds=30 * 24 * 60 * 60  # 30 days
-            )
+            # TTL index - expire activities per the shared retention rule
+            await ensure_ttl_index(self.db, get_rule("user_activities"))
 
             logger.info("Activity logging indexes created successfully")
         except Exception as e:
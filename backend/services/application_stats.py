@@ -0,0 +1,210 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("applied", "viewed", "rejected", "hired", "withdrawn")
+APPLICATION_TYPES = ("external", "scraped", "automated")
+RECENT_DAYS = 7
+# Counter documents older than this are re-seeded from the aggregation, which
+# bounds drift from writes that bypassed the service
+COUNTER_MAX_AGE = timedelta(days=1)
+
+# Fields the breakdown depends on; enough to update counters for one document
+STATS_FIELDS = {
+    "user_id": 1,
+    "status": 1,
+    "application_type": 1,
+    "applied_at": 1,
+    "company_response": 1,
+    "response_received": 1,
+}
+
+
+def counters_enabled() -> bool:
+    return os.getenv("APPLICATION_STATS_COUNTERS", "true").lower() == "true"
+
+
+def _key(value: Any) -> str:
+    # Counter maps are keyed by raw values; keep them valid field names
+    return str(value or "unknown").replace(".", "_").lstrip("$") or "unknown"
+
+
+def _responded(app: Dict[str, Any]) -> bool:
+    return app.get("company_response") is not None or app.get("response_received") is not None
+
+
+def _day(value: Any) -> Optional[str]:
+    return value.strftime("%Y-%m-%d") if isinstance(value, datetime) else None
+
+
+def _recent_since() -> datetime:
+    """Start of the day window counted as "recent" (today plus the previous days)."""
+    start = datetime.utcnow() - timedelta(days=RECENT_DAYS - 1)
+    return start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _breakdown(
+    total: int,
+    statuses: Dict[str, int],
+    types: Dict[str, int],
+    recent: int,
+    responded: int,
+) -> Dict[str, Any]:
+    return {
+        "total_applications": total,
+        "status_breakdown": {**{s: 0 for s in STATUSES}, **statuses},
+        "type_breakdown": {**{t: 0 for t in APPLICATION_TYPES}, **types},
+        "recent_applications": recent,
+        "response_rate": round(responded / total * 100, 2) if total > 0 else 0,
+        "responded_applications": responded,
+    }
+
+
+class ApplicationStatsEngine:
+    """
+    Per-user application statistics.
+
+    The full breakdown comes from one ``$group`` over the user's applications,
+    served by the ``(user_id, status, application_type, applied_at)`` index.
+    When counters are enabled, each user also gets an ``application_stats``
+    document that apply/update/delete adjust with ``$inc``, so the dashboard
+    read is a single ``find_one``.
+    """
+
+    def __init__(self, collection, counters=None):
+        self.collection = collection
+        self.counters = counters
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_index(
+                [("user_id", 1), ("status", 1), ("application_type", 1), ("applied_at", -1)]
+            )
+        except Exception as e:
+            logger.warning(f"Could not create application stats index: {e}")
+
+    def _pipeline(self, user_id: str, since: datetime) -> list:
+        responded = {
+            "$ne": [
+                {"$ifNull": ["$company_response", {"$ifNull": ["$response_received", None]}]},
+                None,
+            ]
+        }
+        recent_day = {
+            "$cond": [
+                {"$gte": ["$applied_at", since]},
+                {"$dateToString": {"format": "%Y-%m-%d", "date": "$applied_at"}},
+                None,
+            ]
+        }
+        return [
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": {"status": "$status", "type": "$application_type", "day": recent_day},
+                "count": {"$sum": 1},
+                "responded": {"$sum": {"$cond": [responded, 1, 0]}},
+            }},
+        ]
+
+    async def aggregate(self, user_id: str) -> Dict[str, Any]:
+        """Compute counter fields for one user with a single aggregation."""
+        cursor = self.collection.aggregate(self._pipeline(user_id, _recent_since()))
+
+        counts = {"total": 0, "responded": 0, "status": {}, "type": {}, "days": {}}
+        for row in await cursor.to_list(length=None):
+            group = row.get("_id")
+            if not isinstance(group, dict):
+                continue
+            count = row.get("count", 0)
+            counts["total"] += count
+            counts["responded"] += row.get("responded", 0)
+            for field, value in (("status", group.get("status")), ("type", group.get("type"))):
+                name = _key(value)
+                counts[field][name] = counts[field].get(name, 0) + count
+            day = group.get("day")
+            if day:
+                counts["days"][day] = counts["days"].get(day, 0) + count
+        return counts
+
+    def _to_stats(self, counts: Dict[str, Any]) -> Dict[str, Any]:
+        cutoff = _day(_recent_since())
+        days = counts.get("days") or {}
+        return _breakdown(
+            total=max(counts.get("total", 0), 0),
+            statuses={k: v for k, v in (counts.get("status") or {}).items() if v > 0},
+            types={k: v for k, v in (counts.get("type") or {}).items() if v > 0},
+            recent=sum(v for day, v in days.items() if day >= cutoff and v > 0),
+            responded=max(counts.get("responded", 0), 0),
+        )
+
+    async def get_stats(self, user_id: str) -> Dict[str, Any]:
+        """Point read of the counters, seeded from the aggregation when missing or old."""
+        if self.counters is not None and counters_enabled():
+            try:
+                doc = await self.counters.find_one({"_id": user_id})
+                if doc and datetime.utcnow() - doc.get("seeded_at", datetime.min) < COUNTER_MAX_AGE:
+                    return self._to_stats(doc)
+            except Exception as e:
+                logger.warning(f"Application stats counters unavailable: {e}")
+
+        counts = await self.aggregate(user_id)
+        await self._seed(user_id, counts)
+        return self._to_stats(counts)
+
+    async def _seed(self, user_id: str, counts: Dict[str, Any]) -> None:
+        if self.counters is None or not counters_enabled():
+            return
+        try:
+            await self.counters.replace_one(
+                {"_id": user_id},
+                {**counts, "seeded_at": datetime.utcnow()},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Could not seed application stats for {user_id}: {e}")
+
+    def _increments(self, app: Dict[str, Any], sign: int) -> Dict[str, int]:
+        inc = {
+            "total": sign,
+            f"status.{_key(app.get('status'))}": sign,
+            f"type.{_key(app.get('application_type'))}": sign,
+        }
+        if _responded(app):
+            inc["responded"] = sign
+        applied_at = app.get("applied_at")
+        if isinstance(applied_at, datetime) and applied_at >= _recent_since():
+            inc[f"days.{_day(applied_at)}"] = sign
+        return inc
+
+    async def _apply(self, user_id: Any, changes: Iterable[Dict[str, int]]) -> None:
+        if self.counters is None or not counters_enabled() or not user_id:
+            return
+        inc: Dict[str, int] = {}
+        for change in changes:
+            for field, value in change.items():
+                inc[field] = inc.get(field, 0) + value
+        inc = {field: value for field, value in inc.items() if value}
+        if not inc:
+            return
+        try:
+            # No upsert: only seeded documents hold complete counts
+            await self.counters.update_one({"_id": user_id}, {"$inc": inc})
+        except Exception as e:
+            logger.warning(f"Could not update application stats for {user_id}: {e}")
+
+    async def on_created(self, app: Dict[str, Any]) -> None:
+        await self._apply(app.get("user_id"), [self._increments(app, 1)])
+
+    async def on_updated(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        if not before or not after:
+            return
+        await self._apply(
+            after.get("user_id"), [self._increments(before, -1), self._increments(after, 1)]
+        )
+
+    async def on_deleted(self, app: Optional[Dict[str, Any]]) -> None:
+        if app:
+            await self._apply(app.get("user_id"), [self._increments(app, -1)])
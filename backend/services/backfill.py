@@ -0,0 +1,527 @@
+import asyncio
+import logging
+import os
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.ingest_pipeline import (extract_job_skills,
+                                              match_key_fields,
+                                              title_parse_fields)
+from backend.services.job_scheduler import LEASES_COLLECTION
+from backend.utils.html_cleaner import clean_job_data
+
+logger = logging.getLogger(__name__)
+
+RUNS_COLLECTION = "backfill_runs"
+DEFAULT_BATCH_SIZE = 500
+SAMPLE_LIMIT = 20
+ACTIVE_STATUSES = ("queued", "running")
+
+# A running backfill checkpoints after every batch; one that has not for this
+# long belonged to a process that died and may be resumed.
+STALE_AFTER = timedelta(minutes=5)
+
+Transform = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_MISSING = object()
+
+
+class BackfillError(Exception):
+    status_code = 400
+
+
+class UnknownBackfill(BackfillError):
+    status_code = 404
+
+
+class BackfillConflict(BackfillError):
+    status_code = 409
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """A named reprocessing job: ``transform`` maps a stored document to the
+    fields it should have, and only fields whose value differs are written.
+
+    Transforms run in worker processes when requested, so they must be
+    module-level functions.
+    """
+
+    name: str
+    transform: Transform
+    description: str
+    projection: Optional[Dict[str, int]] = None
+    query: Dict[str, Any] = field(default_factory=dict)
+    collection: str = "jobs"
+
+
+HTML_FIELDS = (
+    "title",
+    "description",
+    "company",
+    "location",
+    "requirements",
+    "benefits",
+    "responsibilities",
+)
+
+# Everything title_parse_fields writes, so unchanged values are not rewritten
+TITLE_FIELDS = (
+    "original_job_title",
+    "parsed_job_title",
+    "job_title_category",
+    "job_title_level",
+    "job_title_skills",
+    "job_title_location",
+    "job_title_work_type",
+    "job_title_department",
+    "title_group",
+    "title_group_v",
+)
+
+# Whole words only: "Contractor" is not a contract, "Business" is not in the US
+_JOB_TYPE_PATTERNS = [
+    (re.compile(rf"\b{pattern}\b", re.IGNORECASE), job_type)
+    for pattern, job_type in (
+        ("Full[- ]?time", "Full-time"),
+        ("Part[- ]?time", "Part-time"),
+        ("Contract", "Contract"),
+        ("Freelance", "Freelance"),
+        ("Internship", "Internship"),
+        ("Staj", "Internship"),
+    )
+]
+_TITLE_LOCATION_RE = re.compile(
+    r"\b(?:%s)\b"
+    % "|".join(
+        [
+            "Remote",
+            "On[- ]?Site",
+            "Hybrid",
+            "İstanbul",
+            "Istanbul",
+            "Ankara",
+            "Izmir",
+            "London",
+            "Berlin",
+            "Paris",
+            "New York",
+            "San Francisco",
+            "(?-i:USA?)",
+            "Europe",
+            "Türkiye",
+            "Turkey",
+            "Global",
+            "Worldwide",
+        ]
+    ),
+    re.IGNORECASE,
+)
+_DASHES_RE = re.compile(r"[\-–—]+")
+_EMPTY_BRACKETS_RE = re.compile(r"\(\s*\)|\[\s*\]")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def reparse_titles(job: Dict[str, Any]) -> Dict[str, Any]:
+    return title_parse_fields(job.get("title") or "")
+
+
+def reextract_skills(job: Dict[str, Any]) -> Dict[str, Any]:
+    skills = extract_job_skills(job)
+    return {"skills": skills, "skill_keys": match_key_fields({"skills": skills})["skill_keys"]}
+
+
+def clean_html(job: Dict[str, Any]) -> Dict[str, Any]:
+    return clean_job_data({key: job[key] for key in HTML_FIELDS if key in job})
+
+
+def split_title_metadata(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Move job type and location words that crawlers left in the title to their fields."""
+    title = job.get("title") or ""
+    job_type = job.get("job_type", "")
+    location = job.get("location", "")
+    changed = False
+
+    for pattern, kind in _JOB_TYPE_PATTERNS:
+        match = pattern.search(title)
+        if match:
+            job_type = kind
+            title = (title[: match.start()] + title[match.end() :]).strip()
+            changed = True
+            break
+
+    match = _TITLE_LOCATION_RE.search(title)
+    if match:
+        location = match.group(0).replace("-", " ").replace("İ", "I")
+        title = (title[: match.start()] + title[match.end() :]).strip()
+        changed = True
+
+    title = _EMPTY_BRACKETS_RE.sub("", title)
+    title = _SPACES_RE.sub(" ", _DASHES_RE.sub(" ", title)).strip()
+    if not changed or not title:
+        return None
+
+    fields = {"title": title, **title_parse_fields(title)}
+    if job_type:
+        fields["job_type"] = job_type
+    if location:
+        fields["location"] = location
+    return fields
+
+
+BACKFILLS: Dict[str, Backfill] = {
+    backfill.name: backfill
+    for backfill in (
+        Backfill(
+            "job_skills",
+            reextract_skills,
+            "Re-extract skills of active jobs with the shared skill taxonomy",
+            projection={"title": 1, "description": 1, "skills": 1, "skill_keys": 1},
+            query={"is_active": True},
+        ),
+        Backfill(
+            "match_keys",
+            match_key_fields,
+            "Store the skill and company keys digest subscriptions match on",
+            projection={"skills": 1, "company": 1, "skill_keys": 1, "company_key": 1},
+        ),
+        Backfill(
+            "job_title_parsing",
+            reparse_titles,
+            "Re-parse job titles into category, level, skills and grouping key",
+            projection={key: 1 for key in ("title",) + TITLE_FIELDS},
+        ),
+        Backfill(
+            "html_clean",
+            clean_html,
+            "Strip HTML from stored job text fields",
+            projection={key: 1 for key in HTML_FIELDS},
+        ),
+        Backfill(
+            "title_metadata",
+            split_title_metadata,
+            "Move job type and location words out of job titles",
+            projection={key: 1 for key in ("title", "job_type", "location") + TITLE_FIELDS},
+        ),
+    )
+}
+
+
+def get_backfill(name: str) -> Backfill:
+    try:
+        return BACKFILLS[name]
+    except KeyError:
+        raise UnknownBackfill(f"Unknown backfill: {name}")
+
+
+def compute_changes(transform: Transform, docs: List[Dict[str, Any]]) -> List[Tuple[Any, Any]]:
+    """``(changes, error)`` per document; ``changes`` holds only fields that differ."""
+    results = []
+    for doc in docs:
+        try:
+            fields = transform(doc) or {}
+        except Exception as e:
+            results.append((None, f"{type(e).__name__}: {e}"))
+            continue
+        results.append(
+            ({key: value for key, value in fields.items() if doc.get(key, _MISSING) != value}, None)
+        )
+    return results
+
+
+class BackfillRunner:
+    """
+    Applies a Backfill to every matching document in ``_id`` order.
+
+    Each batch is read with an ``_id > last_id`` range query, so pages stay
+    cheap however far the run has progressed and documents changing mid-run
+    are neither skipped nor visited twice. Changes are written with one
+    unordered ``bulk_write`` per batch, and the run's progress document is
+    checkpointed after every batch so an interrupted run resumes where it
+    stopped. In dry-run mode nothing is written and the first differences are
+    kept as before/after samples.
+    """
+
+    def __init__(
+        self,
+        db,
+        backfill: Backfill,
+        run_id: Optional[str] = None,
+        dry_run: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = 0,
+    ):
+        self.db = db
+        self.backfill = backfill
+        self.run_id = run_id or uuid.uuid4().hex
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.workers = workers
+        self.runs = db[RUNS_COLLECTION]
+        self.state: Dict[str, Any] = {}
+
+    async def create(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        self.state = {
+            "_id": self.run_id,
+            "name": self.backfill.name,
+            "collection": self.backfill.collection,
+            "dry_run": self.dry_run,
+            "batch_size": self.batch_size,
+            "workers": self.workers,
+            "status": "queued",
+            "total": None,
+            "scanned": 0,
+            "changed": 0,
+            "written": 0,
+            "errors": 0,
+            "last_id": None,
+            "samples": [],
+            "error_samples": [],
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        await self.runs.insert_one(dict(self.state))
+        return self.state
+
+    async def _load(self) -> None:
+        state = await self.runs.find_one({"_id": self.run_id})
+        if state is None:
+            await self.create()
+            return
+        self.state = state
+        self.dry_run = state["dry_run"]
+        self.batch_size = state.get("batch_size", self.batch_size)
+
+    async def _checkpoint(self, **fields) -> None:
+        self.state.update(fields, updated_at=datetime.utcnow())
+        update = {key: value for key, value in self.state.items() if key != "_id"}
+        await self.runs.update_one({"_id": self.run_id}, {"$set": update})
+
+    async def _changes(self, pool, docs: List[Dict[str, Any]]) -> List[Tuple[Any, Any]]:
+        transform = self.backfill.transform
+        if pool is None:
+            return compute_changes(transform, docs)
+        loop = asyncio.get_running_loop()
+        size = -(-len(docs) // self.workers)
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, compute_changes, transform, docs[i:i + size])
+                for i in range(0, len(docs), size)
+            )
+        )
+        return [result for chunk in chunks for result in chunk]
+
+    async def _process(self, pool, docs: List[Dict[str, Any]]) -> None:
+        state = self.state
+        operations = []
+        for doc, (changes, error) in zip(docs, await self._changes(pool, docs)):
+            if error is not None:
+                state["errors"] += 1
+                if len(state["error_samples"]) < SAMPLE_LIMIT:
+                    state["error_samples"].append({"_id": str(doc["_id"]), "error": error})
+                continue
+            if not changes:
+                continue
+            state["changed"] += 1
+            if len(state["samples"]) < SAMPLE_LIMIT:
+                state["samples"].append(
+                    {
+                        "_id": str(doc["_id"]),
+                        "before": {key: doc.get(key) for key in changes},
+                        "after": changes,
+                    }
+                )
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+
+        if operations and not self.dry_run:
+            await self.db[self.backfill.collection].bulk_write(operations, ordered=False)
+            state["written"] += len(operations)
+
+    async def run(self) -> Dict[str, Any]:
+        """Run (or resume) to completion and return the final progress document."""
+        await self._load()
+        if self.state["status"] == "completed":
+            return self.state
+
+        collection = self.db[self.backfill.collection]
+        query = self.backfill.query
+        if self.state["total"] is None:
+            self.state["total"] = await collection.count_documents(query)
+        await self._checkpoint(
+            status="running", started_at=self.state["started_at"] or datetime.utcnow()
+        )
+        logger.info(
+            f"Backfill {self.backfill.name} ({self.run_id}) started at {self.state['last_id']}"
+            f"{' [dry run]' if self.dry_run else ''}"
+        )
+
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        try:
+            while True:
+                page = dict(query)
+                if self.state["last_id"] is not None:
+                    page = {"$and": [query, {"_id": {"$gt": self.state["last_id"]}}]}
+                docs = await (
+                    collection.find(page, self.backfill.projection)
+                    .sort("_id", 1)
+                    .limit(self.batch_size)
+                    .to_list(length=self.batch_size)
+                )
+                if not docs:
+                    break
+                await self._process(pool, docs)
+                self.state["scanned"] += len(docs)
+                await self._checkpoint(last_id=docs[-1]["_id"])
+                if len(docs) < self.batch_size:
+                    break
+        except asyncio.CancelledError:
+            await self._checkpoint(status="cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Backfill {self.backfill.name} ({self.run_id}) failed: {e}")
+            await self._checkpoint(status="failed", error=str(e))
+            return self.state
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        await self._checkpoint(status="completed", finished_at=datetime.utcnow())
+        logger.info(
+            f"Backfill {self.backfill.name} ({self.run_id}) completed: "
+            f"{self.state['scanned']} scanned, {self.state['changed']} changed, "
+            f"{self.state['written']} written, {self.state['errors']} errors"
+        )
+        return self.state
+
+
+def public_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Progress document for API responses."""
+    total = state.get("total") or 0
+    result = {key: value for key, value in state.items() if key != "_id"}
+    result["id"] = state["_id"]
+    result["last_id"] = str(state["last_id"]) if state.get("last_id") is not None else None
+    result["progress"] = round(state.get("scanned", 0) / total * 100, 1) if total else None
+    return result
+
+
+class BackfillManager:
+    """Runs backfills as background tasks of this process, one per name at a time."""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _start(self, runner: BackfillRunner) -> None:
+        task = asyncio.get_running_loop().create_task(runner.run())
+        self._tasks[runner.run_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(runner.run_id, None))
+
+    async def _claim(self, db, name: str, run_id: str) -> None:
+        """
+        Make ``run_id`` the active run of ``name``.
+
+        The ``backfill:<name>`` lease names the run that holds it. It is only
+        taken over with a compare-and-set on the holder that was found idle
+        (finished, or stale for STALE_AFTER), so of two concurrent claims
+        exactly one succeeds.
+        """
+        leases = db[LEASES_COLLECTION]
+        lease_id = f"backfill:{name}"
+        holder = ((await leases.find_one({"_id": lease_id})) or {}).get("owner")
+        if holder is not None and holder != run_id:
+            active = await db[RUNS_COLLECTION].find_one(
+                {
+                    "_id": holder,
+                    "status": {"$in": list(ACTIVE_STATUSES)},
+                    "updated_at": {"$gte": datetime.utcnow() - STALE_AFTER},
+                }
+            )
+            if active is not None:
+                raise BackfillConflict(f"Backfill {name} is already running as {holder}")
+        try:
+            await leases.update_one(
+                {"_id": lease_id, "owner": holder},
+                {"$set": {"owner": run_id, "claimed_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            raise BackfillConflict(f"Backfill {name} was just started by another request")
+
+    async def enqueue(
+        self,
+        db,
+        name: str,
+        dry_run: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        backfill = get_backfill(name)
+        if workers is None:
+            workers = int(os.getenv("BACKFILL_WORKERS", "0") or 0)
+        runner = BackfillRunner(
+            db, backfill, dry_run=dry_run, batch_size=batch_size, workers=workers
+        )
+        # Created first, so a concurrent claim sees the new holder as active
+        state = await runner.create()
+        try:
+            await self._claim(db, name, runner.run_id)
+        except BackfillConflict:
+            await db[RUNS_COLLECTION].delete_one({"_id": runner.run_id})
+            raise
+        self._start(runner)
+        return public_state(state)
+
+    async def resume(self, db, run_id: str) -> Dict[str, Any]:
+        state = await db[RUNS_COLLECTION].find_one({"_id": run_id})
+        if state is None:
+            raise UnknownBackfill(f"Unknown backfill run: {run_id}")
+        if state["status"] == "completed":
+            raise BackfillConflict(f"Backfill run {run_id} already completed")
+        if run_id in self._tasks or (
+            state["status"] in ACTIVE_STATUSES
+            and state["updated_at"] >= datetime.utcnow() - STALE_AFTER
+        ):
+            raise BackfillConflict(f"Backfill run {run_id} is running")
+        await self._claim(db, state["name"], run_id)
+        runner = BackfillRunner(
+            db, get_backfill(state["name"]), run_id=run_id, workers=state.get("workers", 0)
+        )
+        self._start(runner)
+        return public_state(state)
+
+    def cancel(self, run_id: str) -> bool:
+        task = self._tasks.get(run_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def wait(self, run_id: str) -> None:
+        task = self._tasks.get(run_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def status(self, db, run_id: str) -> Optional[Dict[str, Any]]:
+        state = await db[RUNS_COLLECTION].find_one({"_id": run_id})
+        return public_state(state) if state else None
+
+    async def list_runs(self, db, limit: int = 20) -> List[Dict[str, Any]]:
+        cursor = db[RUNS_COLLECTION].find({}, {"samples": 0}).sort("created_at", -1).limit(limit)
+        return [public_state(state) for state in await cursor.to_list(length=limit)]
+
+
+_manager = BackfillManager()
+
+
+def get_backfill_manager() -> BackfillManager:
+    return _manager
@@ -7,12 +7,208 @@ skill demand analysis, and career insights.
 
 import json
 import logging
+import re
 from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Analysis filters and the job fields each one matches (case-insensitive substring)
+FILTER_FIELDS = {
+    "location": ("location",),
+    "job_type": ("type", "job_type"),
+    "experience_level": ("experience_level",),
+}
+
+# Only the fields the analysis reads are loaded from the jobs collection
+MARKET_PROJECTION = {
+    "company": {"$ifNull": ["$company", "Unknown"]},
+    "category": {"$ifNull": ["$category", "Other"]},
+    "remote": {
+        "$or": [
+            {"$eq": ["$remote", True]},
+            {"$eq": ["$remote_type", "remote"]},
+            {"$eq": ["$work_type", "remote"]},
+        ]
+    },
+    "salary": {"$ifNull": ["$salary.max", "$salary_max"]},
+    "skills": 1,
+}
+
+_VALID_SALARY = {"$and": [{"$isNumber": "$salary"}, {"$gt": ["$salary", 0]}]}
+
+SKILL_GROUPS = {
+    "programming_languages": frozenset(
+        ["python", "javascript", "java", "c++", "c#", "php", "ruby", "go", "rust"]
+    ),
+    "frameworks": frozenset(
+        ["react", "angular", "vue", "django", "flask", "spring", "express"]
+    ),
+    "databases": frozenset(["mysql", "postgresql", "mongodb", "redis", "elasticsearch"]),
+    "cloud_platforms": frozenset(["aws", "azure", "gcp", "docker", "kubernetes"]),
+}
+
+Predicate = List[Tuple[Tuple[str, ...], str]]
+
+_NUMBERS = (int, float)
+
+
+def _compile_filters(filters: Optional[Dict[str, Any]]) -> Predicate:
+    """(fields, lowercase needle) pairs for the filters that are set"""
+    return [
+        (fields, str(filters[name]).lower())
+        for name, fields in FILTER_FIELDS.items()
+        if filters and filters.get(name)
+    ]
+
+
+def _filter_jobs(
+    jobs_data: List[Dict[str, Any]], predicate: Predicate
+) -> List[Dict[str, Any]]:
+    # One comprehension per filter: each narrows the list the next one scans
+    for fields, needle in predicate:
+        if len(fields) == 1:
+            name = fields[0]
+            jobs_data = [
+                job for job in jobs_data if needle in (job.get(name) or "").lower()
+            ]
+        else:
+            first, second = fields
+            jobs_data = [
+                job
+                for job in jobs_data
+                if needle in (job.get(first) or job.get(second) or "").lower()
+            ]
+    return jobs_data
+
+
+@dataclass
+class MarketStats:
+    """Aggregates behind the market and skills analyses"""
+
+    total: int = 0
+    remote: int = 0
+    salary_count: int = 0
+    salary_sum: float = 0
+    salary_min: float = 0
+    salary_max: float = 0
+    companies: Counter = field(default_factory=Counter)
+    categories: Counter = field(default_factory=Counter)
+    skills: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def scan(
+        cls,
+        jobs_data: List[Dict[str, Any]],
+        filters: Optional[Dict[str, Any]] = None,
+        market: bool = True,
+        with_skills: bool = False,
+    ) -> "MarketStats":
+        """
+        Filter and aggregate in-memory jobs. Each aggregate is one
+        comprehension or Counter over a single field of the filtered jobs,
+        and only the aggregates the caller needs are computed.
+        """
+        jobs = _filter_jobs(jobs_data, _compile_filters(filters))
+        stats = cls(total=len(jobs))
+        if market:
+            stats._scan_market(jobs)
+        if with_skills:
+            skills = []
+            for value in [job.get("skills") for job in jobs]:
+                if isinstance(value, list):
+                    skills.extend(value)
+                elif isinstance(value, str):
+                    skills.extend(s.strip() for s in value.split(","))
+            stats.skills = Counter(skills)
+        return stats
+
+    def _scan_market(self, jobs: List[Dict[str, Any]]) -> None:
+        maxima = [
+            salary.get("max", 0) if isinstance(salary, dict) else 0
+            for salary in [job.get("salary") for job in jobs]
+        ]
+        salaries = [value for value in maxima if value.__class__ in _NUMBERS and value > 0]
+        self.remote = sum(1 for job in jobs if job.get("remote", False))
+        self.companies = Counter([job.get("company", "Unknown") for job in jobs])
+        self.categories = Counter([job.get("category", "Other") for job in jobs])
+        if salaries:
+            self.salary_count = len(salaries)
+            self.salary_sum = sum(salaries)
+            self.salary_min = min(salaries)
+            self.salary_max = max(salaries)
+
+    @classmethod
+    def from_facets(cls, result: Dict[str, Any]) -> "MarketStats":
+        """Stats from the ``$facet`` output of ``market_pipeline``"""
+        totals = (result.get("totals") or [{}])[0]
+        return cls(
+            total=totals.get("total", 0),
+            remote=totals.get("remote", 0),
+            salary_count=totals.get("salary_count", 0),
+            salary_sum=totals.get("salary_sum", 0),
+            salary_min=totals.get("salary_min") or 0,
+            salary_max=totals.get("salary_max") or 0,
+            companies=Counter(
+                {row["_id"]: row["count"] for row in result.get("companies", [])}
+            ),
+            categories=Counter(
+                {row["_id"]: row["count"] for row in result.get("categories", [])}
+            ),
+            skills=Counter(
+                {row["_id"]: row["count"] for row in result.get("skills", [])}
+            ),
+        )
+
+
+def _top(group: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+    stages = [
+        {"$group": {"_id": f"${group}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+    return stages + [{"$limit": limit}] if limit else stages
+
+
+def market_pipeline(
+    filters: Optional[Dict[str, Any]] = None,
+    market: bool = True,
+    with_skills: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregation computing every market aggregate in the database:
+    filters become one ``$match``, and totals, remote share, salary stats,
+    top companies, categories and (optionally) skill counts come back from
+    a single ``$facet``.
+    """
+    match = []
+    for fields, needle in _compile_filters(filters):
+        regex = {"$regex": re.escape(needle), "$options": "i"}
+        clauses = [{f: regex} for f in fields]
+        match.append(clauses[0] if len(clauses) == 1 else {"$or": clauses})
+
+    totals: Dict[str, Any] = {"_id": None, "total": {"$sum": 1}}
+    facets: Dict[str, Any] = {"totals": [{"$group": totals}]}
+    if market:
+        totals.update(
+            {
+                "remote": {"$sum": {"$cond": ["$remote", 1, 0]}},
+                "salary_count": {"$sum": {"$cond": [_VALID_SALARY, 1, 0]}},
+                "salary_sum": {"$sum": {"$cond": [_VALID_SALARY, "$salary", 0]}},
+                "salary_min": {"$min": {"$cond": [_VALID_SALARY, "$salary", None]}},
+                "salary_max": {"$max": {"$cond": [_VALID_SALARY, "$salary", None]}},
+            }
+        )
+        facets["companies"] = _top("company", 10)
+        facets["categories"] = _top("category", 10)
+    if with_skills:
+        facets["skills"] = [{"$unwind": "$skills"}] + _top("skills", None)
+
+    pipeline = [{"$match": {"$and": match}}] if match else []
+    projection = MARKET_PROJECTION if market else {"skills": 1}
+    return pipeline + [{"$project": projection}, {"$facet": facets}]
+
 
 class ComprehensiveAnalysisService:
     """
@@ -76,73 +272,20 @@ class ComprehensiveAnalysisService:
         Analyze job market trends and insights
         """
         try:
-            if not jobs_data:
-                return {
-                    "total_jobs": 0,
-                    "remote_jobs_percentage": 0,
-                    "top_companies": [],
-                    "salary_trends": {
-                        "average_salary": 0,
-                        "salary_range": {"min": 0, "max": 0},
-                    },
-                    "job_categories": [],
-                    "analysis_date": datetime.now().isoformat(),
-                }
-
-            # Apply filters if provided
-            filtered_jobs = self._apply_filters(jobs_data, filters)
-
-            # Calculate basic statistics
-            total_jobs = len(filtered_jobs)
-            remote_jobs = [job for job in filtered_jobs if job.get("remote", False)]
-            remote_percentage = (
-                (len(remote_jobs) / total_jobs * 100) if total_jobs > 0 else 0
-            )
-
-            # Top companies
-            companies = [job.get("company", "Unknown") for job in filtered_jobs]
-            company_counts = Counter(companies)
-            top_companies = [
-                {"company": company, "job_count": count}
-                for company, count in company_counts.most_common(10)
-            ]
-
-            # Salary analysis
-            salaries = [
-                job.get("salary", {}).get("max", 0)
-                for job in filtered_jobs
-                if job.get("salary", {}).get("max", 0) > 0
-            ]
-            avg_salary = sum(salaries) / len(salaries) if salaries else 0
-            salary_range = {
-                "min": min(salaries) if salaries else 0,
-                "max": max(salaries) if salaries else 0,
-            }
-
-            # Job categories
-            categories = [job.get("category", "Other") for job in filtered_jobs]
-            category_counts = Counter(categories)
-            job_categories = [
-                {"category": category, "count": count}
-                for category, count in category_counts.most_common(10)
-            ]
-
-            return {
-                "total_jobs": total_jobs,
-                "remote_jobs_percentage": round(remote_percentage, 2),
-                "top_companies": top_companies,
-                "salary_trends": {
-                    "average_salary": round(avg_salary, 2),
-                    "salary_range": salary_range,
-                },
-                "job_categories": job_categories,
-                "analysis_date": datetime.now().isoformat(),
-            }
+            return self._market_result(MarketStats.scan(jobs_data or [], filters))
 
         except Exception as e:
             logger.error(f"Error analyzing job market: {str(e)}")
             raise
 
+    async def analyze_job_market_from_db(
+        self, filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Job market analysis over the jobs collection, aggregated in MongoDB
+        """
+        return self._market_result(await self._aggregate_stats(filters))
+
     def analyze_skills_demand(
         self, jobs_data: List[Dict[str, Any]], filters: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
@@ -150,64 +293,89 @@ class ComprehensiveAnalysisService:
         Analyze skills demand in the job market
         """
         try:
-            if not jobs_data:
-                return {
-                    "most_demanded_skills": [],
-                    "emerging_skills": [],
-                    "skill_categories": {},
-                    "analysis_date": datetime.now().isoformat(),
-                }
+            stats = MarketStats.scan(
+                jobs_data or [], filters, market=False, with_skills=True
+            )
+            return self._skills_result(stats)
 
-            # Apply filters
-            filtered_jobs = self._apply_filters(jobs_data, filters)
+        except Exception as e:
+            logger.error(f"Error analyzing skills demand: {str(e)}")
+            raise
 
-            # Extract skills from job descriptions
-            all_skills = []
-            for job in filtered_jobs:
-                skills = job.get("skills", [])
-                if isinstance(skills, list):
-                    all_skills.extend(skills)
-                elif isinstance(skills, str):
-                    all_skills.extend([s.strip() for s in skills.split(",")])
+    async def analyze_skills_demand_from_db(
+        self, filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Skills demand analysis over the jobs collection, aggregated in MongoDB
+        """
+        return self._skills_result(
+            await self._aggregate_stats(filters, market=False, with_skills=True)
+        )
 
-            # Count skill occurrences
-            skill_counts = Counter(all_skills)
+    async def _aggregate_stats(
+        self,
+        filters: Optional[Dict[str, Any]],
+        market: bool = True,
+        with_skills: bool = False,
+    ) -> MarketStats:
+        if self.db is None:
+            raise ValueError("Database is required for collection analysis")
+        rows = await self.db.jobs.aggregate(
+            market_pipeline(filters, market, with_skills), allowDiskUse=True
+        ).to_list(length=1)
+        return MarketStats.from_facets(rows[0] if rows else {})
+
+    def _market_result(self, stats: MarketStats) -> Dict[str, Any]:
+        """Shape market stats into the job market analysis response"""
+        remote_percentage = (
+            stats.remote / stats.total * 100 if stats.total > 0 else 0
+        )
+        avg_salary = (
+            stats.salary_sum / stats.salary_count if stats.salary_count else 0
+        )
+        return {
+            "total_jobs": stats.total,
+            "remote_jobs_percentage": round(remote_percentage, 2),
+            "top_companies": [
+                {"company": company, "job_count": count}
+                for company, count in stats.companies.most_common(10)
+            ],
+            "salary_trends": {
+                "average_salary": round(avg_salary, 2),
+                "salary_range": {"min": stats.salary_min, "max": stats.salary_max},
+            },
+            "job_categories": [
+                {"category": category, "count": count}
+                for category, count in stats.categories.most_common(10)
+            ],
+            "analysis_date": datetime.now().isoformat(),
+        }
 
-            # Most demanded skills
-            most_demanded = [
+    def _skills_result(self, stats: MarketStats) -> Dict[str, Any]:
+        """Shape skill counts into the skills demand response"""
+        top_skills = stats.skills.most_common(20)
+        return {
+            "most_demanded_skills": [
                 {
                     "skill": skill,
-                    "demand_score": count / len(filtered_jobs),
+                    "demand_score": count / stats.total,
                     "job_count": count,
                 }
-                for skill, count in skill_counts.most_common(20)
-            ]
-
-            # Emerging skills (skills with recent mentions)
-            emerging_skills = [
+                for skill, count in top_skills
+            ],
+            # Emerging skills: at least 10% of jobs mention this skill
+            "emerging_skills": [
                 {
                     "skill": skill,
-                    "growth_rate": count / len(filtered_jobs),
+                    "growth_rate": count / stats.total,
                     "job_count": count,
                 }
-                for skill, count in skill_counts.most_common(10)
-                if count / len(filtered_jobs)
-                > 0.1  # At least 10% of jobs mention this skill
-            ]
-
-            # Categorize skills
-            skill_categories = self._categorize_skills(list(skill_counts.keys()))
-
-            return {
-                "most_demanded_skills": most_demanded,
-                "emerging_skills": emerging_skills,
-                "skill_categories": skill_categories,
-                "analysis_date": datetime.now().isoformat(),
-            }
-
-        except Exception as e:
-            logger.error(f"Error analyzing skills demand: {str(e)}")
-            raise
+                for skill, count in top_skills[:10]
+                if count / stats.total > 0.1
+            ],
+            "skill_categories": self._categorize_skills(list(stats.skills)),
+            "analysis_date": datetime.now().isoformat(),
+        }
 
     def _analyze_resume(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze resume data and extract insights"""
@@ -309,37 +477,7 @@ class ComprehensiveAnalysisService:
         self, jobs_data: List[Dict[str, Any]], filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """Apply filters to job data"""
-        if not filters:
-            return jobs_data
-
-        filtered_jobs = jobs_data
-
-        # Location filter
-        if "location" in filters:
-            location = filters["location"].lower()
-            filtered_jobs = [
-                job
-                for job in filtered_jobs
-                if location in job.get("location", "").lower()
-            ]
-
-        # Job type filter
-        if "job_type" in filters:
-            job_type = filters["job_type"].lower()
-            filtered_jobs = [
-                job for job in filtered_jobs if job_type in job.get("type", "").lower()
-            ]
-
-        # Experience level filter
-        if "experience_level" in filters:
-            level = filters["experience_level"].lower()
-            filtered_jobs = [
-                job
-                for job in filtered_jobs
-                if level in job.get("experience_level", "").lower()
-            ]
-
-        return filtered_jobs
+        return _filter_jobs(jobs_data, _compile_filters(filters))
 
     def _categorize_skills(self, skills: List[str]) -> Dict[str, List[str]]:
         """Categorize skills into different groups"""
@@ -353,48 +491,10 @@ class ComprehensiveAnalysisService:
 
         for skill in skills:
             skill_lower = skill.lower()
-
-            # Programming languages
-            if skill_lower in [
-                "python",
-                "javascript",
-                "java",
-                "c++",
-                "c#",
-                "php",
-                "ruby",
-                "go",
-                "rust",
-            ]:
-                categories["programming_languages"].append(skill)
-
-            # Frameworks
-            elif skill_lower in [
-                "react",
-                "angular",
-                "vue",
-                "django",
-                "flask",
-                "spring",
-                "express",
-            ]:
-                categories["frameworks"].append(skill)
-
-            # Databases
-            elif skill_lower in [
-                "mysql",
-                "postgresql",
-                "mongodb",
-                "redis",
-                "elasticsearch",
-            ]:
-                categories["databases"].append(skill)
-
-            # Cloud platforms
-            elif skill_lower in ["aws", "azure", "gcp", "docker", "kubernetes"]:
-                categories["cloud_platforms"].append(skill)
-
-            # Tools
+            for group, names in SKILL_GROUPS.items():
+                if skill_lower in names:
+                    categories[group].append(skill)
+                    break
             else:
                 categories["tools"].append(skill)
 
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+METRICS_COLLECTION = "dashboard_metrics"
+SNAPSHOT_ID = "admin_dashboard"
+
+# Only the fields the facets read are carried into $facet
+PROJECTED_FIELDS = (
+    "is_active",
+    "created_at",
+    "last_updated",
+    "posted_date",
+    "location",
+    "company",
+    "source_type",
+)
+
+EMPTY_METRICS = {
+    "total_jobs": 0,
+    "active_jobs": 0,
+    "new_jobs_24h": 0,
+    "jobs_today": 0,
+    "remote_jobs": 0,
+    "total_companies": 0,
+    "active_api_sources": 0,
+    "latest_sync": None,
+}
+
+
+def _facet_count(result: Dict[str, Any], name: str) -> int:
+    rows = result.get(name) or []
+    return rows[0]["n"] if rows else 0
+
+
+def _latest_sync(sources: List[Dict[str, Any]]) -> Optional[datetime]:
+    latest = None
+    for source in sources:
+        value = source.get("latest")
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                continue
+        if isinstance(value, datetime):
+            value = value.replace(tzinfo=None)
+            latest = value if latest is None else max(latest, value)
+    return latest
+
+
+class DashboardMetricsService:
+    """
+    Admin dashboard metrics computed in one ``$facet`` aggregation.
+
+    The result is stored as a snapshot document in ``dashboard_metrics`` so
+    every worker serves the same numbers; pages read the snapshot and show
+    its ``as_of`` timestamp instead of querying ``jobs`` on each load.
+    """
+
+    def __init__(self, db, refresh_interval_seconds: int = 300):
+        self.db = db
+        self.collection = db[METRICS_COLLECTION]
+        self.refresh_interval_seconds = refresh_interval_seconds
+
+    def build_pipeline(self, now: datetime) -> List[Dict[str, Any]]:
+        yesterday = now - timedelta(days=1)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return [
+            {"$project": {field: 1 for field in PROJECTED_FIELDS}},
+            {
+                "$facet": {
+                    "total": [{"$count": "n"}],
+                    "active": [{"$match": {"is_active": True}}, {"$count": "n"}],
+                    "new_24h": [
+                        {
+                            "$match": {
+                                "$or": [
+                                    {"created_at": {"$gte": yesterday}},
+                                    {"created_at": {"$gte": yesterday.isoformat()}},
+                                    {"last_updated": {"$gte": yesterday.isoformat()}},
+                                    {"posted_date": {"$gte": yesterday.isoformat()}},
+                                ]
+                            }
+                        },
+                        {"$count": "n"},
+                    ],
+                    "today": [
+                        {"$match": {"created_at": {"$gte": today}}},
+                        {"$count": "n"},
+                    ],
+                    "remote": [
+                        {"$match": {"location": {"$regex": "remote", "$options": "i"}}},
+                        {"$count": "n"},
+                    ],
+                    "companies": [
+                        {"$match": {"company": {"$nin": [None, ""]}}},
+                        {"$group": {"_id": "$company"}},
+                        {"$count": "n"},
+                    ],
+                    "sources": [
+                        {
+                            "$group": {
+                                "_id": "$source_type",
+                                "count": {"$sum": 1},
+                                "latest": {"$max": "$last_updated"},
+                            }
+                        },
+                    ],
+                }
+            },
+        ]
+
+    async def compute(self) -> Dict[str, Any]:
+        """Run the single-pass aggregation and shape the metrics."""
+        now = datetime.now()
+        rows = await self.db.jobs.aggregate(
+            self.build_pipeline(now), allowDiskUse=True
+        ).to_list(length=1)
+        result = rows[0] if rows else {}
+        sources = [s for s in result.get("sources", []) if s.get("_id")]
+
+        return {
+            "total_jobs": _facet_count(result, "total"),
+            "active_jobs": _facet_count(result, "active"),
+            "new_jobs_24h": _facet_count(result, "new_24h"),
+            "jobs_today": _facet_count(result, "today"),
+            "remote_jobs": _facet_count(result, "remote"),
+            "total_companies": _facet_count(result, "companies"),
+            "active_api_sources": len(sources),
+            "latest_sync": _latest_sync(sources),
+        }
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Recompute the metrics and replace the stored snapshot."""
+        started = datetime.now()
+        metrics = await self.compute()
+        snapshot = {
+            "_id": SNAPSHOT_ID,
+            **metrics,
+            "as_of": datetime.now(),
+            "duration_ms": int((datetime.now() - started).total_seconds() * 1000),
+        }
+        await self.collection.replace_one({"_id": SNAPSHOT_ID}, snapshot, upsert=True)
+        return snapshot
+
+    async def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Return the stored snapshot. A missing snapshot is computed inline;
+        a stale one is served as-is while a refresh runs in the background.
+        """
+        snapshot = await self.collection.find_one({"_id": SNAPSHOT_ID})
+        if snapshot is None:
+            return await _refresh_once(self)
+
+        as_of = snapshot.get("as_of")
+        max_age = timedelta(seconds=self.refresh_interval_seconds * 2)
+        if not isinstance(as_of, datetime) or datetime.now() - as_of > max_age:
+            _schedule_refresh(self)
+        return snapshot
+
+    async def run_periodic(self) -> None:
+        """Refresh the snapshot every ``refresh_interval_seconds`` until cancelled."""
+        while True:
+            try:
+                await _refresh_once(self)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Dashboard metrics refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+
+# One in-flight refresh per process; concurrent page loads wait on it
+_refresh_lock = asyncio.Lock()
+_background_refresh: Optional[asyncio.Task] = None
+
+
+async def _refresh_once(service: DashboardMetricsService) -> Dict[str, Any]:
+    async with _refresh_lock:
+        snapshot = await service.collection.find_one({"_id": SNAPSHOT_ID})
+        as_of = snapshot.get("as_of") if snapshot else None
+        if isinstance(as_of, datetime) and datetime.now() - as_of < timedelta(
+            seconds=service.refresh_interval_seconds / 2
+        ):
+            # Another worker refreshed it while we waited
+            return snapshot
+        return await service.refresh()
+
+
+def _schedule_refresh(service: DashboardMetricsService) -> None:
+    global _background_refresh
+    if _background_refresh is None or _background_refresh.done():
+        _background_refresh = asyncio.create_task(_refresh_once(service))
+
+
+def empty_snapshot() -> Dict[str, Any]:
+    """Placeholder served when the database is unavailable."""
+    return {**EMPTY_METRICS, "as_of": None}
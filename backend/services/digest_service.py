@@ -0,0 +1,428 @@
+"""
+Digest Service
+
+Builds daily/weekly new-job digests for email and Telegram subscribers.
+Subscribers with identical preferences share a signature; each signature is
+evaluated once per run and its jobs are fanned out to its subscribers, which
+are streamed in batches rather than collected per signature.
+"""
+
+import hashlib
+import html
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from backend.services.ingest_pipeline import company_key
+from backend.services.location_normalizer import geo_filters
+from backend.services.skill_taxonomy import skill_key
+from backend.services.title_grouping import normalize_job_title
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTIONS_COLLECTION = "digest_subscriptions"
+RUNS_COLLECTION = "digest_runs"
+DELIVERIES_COLLECTION = "digest_deliveries"
+
+FREQUENCIES = {"daily": timedelta(days=1), "weekly": timedelta(days=7)}
+CHANNELS = ("email", "telegram")
+PREFERENCE_FIELDS = ("titles", "skills", "locations", "companies", "work_types")
+
+# Fields needed to render a digest entry
+JOB_PROJECTION = {
+    "title": 1,
+    "company": 1,
+    "company_name": 1,
+    "location": 1,
+    "url": 1,
+    "salary_min": 1,
+    "salary_max": 1,
+    "work_type": 1,
+    "remote_type": 1,
+    "description": 1,
+    "created_at": 1,
+}
+
+TelegramSender = Callable[[str, str], Awaitable[bool]]
+
+
+def normalize_preferences(preferences: Optional[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Lower-case, de-duplicate and sort every preference list; skills become skill keys."""
+    preferences = preferences or {}
+    normalized = {}
+    for field in PREFERENCE_FIELDS:
+        values = preferences.get(field) or []
+        if isinstance(values, str):
+            values = [values]
+        values = {str(v).strip().lower() for v in values if str(v).strip()}
+        if field == "skills":
+            values = {skill_key(v) for v in values}
+        normalized[field] = sorted(values)
+    return normalized
+
+
+def preference_signature(preferences: Dict[str, Any]) -> str:
+    """Stable identifier shared by subscribers with identical preferences."""
+    encoded = json.dumps(normalize_preferences(preferences), sort_keys=True)
+    return hashlib.sha1(encoded.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def build_job_query(preferences: Dict[str, List[str]], since: datetime, until: datetime) -> Dict[str, Any]:
+    """
+    Query for jobs matching a preference set within a window.
+
+    Every clause is an exact match on keys written at ingest, so each can
+    use a compound index with ``created_at``: titles on ``title_group``,
+    skills on ``skill_keys``, companies on ``company_key`` and locations on
+    ``geo`` (raw-text match only for places the gazetteer does not know).
+    """
+    clauses: List[Dict[str, Any]] = [
+        {"created_at": {"$gte": since, "$lt": until}},
+        {"is_active": {"$ne": False}},
+    ]
+    if preferences.get("titles"):
+        groups = sorted({normalize_job_title(title) for title in preferences["titles"]} - {""})
+        if groups:
+            clauses.append({"title_group": {"$in": groups}})
+    if preferences.get("skills"):
+        keys = sorted({skill_key(skill) for skill in preferences["skills"]})
+        clauses.append({"skill_keys": {"$in": keys}})
+    if preferences.get("locations"):
+        locations = [
+            clause for location in preferences["locations"] for clause in geo_filters(location)
+        ]
+        if any("remote" in location for location in preferences["locations"]):
+            # Remote listings often carry a country or "Anywhere" as location
+            locations.append({"remote_type": "remote"})
+        clauses.append({"$or": locations} if len(locations) > 1 else locations[0])
+    if preferences.get("companies"):
+        companies = sorted({company_key(company) for company in preferences["companies"]})
+        clauses.append({"company_key": {"$in": companies}})
+    if preferences.get("work_types"):
+        clauses.append(
+            {
+                "$or": [
+                    {"remote_type": {"$in": preferences["work_types"]}},
+                    {"work_type": {"$in": preferences["work_types"]}},
+                    {"job_title_work_type": {"$in": preferences["work_types"]}},
+                ]
+            }
+        )
+    return {"$and": clauses}
+
+
+def format_telegram_digest(jobs: List[Dict[str, Any]], frequency: str) -> str:
+    """HTML digest message for Telegram."""
+    heading = "Günlük" if frequency == "daily" else "Haftalık"
+    lines = [f"📬 <b>{heading} İş Özeti</b> — {len(jobs)} yeni ilan\n"]
+    for job in jobs[:10]:
+        company = html.escape(str(job.get("company") or job.get("company_name") or "?"))
+        title = html.escape(str(job.get("title") or "İş Pozisyonu"))
+        line = f"💼 <b>{title}</b> — {company}"
+        if job.get("url"):
+            line += f'\n🔗 <a href="{html.escape(str(job["url"]))}">Başvur</a>'
+        lines.append(line)
+    if len(jobs) > 10:
+        lines.append(f"\n+{len(jobs) - 10} daha fazla iş fırsatı")
+    return "\n".join(lines)
+
+
+def telegram_bot_sender(bot) -> Optional[TelegramSender]:
+    """Sender that posts digests through a running RemoteJobsBot."""
+    if bot is None or not getattr(bot, "enabled", False) or not bot.application:
+        return None
+
+    async def send(chat_id: str, text: str) -> bool:
+        try:
+            await bot.application.bot.send_message(
+                chat_id=int(chat_id),
+                text=text,
+                parse_mode="HTML",
+                disable_web_page_preview=True,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to send Telegram digest to {chat_id}: {e}")
+            return False
+
+    return send
+
+
+def user_digest_preferences(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Digest preferences taken from a user's onboarding profile."""
+    location = user.get("location")
+    return {
+        "titles": user.get("job_titles") or [],
+        "skills": user.get("skills") or [],
+        "locations": [location] if isinstance(location, str) else location or [],
+        "work_types": user.get("work_types") or [],
+    }
+
+
+def run_id_for(frequency: str, until: datetime) -> str:
+    """One run per day (daily) or ISO week (weekly)."""
+    if frequency == "weekly":
+        year, week, _ = until.isocalendar()
+        return f"weekly:{year}-W{week:02d}"
+    return f"daily:{until.strftime('%Y-%m-%d')}"
+
+
+class DigestSubscriptionStore:
+    """Digest subscriptions keyed on (channel, address)."""
+
+    def __init__(self, db):
+        self.collection = db[SUBSCRIPTIONS_COLLECTION]
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_index(
+                [("channel", 1), ("address", 1)], unique=True
+            )
+            await self.collection.create_index(
+                [("frequency", 1), ("active", 1), ("signature", 1)]
+            )
+        except Exception as e:
+            logger.warning(f"Could not create digest subscription indexes: {e}")
+
+    async def subscribe(
+        self,
+        channel: str,
+        address: str,
+        frequency: str,
+        preferences: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> None:
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown digest channel: {channel}")
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown digest frequency: {frequency}")
+
+        normalized = normalize_preferences(preferences)
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"channel": channel, "address": str(address)},
+            {
+                "$set": {
+                    "frequency": frequency,
+                    "preferences": normalized,
+                    "signature": preference_signature(normalized),
+                    "name": name,
+                    "user_id": user_id,
+                    "active": True,
+                    "updated_at": now,
+                },
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        )
+
+    async def unsubscribe(self, channel: str, address: str) -> bool:
+        result = await self.collection.update_one(
+            {"channel": channel, "address": str(address)},
+            {"$set": {"active": False, "updated_at": datetime.utcnow()}},
+        )
+        return result.modified_count > 0
+
+
+class DigestBuilder:
+    """
+    Computes and delivers digests for one frequency.
+
+    Progress is checkpointed in ``digest_runs`` (completed signatures) and
+    every recipient is claimed in ``digest_deliveries`` before anything is
+    sent, so a resumed run never delivers the same digest twice. A crash
+    between claiming and sending skips those recipients for that run.
+    """
+
+    def __init__(
+        self,
+        db,
+        mailgun=None,
+        telegram_sender: Optional[TelegramSender] = None,
+        max_jobs: int = 20,
+        batch_size: int = 500,
+    ):
+        self.db = db
+        self.subscriptions = db[SUBSCRIPTIONS_COLLECTION]
+        self.runs = db[RUNS_COLLECTION]
+        self.deliveries = db[DELIVERIES_COLLECTION]
+        if mailgun is None:
+            from backend.services.mailgun_service import mailgun_service as mailgun
+        self.mailgun = mailgun
+        self.telegram_sender = telegram_sender
+        self.max_jobs = max_jobs
+        self.batch_size = batch_size
+
+    async def _signature_groups(self, frequency: str):
+        pipeline = [
+            {"$match": {"frequency": frequency, "active": True}},
+            {
+                "$group": {
+                    "_id": "$signature",
+                    "preferences": {"$first": "$preferences"},
+                    "subscribers": {"$sum": 1},
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+        async for group in self.subscriptions.aggregate(pipeline):
+            yield group
+
+    async def _subscriber_batches(self, frequency: str, signature: str):
+        """Subscribers of one signature, streamed in batches of ``batch_size``."""
+        cursor = self.subscriptions.find(
+            {"frequency": frequency, "active": True, "signature": signature},
+            {"_id": 0, "channel": 1, "address": 1, "name": 1},
+        ).batch_size(self.batch_size)
+        batch: List[Dict[str, Any]] = []
+        async for subscriber in cursor:
+            batch.append(subscriber)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _find_jobs(
+        self, preferences: Dict[str, List[str]], since: datetime, until: datetime
+    ) -> List[Dict[str, Any]]:
+        cursor = (
+            self.db.jobs.find(build_job_query(preferences, since, until), JOB_PROJECTION)
+            .sort("created_at", -1)
+            .limit(self.max_jobs)
+        )
+        return await cursor.to_list(length=self.max_jobs)
+
+    async def _claim(
+        self, run_id: str, signature: str, subscribers: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Record deliveries; only recipients not already recorded are returned."""
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": f"{run_id}|{s['channel']}|{s['address']}"},
+                {
+                    "$setOnInsert": {
+                        "run_id": run_id,
+                        "signature": signature,
+                        "channel": s["channel"],
+                        "address": s["address"],
+                        "claimed_at": now,
+                    }
+                },
+                upsert=True,
+            )
+            for s in subscribers
+        ]
+        result = await self.deliveries.bulk_write(operations, ordered=False)
+        claimed = {u["index"] for u in result.bulk_api_result.get("upserted", [])}
+        return [s for i, s in enumerate(subscribers) if i in claimed]
+
+    async def _fan_out(
+        self,
+        frequency: str,
+        preferences: Dict[str, List[str]],
+        jobs: List[Dict[str, Any]],
+        recipients: List[Dict[str, Any]],
+        stats: Dict[str, int],
+    ) -> None:
+        emails = [
+            {"email": r["address"], "name": r.get("name") or ""}
+            for r in recipients
+            if r["channel"] == "email"
+        ]
+        if emails:
+            mail_preferences = {
+                "location": preferences["locations"][0] if preferences["locations"] else None,
+                "skills": preferences["skills"],
+            }
+            stats["emails"] += await self.mailgun.queue_new_jobs_digest(
+                emails, jobs, mail_preferences
+            )
+
+        chats = [r["address"] for r in recipients if r["channel"] == "telegram"]
+        if chats and self.telegram_sender is not None:
+            message = format_telegram_digest(jobs, frequency)
+            for chat_id in chats:
+                if await self.telegram_sender(chat_id, message):
+                    stats["telegram"] += 1
+
+    async def run(self, frequency: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Build and deliver the digest for the current window, resuming if needed."""
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown digest frequency: {frequency}")
+
+        until = now or datetime.utcnow()
+        since = until - FREQUENCIES[frequency]
+        run_id = run_id_for(frequency, until)
+
+        run = await self.runs.find_one({"_id": run_id})
+        if run and run.get("status") == "completed":
+            logger.info(f"Digest run {run_id} already completed")
+            return run["stats"]
+        if run is None:
+            run = {
+                "_id": run_id,
+                "frequency": frequency,
+                "since": since,
+                "until": until,
+                "status": "running",
+                "completed_signatures": [],
+                "started_at": datetime.utcnow(),
+            }
+            await self.runs.insert_one(run)
+        else:
+            # Resume with the original window so results are consistent
+            since, until = run["since"], run["until"]
+            logger.info(
+                f"Resuming digest run {run_id} after "
+                f"{len(run['completed_signatures'])} signatures"
+            )
+
+        completed = set(run.get("completed_signatures", []))
+        stats = {
+            "signatures": 0,
+            "skipped_signatures": 0,
+            "subscribers": 0,
+            "already_delivered": 0,
+            "emails": 0,
+            "telegram": 0,
+        }
+
+        async for group in self._signature_groups(frequency):
+            signature = group["_id"]
+            stats["subscribers"] += group["subscribers"]
+            if signature in completed:
+                stats["skipped_signatures"] += 1
+                continue
+
+            stats["signatures"] += 1
+            jobs = await self._find_jobs(group["preferences"], since, until)
+            if jobs:
+                async for subscribers in self._subscriber_batches(frequency, signature):
+                    recipients = await self._claim(run_id, signature, subscribers)
+                    stats["already_delivered"] += len(subscribers) - len(recipients)
+                    await self._fan_out(
+                        frequency, group["preferences"], jobs, recipients, stats
+                    )
+
+            await self.runs.update_one(
+                {"_id": run_id}, {"$addToSet": {"completed_signatures": signature}}
+            )
+
+        await self.runs.update_one(
+            {"_id": run_id},
+            {
+                "$set": {
+                    "status": "completed",
+                    "completed_at": datetime.utcnow(),
+                    "stats": stats,
+                }
+            },
+        )
+        logger.info(f"Digest run {run_id} completed: {stats}")
+        return stats
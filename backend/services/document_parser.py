@@ -0,0 +1,442 @@
+import io
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .skill_taxonomy import extract_skills, lookup_skill, normalize_skills
+
+logger = logging.getLogger(__name__)
+
+# Optional imports for document text extraction
+try:
+    import pypdf  # Using pypdf instead of vulnerable PyPDF2
+
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+    pypdf = None
+    logger.warning("pypdf not available - PDF parsing disabled")
+
+try:
+    import docx
+
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+    docx = None
+    logger.warning("python-docx not available - DOCX parsing disabled")
+
+# Bump when parsing output changes so cached results are not reused
+PARSER_VERSION = 1
+
+SUPPORTED_TYPES = ("pdf", "docx", "txt")
+
+SECTION_HEADINGS = {
+    "summary": (
+        "summary", "professional summary", "profile", "professional profile",
+        "objective", "career objective", "about", "about me", "overview",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "career",
+    ),
+    "education": (
+        "education", "academic background", "academic history", "qualifications",
+        "academic",
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core competencies",
+        "competencies", "technologies", "tech stack", "programming languages",
+    ),
+    "languages": ("languages", "language skills", "spoken languages"),
+    "certifications": (
+        "certifications", "certificates", "professional certifications",
+        "licenses", "licenses and certifications",
+    ),
+    "projects": ("projects", "personal projects", "selected projects"),
+}
+_HEADINGS = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+_HEADING_RE = re.compile(
+    r"^(%s)\s*(?::\s*(.*))?$"
+    % "|".join(re.escape(h) for h in sorted(_HEADINGS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+JOB_KEYWORDS = (
+    "developer", "engineer", "manager", "analyst", "designer", "consultant",
+    "specialist", "coordinator", "director", "architect", "scientist", "lead",
+    "administrator", "intern", "officer", "head", "programmer", "tester",
+)
+_JOB_RE = re.compile(r"\b(?:%s)s?\b" % "|".join(JOB_KEYWORDS), re.IGNORECASE)
+_DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|ph\.?d|doctorate|associate|diploma|mba|"
+    r"b\.?sc|m\.?sc|b\.?s|m\.?s|b\.?a|m\.?a|b\.?eng|m\.?eng)\b",
+    re.IGNORECASE,
+)
+_INSTITUTION_RE = re.compile(
+    r"\b(?:university|universit[éä]t|college|school|institute|academy|polytechnic|üniversite\w*)\b",
+    re.IGNORECASE,
+)
+
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+# Digits with separators on one line; validated by digit count
+PHONE_RE = re.compile(r"\+?\(?\d[\d \t().-]{7,}\d")
+_LINKEDIN_RE = re.compile(r"(?:https?://)?(?:www\.)?linkedin\.com/in/([\w-]+)", re.IGNORECASE)
+_GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/([\w-]+)", re.IGNORECASE)
+_URL_RE = re.compile(r"https?://[^\s,;]+", re.IGNORECASE)
+# Emails and URLs are masked before the skill scan ("github.com/x" is not GitHub)
+_LINKISH_RE = re.compile(r"\S+@\S+|\S*(?:https?://|www\.|\.com/|\.io/)\S*", re.IGNORECASE)
+_LOCATION_RE = re.compile(
+    r"^(?:address|location|based in|residing in|city)\s*:\s*(.+)$", re.IGNORECASE
+)
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:(?:{_MONTH}\s+|\d{{1,2}}[/.])?(?:19|20)\d{{2}})"
+_DATE_RANGE_RE = re.compile(
+    rf"({_DATE})\s*(?:-|–|—|to)\s*({_DATE}|present|current|now|today)", re.IGNORECASE
+)
+_YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+
+_BULLET_RE = re.compile(r"^[-•*–·▪●◦]\s*")
+_ROLE_SPLIT_RE = re.compile(r"\s+(?:-|–|—|\||@|at)\s+|,\s+", re.IGNORECASE)
+_ITEM_SPLIT_RE = re.compile(r"[,•;|·▪●]|\s/\s")
+_LABEL_RE = re.compile(r"^[A-Za-z][A-Za-z &/]{1,30}:\s*")
+_PROFICIENCY_RE = re.compile(
+    r"\s*(?:\([^)]*\)|[-–:]\s*\w+|\b(?:native|fluent|intermediate|basic|advanced|"
+    r"beginner|proficient|professional|working|conversational|mother tongue|"
+    r"[abc][12])\b)",
+    re.IGNORECASE,
+)
+
+
+class DocumentError(ValueError):
+    """A document that cannot be parsed; ``status_code`` is the HTTP status to report."""
+
+    status_code = 400
+
+
+@dataclass
+class ExtractedText:
+    text: str
+    pages: int = 0
+    truncated: bool = False
+
+
+@dataclass
+class ParsedDocument:
+    """Everything the parser found in a CV or resume."""
+
+    name: str = ""
+    title: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = ""
+    summary: str = ""
+    links: Dict[str, str] = field(
+        default_factory=lambda: {"linkedin": "", "github": "", "portfolio": ""}
+    )
+    skills: List[str] = field(default_factory=list)
+    experience: List[Dict[str, str]] = field(default_factory=list)
+    education: List[Dict[str, str]] = field(default_factory=list)
+    languages: List[str] = field(default_factory=list)
+    certifications: List[str] = field(default_factory=list)
+    projects: List[str] = field(default_factory=list)
+    raw_text: str = ""
+    pages: int = 0
+    truncated: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsedDocument":
+        return cls(**data)
+
+
+def file_type_for(filename: str) -> str:
+    """Normalized file type ("pdf", "docx", ...) from a filename or bare extension."""
+    name = (filename or "").strip().lower()
+    return name.rsplit(".", 1)[-1] if "." in name else name
+
+
+def _extract_pdf(content: bytes, max_pages: Optional[int], max_chars: Optional[int]) -> ExtractedText:
+    if not PDF_AVAILABLE:
+        raise DocumentError("PDF parsing not available - pypdf not installed")
+    reader = pypdf.PdfReader(io.BytesIO(content))
+    total = len(reader.pages)
+    parts: List[str] = []
+    size = 0
+    read = 0
+    for page in reader.pages:
+        if max_pages is not None and read >= max_pages:
+            break
+        text = page.extract_text() or ""
+        parts.append(text + "\n")
+        size += len(text) + 1
+        read += 1
+        if max_chars is not None and size >= max_chars:
+            break
+    return ExtractedText("".join(parts), pages=total, truncated=read < total)
+
+
+def _extract_docx(content: bytes) -> ExtractedText:
+    if not DOCX_AVAILABLE:
+        raise DocumentError("DOCX parsing not available - python-docx not installed")
+    document = docx.Document(io.BytesIO(content))
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    # Many CV templates lay out contact details and skills in tables
+    for table in document.tables:
+        for row in table.rows:
+            cells = list(dict.fromkeys(cell.text.strip() for cell in row.cells))
+            lines.append(" | ".join(cell for cell in cells if cell))
+    return ExtractedText("".join(line + "\n" for line in lines))
+
+
+def extract_text(
+    content: bytes,
+    file_type: str,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> ExtractedText:
+    """Plain text of a PDF, DOCX or TXT document, cut at ``max_pages``/``max_chars``."""
+    file_type = file_type_for(file_type)
+    if file_type == "pdf":
+        extracted = _extract_pdf(content, max_pages, max_chars)
+    elif file_type == "docx":
+        extracted = _extract_docx(content)
+    elif file_type == "txt":
+        extracted = ExtractedText(content.decode("utf-8", errors="replace"))
+    elif file_type == "doc":
+        raise DocumentError("DOC format not supported yet. Please convert to DOCX or PDF.")
+    else:
+        raise DocumentError(f"Unsupported file type: {file_type}")
+
+    if max_chars is not None and len(extracted.text) > max_chars:
+        extracted.text = extracted.text[:max_chars]
+        extracted.truncated = True
+    return extracted
+
+
+def _split_sections(lines: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Header lines (before the first heading) and the lines under each section."""
+    header: List[str] = []
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in lines:
+        match = _HEADING_RE.match(line)
+        if match:
+            current = sections.setdefault(_HEADINGS[match.group(1).lower()], [])
+            if match.group(2):
+                current.append(match.group(2).strip())
+        elif current is None:
+            header.append(line)
+        else:
+            current.append(line)
+    return header, sections
+
+
+def _items(lines: List[str], max_length: int = 60) -> List[str]:
+    """List entries of a skills-style section: bullets, commas, "Label: a, b"."""
+    items: List[str] = []
+    for line in lines:
+        line = _LABEL_RE.sub("", _BULLET_RE.sub("", line))
+        for item in _ITEM_SPLIT_RE.split(line):
+            item = re.sub(r"^(?:and|or|&)\s+|\s+(?:and|or|&)$", "", item.strip(), flags=re.IGNORECASE)
+            item = item.strip(" .")
+            if 1 < len(item) <= max_length and item not in items:
+                items.append(item)
+    return items
+
+
+def _find_name(header: List[str]) -> Tuple[str, int]:
+    for index, line in enumerate(header[:10]):
+        clean = re.sub(r"^(?:mr|mrs|ms|dr|prof)\.?\s+", "", line, flags=re.IGNORECASE)
+        words = clean.split()
+        if not 2 <= len(words) <= 4 or len(clean) > 50:
+            continue
+        if not all(word.replace("-", "").replace("'", "").replace(".", "").isalpha() for word in words):
+            continue
+        if _JOB_RE.search(clean) or clean.lower() in _HEADINGS:
+            continue
+        if clean.isupper() or clean.islower():
+            clean = clean.title()
+        return clean, index
+    return "", -1
+
+
+def _find_phone(text: str) -> str:
+    for match in PHONE_RE.finditer(text):
+        candidate = match.group(0).strip()
+        digits = sum(ch.isdigit() for ch in candidate)
+        if 9 <= digits <= 15 and not _DATE_RANGE_RE.fullmatch(candidate):
+            return candidate
+    return ""
+
+
+def _find_links(text: str) -> Dict[str, str]:
+    links = {"linkedin": "", "github": "", "portfolio": ""}
+    match = _LINKEDIN_RE.search(text)
+    if match:
+        links["linkedin"] = f"linkedin.com/in/{match.group(1)}"
+    match = _GITHUB_RE.search(text)
+    if match:
+        links["github"] = f"github.com/{match.group(1)}"
+    for url in _URL_RE.findall(text):
+        if "linkedin.com" not in url.lower() and "github.com" not in url.lower():
+            links["portfolio"] = url.rstrip(".)")
+            break
+    return links
+
+
+def _split_role(line: str) -> Dict[str, str]:
+    """"Senior Developer - Acme" or "Acme | Senior Developer" -> title and company."""
+    parts = [part.strip() for part in _ROLE_SPLIT_RE.split(line, maxsplit=1) if part.strip()]
+    if len(parts) < 2:
+        return {"title": line}
+    first, second = parts
+    if _JOB_RE.search(second) and not _JOB_RE.search(first):
+        first, second = second, first
+    return {"title": first, "company": second}
+
+
+def _set_period(entry: Dict[str, str], match: "re.Match") -> None:
+    entry["period"] = match.group(0)
+    start, end = _YEAR_RE.search(match.group(1)), _YEAR_RE.search(match.group(2))
+    entry["start_date"] = start.group(0) if start else match.group(1)
+    entry["end_date"] = end.group(0) if end else match.group(2).lower()
+
+
+def _parse_experience(lines: List[str]) -> List[Dict[str, str]]:
+    entries: List[Dict[str, str]] = []
+    current: Optional[Dict[str, str]] = None
+    for line in lines:
+        if _BULLET_RE.match(line) or (current and "title" in current and len(line) > 80):
+            if current is not None:
+                detail = _BULLET_RE.sub("", line)
+                current["description"] = f"{current.get('description', '')} {detail}".strip()
+            continue
+
+        dates = _DATE_RANGE_RE.search(line)
+        rest = (line[: dates.start()] + line[dates.end():]).strip(" ,|-–—()") if dates else line
+        starts_entry = (
+            current is None
+            or (dates is not None and "period" in current)
+            or (bool(rest) and "title" in current and ("period" in current or "description" in current))
+        )
+        if starts_entry:
+            current = {}
+            entries.append(current)
+        if dates:
+            _set_period(current, dates)
+        if rest:
+            if "title" in current:
+                current.setdefault("company", rest)
+            else:
+                current.update(_split_role(rest))
+    return [entry for entry in entries if entry]
+
+
+def _parse_education(lines: List[str]) -> List[Dict[str, str]]:
+    entries: List[Dict[str, str]] = []
+    current: Optional[Dict[str, str]] = None
+    for line in lines:
+        line = _BULLET_RE.sub("", line)
+        dates = _DATE_RANGE_RE.search(line)
+        rest = (line[: dates.start()] + line[dates.end():]).strip(" ,|-–—()") if dates else line
+        # "M.Sc. Statistics, Humboldt University" carries both fields
+        found: Dict[str, str] = {}
+        for part in _ROLE_SPLIT_RE.split(rest):
+            if _DEGREE_RE.search(part):
+                found.setdefault("degree", part.strip())
+            elif _INSTITUTION_RE.search(part):
+                found.setdefault("institution", part.strip())
+        if len(found) == 1:
+            found = {kind: rest for kind in found}
+
+        if current is None or any(kind in current for kind in found) or (dates and "period" in current):
+            current = {}
+            entries.append(current)
+        if dates:
+            _set_period(current, dates)
+        elif not found and _YEAR_RE.fullmatch(rest):
+            current["end_date"] = rest
+        current.update(found)
+    return [entry for entry in entries if entry.get("degree") or entry.get("institution")]
+
+
+def _languages(section: List[str], text: str) -> List[str]:
+    names: List[str] = []
+    for item in _items(section, max_length=40):
+        item = _PROFICIENCY_RE.sub("", item).strip(" -–:")
+        skill = lookup_skill(item)
+        name = skill.name if skill else item
+        if name and name not in names and (skill is None or skill.category == "spoken_languages"):
+            names.append(name)
+    for skill in extract_skills(text):
+        if skill.category == "spoken_languages" and skill.name not in names:
+            names.append(skill.name)
+    return names
+
+
+def parse_text(text: str) -> ParsedDocument:
+    """Parse CV/resume text in one pass over its lines plus a few targeted scans."""
+    lines = [" ".join(line.split()) for line in (text or "").splitlines()]
+    lines = [line for line in lines if line]
+    header, sections = _split_sections(lines)
+
+    name, name_index = _find_name(header)
+    title = next(
+        (line for line in header[name_index + 1:10] if _JOB_RE.search(line) and len(line) < 100),
+        "",
+    )
+    location = ""
+    for line in header + sections.get("summary", []):
+        match = _LOCATION_RE.match(line)
+        if match:
+            location = match.group(1).strip()
+            break
+    email = EMAIL_RE.search(text or "")
+
+    mentioned = [
+        skill for skill in extract_skills(_LINKISH_RE.sub(" ", text or ""))
+        if skill.category != "spoken_languages"
+    ]
+    listed = [
+        item for item in _items(sections.get("skills", []))
+        if not (lookup_skill(item) and lookup_skill(item).category == "spoken_languages")
+    ]
+    summary = " ".join(sections.get("summary", [])[:6])
+
+    return ParsedDocument(
+        name=name,
+        title=title,
+        email=email.group(0) if email else "",
+        phone=_find_phone(text or ""),
+        location=location,
+        summary=summary[:1000],
+        links=_find_links(text or ""),
+        skills=normalize_skills(listed + [skill.name for skill in mentioned]),
+        experience=_parse_experience(sections.get("experience", [])),
+        education=_parse_education(sections.get("education", [])),
+        languages=_languages(sections.get("languages", []), text or ""),
+        certifications=_items(sections.get("certifications", []), max_length=100),
+        projects=_items(sections.get("projects", []), max_length=100),
+        raw_text=text or "",
+    )
+
+
+def parse_document(
+    content: bytes,
+    file_type: str,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Extract and parse a document; returns ``ParsedDocument.to_dict()`` (picklable)."""
+    extracted = extract_text(content, file_type, max_pages=max_pages, max_chars=max_chars)
+    parsed = parse_text(extracted.text)
+    parsed.pages = extracted.pages
+    parsed.truncated = extracted.truncated
+    return parsed.to_dict()
@@ -0,0 +1,232 @@
+import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from .document_parser import (PARSER_VERSION, SUPPORTED_TYPES, DocumentError,
+                              ParsedDocument, file_type_for, parse_document)
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class DocumentTooLarge(DocumentError):
+    status_code = 413
+
+
+class DocumentTimeout(DocumentError):
+    status_code = 422
+
+
+class DocumentBusy(DocumentError):
+    status_code = 503
+
+
+CacheKey = Tuple[str, str, int]
+
+
+class DocumentJob:
+    """
+    Handle for one submitted document; ``await job`` returns the ParsedDocument.
+
+    Identical uploads submitted while one is still running share the same
+    underlying task, and cached results come back already resolved.
+    """
+
+    def __init__(self, content_hash: str, file_type: str, future: "asyncio.Future", cached: bool):
+        self.id = uuid.uuid4().hex
+        self.content_hash = content_hash
+        self.file_type = file_type
+        self.cached = cached
+        self._future = future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    async def result(self) -> ParsedDocument:
+        return ParsedDocument.from_dict(await asyncio.shield(self._future))
+
+    def __await__(self):
+        return self.result().__await__()
+
+
+class DocumentProcessor:
+    """
+    Parses CV/resume uploads in a bounded process pool.
+
+    PDF/DOCX extraction and the section parser are CPU-bound; running them in
+    worker processes keeps the event loop free while a large upload is parsed.
+    At most ``workers`` documents run at once and ``max_queue`` more may wait;
+    beyond that submissions fail fast with DocumentBusy. A parse that exceeds
+    ``timeout`` seconds fails with DocumentTimeout and the pool is replaced,
+    since a worker stuck inside a PDF cannot be interrupted otherwise.
+    Results are cached by content hash, so re-uploading the same file is free.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        cache_size: int = 256,
+    ):
+        self.workers = _env_int("DOCUMENT_WORKERS", 2) if workers is None else workers
+        self.max_bytes = max_bytes or _env_int("DOCUMENT_MAX_BYTES", 5 * 1024 * 1024)
+        self.max_pages = max_pages or _env_int("DOCUMENT_MAX_PAGES", 20)
+        self.max_chars = max_chars or _env_int("DOCUMENT_MAX_CHARS", 200_000)
+        self.timeout = timeout or float(_env_int("DOCUMENT_PARSE_TIMEOUT", 20))
+        self.max_queue = _env_int("DOCUMENT_MAX_QUEUE", 32) if max_queue is None else max_queue
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[CacheKey, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self.stats = {"submitted": 0, "cache_hits": 0, "parsed": 0, "timeouts": 0, "failed": 0}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _reset_pool(self) -> None:
+        """Drop the pool, killing its workers (used after a timeout)."""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self._reset_pool()
+
+    def _validate(self, content: bytes, filename: str) -> str:
+        file_type = file_type_for(filename)
+        if file_type not in SUPPORTED_TYPES:
+            raise DocumentError(
+                f"Unsupported file type: {file_type}. Allowed types: {', '.join(SUPPORTED_TYPES)}"
+            )
+        if not content:
+            raise DocumentError("Empty file")
+        if len(content) > self.max_bytes:
+            raise DocumentTooLarge(
+                f"File size too large. Maximum size is {self.max_bytes // (1024 * 1024)}MB."
+            )
+        return file_type
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        # Slots and in-flight futures belong to one event loop
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(max(self.workers, 1))
+            self._inflight = {}
+            self._waiting = 0
+        return loop
+
+    def _remember(self, key: CacheKey, result: Dict[str, Any]) -> None:
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def submit(self, content: bytes, filename: str) -> DocumentJob:
+        """
+        Queue a document for parsing and return its handle.
+
+        Raises DocumentError right away for unsupported, empty or oversized
+        files; parse failures surface when the handle is awaited.
+        """
+        file_type = self._validate(content, filename)
+        content_hash = hashlib.sha256(content).hexdigest()
+        key = (content_hash, file_type, PARSER_VERSION)
+        loop = self._bind_loop()
+        self.stats["submitted"] += 1
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            future = loop.create_future()
+            future.set_result(self._cache[key])
+            return DocumentJob(content_hash, file_type, future, cached=True)
+
+        future = self._inflight.get(key)
+        if future is None:
+            if self._waiting >= max(self.workers, 1) + self.max_queue:
+                raise DocumentBusy("Document processing is busy, please retry shortly")
+            self._waiting += 1
+            future = asyncio.ensure_future(self._process(key, content, file_type))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return DocumentJob(content_hash, file_type, future, cached=False)
+
+    async def parse(self, content: bytes, filename: str) -> ParsedDocument:
+        """Submit and wait: ``await processor.parse(content, filename)``."""
+        return await self.submit(content, filename)
+
+    async def _process(self, key: CacheKey, content: bytes, file_type: str) -> Dict[str, Any]:
+        try:
+            async with self._slots:
+                result = await self._run(content, file_type)
+        except DocumentError:
+            self.stats["failed"] += 1
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Error parsing {file_type} document: {e}")
+            raise DocumentError(f"Could not read {file_type.upper()} file") from e
+        finally:
+            self._waiting -= 1
+
+        self.stats["parsed"] += 1
+        self._remember(key, result)
+        return result
+
+    async def _run(self, content: bytes, file_type: str) -> Dict[str, Any]:
+        args = (content, file_type, self.max_pages, self.max_chars)
+        if self.workers <= 0:
+            # No pool (tests, single-core deployments): still off the event loop
+            return await asyncio.wait_for(
+                asyncio.to_thread(parse_document, *args), self.timeout
+            )
+
+        for attempt in range(2):
+            pool = self._get_pool()
+            future = asyncio.get_running_loop().run_in_executor(pool, parse_document, *args)
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                logger.warning(f"{file_type} document parse exceeded {self.timeout}s; restarting workers")
+                if self._pool is pool:
+                    self._reset_pool()
+                raise DocumentTimeout("Document took too long to process")
+            except BrokenProcessPool:
+                # Another job's timeout recycled the pool under us; retry once
+                if self._pool is pool:
+                    self._reset_pool()
+                if attempt:
+                    raise
+        raise DocumentError("Document processing failed")
+
+
+document_processor = DocumentProcessor()
+atexit.register(document_processor.shutdown)
@@ -0,0 +1,466 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+import aiohttp
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = "email_outbox"
+COUNTERS_COLLECTION = "email_counters"
+
+# Mailgun accepts at most 1000 recipients per batch message
+MAILGUN_BATCH_LIMIT = 1000
+
+# Statuses that are worth retrying; other 4xx responses fail immediately
+RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class MailgunError(Exception):
+    """Raised when Mailgun rejects a message."""
+
+    def __init__(self, status: int, details: str = ""):
+        super().__init__(f"Mailgun API error: {status}")
+        self.status = status
+        self.details = details
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in RETRYABLE_STATUSES
+
+
+class DailyLimitStore:
+    """
+    Daily send counter shared by every worker and process.
+
+    One document per UTC day in ``email_counters``; reservations are a single
+    conditional ``$inc`` so concurrent workers can never overshoot the limit.
+    """
+
+    def __init__(self, db, daily_limit: int = 100):
+        self.collection = db[COUNTERS_COLLECTION]
+        self.daily_limit = daily_limit
+
+    @staticmethod
+    def _day_key(now: Optional[datetime] = None) -> str:
+        return f"mailgun:{(now or datetime.utcnow()).strftime('%Y-%m-%d')}"
+
+    async def reserve(self, count: int = 1) -> bool:
+        key = self._day_key()
+        await self.collection.update_one(
+            {"_id": key}, {"$setOnInsert": {"sent": 0}}, upsert=True
+        )
+        updated = await self.collection.find_one_and_update(
+            {"_id": key, "sent": {"$lte": self.daily_limit - count}},
+            {"$inc": {"sent": count}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return updated is not None
+
+    async def release(self, count: int = 1) -> None:
+        await self.collection.update_one(
+            {"_id": self._day_key()}, {"$inc": {"sent": -count}}
+        )
+
+    async def sent_today(self) -> int:
+        doc = await self.collection.find_one({"_id": self._day_key()})
+        return doc.get("sent", 0) if doc else 0
+
+
+class MailgunClient:
+    """Async Mailgun API client with a pooled, reused HTTP session."""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str,
+        timeout: int = 30,
+        pool_size: int = 10,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                auth=aiohttp.BasicAuth("api", self.api_key or ""),
+            )
+        return self._session
+
+    async def send(self, data: Dict[str, str]) -> Dict[str, Any]:
+        async with self._get_session().post(
+            f"{self.base_url}/messages", data=data
+        ) as response:
+            body = await response.text()
+            if response.status != 200:
+                raise MailgunError(response.status, body)
+            try:
+                return json.loads(body)
+            except ValueError:
+                return {"message": body}
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class EmailQueue:
+    """
+    Persistent outbound email queue.
+
+    Messages are written to the ``email_outbox`` collection and delivered by
+    async workers that claim them with a lease, so a crashed worker's message
+    is picked up again once the lease expires. Batch messages carry Mailgun
+    ``recipient-variables`` and are delivered as one API call for up to
+    1000 recipients, or the daily limit when that is lower.
+    """
+
+    def __init__(
+        self,
+        db,
+        client: MailgunClient,
+        from_email: str,
+        daily_limit: int = 100,
+        workers: int = 2,
+        max_attempts: int = 5,
+        retry_base_seconds: int = 30,
+        lease_seconds: int = 120,
+        poll_interval: float = 5.0,
+    ):
+        self.outbox = db[OUTBOX_COLLECTION]
+        self.client = client
+        self.from_email = from_email
+        self.limits = DailyLimitStore(db, daily_limit)
+        # A message must fit in one day's quota or it could never be reserved
+        self.batch_limit = max(1, min(MAILGUN_BATCH_LIMIT, daily_limit))
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        self.running = False
+        self._workers: List[asyncio.Task] = []
+        self._pending_writes: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.outbox.create_index([("status", 1), ("next_attempt_at", 1)])
+            await self.outbox.create_index([("status", 1), ("lease_until", 1)])
+        except Exception as e:
+            logger.warning(f"Could not create email outbox indexes: {e}")
+
+    def _message(
+        self,
+        to: List[str],
+        subject: str,
+        html: str,
+        text: Optional[str],
+        from_name: Optional[str],
+        recipient_variables: Optional[Dict[str, Dict[str, Any]]],
+        tag: Optional[str],
+    ) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            "to": to,
+            "subject": subject,
+            "html": html,
+            "text": text,
+            "from_name": from_name,
+            "recipient_variables": recipient_variables,
+            "tag": tag,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+
+    async def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        from_name: Optional[str] = "Buzz2Remote",
+        tag: Optional[str] = None,
+    ) -> Any:
+        """Store a single message in the outbox and wake a worker."""
+        result = await self.outbox.insert_one(
+            self._message(
+                [to_email], subject, html_content, text_content, from_name, None, tag
+            )
+        )
+        self._wakeup.set()
+        return result.inserted_id
+
+    async def enqueue_batch(
+        self,
+        recipients: Dict[str, Dict[str, Any]],
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        from_name: Optional[str] = "Buzz2Remote",
+        tag: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Store a batch message; ``recipients`` maps each address to its
+        recipient variables (used as ``%recipient.<name>%`` in the content).
+        """
+        emails = list(recipients)
+        messages = [
+            self._message(
+                chunk,
+                subject,
+                html_content,
+                text_content,
+                from_name,
+                {email: recipients[email] for email in chunk},
+                tag,
+            )
+            for chunk in (
+                emails[i : i + self.batch_limit]
+                for i in range(0, len(emails), self.batch_limit)
+            )
+        ]
+        if not messages:
+            return []
+        result = await self.outbox.insert_many(messages)
+        self._wakeup.set()
+        return list(result.inserted_ids)
+
+    def submit_nowait(self, **kwargs) -> None:
+        """Enqueue from synchronous code running on the event loop."""
+        task = asyncio.get_running_loop().create_task(self.enqueue(**kwargs))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    def _payload(self, message: Dict[str, Any]) -> Dict[str, str]:
+        from_name = message.get("from_name")
+        data = {
+            "from": f"{from_name} <{self.from_email}>" if from_name else self.from_email,
+            "to": ", ".join(message["to"]),
+            "subject": message["subject"],
+            "html": message["html"],
+        }
+        if message.get("text"):
+            data["text"] = message["text"]
+        if message.get("recipient_variables"):
+            data["recipient-variables"] = json.dumps(message["recipient_variables"])
+        if message.get("tag"):
+            data["o:tag"] = message["tag"]
+        return data
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self.outbox.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "sending", "lease_until": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": "sending",
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _defer(self, message: Dict[str, Any], until: datetime, **fields) -> None:
+        await self.outbox.update_one(
+            {"_id": message["_id"]},
+            {"$set": {"status": "pending", "next_attempt_at": until, **fields}},
+        )
+
+    async def _split(self, message: Dict[str, Any]) -> None:
+        """Move recipients beyond ``batch_limit`` into new pending messages."""
+        emails = message["to"]
+        variables = message.get("recipient_variables") or {}
+        rest = emails[self.batch_limit :]
+        await self.outbox.insert_many(
+            [
+                {
+                    **self._message(
+                        chunk,
+                        message["subject"],
+                        message["html"],
+                        message.get("text"),
+                        message.get("from_name"),
+                        {email: variables[email] for email in chunk if email in variables} or None,
+                        message.get("tag"),
+                    ),
+                    "split_from": message["_id"],
+                }
+                for chunk in (
+                    rest[i : i + self.batch_limit] for i in range(0, len(rest), self.batch_limit)
+                )
+            ]
+        )
+        message["to"] = emails[: self.batch_limit]
+        fields: Dict[str, Any] = {"to": message["to"]}
+        if variables:
+            message["recipient_variables"] = fields["recipient_variables"] = {
+                email: variables[email] for email in message["to"] if email in variables
+            }
+        await self.outbox.update_one({"_id": message["_id"]}, {"$set": fields})
+
+    async def _deliver(self, message: Dict[str, Any]) -> None:
+        if len(message["to"]) > self.batch_limit:
+            # Queued before the limit was lowered; larger than a day's quota
+            await self._split(message)
+        recipients = len(message["to"])
+
+        if not self.client.api_key:
+            logger.warning(
+                f"Mailgun API key not configured. Logging email instead of sending: "
+                f"{message['to'][:3]} - {message['subject']}"
+            )
+            await self.outbox.update_one(
+                {"_id": message["_id"]},
+                {"$set": {"status": "sent", "logged_only": True, "sent_at": datetime.utcnow()}},
+            )
+            return
+
+        if not await self.limits.reserve(recipients):
+            tomorrow = (datetime.utcnow() + timedelta(days=1)).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            logger.warning(
+                f"Daily email limit ({self.limits.daily_limit}) reached; "
+                f"deferring message {message['_id']} to {tomorrow}"
+            )
+            # Running out of quota is not a delivery attempt
+            await self._defer(message, tomorrow, attempts=message["attempts"] - 1)
+            return
+
+        try:
+            response = await self.client.send(self._payload(message))
+        except (MailgunError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            await self.limits.release(recipients)
+            retryable = not isinstance(e, MailgunError) or e.retryable
+            if retryable and message["attempts"] < self.max_attempts:
+                delay = self.retry_base_seconds * 2 ** (message["attempts"] - 1)
+                logger.warning(f"Email {message['_id']} failed ({e}); retrying in {delay}s")
+                await self._defer(
+                    message, datetime.utcnow() + timedelta(seconds=delay), error=str(e)
+                )
+            else:
+                logger.error(f"Email {message['_id']} failed permanently: {e}")
+                await self.outbox.update_one(
+                    {"_id": message["_id"]},
+                    {"$set": {"status": "failed", "error": str(e), "failed_at": datetime.utcnow()}},
+                )
+            return
+
+        await self.outbox.update_one(
+            {"_id": message["_id"]},
+            {
+                "$set": {
+                    "status": "sent",
+                    "message_id": response.get("id"),
+                    "sent_at": datetime.utcnow(),
+                },
+                "$unset": {"lease_until": "", "error": ""},
+            },
+        )
+        logger.info(f"Email {message['_id']} sent to {recipients} recipient(s)")
+
+    async def process_one(self) -> bool:
+        """Claim and deliver one message; False when nothing is due."""
+        message = await self._claim()
+        if message is None:
+            return False
+        await self._deliver(message)
+        return True
+
+    async def drain(self) -> int:
+        """Deliver every message that is currently due."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        processed = 0
+        while await self.process_one():
+            processed += 1
+        return processed
+
+    async def _worker(self) -> None:
+        while self.running:
+            try:
+                if await self.process_one():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email worker error: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        await self.ensure_indexes()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.client.close()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        counts = {
+            row["_id"]: row["count"]
+            async for row in self.outbox.aggregate(
+                [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+            )
+        }
+        sent_today = await self.limits.sent_today()
+        return {
+            "outbox": counts,
+            "sent_today": sent_today,
+            "daily_limit": self.limits.daily_limit,
+            "remaining_today": max(self.limits.daily_limit - sent_today, 0),
+            "workers": len(self._workers),
+        }
+
+
+def create_email_queue(db, mailgun=None, **kwargs) -> EmailQueue:
+    """Build a queue configured from a ``MailgunService`` instance."""
+    if mailgun is None:
+        from backend.services.mailgun_service import mailgun_service as mailgun
+
+    client = MailgunClient(
+        mailgun.api_key,
+        os.getenv("MAILGUN_BASE_URL", mailgun.base_url),
+    )
+    return EmailQueue(
+        db,
+        client,
+        from_email=mailgun.from_email,
+        daily_limit=mailgun.daily_limit,
+        **kwargs,
+    )
@@ -0,0 +1,692 @@
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (Any, AsyncIterable, Awaitable, Callable, Dict, Iterable,
+                    List, Optional, Tuple, Union)
+
+from pymongo import UpdateOne
+
+from backend.services.job_ingest_writer import (IngestWriteResult,
+                                                JobIngestWriter,
+                                                compute_content_hash)
+from backend.services.location_normalizer import normalize_location
+from backend.services.skill_taxonomy import (extract_skills, normalize_skills,
+                                             skill_key)
+from backend.services.title_grouping import title_group_fields
+from backend.utils.html_cleaner import clean_job_data, clean_job_data_many
+
+logger = logging.getLogger(__name__)
+
+Batch = List[Dict[str, Any]]
+PostIngestHook = Callable[[Batch], Awaitable[Any]]
+
+_END = object()
+
+
+@dataclass
+class StageMetrics:
+    """Throughput and latency counters for one pipeline stage."""
+
+    name: str
+    batches: int = 0
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    max_batch_seconds: float = 0.0
+
+    def record(self, items_in: int, items_out: int, seconds: float) -> None:
+        self.batches += 1
+        self.items_in += items_in
+        self.items_out += items_out
+        self.busy_seconds += seconds
+        self.max_batch_seconds = max(self.max_batch_seconds, seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        avg = self.busy_seconds / self.batches if self.batches else 0.0
+        throughput = self.items_in / self.busy_seconds if self.busy_seconds else 0.0
+        return {
+            "batches": self.batches,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "avg_batch_ms": round(avg * 1000, 3),
+            "max_batch_ms": round(self.max_batch_seconds * 1000, 3),
+            "items_per_second": round(throughput, 1),
+        }
+
+
+class IngestStage:
+    """Base class for a batch-oriented ingest stage."""
+
+    name = "stage"
+
+    async def process(self, batch: Batch) -> Batch:
+        raise NotImplementedError
+
+    async def finish(self) -> None:
+        """Called once after the last batch has been processed."""
+
+
+DEFAULT_IDENTITY = ("apply_url", "url", "title", "company")
+
+# Default lookup of unkeyed jobs: JobDataManager.save_jobs_to_database kept
+# one job per title and company before the (source, source_id) key existed
+LEGACY_KEY_FIELDS = ("title", "company")
+
+
+def _stable_source_id(record: Dict[str, Any], identity: Tuple[str, ...] = DEFAULT_IDENTITY) -> str:
+    basis = "|".join(str(record.get(key) or "") for key in identity)
+    return hashlib.sha1(basis.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def normalize_job_record(
+    record: Any,
+    source: Optional[str] = None,
+    id_field: Optional[str] = "source_id",
+    identity: Tuple[str, ...] = DEFAULT_IDENTITY,
+) -> Dict[str, Any]:
+    """
+    Convert a source-specific job record into the canonical job document.
+
+    ``record`` may be a dict or a dataclass (crawler ``JobListing``, external
+    API ``JobData``). When ``id_field`` is None, or the record has no usable
+    id, a stable id is derived from the ``identity`` fields (by default the
+    job URL, title and company).
+    """
+    if dataclasses.is_dataclass(record) and not isinstance(record, type):
+        doc = dataclasses.asdict(record)
+    else:
+        doc = dict(record)
+
+    doc["source"] = source or doc.get("source") or doc.get("source_type") or "unknown"
+
+    source_id = None
+    if id_field:
+        source_id = doc.get(id_field) or doc.get("external_id") or doc.get("id")
+    doc["source_id"] = str(source_id) if source_id else _stable_source_id(doc, identity)
+
+    if not doc.get("url") and doc.get("apply_url"):
+        doc["url"] = doc["apply_url"]
+    if isinstance(doc.get("posted_date"), datetime) and not doc.get("posted_at"):
+        doc["posted_at"] = doc["posted_date"]
+
+    doc.setdefault("location", "Remote")
+    doc["requirements"] = doc.get("requirements") or []
+    doc["skills"] = doc.get("skills") or []
+    doc.setdefault("is_active", True)
+    doc.setdefault("status", "active")
+    doc.pop("_id", None)
+    return doc
+
+
+class NormalizeStage(IngestStage):
+    name = "normalize"
+
+    def __init__(
+        self,
+        source: Optional[str] = None,
+        id_field: Optional[str] = "source_id",
+        identity: Tuple[str, ...] = DEFAULT_IDENTITY,
+    ):
+        self.source = source
+        self.id_field = id_field
+        self.identity = identity
+
+    async def process(self, batch: Batch) -> Batch:
+        normalized = []
+        for record in batch:
+            try:
+                doc = normalize_job_record(record, self.source, self.id_field, self.identity)
+            except Exception as e:
+                logger.warning(f"Dropping unparseable job record: {e}")
+                continue
+            if doc.get("title") and doc.get("company"):
+                normalized.append(doc)
+        return normalized
+
+
+class HtmlCleanStage(IngestStage):
+    name = "html_clean"
+
+    def __init__(self, workers: Optional[int] = None):
+        if workers is None:
+            workers = int(os.getenv("INGEST_CLEAN_WORKERS", "0") or 0)
+        self.workers = workers
+
+    async def process(self, batch: Batch) -> Batch:
+        if not self.workers:
+            return [clean_job_data(doc) for doc in batch]
+        # Large ingests: clean in the process pool, off the event loop
+        return await asyncio.to_thread(clean_job_data_many, batch, self.workers)
+
+
+class GeoNormalizeStage(IngestStage):
+    name = "geo_normalize"
+
+    async def process(self, batch: Batch) -> Batch:
+        for doc in batch:
+            location = doc.get("location")
+            doc["geo"] = normalize_location(
+                location if isinstance(location, str) else None
+            ).to_document()
+        return batch
+
+
+def title_parse_fields(title: Optional[str], parser=None) -> Dict[str, Any]:
+    """Fields derived from a job title: parsed components plus the grouping key."""
+    if parser is None:
+        from backend.services.job_title_parser import job_title_parser
+
+        parser = job_title_parser
+    parsed = parser.parse_job_title(title or "")
+    return {
+        "original_job_title": parsed.original_title,
+        "parsed_job_title": parsed.parsed_title,
+        "job_title_category": parsed.category,
+        "job_title_level": parsed.level,
+        "job_title_skills": parsed.skills,
+        "job_title_location": parsed.location,
+        "job_title_work_type": parsed.work_type,
+        "job_title_department": parsed.department,
+        **title_group_fields(title),
+    }
+
+
+def extract_job_skills(doc: Dict[str, Any]) -> List[str]:
+    """Listed skills merged with those found in the title and description."""
+    listed = doc.get("skills") if isinstance(doc.get("skills"), list) else []
+    text = f"{doc.get('title') or ''}\n{doc.get('description') or ''}"
+    found = [skill.name for skill in extract_skills(text)]
+    return normalize_skills(listed + found)
+
+
+class TitleParseStage(IngestStage):
+    name = "title_parse"
+
+    def __init__(self, parser=None):
+        if parser is None:
+            from backend.services.job_title_parser import job_title_parser
+
+            parser = job_title_parser
+        self.parser = parser
+
+    async def process(self, batch: Batch) -> Batch:
+        for doc in batch:
+            doc.update(title_parse_fields(doc.get("title", ""), self.parser))
+        return batch
+
+
+class SkillExtractStage(IngestStage):
+    name = "skill_extract"
+
+    async def process(self, batch: Batch) -> Batch:
+        for doc in batch:
+            doc["skills"] = extract_job_skills(doc)
+        return batch
+
+
+def company_key(company: Any) -> Optional[str]:
+    """Company name without case or spacing differences."""
+    if not isinstance(company, str) or not company.strip():
+        return None
+    return " ".join(company.casefold().split())
+
+
+def match_key_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Lower-case keys that subscriptions match exactly: skill keys and company."""
+    skills = doc.get("skills") if isinstance(doc.get("skills"), list) else []
+    names = [name for name in skills if isinstance(name, str) and name.strip()]
+    return {
+        "skill_keys": list(dict.fromkeys(skill_key(name) for name in names)),
+        "company_key": company_key(doc.get("company")),
+    }
+
+
+class MatchKeysStage(IngestStage):
+    name = "match_keys"
+
+    async def process(self, batch: Batch) -> Batch:
+        for doc in batch:
+            doc.update(match_key_fields(doc))
+        return batch
+
+
+class SalaryExtractStage(IngestStage):
+    name = "salary_extract"
+
+    def __init__(self, extractor: Optional[Callable[[str], Optional[Dict]]] = None):
+        if extractor is None:
+            from backend.services.salary_estimation_service import \
+                salary_estimation_service
+
+            extractor = salary_estimation_service.extract_salary_from_text
+        self.extractor = extractor
+
+    async def process(self, batch: Batch) -> Batch:
+        for doc in batch:
+            if doc.get("salary_min") or doc.get("salary_max"):
+                continue
+            salary_text = doc.get("salary")
+            if not salary_text or not isinstance(salary_text, str):
+                continue
+            parsed = self.extractor(salary_text)
+            if parsed:
+                doc["salary_min"] = parsed["min_salary"]
+                doc["salary_max"] = parsed["max_salary"]
+                doc["salary_currency"] = parsed["currency"]
+                doc["salary_period"] = parsed["period"]
+        return batch
+
+
+class DedupeStage(IngestStage):
+    """
+    Drops repeated (source, source_id) keys within a run and documents whose
+    content hash was already seen recently. The seen-set is a bounded LRU so
+    long-running streams do not grow without limit.
+    """
+
+    name = "dedupe"
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self.seen: "OrderedDict[tuple, str]" = OrderedDict()
+        self.duplicates = 0
+
+    async def process(self, batch: Batch) -> Batch:
+        unique = []
+        for doc in batch:
+            key = (doc.get("source"), doc.get("source_id"))
+            content_hash = compute_content_hash(doc)
+            if self.seen.get(key) == content_hash:
+                self.duplicates += 1
+                self.seen.move_to_end(key)
+                continue
+            self.seen[key] = content_hash
+            if len(self.seen) > self.max_keys:
+                self.seen.popitem(last=False)
+            unique.append(doc)
+        return unique
+
+
+class LegacyKeyStage(IngestStage):
+    """
+    Adopts jobs stored before the ``(source, source_id)`` key existed.
+
+    Unkeyed jobs matching ``legacy_query`` are looked up on the ``fields``
+    their saver used as a key and given the key of the incoming record,
+    so the upsert updates them instead of inserting a duplicate. Their
+    ``application_urls`` are rewritten in the ``{url, source}`` form the
+    writer adds to, so known URLs are not added twice.
+    """
+
+    name = "legacy_keys"
+
+    def __init__(
+        self,
+        collection,
+        legacy_query: Optional[Dict[str, Any]] = None,
+        fields: Tuple[str, ...] = LEGACY_KEY_FIELDS,
+    ):
+        self.collection = collection
+        self.legacy_query = legacy_query or {}
+        self.fields = fields
+        self.adopted = 0
+
+    async def process(self, batch: Batch) -> Batch:
+        wanted: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for doc in batch:
+            key = tuple(doc.get(name) for name in self.fields)
+            if all(key):
+                wanted.setdefault(key, doc)
+        if not wanted:
+            return batch
+
+        # Keys that already have a document must not be given to a second one
+        keyed = {
+            (doc["source"], doc["source_id"])
+            async for doc in self.collection.find(
+                {
+                    "$or": [
+                        {"source": doc["source"], "source_id": doc["source_id"]}
+                        for doc in wanted.values()
+                    ]
+                },
+                {"source": 1, "source_id": 1},
+            )
+        }
+        query = {
+            **self.legacy_query,
+            "source_id": {"$exists": False},
+            "$or": [dict(zip(self.fields, key)) for key in wanted],
+        }
+        projection = {name: 1 for name in self.fields}
+        projection["application_urls"] = 1
+
+        operations = []
+        async for legacy in self.collection.find(query, projection):
+            doc = wanted.get(tuple(legacy.get(name) for name in self.fields))
+            if doc is None or (doc["source"], doc["source_id"]) in keyed:
+                continue
+            keyed.add((doc["source"], doc["source_id"]))
+            fields = {"source": doc["source"], "source_id": doc["source_id"]}
+            urls = legacy_application_urls(legacy.get("application_urls"))
+            if urls:
+                fields["application_urls"] = urls
+            operations.append(
+                UpdateOne(
+                    {"_id": legacy["_id"], "source_id": {"$exists": False}},
+                    {"$set": fields},
+                )
+            )
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+            self.adopted += len(operations)
+        return batch
+
+
+def legacy_application_urls(entries: Any) -> List[Dict[str, Any]]:
+    """``application_urls`` entries as ``{url, source}``, deduplicated."""
+    urls: List[Dict[str, Any]] = []
+    for entry in entries or []:
+        if isinstance(entry, dict) and entry.get("url"):
+            url = {"url": entry["url"], "source": entry.get("source")}
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+class BulkUpsertStage(IngestStage):
+    """Writes each batch with JobIngestWriter and emits only newly inserted jobs."""
+
+    name = "bulk_upsert"
+
+    def __init__(self, writer: JobIngestWriter):
+        self.writer = writer
+        self.result = IngestWriteResult()
+        self._indexes_ready = False
+
+    async def process(self, batch: Batch) -> Batch:
+        if not self._indexes_ready:
+            await self.writer.ensure_indexes()
+            self._indexes_ready = True
+
+        result = await self.writer.write(batch)
+        self.result.merge(result)
+
+        new_jobs = []
+        inserted_at = datetime.utcnow()
+        for doc in batch:
+            key = (doc.get("source"), doc.get("source_id"))
+            if key in result.upserted_ids:
+                new_job = dict(doc, _id=result.upserted_ids[key])
+                new_job.setdefault("created_at", inserted_at)
+                new_jobs.append(new_job)
+        return new_jobs
+
+
+class PostIngestStage(IngestStage):
+    """Runs post-ingest hooks (notifications, index updates) on new jobs."""
+
+    name = "post_ingest"
+
+    def __init__(self, hooks: Optional[List[PostIngestHook]] = None):
+        self.hooks: List[PostIngestHook] = list(hooks or [])
+
+    async def process(self, batch: Batch) -> Batch:
+        if not batch:
+            return batch
+        for hook in self.hooks:
+            try:
+                await hook(batch)
+            except Exception as e:
+                logger.error(f"Post-ingest hook {getattr(hook, '__name__', hook)} failed: {e}")
+        return batch
+
+
+@dataclass
+class IngestReport:
+    source: Optional[str]
+    received: int = 0
+    duplicates: int = 0
+    adopted: int = 0
+    write: Dict[str, int] = field(default_factory=dict)
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    duration_seconds: float = 0.0
+
+    @property
+    def new_jobs(self) -> int:
+        return self.write.get("inserted", 0)
+
+    @property
+    def updated_jobs(self) -> int:
+        return self.write.get("updated", 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "adopted_jobs": self.adopted,
+            "new_jobs": self.new_jobs,
+            "updated_jobs": self.updated_jobs,
+            "unchanged_jobs": self.write.get("unchanged", 0),
+            "failed_jobs": self.write.get("failed", 0),
+            "duration_seconds": round(self.duration_seconds, 3),
+            "stages": self.stages,
+        }
+
+
+class IngestPipeline:
+    """
+    Streaming job ingest pipeline shared by every job source.
+
+    Records pushed into the pipeline are grouped into batches and flow through
+    the stages concurrently. Stages are connected by bounded queues, so a slow
+    stage (usually the database write) applies backpressure to ``push``.
+    """
+
+    def __init__(
+        self,
+        stages: List[IngestStage],
+        batch_size: int = 200,
+        queue_size: int = 4,
+        source: Optional[str] = None,
+    ):
+        self.stages = stages
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.source = source
+        self.metrics = {stage.name: StageMetrics(stage.name) for stage in stages}
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._pending: Batch = []
+        self._received = 0
+        self._started_at = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def add_hook(self, hook: PostIngestHook) -> None:
+        for stage in self.stages:
+            if isinstance(stage, PostIngestStage):
+                stage.hooks.append(hook)
+                return
+        raise ValueError("Pipeline has no post-ingest stage")
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        self._workers = [
+            asyncio.create_task(self._run_stage(index))
+            for index in range(len(self.stages))
+        ]
+        self._pending = []
+        self._received = 0
+        self._started_at = time.perf_counter()
+
+    async def _run_stage(self, index: int) -> None:
+        stage = self.stages[index]
+        metrics = self.metrics[stage.name]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self._queues) else None
+
+        while True:
+            batch = await inbox.get()
+            if batch is _END:
+                await stage.finish()
+                if outbox is not None:
+                    await outbox.put(_END)
+                return
+
+            started = time.perf_counter()
+            try:
+                output = await stage.process(batch)
+            except Exception as e:
+                metrics.errors += 1
+                logger.error(f"Ingest stage {stage.name} failed on batch: {e}")
+                output = []
+            metrics.record(len(batch), len(output), time.perf_counter() - started)
+
+            if outbox is not None and output:
+                await outbox.put(output)
+
+    async def push(self, record: Any) -> None:
+        """Add one record; blocks while downstream stages are saturated."""
+        if not self.running:
+            await self.start()
+        self._pending.append(record)
+        self._received += 1
+        if len(self._pending) >= self.batch_size:
+            batch, self._pending = self._pending, []
+            await self._queues[0].put(batch)
+
+    async def push_many(self, records: Union[Iterable[Any], AsyncIterable[Any]]) -> None:
+        if hasattr(records, "__aiter__"):
+            async for record in records:
+                await self.push(record)
+        else:
+            for record in records:
+                await self.push(record)
+
+    async def close(self) -> IngestReport:
+        """Flush pending records, wait for all stages and return the report."""
+        if not self.running:
+            await self.start()
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._queues[0].put(batch)
+        await self._queues[0].put(_END)
+
+        try:
+            await asyncio.gather(*self._workers)
+        finally:
+            self._workers = []
+
+        report = IngestReport(
+            source=self.source,
+            received=self._received,
+            stages={name: m.to_dict() for name, m in self.metrics.items()},
+            duration_seconds=time.perf_counter() - self._started_at,
+        )
+        for stage in self.stages:
+            if isinstance(stage, DedupeStage):
+                report.duplicates = stage.duplicates
+            elif isinstance(stage, LegacyKeyStage):
+                report.adopted = stage.adopted
+            elif isinstance(stage, BulkUpsertStage):
+                report.write = stage.result.to_dict()
+
+        logger.info(f"Ingest completed: {report.to_dict()}")
+        return report
+
+    async def run(self, records: Union[Iterable[Any], AsyncIterable[Any]]) -> IngestReport:
+        """Push every record through the pipeline and return the report."""
+        await self.start()
+        try:
+            await self.push_many(records)
+        except BaseException:
+            for worker in self._workers:
+                worker.cancel()
+            self._workers = []
+            raise
+        return await self.close()
+
+
+def notification_hook(db) -> PostIngestHook:
+    """Post-ingest hook that matches new jobs against user notification preferences."""
+
+    async def notify_new_jobs(new_jobs: Batch) -> None:
+        from backend.services.job_notification_service import \
+            JobNotificationService
+
+        stats = await JobNotificationService(db).process_new_jobs_for_notifications(
+            new_jobs
+        )
+        logger.info(f"Notification processing completed: {stats}")
+
+    return notify_new_jobs
+
+
+def build_ingest_pipeline(
+    db,
+    source: Optional[str] = None,
+    id_field: Optional[str] = "source_id",
+    hooks: Optional[List[PostIngestHook]] = None,
+    notify: bool = True,
+    stats: bool = True,
+    batch_size: int = 200,
+    identity: Tuple[str, ...] = DEFAULT_IDENTITY,
+    legacy_query: Optional[Dict[str, Any]] = None,
+    legacy_fields: Tuple[str, ...] = LEGACY_KEY_FIELDS,
+    url_history: bool = False,
+) -> IngestPipeline:
+    """
+    Build the standard ingest pipeline writing into ``db.jobs``.
+
+    ``legacy_query`` selects unkeyed jobs this source wrote before the
+    ingest key existed; they are matched on ``legacy_fields`` and adopted
+    instead of duplicated. With
+    ``url_history`` every apply URL seen for a job is kept in
+    ``application_urls``.
+    """
+    all_hooks = list(hooks or [])
+    if stats:
+        from backend.services.job_analytics_store import JobAnalyticsStore
+        from backend.services.job_stats_materializer import \
+            JobStatsMaterializer
+        from backend.services.location_index import LocationIndex
+
+        all_hooks.insert(0, JobAnalyticsStore(db).on_jobs_ingested)
+        all_hooks.insert(0, LocationIndex(db).on_jobs_ingested)
+        all_hooks.insert(0, JobStatsMaterializer(db).on_jobs_ingested)
+    if notify:
+        all_hooks.insert(0, notification_hook(db))
+
+    stages: List[IngestStage] = [
+        NormalizeStage(source=source, id_field=id_field, identity=identity),
+        HtmlCleanStage(),
+        GeoNormalizeStage(),
+        TitleParseStage(),
+        SkillExtractStage(),
+        MatchKeysStage(),
+        SalaryExtractStage(),
+        DedupeStage(),
+    ]
+    if legacy_query is not None:
+        stages.append(LegacyKeyStage(db.jobs, legacy_query, legacy_fields))
+    stages += [
+        BulkUpsertStage(
+            JobIngestWriter(db.jobs, batch_size=batch_size, url_history=url_history)
+        ),
+        PostIngestStage(all_hooks),
+    ]
+    return IngestPipeline(stages, batch_size=batch_size, source=source)
@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "job_interactions"
+COUNTERS_COLLECTION = "job_interaction_counters"
+META_ID = "meta"
+
+# Actions become counter field names, so anything else is folded into "other"
+_ACTION_RE = re.compile(r"^[a-z][a-z0-9_]{0,39}$")
+OTHER_ACTION = "other"
+
+EVENT_FIELDS = ("user_agent", "ip_address", "session_id")
+
+CounterKey = Tuple[str, datetime, str]
+
+
+def normalize_action(action: Any) -> str:
+    if isinstance(action, str):
+        action = action.strip().lower()
+        if _ACTION_RE.match(action):
+            return action
+    return OTHER_ACTION
+
+
+def event_day(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def counter_id(job_id: str, day: datetime) -> str:
+    return f"{job_id}|{day:%Y-%m-%d}"
+
+
+class InteractionRecorder:
+    """
+    Buffered writer for job interaction events.
+
+    ``record`` only appends to memory. Every ``flush_interval`` seconds, or
+    once ``max_batch`` events are waiting, the buffer is written with one
+    ``insert_many`` of the raw events and one unordered bulk of ``$inc``
+    upserts into per-job, per-day counters (``actions.<action>`` and
+    ``total``). Analytics read the counters, never the raw events. Every
+    worker increments the same counter documents, so they add up across
+    the deployment.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_batch: int = 500,
+        flush_interval: float = 2.0,
+        max_buffer: int = 50_000,
+    ):
+        self.db = db
+        self.events = db[EVENTS_COLLECTION]
+        self.counters = db[COUNTERS_COLLECTION]
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.running = False
+        self.dropped = 0
+        self._marked = False
+        self._buffer: List[Dict[str, Any]] = []
+        self._counts: Counter = Counter()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.counters.create_index([("job_id", 1), ("day", 1)])
+        except Exception as e:
+            logger.warning(f"Could not create interaction counter index: {e}")
+
+    def record(self, job_id: str, action: Any, **fields: Any) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            # The database is not keeping up; shed events rather than memory
+            self.dropped += 1
+            return
+        now = datetime.utcnow()
+        action = normalize_action(action)
+        event = {"job_id": job_id, "action": action, "timestamp": now}
+        event.update({name: fields.get(name) for name in EVENT_FIELDS})
+        if fields.get("client_timestamp") is not None:
+            event["client_timestamp"] = fields["client_timestamp"]
+        self._buffer.append(event)
+        self._counts[(job_id, event_day(now), action)] += 1
+        if (
+            self.running
+            and len(self._buffer) >= self.max_batch
+            and (self._flush_task is None or self._flush_task.done())
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    @staticmethod
+    def counter_operations(counts: Dict[CounterKey, int]) -> List[UpdateOne]:
+        increments: Dict[Tuple[str, datetime], Dict[str, int]] = {}
+        for (job_id, day, action), count in counts.items():
+            inc = increments.setdefault((job_id, day), {"total": 0})
+            inc[f"actions.{action}"] = inc.get(f"actions.{action}", 0) + count
+            inc["total"] += count
+        return [
+            UpdateOne(
+                {"_id": counter_id(job_id, day)},
+                {"$setOnInsert": {"job_id": job_id, "day": day}, "$inc": inc},
+                upsert=True,
+            )
+            for (job_id, day), inc in increments.items()
+        ]
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of events."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+            events, counts = self._buffer, self._counts
+            self._buffer, self._counts = [], Counter()
+            try:
+                if not self._marked:
+                    # Events stored from now on are counted as they arrive
+                    await self.counters.update_one(
+                        {"_id": META_ID},
+                        {"$setOnInsert": {"counting_since": datetime.utcnow()}},
+                        upsert=True,
+                    )
+                    self._marked = True
+                await self.counters.bulk_write(self.counter_operations(counts), ordered=False)
+            except Exception as e:
+                logger.error(f"Interaction counter flush failed, retrying next flush: {e}")
+                self._buffer = events + self._buffer
+                self._counts.update(counts)
+                return 0
+            try:
+                await self.events.insert_many(events, ordered=False)
+            except Exception as e:
+                # Counters are already in; raw events are only kept for audits
+                logger.warning(f"Could not store {len(events)} raw interaction events: {e}")
+            return len(events)
+
+    async def _flusher(self) -> None:
+        while self.running:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Interaction flush failed: {e}")
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        await self.ensure_indexes()
+        self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def backfill(self, batch_size: int = 1000) -> int:
+        """
+        Seed the counters once from raw events stored before they existed
+        (before ``counting_since``). Events are dated by their ObjectId and
+        streamed in ``_id`` order; after every batch the last ``_id`` is
+        checkpointed, so an interrupted seed resumes after it instead of
+        adding the same events again.
+        """
+        meta = await self.counters.find_one({"_id": META_ID}) or {}
+        if meta.get("seeded_at"):
+            return 0
+        since = meta.get("counting_since")
+        if since is None:
+            since = datetime.utcnow()
+            await self.counters.update_one(
+                {"_id": META_ID}, {"$setOnInsert": {"counting_since": since}}, upsert=True
+            )
+        seen = meta.get("seeded_events", 0)
+        id_range: Dict[str, Any] = {"$lt": ObjectId.from_datetime(since)}
+        if meta.get("seeded_last_id") is not None:
+            id_range["$gt"] = meta["seeded_last_id"]
+
+        counts: Counter = Counter()
+        pending = 0
+        cursor = (
+            self.events.find({"_id": id_range}, {"job_id": 1, "action": 1})
+            .sort("_id", 1)
+            .batch_size(batch_size)
+        )
+        async for event in cursor:
+            pending += 1
+            created = getattr(event["_id"], "generation_time", None)
+            if created is not None and event.get("job_id") is not None:
+                day = event_day(created.replace(tzinfo=None))
+                counts[(str(event["job_id"]), day, normalize_action(event.get("action")))] += 1
+                seen += 1
+            if pending >= batch_size:
+                await self._seed_batch(counts, event["_id"], seen)
+                counts.clear()
+                pending = 0
+        if pending:
+            await self._seed_batch(counts, event["_id"], seen)
+        await self.counters.update_one(
+            {"_id": META_ID},
+            {"$set": {"seeded_at": datetime.utcnow(), "seeded_events": seen}},
+            upsert=True,
+        )
+        return seen
+
+    async def is_seeded(self) -> bool:
+        """Whether the counters were seeded from the events stored before them."""
+        meta = await self.counters.find_one({"_id": META_ID}) or {}
+        return bool(meta.get("seeded_at"))
+
+    async def _seed_batch(self, counts: Counter, last_id: ObjectId, seen: int) -> None:
+        if counts:
+            await self.counters.bulk_write(self.counter_operations(counts), ordered=False)
+        await self.counters.update_one(
+            {"_id": META_ID},
+            {"$set": {"seeded_last_id": last_id, "seeded_events": seen}},
+            upsert=True,
+        )
+
+
+async def job_interaction_counts(
+    db, job_id: str, since: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Per-action and per-day interaction totals of one job, from the counters."""
+    query: Dict[str, Any] = {"job_id": job_id}
+    if since is not None:
+        query["day"] = {"$gte": event_day(since)}
+    actions: Counter = Counter()
+    daily: Dict[str, int] = {}
+    async for doc in db[COUNTERS_COLLECTION].find(query).sort("day", 1):
+        actions.update(doc.get("actions", {}))
+        daily[doc["day"].strftime("%Y-%m-%d")] = doc.get("total", 0)
+    return {"total": sum(actions.values()), "actions": dict(actions), "daily": daily}
+
+
+_recorder: Optional[InteractionRecorder] = None
+
+
+def set_interaction_recorder(recorder: Optional[InteractionRecorder]) -> None:
+    global _recorder
+    _recorder = recorder
+
+
+def get_interaction_recorder() -> Optional[InteractionRecorder]:
+    """The running recorder, if one was started in this process."""
+    if _recorder is None or not _recorder.running:
+        return None
+    return _recorder
@@ -0,0 +1,548 @@
+import hashlib
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from backend.services.location_normalizer import (ZONES, geo_filters,
+                                                  normalize_location,
+                                                  resolve_country,
+                                                  resolve_regions)
+from backend.services.skill_taxonomy import lookup_skill, normalize_skills
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_COLLECTION = "job_analytics"
+META_ID = "meta"
+ANY = "*"
+# Bump when the bucket keys change so backfill reseeds the store
+BUCKET_VERSION = 2
+MAX_VALUE_LENGTH = 200
+WINDOWS = {"7d": 7, "30d": 30, "90d": 90}
+
+# Distinct companies: HyperLogLog with 2^10 registers (~3% standard error),
+# stored sparsely as {"<register>": rank} and merged with $max
+HLL_PRECISION = 10
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+
+# Salaries: DDSketch-style log buckets, quantiles within 1% relative error,
+# stored as {"<bucket>": count} and merged with $inc
+SALARY_ACCURACY = 0.01
+_GAMMA = (1 + SALARY_ACCURACY) / (1 - SALARY_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+MAX_SALARY = 10_000_000
+
+# Same yearly conversion as SalaryEstimationService.normalize_salary_to_yearly
+_PERIOD_FACTORS = {"yearly": 1, "monthly": 12, "hourly": 40 * 52}
+
+_CLUSTER_SPLIT_RE = re.compile(r"\s[-–—|/:]\s|[,(\[|]")
+_CLUSTER_NOISE_RE = re.compile(
+    r"\b(?:senior|sr|junior|jr|lead|principal|staff|mid|intermediate|entry|level|"
+    r"intern|trainee|i{1,3}|iv|remote|hybrid|on-?site|full[- ]time|part[- ]time|"
+    r"contract|freelance)\b\.?"
+)
+_CLUSTER_WORD_RE = re.compile(r"[\w+#]+(?:[.-][\w+#]+)*")
+
+# Zones spanning several regions get a key of their own, so a job is counted
+# once per zone instead of once per region it shares with the zone
+_ZONE_KEYS = {frozenset(regions): key for key, _, regions, _, _ in ZONES if len(regions) > 1}
+
+
+def title_cluster(title: Optional[str]) -> Optional[str]:
+    """
+    Group title variants into one role: "Senior Python Developer (Remote)"
+    and "Python Developer - Berlin" both become "python developer".
+    """
+    if not isinstance(title, str):
+        return None
+    head = _CLUSTER_SPLIT_RE.split(title, 1)[0].casefold()
+    words = _CLUSTER_WORD_RE.findall(_CLUSTER_NOISE_RE.sub(" ", head))
+    cluster = " ".join(words)[:MAX_VALUE_LENGTH]
+    return cluster or None
+
+
+def job_regions(job: Dict[str, Any]) -> List[str]:
+    """Region keys a job is counted under: countries, regions, city, remote."""
+    geo = job.get("geo")
+    if not isinstance(geo, dict):
+        location = job.get("location")
+        geo = normalize_location(location if isinstance(location, str) else None).to_document()
+    values = [f"country:{code}" for code in geo.get("countries") or []]
+    regions = set(geo.get("regions") or [])
+    values += [f"region:{key}" for key in geo.get("regions") or []]
+    values += [f"zone:{key}" for zone, key in _ZONE_KEYS.items() if zone & regions]
+    if geo.get("city"):
+        values.append(f"city:{geo['city']}")
+    if geo.get("remote"):
+        values.append("remote")
+    return list(dict.fromkeys(values))
+
+
+def _region_keys(regions: Tuple[str, ...]) -> Tuple[str, ...]:
+    if len(regions) > 1 and frozenset(regions) in _ZONE_KEYS:
+        return (f"zone:{_ZONE_KEYS[frozenset(regions)]}",)
+    return tuple(f"region:{key}" for key in regions)
+
+
+def location_regions(location: str) -> Tuple[str, ...]:
+    """
+    Region keys matching a location filter; empty if it cannot be resolved.
+    A single place or zone resolves to one key. Several keys mean a filter
+    naming several places, whose buckets overlap for jobs in more than one.
+    """
+    geo = normalize_location(location)
+    if geo.kind == "remote":
+        return ("remote",)
+    if geo.kind == "city":
+        return (f"city:{geo.city}",)
+    if geo.kind == "country":
+        return tuple(f"country:{code}" for code in geo.countries)
+    if geo.kind == "region":
+        return _region_keys(geo.regions)
+    code = resolve_country(location)
+    if code:
+        return (f"country:{code}",)
+    return _region_keys(resolve_regions(location))
+
+
+def resolve_level(value: str) -> str:
+    """Map an experience level filter to the levels stored by the title parser."""
+    from backend.services.job_title_parser import job_title_parser
+
+    value = value.strip().casefold()
+    if value in job_title_parser.levels:
+        return value
+    return job_title_parser.parse_job_title(value).level
+
+
+def job_salary(job: Dict[str, Any]) -> Optional[float]:
+    """Yearly midpoint of the job's salary range, if it has a usable one."""
+    values = [
+        job.get(key)
+        for key in ("salary_min", "salary_max")
+        if isinstance(job.get(key), (int, float)) and job.get(key) > 0
+    ]
+    if not values:
+        return None
+    factor = _PERIOD_FACTORS.get(job.get("salary_period") or "yearly", 1)
+    salary = sum(values) / len(values) * factor
+    return salary if salary <= MAX_SALARY else None
+
+
+def _company_register(company: str) -> Tuple[int, int]:
+    digest = hashlib.blake2b(company.strip().casefold().encode(), digest_size=8).digest()
+    value = int.from_bytes(digest, "big")
+    width = 64 - HLL_PRECISION
+    rest = value & ((1 << width) - 1)
+    return value >> width, width - rest.bit_length() + 1
+
+
+def estimate_distinct(registers: Dict[Any, int]) -> int:
+    """HyperLogLog cardinality estimate from sparse registers."""
+    if not registers:
+        return 0
+    empty = HLL_REGISTERS - len(registers)
+    total = empty + sum(2.0 ** -rank for rank in registers.values())
+    estimate = _HLL_ALPHA * HLL_REGISTERS ** 2 / total
+    if estimate <= 2.5 * HLL_REGISTERS and empty:
+        estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / empty)
+    return round(estimate)
+
+
+def _salary_bucket(salary: float) -> int:
+    return math.ceil(math.log(salary) / _LOG_GAMMA)
+
+
+def _bucket_value(index: int) -> float:
+    return 2 * _GAMMA ** index / (_GAMMA + 1)
+
+
+def _day(job: Dict[str, Any]) -> str:
+    created_at = job.get("created_at")
+    if not isinstance(created_at, datetime):
+        created_at = datetime.utcnow()
+    return created_at.strftime("%Y-%m-%d")
+
+
+def window_start(days: int, now: Optional[datetime] = None) -> str:
+    """First day (inclusive) of a window of ``days`` days ending today."""
+    return ((now or datetime.utcnow()) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+
+
+def _extreme(pick, current: Optional[float], value: Optional[float]) -> Optional[float]:
+    if value is None or current is None:
+        return current if value is None else value
+    return pick(current, value)
+
+
+@dataclass
+class AnalyticsBucket:
+    """Counts and sketches for one bucket, or several merged together."""
+
+    jobs: int = 0
+    companies: Dict[str, int] = field(default_factory=dict)
+    salaries: Dict[int, int] = field(default_factory=dict)
+    salary_sum: float = 0.0
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+
+    @property
+    def salary_count(self) -> int:
+        return sum(self.salaries.values())
+
+    def add_job(self, company: Optional[str], salary: Optional[float]) -> None:
+        self.jobs += 1
+        if isinstance(company, str) and company.strip():
+            register, rank = _company_register(company)
+            key = str(register)
+            self.companies[key] = max(self.companies.get(key, 0), rank)
+        if salary is not None:
+            index = _salary_bucket(salary)
+            self.salaries[index] = self.salaries.get(index, 0) + 1
+            self.salary_sum += salary
+            self.salary_min = _extreme(min, self.salary_min, salary)
+            self.salary_max = _extreme(max, self.salary_max, salary)
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any]) -> "AnalyticsBucket":
+        return cls(
+            jobs=doc.get("jobs", 0),
+            companies=dict(doc.get("hll") or {}),
+            salaries={int(key): count for key, count in (doc.get("salary") or {}).items()},
+            salary_sum=doc.get("salary_sum", 0.0),
+            salary_min=doc.get("salary_min"),
+            salary_max=doc.get("salary_max"),
+        )
+
+    def merge(self, other: "AnalyticsBucket") -> "AnalyticsBucket":
+        """Fold another bucket into this one."""
+        self.jobs += other.jobs
+        for key, rank in other.companies.items():
+            self.companies[key] = max(self.companies.get(key, 0), rank)
+        for index, count in other.salaries.items():
+            self.salaries[index] = self.salaries.get(index, 0) + count
+        self.salary_sum += other.salary_sum
+        self.salary_min = _extreme(min, self.salary_min, other.salary_min)
+        self.salary_max = _extreme(max, self.salary_max, other.salary_max)
+        return self
+
+    def update(self) -> Dict[str, Any]:
+        """Mongo update adding this bucket's contents to a stored document."""
+        inc: Dict[str, Any] = {"jobs": self.jobs}
+        update: Dict[str, Any] = {"$inc": inc}
+        if self.companies:
+            update["$max"] = {f"hll.{key}": rank for key, rank in self.companies.items()}
+        if self.salaries:
+            inc["salary_sum"] = self.salary_sum
+            inc.update({f"salary.{index}": count for index, count in self.salaries.items()})
+            update.setdefault("$max", {})["salary_max"] = self.salary_max
+            update["$min"] = {"salary_min": self.salary_min}
+        return update
+
+    @property
+    def distinct_companies(self) -> int:
+        return estimate_distinct(self.companies)
+
+    @property
+    def mean_salary(self) -> Optional[float]:
+        count = self.salary_count
+        return self.salary_sum / count if count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Salary at quantile ``q`` (within SALARY_ACCURACY of the exact value)."""
+        count = self.salary_count
+        if not count:
+            return None
+        rank = q * (count - 1)
+        seen = 0
+        for index in sorted(self.salaries):
+            seen += self.salaries[index]
+            if seen > rank:
+                value = _bucket_value(index)
+                return min(max(value, self.salary_min), self.salary_max)
+        return self.salary_max
+
+
+def trend(older: float, recent: float, tolerance: float) -> str:
+    if older <= 0:
+        return "increasing" if recent > 0 else "stable"
+    change = recent / older - 1
+    if change > tolerance:
+        return "increasing"
+    if change < -tolerance:
+        return "decreasing"
+    return "stable"
+
+
+class JobAnalyticsStore:
+    """
+    Day-bucketed market analytics in the ``job_analytics`` collection.
+
+    Every ingested job adds to one bucket per skill and one per segment
+    (title cluster x region x level, each also rolled up under ``*``). A
+    bucket holds the job count, a HyperLogLog sketch of distinct companies
+    and a log-bucket salary sketch, so 7d/30d/90d windows are answered by
+    merging at most 90 small documents per key instead of scanning jobs.
+    Buckets are append-only: they describe postings seen per day and are
+    not decremented when jobs are archived.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[ANALYTICS_COLLECTION]
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_index([("dimension", 1), ("day", 1)])
+            await self.collection.create_index(
+                [("dimension", 1), ("region", 1), ("level", 1), ("day", 1)]
+            )
+        except Exception as e:
+            logger.warning(f"Could not create job_analytics indexes: {e}")
+
+    def _bucket_keys(self, job: Dict[str, Any]) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        day = _day(job)
+        listed = [
+            value
+            for key in ("skills", "skills_required")
+            if isinstance(job.get(key), list)
+            for value in job[key]
+        ]
+        for name in normalize_skills(listed):
+            skill = lookup_skill(name)
+            key = skill.key if skill else name.casefold()[:MAX_VALUE_LENGTH]
+            yield f"{day}|skill|{key}", {
+                "day": day, "dimension": "skill", "value": key, "label": name,
+            }
+
+        cluster = title_cluster(job.get("title"))
+        level = job.get("job_title_level") or "unknown"
+        for c in ([cluster, ANY] if cluster else [ANY]):
+            for region in job_regions(job) + [ANY]:
+                for lvl in (level, ANY):
+                    yield f"{day}|segment|{c}|{region}|{lvl}", {
+                        "day": day, "dimension": "segment",
+                        "cluster": c, "region": region, "level": lvl,
+                    }
+
+    async def _apply(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        buckets: Dict[str, AnalyticsBucket] = {}
+        fields: Dict[str, Dict[str, Any]] = {}
+        count = 0
+        for job in jobs:
+            count += 1
+            company = job.get("company")
+            salary = job_salary(job)
+            for bucket_id, bucket_fields in self._bucket_keys(job):
+                if bucket_id not in buckets:
+                    buckets[bucket_id] = AnalyticsBucket()
+                    fields[bucket_id] = bucket_fields
+                buckets[bucket_id].add_job(company, salary)
+
+        if not buckets:
+            return 0
+        operations = [
+            UpdateOne(
+                {"_id": bucket_id},
+                dict(bucket.update(), **{"$setOnInsert": fields[bucket_id]}),
+                upsert=True,
+            )
+            for bucket_id, bucket in buckets.items()
+        ]
+        for start in range(0, len(operations), 1000):
+            await self.collection.bulk_write(operations[start:start + 1000], ordered=False)
+        return count
+
+    async def on_jobs_ingested(self, jobs: List[Dict[str, Any]]) -> None:
+        """Post-ingest hook: add newly inserted jobs to their day buckets."""
+        await self._apply(jobs)
+
+    async def backfill(self, days: int = 90, batch_size: int = 1000, force: bool = False) -> int:
+        """
+        Seed the store from jobs created in the last ``days`` days.
+
+        Runs once per BUCKET_VERSION: archived jobs are gone from ``db.jobs``,
+        so reseeding a populated store would lose history; ``force`` reseeds
+        anyway. Buckets written by ingest before the first seed are replaced,
+        since those jobs are in ``db.jobs`` too.
+        """
+        if not force and await self.is_seeded():
+            return 0
+        await self.ensure_indexes()
+        await self.collection.delete_many({})
+
+        since = datetime.utcnow() - timedelta(days=days)
+        projection = {
+            "title": 1, "company": 1, "created_at": 1, "skills": 1, "skills_required": 1,
+            "job_title_level": 1, "geo": 1, "location": 1,
+            "salary_min": 1, "salary_max": 1, "salary_period": 1,
+        }
+        cursor = self.db.jobs.find({"created_at": {"$gte": since}}, projection)
+        seeded = 0
+        batch: List[Dict[str, Any]] = []
+        async for job in cursor:
+            batch.append(job)
+            if len(batch) >= batch_size:
+                seeded += await self._apply(batch)
+                batch = []
+        if batch:
+            seeded += await self._apply(batch)
+
+        await self.collection.replace_one(
+            {"_id": META_ID},
+            {
+                "_id": META_ID,
+                "seeded_at": datetime.utcnow(),
+                "seeded_jobs": seeded,
+                "version": BUCKET_VERSION,
+            },
+            upsert=True,
+        )
+        logger.info(f"Seeded job analytics from {seeded} jobs")
+        return seeded
+
+    async def is_seeded(self) -> bool:
+        """Whether the store was seeded with the current bucket keys."""
+        meta = await self.collection.find_one({"_id": META_ID}) or {}
+        return meta.get("version") == BUCKET_VERSION
+
+    async def _halves(self, query: Dict[str, Any], days: int) -> Tuple[AnalyticsBucket, AnalyticsBucket]:
+        """Merge matching buckets into the older and the recent half of the window."""
+        since = window_start(days)
+        middle = window_start(days - days // 2)
+        older, recent = AnalyticsBucket(), AnalyticsBucket()
+        async for doc in self.collection.find(dict(query, day={"$gte": since})):
+            (recent if doc["day"] >= middle else older).merge(AnalyticsBucket.from_document(doc))
+        return older, recent
+
+    async def _scan_halves(
+        self, location: str, cluster: Optional[str], level: Optional[str], days: int
+    ) -> Tuple[AnalyticsBucket, AnalyticsBucket]:
+        """
+        Like ``_halves``, from the matching jobs themselves. Used for filters
+        naming several places: their buckets overlap, and adding them up
+        would count a job listed in two of the places twice.
+        """
+        since = window_start(days)
+        middle = window_start(days - days // 2)
+        query = {
+            "$and": geo_filters(location=location)
+            + [{"created_at": {"$gte": datetime.strptime(since, "%Y-%m-%d")}}]
+        }
+        projection = {
+            "title": 1, "company": 1, "created_at": 1, "job_title_level": 1,
+            "salary_min": 1, "salary_max": 1, "salary_period": 1,
+        }
+        older, recent = AnalyticsBucket(), AnalyticsBucket()
+        async for job in self.db.jobs.find(query, projection):
+            if cluster and cluster not in (title_cluster(job.get("title")) or ""):
+                continue
+            if level and (job.get("job_title_level") or "unknown") != level:
+                continue
+            (recent if _day(job) >= middle else older).add_job(job.get("company"), job_salary(job))
+        return older, recent
+
+    async def skills_demand(self, days: int = 30, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most demanded skills over the last ``days`` days."""
+        since = window_start(days)
+        pipeline = [
+            {"$match": {"dimension": "skill", "day": {"$gte": since}}},
+            {"$group": {"_id": "$value", "jobs": {"$sum": "$jobs"}, "label": {"$first": "$label"}}},
+            {"$sort": {"jobs": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        top = [row async for row in self.collection.aggregate(pipeline)]
+        if not top:
+            return []
+
+        older = {row["_id"]: AnalyticsBucket() for row in top}
+        recent = {row["_id"]: AnalyticsBucket() for row in top}
+        middle = window_start(days - days // 2)
+        query = {"dimension": "skill", "value": {"$in": list(older)}, "day": {"$gte": since}}
+        async for doc in self.collection.find(query):
+            half = recent if doc["day"] >= middle else older
+            half[doc["value"]].merge(AnalyticsBucket.from_document(doc))
+
+        older_days, recent_days = days // 2 or 1, days - days // 2
+        result = []
+        for row in top:
+            key = row["_id"]
+            merged = AnalyticsBucket().merge(older[key]).merge(recent[key])
+            skill = lookup_skill(key)
+            result.append({
+                "skill": skill.name if skill else row.get("label") or key,
+                "demand_count": merged.jobs,
+                "average_salary": round(merged.mean_salary or 0),
+                "median_salary": round(merged.quantile(0.5) or 0),
+                "company_count": merged.distinct_companies,
+                "trend": trend(
+                    older[key].jobs / older_days, recent[key].jobs / recent_days, 0.1
+                ),
+            })
+        return result
+
+    async def salary_insights(
+        self,
+        days: int = 90,
+        position: Optional[str] = None,
+        location: Optional[str] = None,
+        experience_level: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Salary distribution for a segment, or None if nothing matches. Each
+        job is counted once: the location resolves to one region key, and a
+        filter naming several places is answered from the jobs instead.
+        """
+        query: Dict[str, Any] = {"dimension": "segment", "cluster": ANY, "region": ANY, "level": ANY}
+        cluster = title_cluster(position)
+        if cluster:
+            query["cluster"] = {"$regex": re.escape(cluster), "$ne": ANY}
+        regions: Tuple[str, ...] = ()
+        if location and location.strip():
+            regions = location_regions(location)
+            if not regions:
+                return None
+            query["region"] = regions[0]
+        level = None
+        if experience_level and experience_level.strip():
+            level = resolve_level(experience_level)
+            if level == "unknown" and experience_level.strip().casefold() != "unknown":
+                return None
+            query["level"] = level
+
+        if len(regions) > 1:
+            older, recent = await self._scan_halves(location, cluster, level, days)
+        else:
+            older, recent = await self._halves(query, days)
+        merged = AnalyticsBucket().merge(older).merge(recent)
+        if not merged.jobs:
+            return None
+
+        percentiles = {
+            f"{int(q * 100)}th": round(merged.quantile(q)) if merged.salary_count else None
+            for q in (0.25, 0.5, 0.75, 0.9)
+        }
+        older_median, recent_median = older.quantile(0.5), recent.quantile(0.5)
+        return {
+            "average_salary": round(merged.mean_salary or 0),
+            "salary_range": {
+                "min": round(merged.salary_min or 0),
+                "max": round(merged.salary_max or 0),
+            },
+            "median_salary": percentiles["50th"] or 0,
+            "total_jobs_analyzed": merged.jobs,
+            "jobs_with_salary": merged.salary_count,
+            "companies_offering": merged.distinct_companies,
+            "market_trend": (
+                trend(older_median, recent_median, 0.03)
+                if older_median and recent_median
+                else "stable"
+            ),
+            "percentiles": percentiles,
+        }
+
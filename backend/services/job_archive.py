@@ -0,0 +1,425 @@
+import asyncio
+import gzip
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import json_util
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.job_scheduler import LEASES_COLLECTION
+from backend.services.retention_rules import RetentionRule, get_rule
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_COLLECTION = "archive_checkpoints"
+ARCHIVE_COLLECTION = "jobs_archive"
+
+Chunk = List[Dict[str, Any]]
+RemovalHook = Callable[[Chunk], Awaitable[Any]]
+
+
+class ArchiveVerificationError(Exception):
+    """An archived chunk could not be read back; nothing was deleted."""
+
+
+class ArchiveInProgressError(Exception):
+    """Another run of the same archiver holds its lease."""
+
+    status_code = 409
+
+
+async def throttle(count: int, started: float, max_rate: Optional[float]) -> None:
+    """Sleep so ``count`` documents since ``started`` stay under ``max_rate`` per second."""
+    if not max_rate:
+        return
+    loop = asyncio.get_running_loop()
+    delay = count / max_rate - (loop.time() - started)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+class ArchiveSink:
+    """Destination for archived jobs.
+
+    ``write`` returning normally means the chunk is durably archived; only
+    then are the jobs deleted. A chunk may be written again after a crash
+    between ``write`` and the checkpoint, so sinks should be idempotent per
+    ``(run_id, chunk_index)`` where they can.
+    """
+
+    name = "sink"
+
+    async def write(self, jobs: Chunk, run_id: str, chunk_index: int) -> None:
+        raise NotImplementedError
+
+    async def verify(self, jobs: Chunk, run_id: str, chunk_index: int) -> bool:
+        """Whether the written chunk can be read back; sinks that cannot check trust ``write``."""
+        return True
+
+
+class JsonlArchiveSink(ArchiveSink):
+    """One gzip-compressed JSON Lines file per chunk (Extended JSON)."""
+
+    name = "jsonl"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for(self, run_id: str, chunk_index: int) -> str:
+        return os.path.join(self.directory, f"jobs-{run_id}-{chunk_index:06d}.jsonl.gz")
+
+    def _write_file(self, jobs: Chunk, path: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        partial = f"{path}.partial"
+        with gzip.open(partial, "wt", encoding="utf-8") as f:
+            for job in jobs:
+                f.write(json_util.dumps(job))
+                f.write("\n")
+        with open(partial, "rb") as f:
+            os.fsync(f.fileno())
+        # Rename last, so a file that exists is always complete
+        os.replace(partial, path)
+
+    async def write(self, jobs: Chunk, run_id: str, chunk_index: int) -> None:
+        await asyncio.to_thread(self._write_file, jobs, self.path_for(run_id, chunk_index))
+
+    def _count_lines(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    async def verify(self, jobs: Chunk, run_id: str, chunk_index: int) -> bool:
+        path = self.path_for(run_id, chunk_index)
+        return await asyncio.to_thread(self._count_lines, path) == len(jobs)
+
+
+class CollectionArchiveSink(ArchiveSink):
+    """Copies jobs into a separate collection, keyed on the original ``_id``."""
+
+    name = "collection"
+
+    def __init__(self, db, collection: str = ARCHIVE_COLLECTION):
+        self.collection = db[collection]
+
+    async def write(self, jobs: Chunk, run_id: str, chunk_index: int) -> None:
+        archived_at = datetime.utcnow()
+        await self.collection.bulk_write(
+            [
+                ReplaceOne(
+                    {"_id": job["_id"]},
+                    {**job, "archived_at": archived_at, "archive_run": run_id},
+                    upsert=True,
+                )
+                for job in jobs
+            ],
+            ordered=False,
+        )
+
+    async def verify(self, jobs: Chunk, run_id: str, chunk_index: int) -> bool:
+        landed = await self.collection.count_documents(
+            {"_id": {"$in": [job["_id"] for job in jobs]}, "archive_run": run_id}
+        )
+        return landed == len(jobs)
+
+
+class SheetsArchiveSink(ArchiveSink):
+    """Appends one row per job to the "Archived Jobs" sheet.
+
+    Appends are not idempotent: a chunk replayed after a crash shows up twice.
+    """
+
+    name = "sheets"
+
+    def __init__(self, spreadsheet_id: Optional[str] = None):
+        self.spreadsheet_id = spreadsheet_id or os.getenv("GOOGLE_SHEETS_ID")
+        self._service = None
+
+    def _get_service(self):
+        if self._service is None:
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+
+            creds = Credentials.from_authorized_user_info(
+                {
+                    "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+                    "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
+                    "refresh_token": os.getenv("GOOGLE_REFRESH_TOKEN"),
+                }
+            )
+            self._service = build("sheets", "v4", credentials=creds)
+        return self._service
+
+    @staticmethod
+    def row(job: Dict[str, Any]) -> List[str]:
+        created_at = job.get("created_at")
+        return [
+            job.get("title", ""),
+            job.get("company", ""),
+            job.get("location", ""),
+            job.get("description", ""),
+            created_at.isoformat() if isinstance(created_at, datetime) else str(created_at or ""),
+            job.get("url", ""),
+        ]
+
+    def _append(self, rows: List[List[str]]) -> None:
+        (
+            self._get_service()
+            .spreadsheets()
+            .values()
+            .append(
+                spreadsheetId=self.spreadsheet_id,
+                range="Archived Jobs!A:F",
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body={"values": rows},
+            )
+            .execute()
+        )
+
+    async def write(self, jobs: Chunk, run_id: str, chunk_index: int) -> None:
+        await asyncio.to_thread(self._append, [self.row(job) for job in jobs])
+
+
+def build_archive_sink(db, kind: Optional[str] = None) -> ArchiveSink:
+    """Sink selected by ``ARCHIVE_SINK`` (sheets, collection or jsonl)."""
+    kind = (kind or os.getenv("ARCHIVE_SINK", "sheets")).lower()
+    if kind == "collection":
+        return CollectionArchiveSink(db)
+    if kind == "jsonl":
+        return JsonlArchiveSink(os.getenv("ARCHIVE_DIR", "archive"))
+    if kind == "sheets":
+        return SheetsArchiveSink()
+    raise ValueError(f"Unknown archive sink: {kind}")
+
+
+def default_removal_hooks(db) -> List[RemovalHook]:
+    from backend.services.job_stats_materializer import JobStatsMaterializer
+    from backend.services.location_index import LocationIndex
+
+    return [JobStatsMaterializer(db).on_jobs_removed, LocationIndex(db).on_jobs_removed]
+
+
+@dataclass
+class ArchiveReport:
+    run_id: str
+    sink: str
+    cutoff: datetime
+    archived: int = 0
+    chunks: int = 0
+    resumed: bool = False
+    completed: bool = False
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "sink": self.sink,
+            "cutoff": self.cutoff.isoformat(),
+            "archived": self.archived,
+            "chunks": self.chunks,
+            "resumed": self.resumed,
+            "completed": self.completed,
+            "seconds": round(self.seconds, 2),
+            "errors": self.errors,
+        }
+
+
+class JobArchiver:
+    """
+    Moves documents past their retention rule (jobs by default) into an
+    archive sink in ``_id``-ordered chunks.
+
+    Each chunk is written to the sink, read back, checkpointed with its ids,
+    then deleted with a bounded ``$in``. A run that stops part-way (error,
+    crash or ``max_chunks``) leaves a ``running`` checkpoint; the next run
+    resumes from it, first finishing the delete of a chunk that was archived
+    but not yet removed. Documents are only ever deleted after their chunk
+    was confirmed. ``max_rate`` caps documents per second so long runs do
+    not crowd out foreground queries. A run holds the ``archive:<name>``
+    lease in ``scheduler_leases``, so the retention job and the admin
+    endpoint never work on the same checkpoint at once.
+    """
+
+    def __init__(
+        self,
+        db,
+        sink: ArchiveSink,
+        days: Optional[int] = None,
+        chunk_size: int = 500,
+        name: Optional[str] = None,
+        hooks: Optional[List[RemovalHook]] = None,
+        rule: Optional[RetentionRule] = None,
+        max_rate: Optional[float] = None,
+        lease_seconds: int = 600,
+    ):
+        self.db = db
+        self.sink = sink
+        self.rule = rule or get_rule("jobs")
+        self.days = self.rule.keep_days if days is None else days
+        self.chunk_size = chunk_size
+        self.name = name or self.rule.collection
+        self.collection = db[self.rule.collection]
+        if hooks is None:
+            hooks = default_removal_hooks(db) if self.rule.collection == "jobs" else []
+        self.hooks = hooks
+        self.max_rate = max_rate
+        self.checkpoints = db[CHECKPOINT_COLLECTION]
+        self.leases = db[LEASES_COLLECTION]
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    @property
+    def lease_id(self) -> str:
+        return f"archive:{self.name}"
+
+    async def _lease(self) -> bool:
+        """Take or renew this archiver's lease; False while another run holds it."""
+        now = datetime.utcnow()
+        try:
+            await self.leases.update_one(
+                {
+                    "_id": self.lease_id,
+                    "$or": [{"owner": self.owner}, {"owner": None}, {"lease_until": {"$lt": now}}],
+                },
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "lease_until": now + timedelta(seconds=self.lease_seconds),
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def _release(self) -> None:
+        await self.leases.update_one(
+            {"_id": self.lease_id, "owner": self.owner},
+            {"$set": {"owner": None, "lease_until": None}},
+        )
+
+    async def _checkpoint(self, **fields) -> None:
+        await self.checkpoints.update_one(
+            {"_id": self.name},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def _start(self) -> Dict[str, Any]:
+        state = await self.checkpoints.find_one({"_id": self.name})
+        if state and state.get("status") == "running":
+            return state
+        now = datetime.utcnow()
+        state = {
+            "run_id": now.strftime("%Y%m%dT%H%M%S"),
+            "sink": self.sink.name,
+            "cutoff": self.rule.cutoff(now, self.days),
+            "last_id": None,
+            "pending_ids": [],
+            "archived": 0,
+            "chunks": 0,
+            "status": "running",
+            "started_at": now,
+        }
+        await self._checkpoint(**state)
+        return state
+
+    async def _remove(self, ids: List[Any], jobs: Optional[Chunk] = None) -> None:
+        if jobs is None:
+            jobs = await self.collection.find({"_id": {"$in": ids}}).to_list(length=len(ids))
+        await self.collection.delete_many({"_id": {"$in": ids}})
+        await self._checkpoint(pending_ids=[])
+        for hook in self.hooks:
+            try:
+                await hook(jobs)
+            except Exception as e:
+                logger.warning(f"Archive removal hook failed: {e}")
+
+    async def run(self, max_chunks: Optional[int] = None) -> ArchiveReport:
+        if not await self._lease():
+            raise ArchiveInProgressError(f"Archiving {self.name} is already running")
+        try:
+            return await self._run(max_chunks)
+        finally:
+            await self._release()
+
+    async def _run(self, max_chunks: Optional[int]) -> ArchiveReport:
+        started = datetime.utcnow()
+        state = await self._start()
+        report = ArchiveReport(
+            run_id=state["run_id"],
+            sink=self.sink.name,
+            cutoff=state["cutoff"],
+            archived=state.get("archived", 0),
+            chunks=state.get("chunks", 0),
+            resumed=bool(state.get("chunks") or state.get("pending_ids")),
+        )
+
+        try:
+            if state.get("pending_ids"):
+                # Archived before the last run stopped, but not yet deleted
+                await self._remove(state["pending_ids"])
+
+            last_id = state.get("last_id")
+            done = 0
+            loop = asyncio.get_running_loop()
+            while max_chunks is None or done < max_chunks:
+                chunk_started = loop.time()
+                query = self.rule.query(state["cutoff"])
+                if last_id is not None:
+                    query["_id"] = {"$gt": last_id}
+                chunk = (
+                    await self.collection.find(query)
+                    .sort("_id", 1)
+                    .limit(self.chunk_size)
+                    .to_list(length=self.chunk_size)
+                )
+                if not chunk:
+                    report.completed = True
+                    break
+
+                await self.sink.write(chunk, report.run_id, report.chunks)
+                if not await self.sink.verify(chunk, report.run_id, report.chunks):
+                    raise ArchiveVerificationError(
+                        f"Chunk {report.chunks} of {self.name} did not land in {self.sink.name}"
+                    )
+                ids = [job["_id"] for job in chunk]
+                last_id = ids[-1]
+                report.archived += len(chunk)
+                report.chunks += 1
+                await self._checkpoint(
+                    last_id=last_id,
+                    pending_ids=ids,
+                    archived=report.archived,
+                    chunks=report.chunks,
+                )
+                await self._remove(ids, chunk)
+                if not await self._lease():
+                    raise ArchiveInProgressError(f"Lost the {self.lease_id} lease")
+                done += 1
+                await throttle(len(chunk), chunk_started, self.max_rate)
+
+            if report.completed:
+                await self._checkpoint(status="completed", completed_at=datetime.utcnow())
+        except Exception as e:
+            report.errors.append(str(e))
+            logger.error(f"Archiving {self.name} stopped after {report.chunks} chunks: {e}")
+            await self._checkpoint(last_error=str(e))
+            raise
+        finally:
+            report.seconds = (datetime.utcnow() - started).total_seconds()
+
+        logger.info(
+            f"Archived {report.archived} {self.name} in {report.chunks} chunks to {self.sink.name}"
+            + ("" if report.completed else " (paused, will resume)")
+        )
+        return report
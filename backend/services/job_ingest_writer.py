@@ -0,0 +1,232 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Fields that change on every crawl and must not influence the content hash
+VOLATILE_FIELDS = (
+    "_id",
+    "created_at",
+    "updated_at",
+    "last_updated",
+    "last_seen_at",
+    "content_hash",
+)
+
+# Fields that are only written when the document is first inserted
+INSERT_ONLY_FIELDS = ("created_at", "posted_at")
+
+INGEST_KEY_FIELDS = ("source", "source_id")
+
+
+@dataclass
+class IngestWriteResult:
+    """Counts reported by a bulk ingest write."""
+
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    upserted_ids: Dict[Tuple[Any, ...], Any] = field(default_factory=dict)
+
+    def merge(self, other: "IngestWriteResult") -> None:
+        self.received += other.received
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.failed += other.failed
+        self.upserted_ids.update(other.upserted_ids)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+        }
+
+
+def compute_content_hash(document: Dict[str, Any]) -> str:
+    """Stable hash of a transformed job document, ignoring volatile fields."""
+    payload = {k: v for k, v in document.items() if k not in VOLATILE_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+class JobIngestWriter:
+    """
+    Writes transformed job documents with one unordered bulk upsert per batch.
+
+    Documents are keyed on ``(source, source_id)``. Before writing, the stored
+    content hashes for the batch are fetched with a single projected query so
+    that unchanged documents are not rewritten; they only get ``last_seen_at``
+    bumped with one ``update_many`` so staleness checks keep working.
+
+    With ``url_history`` each written apply URL is also added to the job's
+    ``application_urls`` as ``{url, source}``.
+    """
+
+    def __init__(
+        self,
+        collection,
+        key_fields: Tuple[str, ...] = INGEST_KEY_FIELDS,
+        batch_size: int = 500,
+        url_history: bool = False,
+    ):
+        self.collection = collection
+        self.key_fields = tuple(key_fields)
+        self.batch_size = batch_size
+        self.url_history = url_history
+
+    async def ensure_indexes(self) -> None:
+        """Create the unique compound index that backs the upsert key."""
+        try:
+            await self.collection.create_index(
+                [(name, 1) for name in self.key_fields],
+                unique=True,
+                name="_".join(self.key_fields) + "_unique",
+                partialFilterExpression={
+                    name: {"$exists": True} for name in self.key_fields
+                },
+            )
+        except Exception as e:
+            logger.warning(f"Could not create ingest key index: {e}")
+
+    def _key(self, document: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(document.get(name) for name in self.key_fields)
+
+    def _keys_query(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build one query matching the keys of every document in a batch."""
+        if len(self.key_fields) == 2:
+            first, second = self.key_fields
+            by_first: Dict[Any, List[Any]] = {}
+            for doc in documents:
+                by_first.setdefault(doc.get(first), []).append(doc.get(second))
+            clauses = [
+                {first: value, second: {"$in": seconds}}
+                for value, seconds in by_first.items()
+            ]
+        else:
+            clauses = [
+                {name: doc.get(name) for name in self.key_fields} for doc in documents
+            ]
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    async def _stored_hashes(
+        self, documents: List[Dict[str, Any]]
+    ) -> Dict[Tuple[Any, ...], Optional[str]]:
+        """Fetch existing content hashes for a batch in one round-trip."""
+        query = self._keys_query(documents)
+        projection = {name: 1 for name in self.key_fields}
+        projection["content_hash"] = 1
+        cursor = self.collection.find(query, projection)
+        existing = await cursor.to_list(length=None)
+        return {self._key(doc): doc.get("content_hash") for doc in existing}
+
+    def _build_operation(
+        self, document: Dict[str, Any], content_hash: str, now: datetime
+    ) -> UpdateOne:
+        to_set = {
+            k: v
+            for k, v in document.items()
+            if k not in INSERT_ONLY_FIELDS and k != "_id"
+        }
+        to_set["content_hash"] = content_hash
+        to_set["updated_at"] = now
+        to_set["last_seen_at"] = now
+
+        on_insert = {
+            k: document[k] for k in INSERT_ONLY_FIELDS if document.get(k) is not None
+        }
+        on_insert.setdefault("created_at", now)
+        on_insert.setdefault("posted_at", now)
+
+        update: Dict[str, Any] = {"$set": to_set, "$setOnInsert": on_insert}
+        if self.url_history:
+            to_set.pop("application_urls", None)
+            apply_url = document.get("apply_url") or document.get("url")
+            if apply_url:
+                update["$addToSet"] = {
+                    "application_urls": {"url": apply_url, "source": document.get("source_url")}
+                }
+
+        return UpdateOne(
+            {name: document.get(name) for name in self.key_fields},
+            update,
+            upsert=True,
+        )
+
+    async def _write_batch(self, documents: List[Dict[str, Any]]) -> IngestWriteResult:
+        result = IngestWriteResult(received=len(documents))
+
+        # Last occurrence wins when a feed repeats the same key
+        unique: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for doc in documents:
+            unique[self._key(doc)] = doc
+        result.unchanged += len(documents) - len(unique)
+
+        stored = await self._stored_hashes(list(unique.values()))
+        now = datetime.utcnow()
+
+        operations = []
+        operation_keys = []
+        unchanged_docs = []
+        for key, doc in unique.items():
+            content_hash = compute_content_hash(doc)
+            if stored.get(key) == content_hash:
+                unchanged_docs.append(doc)
+                continue
+            operations.append(self._build_operation(doc, content_hash, now))
+            operation_keys.append(key)
+
+        result.unchanged += len(unchanged_docs)
+        if unchanged_docs:
+            await self.collection.update_many(
+                self._keys_query(unchanged_docs), {"$set": {"last_seen_at": now}}
+            )
+
+        if not operations:
+            return result
+
+        try:
+            bulk_result = await self.collection.bulk_write(operations, ordered=False)
+            details = bulk_result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            result.failed += len(details.get("writeErrors", []))
+            logger.warning(
+                f"Bulk ingest write had {result.failed} errors: "
+                f"{details.get('writeErrors', [])[:1]}"
+            )
+
+        inserted = details.get("nUpserted", 0)
+        matched = details.get("nMatched", 0)
+        modified = details.get("nModified", 0)
+        result.inserted += inserted
+        result.updated += modified
+        result.unchanged += matched - modified
+        for upserted in details.get("upserted", []):
+            result.upserted_ids[operation_keys[upserted["index"]]] = upserted["_id"]
+        return result
+
+    async def write(self, documents: Iterable[Dict[str, Any]]) -> IngestWriteResult:
+        """Upsert documents in batches and return aggregated bulk counts."""
+        total = IngestWriteResult()
+        batch: List[Dict[str, Any]] = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                total.merge(await self._write_batch(batch))
+                batch = []
+        if batch:
+            total.merge(await self._write_batch(batch))
+        return total
@@ -0,0 +1,509 @@
+import asyncio
+import inspect
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+LEASES_COLLECTION = "scheduler_leases"
+RUNS_COLLECTION = "scheduler_logs"
+
+
+class UnknownJob(KeyError):
+    """Raised when triggering a job that is not registered."""
+
+
+class CronSchedule:
+    """
+    Five-field cron expression (minute hour day-of-month month day-of-week)
+    evaluated in UTC. Fields accept ``*``, lists, ranges and ``/step``; day
+    of week runs 0-7 with both 0 and 7 meaning Sunday. As in cron, when
+    both day fields are restricted a day matching either one fires.
+    """
+
+    _FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        values = [self._parse(part, low, high) for part, (low, high) in zip(parts, self._FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = parts[2].startswith("*")
+        self._any_weekday = parts[4].startswith("*")
+
+    @staticmethod
+    def _parse(part: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in part.split(","):
+            body, _, step = item.partition("/")
+            if body == "*":
+                start, end = low, high
+            elif "-" in body:
+                start, end = (int(value) for value in body.split("-", 1))
+            else:
+                start = int(body)
+                end = high if step else start
+            step = int(step) if step else 1
+            if not (low <= start <= end <= high) or step < 1:
+                raise ValueError(f"Invalid cron field {item!r} (allowed {low}-{high})")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, when: datetime) -> bool:
+        day = when.day in self.days
+        weekday = (when.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, after: datetime) -> datetime:
+        when = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after + timedelta(days=366 * 5)
+        while when <= limit:
+            if when.month not in self.months:
+                year, month = divmod(when.month, 12)
+                when = when.replace(
+                    year=when.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(when):
+                when = (when + timedelta(days=1)).replace(hour=0, minute=0)
+            elif when.hour not in self.hours:
+                when = (when + timedelta(hours=1)).replace(minute=0)
+            elif when.minute not in self.minutes:
+                when += timedelta(minutes=1)
+            else:
+                return when
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __str__(self) -> str:
+        return f"cron[{self.expression}]"
+
+
+class IntervalSchedule:
+    """Fixed interval between runs, counted from when the schedule is evaluated."""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.interval = timedelta(seconds=seconds)
+
+    def next_after(self, after: datetime) -> datetime:
+        return after + self.interval
+
+    def __str__(self) -> str:
+        return f"interval[{self.interval}]"
+
+
+class OnDemandSchedule:
+    """Never due by itself: the job only runs when triggered (e.g. one-shot seeds)."""
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        return None
+
+    def __str__(self) -> str:
+        return "on demand"
+
+
+Schedule = Union[CronSchedule, IntervalSchedule, OnDemandSchedule]
+
+
+@dataclass
+class ScheduledJob:
+    """
+    A job the scheduler runs on ``schedule``.
+
+    ``jitter`` adds up to that many seconds to every computed run time so
+    jobs sharing a schedule do not all fire on the same second.
+    ``max_instances`` caps concurrent runs in this process; ``exclusive``
+    jobs additionally hold a lease in MongoDB while running, so each
+    scheduled occurrence runs on exactly one worker of the deployment.
+    ``heavy`` jobs run on the scheduler's JobExecutor instead of the
+    request-serving event loop and receive its database as ``db``.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    schedule: Schedule
+    description: str = ""
+    jitter: float = 0.0
+    max_instances: int = 1
+    exclusive: bool = True
+    heavy: bool = False
+    timeout: Optional[float] = None
+    paused: bool = False
+    next_run: Optional[datetime] = None
+    running: int = field(default=0, init=False)
+
+    def compute_next(self, after: datetime) -> Optional[datetime]:
+        when = self.schedule.next_after(after)
+        if when is not None and self.jitter:
+            when += timedelta(seconds=random.uniform(0, self.jitter))
+        return when
+
+
+class JobExecutor:
+    """
+    A dedicated thread running its own event loop for heavy jobs.
+
+    Motor clients are bound to the loop they first run on, so jobs running
+    here get their own database handle from ``database_factory`` (called
+    once, on the executor's loop) rather than the application's client.
+    """
+
+    def __init__(
+        self, database_factory: Optional[Callable[[], Any]] = None, name: str = "scheduler-jobs"
+    ):
+        self.database_factory = database_factory
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._db = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=self.name, daemon=True)
+        self._thread.start()
+
+    async def _invoke(self, func: Callable[..., Any], with_db: bool) -> Any:
+        kwargs = {}
+        if with_db and self.database_factory is not None:
+            if self._db is None:
+                self._db = self.database_factory()
+            kwargs["db"] = self._db
+        result = func(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def run(self, func: Callable[..., Any], with_db: bool = False) -> Any:
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._invoke(func, with_db), self.loop)
+        return await asyncio.wrap_future(future)
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        if self._db is not None and hasattr(self._db, "client"):
+            self.loop.call_soon_threadsafe(self._db.client.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+        if not self._thread.is_alive():
+            self.loop.close()
+        self._thread = None
+        self._db = None
+
+
+class JobScheduler:
+    """
+    Asyncio scheduler for periodic jobs shared by every API worker.
+
+    Exclusive jobs keep one document per job in ``scheduler_leases`` holding
+    the deployment-wide ``next_run``. A worker runs an occurrence only after
+    claiming that document with a conditional ``find_one_and_update`` while
+    it is due and unleased; the holder renews the lease while the job runs
+    and moves ``next_run`` forward on release, so other workers skip the
+    occurrence and a crashed worker's job is retried once its lease expires.
+    Every run is recorded in ``scheduler_logs`` with its duration.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        owner: Optional[str] = None,
+        lease_seconds: int = 120,
+        poll_interval: float = 5.0,
+        executor: Optional[JobExecutor] = None,
+    ):
+        self.db = db
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.executor = executor
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.running = False
+        self._loop_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._synced: Set[str] = set()
+
+    @property
+    def leases(self):
+        return self.db[LEASES_COLLECTION] if self.db is not None else None
+
+    def add_job(self, job: ScheduledJob) -> ScheduledJob:
+        if job.next_run is None:
+            job.next_run = job.compute_next(datetime.utcnow())
+        self.jobs[job.name] = job
+        self._synced.discard(job.name)
+        return job
+
+    def remove_job(self, name: str) -> bool:
+        return self.jobs.pop(name, None) is not None
+
+    def get_job(self, name: str) -> ScheduledJob:
+        try:
+            return self.jobs[name]
+        except KeyError:
+            raise UnknownJob(name)
+
+    async def ensure_indexes(self) -> None:
+        if self.db is None:
+            return
+        try:
+            await self.db[RUNS_COLLECTION].create_index([("job_name", 1), ("started_at", -1)])
+        except Exception as e:
+            logger.warning(f"Could not create scheduler log index: {e}")
+
+    async def _sync(self, job: ScheduledJob) -> None:
+        """Create the job's lease document, or adopt the deployment's next run."""
+        spec = str(job.schedule)
+        await self.leases.update_one(
+            {"_id": job.name},
+            {
+                "$setOnInsert": {
+                    "owner": None,
+                    "lease_until": None,
+                    "next_run": job.next_run,
+                    "spec": spec,
+                }
+            },
+            upsert=True,
+        )
+        # A changed schedule restarts from this worker's view of it
+        await self.leases.update_one(
+            {"_id": job.name, "spec": {"$ne": spec}},
+            {"$set": {"spec": spec, "next_run": job.next_run}},
+        )
+        doc = await self.leases.find_one({"_id": job.name})
+        if doc and doc.get("next_run"):
+            job.next_run = doc["next_run"]
+        self._synced.add(job.name)
+
+    async def _acquire(self, job: ScheduledJob, now: datetime, scheduled: bool) -> bool:
+        claim = {
+            "_id": job.name,
+            "$or": [{"owner": None}, {"lease_until": {"$lt": now}}],
+        }
+        if scheduled:
+            claim["next_run"] = {"$lte": now}
+        lease = await self.leases.find_one_and_update(
+            claim,
+            {
+                "$set": {
+                    "owner": self.owner,
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                }
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        return lease is not None
+
+    async def _renew(self, job: ScheduledJob) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            lease_until = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+            await self.leases.update_one(
+                {"_id": job.name, "owner": self.owner}, {"$set": {"lease_until": lease_until}}
+            )
+
+    async def _release(self, job: ScheduledJob, record: Dict[str, Any], scheduled: bool) -> None:
+        fields = {
+            "owner": None,
+            "lease_until": None,
+            "last_run": record["started_at"],
+            "last_status": record["status"],
+            "last_duration_ms": record["duration_ms"],
+        }
+        if scheduled:
+            fields["next_run"] = job.next_run
+        await self.leases.update_one({"_id": job.name, "owner": self.owner}, {"$set": fields})
+
+    async def _call(self, job: ScheduledJob) -> Any:
+        if job.heavy and self.executor is not None:
+            call = self.executor.run(job.func, with_db=True)
+        else:
+            call = job.func()
+            if not inspect.isawaitable(call):
+                return call
+        if job.timeout:
+            return await asyncio.wait_for(call, job.timeout)
+        return await call
+
+    async def _record(self, record: Dict[str, Any]) -> None:
+        if self.db is None:
+            return
+        try:
+            await self.db[RUNS_COLLECTION].insert_one(dict(record))
+        except Exception as e:
+            logger.error(f"Error logging job run: {e}")
+
+    def _skipped(self, job: ScheduledJob, trigger: str, reason: str) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            "job_name": job.name,
+            "status": "skipped",
+            "trigger": trigger,
+            "owner": self.owner,
+            "reason": reason,
+            "started_at": now,
+            "finished_at": now,
+            "duration_ms": 0.0,
+            "timestamp": now.isoformat(),
+        }
+
+    async def run_job(self, name: str, trigger: str = "manual") -> Dict[str, Any]:
+        """
+        Run a job now and return its run record. Scheduled runs (``trigger``
+        of "schedule") only claim an occurrence that is due; any trigger is
+        skipped while the job is already running here or on another worker.
+        """
+        job = self.get_job(name)
+        scheduled = trigger == "schedule"
+        if job.running >= job.max_instances:
+            record = self._skipped(job, trigger, "max_instances reached")
+            await self._record(record)
+            return record
+
+        job.running += 1
+        leased = False
+        renewal = None
+        try:
+            now = datetime.utcnow()
+            if job.exclusive and self.db is not None:
+                if job.name not in self._synced:
+                    await self._sync(job)
+                leased = await self._acquire(job, now, scheduled)
+                if not leased:
+                    if scheduled:
+                        # Another worker ran or is running this occurrence
+                        await self._sync(job)
+                        if job.next_run <= now:
+                            job.next_run = now + timedelta(seconds=self.poll_interval)
+                        return self._skipped(job, trigger, "leased by another worker")
+                    record = self._skipped(job, trigger, "already running")
+                    await self._record(record)
+                    return record
+                renewal = asyncio.create_task(self._renew(job))
+                if scheduled:
+                    job.next_run = job.compute_next(now)
+
+            started = datetime.utcnow()
+            record = {
+                "job_name": job.name,
+                "trigger": trigger,
+                "owner": self.owner,
+                "started_at": started,
+                "timestamp": started.isoformat(),
+            }
+            try:
+                record["result"] = await self._call(job)
+                record["status"] = "success"
+            except asyncio.TimeoutError:
+                record["status"] = "timeout"
+                record["error"] = f"Timed out after {job.timeout}s"
+            except asyncio.CancelledError:
+                record["status"] = "cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Scheduled job {job.name} failed: {e}")
+                record["status"] = "failed"
+                record["error"] = str(e)
+            finally:
+                record["finished_at"] = datetime.utcnow()
+                record["duration_ms"] = round(
+                    (record["finished_at"] - started).total_seconds() * 1000, 2
+                )
+                if renewal is not None:
+                    renewal.cancel()
+                if leased:
+                    await self._release(job, record, scheduled)
+                await self._record(record)
+            logger.info(
+                f"Job {job.name} completed with status: {record['status']} "
+                f"({record['duration_ms']}ms)"
+            )
+            return record
+        finally:
+            job.running -= 1
+
+    def run_pending(self, now: Optional[datetime] = None) -> List[asyncio.Task]:
+        """Start every due, unpaused job in the background and return the tasks."""
+        now = now or datetime.utcnow()
+        started = []
+        for job in list(self.jobs.values()):
+            if job.paused or job.next_run is None or job.next_run > now:
+                continue
+            if job.running >= job.max_instances:
+                continue
+            if not job.exclusive or self.db is None:
+                job.next_run = job.compute_next(now)
+            task = asyncio.create_task(self.run_job(job.name, trigger="schedule"))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            started.append(task)
+        return started
+
+    async def _run(self) -> None:
+        while self.running:
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Error in scheduler loop: {e}")
+            due = [job.next_run for job in self.jobs.values() if job.next_run and not job.paused]
+            delay = self.poll_interval
+            if due:
+                delay = min(delay, max((min(due) - datetime.utcnow()).total_seconds(), 0.1))
+            await asyncio.sleep(delay)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        await self.ensure_indexes()
+        if self.executor is not None:
+            self.executor.start()
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.stop()
+
+    def job_status(self, job: ScheduledJob) -> Dict[str, Any]:
+        return {
+            "id": job.name,
+            "name": job.description or job.name,
+            "trigger": str(job.schedule),
+            "next_run": job.next_run.isoformat() if job.next_run and not job.paused else None,
+            "paused": job.paused,
+            "is_running": job.running > 0,
+            "exclusive": job.exclusive,
+            "heavy": job.heavy,
+        }
+
+    async def history(self, name: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        if self.db is None:
+            return []
+        query = {"job_name": name} if name else {}
+        cursor = self.db[RUNS_COLLECTION].find(query, {"_id": 0}).sort("started_at", -1)
+        return await cursor.limit(limit).to_list(length=limit)
@@ -0,0 +1,313 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+STATS_COLLECTION = "job_stats"
+SUMMARY_ID = "summary"
+TOTALS_ID = "totals"
+
+# Dimension name -> field expression used by the reconcile aggregation
+DIMENSIONS = {
+    "company": "$company",
+    "location": "$location",
+    "source": {"$ifNull": ["$source", "$source_type"]},
+    "title": {"$ifNull": ["$parsed_job_title", "$title"]},
+    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+}
+
+# Pre-filters for dimensions whose expression needs a typed field
+DIMENSION_FILTERS = {
+    "day": {"created_at": {"$type": "date"}},
+}
+
+MAX_VALUE_LENGTH = 200
+
+
+def _is_active(job: Dict[str, Any]) -> bool:
+    return job.get("is_active", True) is not False
+
+
+def _is_remote(job: Dict[str, Any]) -> bool:
+    if job.get("work_type") == "remote" or job.get("remote_type") == "remote":
+        return True
+    location = job.get("location")
+    return isinstance(location, str) and "remote" in location.lower()
+
+
+def _dimension_value(job: Dict[str, Any], dimension: str) -> Optional[str]:
+    if dimension == "source":
+        value = job.get("source") or job.get("source_type")
+    elif dimension == "title":
+        value = job.get("parsed_job_title") or job.get("title")
+    elif dimension == "day":
+        created_at = job.get("created_at")
+        value = created_at.strftime("%Y-%m-%d") if isinstance(created_at, datetime) else None
+    else:
+        value = job.get(dimension)
+
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value[:MAX_VALUE_LENGTH] if value else None
+
+
+def _counter_id(dimension: str, value: str) -> str:
+    return f"{dimension}|{value}"
+
+
+class JobStatsMaterializer:
+    """
+    Keeps job statistics materialized in the ``job_stats`` collection.
+
+    Counter documents (one per dimension value) are adjusted incrementally from
+    ingest and archive events and rebuilt by ``reconcile``, which the
+    scheduler's job_statistics job owns. Endpoints read a single summary
+    document holding totals and capped top-N lists; rebuilding it from the
+    counters is throttled through its ``refresh_after`` field, so every
+    worker and instance shares one refresh per interval.
+    """
+
+    def __init__(self, db, top_n: int = 20, summary_interval_seconds: float = 30.0):
+        self.db = db
+        self.collection = db[STATS_COLLECTION]
+        self.top_n = top_n
+        self.summary_interval_seconds = summary_interval_seconds
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_index([("dimension", 1), ("total", -1)])
+        except Exception as e:
+            logger.warning(f"Could not create job_stats index: {e}")
+
+    async def _apply(self, jobs: Iterable[Dict[str, Any]], sign: int) -> int:
+        totals = Counter()
+        counters: Dict[str, Counter] = {}
+        values: Dict[str, tuple] = {}
+
+        for job in jobs:
+            active = _is_active(job)
+            totals["total"] += 1
+            totals["active"] += int(active)
+            totals["remote"] += int(_is_remote(job))
+            for dimension in DIMENSIONS:
+                value = _dimension_value(job, dimension)
+                if value is None:
+                    continue
+                counter_id = _counter_id(dimension, value)
+                counters.setdefault(counter_id, Counter())
+                counters[counter_id]["total"] += 1
+                counters[counter_id]["active"] += int(active)
+                values[counter_id] = (dimension, value)
+
+        if not totals["total"]:
+            return 0
+
+        operations = [
+            UpdateOne(
+                {"_id": TOTALS_ID},
+                {"$inc": {k: sign * v for k, v in totals.items()}},
+                upsert=True,
+            )
+        ]
+        for counter_id, counts in counters.items():
+            dimension, value = values[counter_id]
+            operations.append(
+                UpdateOne(
+                    {"_id": counter_id},
+                    {
+                        "$inc": {k: sign * v for k, v in counts.items()},
+                        "$setOnInsert": {"dimension": dimension, "value": value},
+                    },
+                    upsert=True,
+                )
+            )
+        await self.collection.bulk_write(operations, ordered=False)
+
+        if sign < 0:
+            await self.collection.delete_many(
+                {"dimension": {"$exists": True}, "total": {"$lte": 0}}
+            )
+        return totals["total"]
+
+    async def on_jobs_ingested(self, jobs: List[Dict[str, Any]]) -> None:
+        """Post-ingest hook: count newly inserted jobs."""
+        if await self._apply(jobs, 1):
+            await self.refresh_summary()
+
+    async def on_jobs_removed(self, jobs: List[Dict[str, Any]]) -> None:
+        """Archive/delete event: subtract removed jobs from the counters."""
+        if await self._apply(jobs, -1):
+            await self.refresh_summary(force=True)
+
+    async def _top(self, dimension: str, limit: int) -> List[Dict[str, Any]]:
+        cursor = (
+            self.collection.find(
+                {"dimension": dimension, "total": {"$gt": 0}},
+                {"_id": 0, "value": 1, "total": 1, "active": 1},
+            )
+            .sort("total", -1)
+            .limit(limit)
+        )
+        return [
+            {"_id": doc["value"], "count": doc["total"], "active": doc.get("active", 0)}
+            for doc in await cursor.to_list(length=limit)
+        ]
+
+    async def refresh_summary(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Rebuild the summary document from the counters (throttled)."""
+        refresh_after = datetime.utcnow() + timedelta(seconds=self.summary_interval_seconds)
+        if not force and not await self._claim_refresh(refresh_after):
+            return None
+
+        totals = await self.collection.find_one({"_id": TOTALS_ID}) or {}
+        week_days = [
+            _counter_id("day", (datetime.utcnow() - timedelta(days=i)).strftime("%Y-%m-%d"))
+            for i in range(7)
+        ]
+        recent = await self.collection.find(
+            {"_id": {"$in": week_days}}, {"total": 1}
+        ).to_list(length=7)
+
+        summary = {
+            "_id": SUMMARY_ID,
+            "total_jobs": max(totals.get("total", 0), 0),
+            "active_jobs": max(totals.get("active", 0), 0),
+            "remote_jobs": max(totals.get("remote", 0), 0),
+            "recent_jobs": sum(max(doc.get("total", 0), 0) for doc in recent),
+            "updated_at": datetime.utcnow(),
+            "refresh_after": refresh_after,
+        }
+        for dimension, key in (
+            ("company", "companies"),
+            ("location", "locations"),
+            ("source", "sources"),
+            ("title", "titles"),
+        ):
+            summary[f"{key}_count"] = await self.collection.count_documents(
+                {"dimension": dimension, "total": {"$gt": 0}}
+            )
+            summary[f"top_{key}"] = await self._top(dimension, self.top_n)
+
+        previous = await self.collection.find_one({"_id": SUMMARY_ID}, {"reconciled_at": 1})
+        if previous and previous.get("reconciled_at"):
+            summary["reconciled_at"] = previous["reconciled_at"]
+
+        await self.collection.replace_one({"_id": SUMMARY_ID}, summary, upsert=True)
+        return summary
+
+    async def _claim_refresh(self, refresh_after: datetime) -> bool:
+        """Take the summary refresh slot unless another refresh holds it."""
+        try:
+            await self.collection.update_one(
+                {"_id": SUMMARY_ID, "refresh_after": {"$not": {"$gt": datetime.utcnow()}}},
+                {"$set": {"refresh_after": refresh_after}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """Recompute every counter from the jobs collection and drop stale ones."""
+        # BSON dates have millisecond precision; truncate so the stale-counter
+        # sweep below compares against the stored value
+        now = datetime.utcnow()
+        started = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        jobs = self.db.jobs
+        await self.ensure_indexes()
+
+        for dimension, expression in DIMENSIONS.items():
+            pipeline = []
+            if dimension in DIMENSION_FILTERS:
+                pipeline.append({"$match": DIMENSION_FILTERS[dimension]})
+            pipeline += [
+                {"$group": {
+                    "_id": expression,
+                    "total": {"$sum": 1},
+                    "active": {"$sum": {"$cond": [{"$ne": ["$is_active", False]}, 1, 0]}},
+                }},
+                {"$match": {"_id": {"$nin": [None, ""]}}},
+            ]
+            operations = []
+            async for row in jobs.aggregate(pipeline, allowDiskUse=True):
+                if not isinstance(row["_id"], str):
+                    continue
+                value = row["_id"].strip()[:MAX_VALUE_LENGTH]
+                if not value:
+                    continue
+                operations.append(
+                    ReplaceOne(
+                        {"_id": _counter_id(dimension, value)},
+                        {
+                            "dimension": dimension,
+                            "value": value,
+                            "total": row["total"],
+                            "active": row["active"],
+                            "reconciled_at": started,
+                        },
+                        upsert=True,
+                    )
+                )
+                if len(operations) >= 1000:
+                    await self.collection.bulk_write(operations, ordered=False)
+                    operations = []
+            if operations:
+                await self.collection.bulk_write(operations, ordered=False)
+
+        await self.collection.delete_many(
+            {"dimension": {"$exists": True}, "reconciled_at": {"$ne": started}}
+        )
+
+        totals = {
+            "_id": TOTALS_ID,
+            "total": await jobs.count_documents({}),
+            "active": await jobs.count_documents({"is_active": {"$ne": False}}),
+            "remote": await jobs.count_documents(
+                {"$or": [
+                    {"work_type": "remote"},
+                    {"remote_type": "remote"},
+                    {"location": {"$regex": "remote", "$options": "i"}},
+                ]}
+            ),
+        }
+        await self.collection.replace_one({"_id": TOTALS_ID}, totals, upsert=True)
+
+        await self.collection.update_one(
+            {"_id": SUMMARY_ID}, {"$set": {"reconciled_at": started}}, upsert=True
+        )
+        summary = await self.refresh_summary(force=True)
+        logger.info(
+            f"Job statistics reconciled in {(datetime.utcnow() - started).total_seconds():.1f}s"
+        )
+        return summary
+
+    async def reconciled_at(self) -> Optional[datetime]:
+        summary = await self.collection.find_one({"_id": SUMMARY_ID}, {"reconciled_at": 1})
+        return (summary or {}).get("reconciled_at")
+
+    async def get_summary(self) -> Dict[str, Any]:
+        """
+        Return the last summary snapshot. Without one it is built from the
+        counters; before the first reconcile only the estimated job count is
+        known.
+        """
+        summary = await self.collection.find_one({"_id": SUMMARY_ID})
+        if summary and "total_jobs" in summary:
+            return summary
+        if await self.collection.find_one({"_id": TOTALS_ID}, {"_id": 1}):
+            return await self.refresh_summary(force=True)
+        return {
+            "_id": SUMMARY_ID,
+            "total_jobs": await self.db.jobs.estimated_document_count(),
+            "active_jobs": 0,
+            "remote_jobs": 0,
+            "recent_jobs": 0,
+            "updated_at": datetime.utcnow(),
+            "reconciled_at": None,
+        }
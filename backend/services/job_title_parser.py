@@ -3,6 +3,9 @@ import re
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
+from .location_normalizer import is_known_place
+from .skill_taxonomy import extract_skill_keys
+
 logger = logging.getLogger(__name__)
 
 
@@ -203,44 +206,6 @@ class JobTitleParser:
             "staff",
         ]
 
-        # Common skills to extract
-        self.skills = [
-            "javascript",
-            "python",
-            "java",
-            "react",
-            "node",
-            "angular",
-            "vue",
-            "typescript",
-            "php",
-            "ruby",
-            "go",
-            "rust",
-            "kotlin",
-            "swift",
-            "c++",
-            "c#",
-            "sql",
-            "mongodb",
-            "postgresql",
-            "mysql",
-            "redis",
-            "docker",
-            "kubernetes",
-            "aws",
-            "azure",
-            "gcp",
-            "git",
-            "jenkins",
-            "jira",
-            "figma",
-            "sketch",
-            "adobe",
-            "photoshop",
-            "illustrator",
-        ]
-
         # Work types
         self.work_types = [
             "remote",
@@ -448,96 +413,10 @@ class JobTitleParser:
 
     def _extract_skills(self, title: str) -> List[str]:
         """Extract skills mentioned in the title"""
-        title_lower = title.lower()
-        found_skills = []
-
-        for skill in self.skills:
-            if skill in title_lower:
-                found_skills.append(skill)
-
-        return found_skills
+        return list(extract_skill_keys(title))
 
     def _extract_location(self, title: str) -> Optional[str]:
         """Extract location information from title"""
-        # Common location names (countries, cities, regions)
-        location_names = [
-            "north america",
-            "south america",
-            "europe",
-            "asia",
-            "africa",
-            "australia",
-            "united states",
-            "usa",
-            "canada",
-            "mexico",
-            "brazil",
-            "argentina",
-            "united kingdom",
-            "uk",
-            "germany",
-            "france",
-            "spain",
-            "italy",
-            "netherlands",
-            "sweden",
-            "norway",
-            "denmark",
-            "finland",
-            "switzerland",
-            "austria",
-            "japan",
-            "china",
-            "india",
-            "singapore",
-            "australia",
-            "new zealand",
-            "new york",
-            "london",
-            "berlin",
-            "paris",
-            "madrid",
-            "rome",
-            "amsterdam",
-            "stockholm",
-            "oslo",
-            "copenhagen",
-            "helsinki",
-            "zurich",
-            "vienna",
-            "tokyo",
-            "beijing",
-            "shanghai",
-            "mumbai",
-            "delhi",
-            "bangalore",
-            "san francisco",
-            "los angeles",
-            "chicago",
-            "boston",
-            "seattle",
-            "toronto",
-            "vancouver",
-            "montreal",
-            "sydney",
-            "melbourne",
-            "philadelphia",
-            "pa",
-            "california",
-            "ca",
-            "texas",
-            "tx",
-            "florida",
-            "fl",
-            "england",
-            "scotland",
-            "wales",
-            "ireland",
-            "emea",
-            "apac",
-            "latam",
-        ]
-
         title_lower = title.lower()
 
         # Look for location patterns - improved patterns
@@ -576,7 +455,7 @@ class JobTitleParser:
                     continue
 
                 # Check if it's a known location name
-                if location_lower in location_names:
+                if is_known_place(location):
                     return location
 
                 # Check if it looks like a location (not a job title word)
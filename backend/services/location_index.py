@@ -0,0 +1,201 @@
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+from backend.services.location_normalizer import (GAZETTEER_VERSION,
+                                                  GeoLocation,
+                                                  normalize_location)
+
+logger = logging.getLogger(__name__)
+
+SUGGESTIONS_COLLECTION = "location_suggestions"
+MAX_LABEL_LENGTH = 200
+
+# Word starts: every suffix beginning at one is stored as a prefix-search term
+_WORD_START_RE = re.compile(r"(?<!\w)\w")
+
+
+def _job_geo(job: Dict[str, Any]) -> GeoLocation:
+    return normalize_location(job.get("location") if isinstance(job.get("location"), str) else None)
+
+
+def _label(geo: GeoLocation) -> Optional[str]:
+    label = geo.label.strip()[:MAX_LABEL_LENGTH]
+    return label or None
+
+
+def _terms(label: str) -> List[str]:
+    folded = label.casefold()
+    return list(dict.fromkeys(folded[m.start():] for m in _WORD_START_RE.finditer(folded)))
+
+
+def _suggestion_fields(label: str, geo: GeoLocation) -> Dict[str, Any]:
+    return {
+        "name": label,
+        "kind": geo.kind,
+        "country": geo.country_code,
+        "flag": geo.flag,
+        "terms": _terms(label),
+    }
+
+
+class LocationIndex:
+    """
+    Structured job locations and the autocomplete table built from them.
+
+    Jobs carry a ``geo`` sub-document resolved by the gazetteer at ingest;
+    ``location_suggestions`` holds one counter document per display label so
+    autocomplete is an indexed prefix lookup instead of a regex ``$group``
+    over the jobs collection.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[SUGGESTIONS_COLLECTION]
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_index([("terms", 1), ("total", -1)])
+            await self.db.jobs.create_index([("geo.countries", 1), ("is_active", 1)])
+            await self.db.jobs.create_index([("geo.regions", 1), ("is_active", 1)])
+            await self.db.jobs.create_index("geo.city")
+            await self.db.jobs.create_index("geo.remote_scope")
+        except Exception as e:
+            logger.warning(f"Could not create location indexes: {e}")
+
+    async def _apply(self, jobs: Iterable[Dict[str, Any]], sign: int) -> int:
+        counters: Dict[str, Counter] = {}
+        geos: Dict[str, GeoLocation] = {}
+
+        for job in jobs:
+            geo = _job_geo(job)
+            label = _label(geo)
+            if label is None:
+                continue
+            counters.setdefault(label, Counter())
+            counters[label]["total"] += 1
+            counters[label]["active"] += int(job.get("is_active", True) is not False)
+            geos[label] = geo
+
+        if not counters:
+            return 0
+
+        operations = [
+            UpdateOne(
+                {"_id": label},
+                {
+                    "$inc": {k: sign * v for k, v in counts.items()},
+                    "$setOnInsert": _suggestion_fields(label, geos[label]),
+                },
+                upsert=True,
+            )
+            for label, counts in counters.items()
+        ]
+        await self.collection.bulk_write(operations, ordered=False)
+
+        if sign < 0:
+            await self.collection.delete_many({"total": {"$lte": 0}})
+        return len(counters)
+
+    async def on_jobs_ingested(self, jobs: List[Dict[str, Any]]) -> None:
+        """Post-ingest hook: count newly inserted jobs per location label."""
+        await self._apply(jobs, 1)
+
+    async def on_jobs_removed(self, jobs: List[Dict[str, Any]]) -> None:
+        """Archive/delete event: subtract removed jobs from the counters."""
+        await self._apply(jobs, -1)
+
+    async def search(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most common locations with a word starting with ``q``."""
+        prefix = " ".join(q.split()).casefold()
+        if not prefix or limit <= 0:
+            return []
+        cursor = (
+            self.collection.find(
+                {"terms": {"$regex": f"^{re.escape(prefix)}"}, "total": {"$gt": 0}},
+                {"_id": 0, "name": 1, "total": 1, "flag": 1},
+            )
+            .sort("total", -1)
+            .limit(limit)
+        )
+        return [
+            {"name": doc["name"], "count": doc["total"], "flag": doc.get("flag", "🏙️")}
+            for doc in await cursor.to_list(length=limit)
+        ]
+
+    async def is_built(self) -> bool:
+        """Whether the suggestion table has been filled at least once."""
+        return await self.collection.find_one({}, {"_id": 1}) is not None
+
+    async def backfill_jobs(self, batch_size: int = 1000) -> int:
+        """Resolve ``geo`` for jobs stored before (or with an older) gazetteer."""
+        updated = 0
+        stale = {"geo.v": {"$ne": GAZETTEER_VERSION}}
+        while True:
+            docs = await self.db.jobs.find(stale, {"location": 1}).limit(batch_size).to_list(
+                length=batch_size
+            )
+            if not docs:
+                break
+            await self.db.jobs.bulk_write(
+                [
+                    UpdateOne({"_id": doc["_id"]}, {"$set": {"geo": _job_geo(doc).to_document()}})
+                    for doc in docs
+                ],
+                ordered=False,
+            )
+            updated += len(docs)
+            if len(docs) < batch_size:
+                break
+        if updated:
+            logger.info(f"Resolved structured locations for {updated} jobs")
+        return updated
+
+    async def rebuild(self) -> int:
+        """Recompute the suggestion table from the jobs collection."""
+        # BSON dates have millisecond precision; see JobStatsMaterializer.reconcile
+        now = datetime.utcnow()
+        started = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        await self.ensure_indexes()
+
+        # Group on the raw string first; distinct locations are far fewer than jobs
+        pipeline = [
+            {"$group": {
+                "_id": "$location",
+                "total": {"$sum": 1},
+                "active": {"$sum": {"$cond": [{"$ne": ["$is_active", False]}, 1, 0]}},
+            }},
+        ]
+        counters: Dict[str, Counter] = {}
+        geos: Dict[str, GeoLocation] = {}
+        async for row in self.db.jobs.aggregate(pipeline, allowDiskUse=True):
+            geo = _job_geo({"location": row["_id"]})
+            label = _label(geo)
+            if label is None:
+                continue
+            counters.setdefault(label, Counter())
+            counters[label]["total"] += row["total"]
+            counters[label]["active"] += row["active"]
+            geos[label] = geo
+
+        operations = [
+            ReplaceOne(
+                {"_id": label},
+                {
+                    **_suggestion_fields(label, geos[label]),
+                    "total": counts["total"],
+                    "active": counts["active"],
+                    "rebuilt_at": started,
+                },
+                upsert=True,
+            )
+            for label, counts in counters.items()
+        ]
+        for i in range(0, len(operations), 1000):
+            await self.collection.bulk_write(operations[i:i + 1000], ordered=False)
+        await self.collection.delete_many({"rebuilt_at": {"$ne": started}})
+        return len(operations)
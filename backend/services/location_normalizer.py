@@ -0,0 +1,684 @@
+"""
+Location Normalizer
+Resolves free-text job locations into structured geo fields with a compiled
+gazetteer: country codes, regions, city, remote scope and timezone band.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Bump when the gazetteer changes so stored ``geo`` documents get re-resolved
+GAZETTEER_VERSION = 1
+
+REGION_LABELS = {
+    "north_america": "North America",
+    "latin_america": "Latin America",
+    "europe": "Europe",
+    "middle_east": "Middle East",
+    "africa": "Africa",
+    "asia": "Asia",
+    "oceania": "Oceania",
+}
+
+REGION_BANDS = {
+    "north_america": "americas",
+    "latin_america": "americas",
+    "europe": "emea",
+    "middle_east": "emea",
+    "africa": "emea",
+    "asia": "apac",
+    "oceania": "apac",
+}
+
+# code, name, region, aliases
+COUNTRIES = (
+    ("US", "United States", "north_america", ("usa", "united states of america")),
+    ("CA", "Canada", "north_america", ()),
+    ("MX", "Mexico", "latin_america", ("méxico",)),
+    ("GB", "United Kingdom", "europe", ("uk", "great britain", "britain", "england", "scotland", "wales", "northern ireland")),
+    ("IE", "Ireland", "europe", ()),
+    ("DE", "Germany", "europe", ("deutschland",)),
+    ("FR", "France", "europe", ()),
+    ("ES", "Spain", "europe", ("españa",)),
+    ("PT", "Portugal", "europe", ()),
+    ("IT", "Italy", "europe", ("italia",)),
+    ("NL", "Netherlands", "europe", ("the netherlands", "holland")),
+    ("BE", "Belgium", "europe", ()),
+    ("LU", "Luxembourg", "europe", ()),
+    ("CH", "Switzerland", "europe", ()),
+    ("AT", "Austria", "europe", ()),
+    ("SE", "Sweden", "europe", ()),
+    ("NO", "Norway", "europe", ()),
+    ("DK", "Denmark", "europe", ()),
+    ("FI", "Finland", "europe", ()),
+    ("IS", "Iceland", "europe", ()),
+    ("PL", "Poland", "europe", ()),
+    ("CZ", "Czech Republic", "europe", ("czechia",)),
+    ("SK", "Slovakia", "europe", ()),
+    ("HU", "Hungary", "europe", ()),
+    ("SI", "Slovenia", "europe", ()),
+    ("HR", "Croatia", "europe", ()),
+    ("RS", "Serbia", "europe", ()),
+    ("BA", "Bosnia and Herzegovina", "europe", ()),
+    ("ME", "Montenegro", "europe", ()),
+    ("MK", "North Macedonia", "europe", ("macedonia",)),
+    ("AL", "Albania", "europe", ()),
+    ("RO", "Romania", "europe", ()),
+    ("BG", "Bulgaria", "europe", ()),
+    ("GR", "Greece", "europe", ()),
+    ("CY", "Cyprus", "europe", ()),
+    ("MT", "Malta", "europe", ()),
+    ("EE", "Estonia", "europe", ()),
+    ("LV", "Latvia", "europe", ()),
+    ("LT", "Lithuania", "europe", ()),
+    ("UA", "Ukraine", "europe", ()),
+    ("BY", "Belarus", "europe", ()),
+    ("MD", "Moldova", "europe", ()),
+    ("RU", "Russia", "europe", ("russian federation",)),
+    ("TR", "Turkey", "europe", ("türkiye", "turkiye")),
+    ("GE", "Georgia", "asia", ()),
+    ("AM", "Armenia", "asia", ()),
+    ("AZ", "Azerbaijan", "asia", ()),
+    ("KZ", "Kazakhstan", "asia", ()),
+    ("UZ", "Uzbekistan", "asia", ()),
+    ("TM", "Turkmenistan", "asia", ()),
+    ("KG", "Kyrgyzstan", "asia", ()),
+    ("TJ", "Tajikistan", "asia", ()),
+    ("AF", "Afghanistan", "asia", ()),
+    ("PK", "Pakistan", "asia", ()),
+    ("IN", "India", "asia", ()),
+    ("BD", "Bangladesh", "asia", ()),
+    ("LK", "Sri Lanka", "asia", ()),
+    ("NP", "Nepal", "asia", ()),
+    ("BT", "Bhutan", "asia", ()),
+    ("MV", "Maldives", "asia", ()),
+    ("CN", "China", "asia", ()),
+    ("TW", "Taiwan", "asia", ()),
+    ("HK", "Hong Kong", "asia", ()),
+    ("MO", "Macau", "asia", ("macao",)),
+    ("MN", "Mongolia", "asia", ()),
+    ("KP", "North Korea", "asia", ()),
+    ("KR", "South Korea", "asia", ("korea",)),
+    ("JP", "Japan", "asia", ()),
+    ("VN", "Vietnam", "asia", ("viet nam",)),
+    ("TH", "Thailand", "asia", ()),
+    ("MY", "Malaysia", "asia", ()),
+    ("SG", "Singapore", "asia", ()),
+    ("ID", "Indonesia", "asia", ()),
+    ("PH", "Philippines", "asia", ()),
+    ("KH", "Cambodia", "asia", ()),
+    ("LA", "Laos", "asia", ()),
+    ("MM", "Myanmar", "asia", ()),
+    ("BN", "Brunei", "asia", ()),
+    ("TL", "East Timor", "asia", ("timor-leste",)),
+    ("IR", "Iran", "middle_east", ()),
+    ("IQ", "Iraq", "middle_east", ()),
+    ("SY", "Syria", "middle_east", ()),
+    ("LB", "Lebanon", "middle_east", ()),
+    ("JO", "Jordan", "middle_east", ()),
+    ("IL", "Israel", "middle_east", ()),
+    ("PS", "Palestine", "middle_east", ()),
+    ("SA", "Saudi Arabia", "middle_east", ()),
+    ("YE", "Yemen", "middle_east", ()),
+    ("OM", "Oman", "middle_east", ()),
+    ("AE", "United Arab Emirates", "middle_east", ("uae",)),
+    ("QA", "Qatar", "middle_east", ()),
+    ("KW", "Kuwait", "middle_east", ()),
+    ("BH", "Bahrain", "middle_east", ()),
+    ("EG", "Egypt", "africa", ()),
+    ("LY", "Libya", "africa", ()),
+    ("TN", "Tunisia", "africa", ()),
+    ("DZ", "Algeria", "africa", ()),
+    ("MA", "Morocco", "africa", ()),
+    ("SD", "Sudan", "africa", ()),
+    ("SS", "South Sudan", "africa", ()),
+    ("ET", "Ethiopia", "africa", ()),
+    ("SO", "Somalia", "africa", ()),
+    ("DJ", "Djibouti", "africa", ()),
+    ("ER", "Eritrea", "africa", ()),
+    ("KE", "Kenya", "africa", ()),
+    ("TZ", "Tanzania", "africa", ()),
+    ("UG", "Uganda", "africa", ()),
+    ("RW", "Rwanda", "africa", ()),
+    ("BI", "Burundi", "africa", ()),
+    ("CG", "Congo", "africa", ("republic of the congo",)),
+    ("CD", "DR Congo", "africa", ("democratic republic of the congo", "drc")),
+    ("CF", "Central African Republic", "africa", ()),
+    ("TD", "Chad", "africa", ()),
+    ("CM", "Cameroon", "africa", ()),
+    ("GA", "Gabon", "africa", ()),
+    ("GQ", "Equatorial Guinea", "africa", ()),
+    ("ST", "Sao Tome and Principe", "africa", ("são tomé and príncipe",)),
+    ("NG", "Nigeria", "africa", ()),
+    ("NE", "Niger", "africa", ()),
+    ("ML", "Mali", "africa", ()),
+    ("BF", "Burkina Faso", "africa", ()),
+    ("SN", "Senegal", "africa", ()),
+    ("GM", "Gambia", "africa", ("the gambia",)),
+    ("GW", "Guinea-Bissau", "africa", ()),
+    ("GN", "Guinea", "africa", ()),
+    ("SL", "Sierra Leone", "africa", ()),
+    ("LR", "Liberia", "africa", ()),
+    ("CI", "Ivory Coast", "africa", ("cote d'ivoire", "côte d'ivoire")),
+    ("GH", "Ghana", "africa", ()),
+    ("TG", "Togo", "africa", ()),
+    ("BJ", "Benin", "africa", ()),
+    ("AO", "Angola", "africa", ()),
+    ("NA", "Namibia", "africa", ()),
+    ("BW", "Botswana", "africa", ()),
+    ("ZW", "Zimbabwe", "africa", ()),
+    ("ZM", "Zambia", "africa", ()),
+    ("MW", "Malawi", "africa", ()),
+    ("MZ", "Mozambique", "africa", ()),
+    ("MG", "Madagascar", "africa", ()),
+    ("MU", "Mauritius", "africa", ()),
+    ("SC", "Seychelles", "africa", ()),
+    ("KM", "Comoros", "africa", ()),
+    ("YT", "Mayotte", "africa", ()),
+    ("RE", "Reunion", "africa", ("réunion",)),
+    ("ZA", "South Africa", "africa", ()),
+    ("LS", "Lesotho", "africa", ()),
+    ("SZ", "Eswatini", "africa", ("swaziland",)),
+    ("AU", "Australia", "oceania", ()),
+    ("NZ", "New Zealand", "oceania", ()),
+    ("BR", "Brazil", "latin_america", ("brasil",)),
+    ("AR", "Argentina", "latin_america", ()),
+    ("CL", "Chile", "latin_america", ()),
+    ("CO", "Colombia", "latin_america", ()),
+    ("PE", "Peru", "latin_america", ()),
+    ("VE", "Venezuela", "latin_america", ()),
+    ("UY", "Uruguay", "latin_america", ()),
+    ("PY", "Paraguay", "latin_america", ()),
+    ("BO", "Bolivia", "latin_america", ()),
+    ("EC", "Ecuador", "latin_america", ()),
+    ("GY", "Guyana", "latin_america", ()),
+    ("SR", "Suriname", "latin_america", ()),
+    ("CR", "Costa Rica", "latin_america", ()),
+    ("PA", "Panama", "latin_america", ()),
+    ("GT", "Guatemala", "latin_america", ()),
+    ("DO", "Dominican Republic", "latin_america", ()),
+    ("PR", "Puerto Rico", "latin_america", ()),
+    ("JM", "Jamaica", "latin_america", ()),
+)
+
+# Caucasus countries sit in Asia but share European working hours
+BAND_OVERRIDES = {"GE": "emea", "AM": "emea", "AZ": "emea"}
+
+# Multi-country zones: key, label, regions, timezone band, aliases
+ZONES = (
+    ("eu", "EU", ("europe",), "emea", ("european union",)),
+    ("europe", "Europe", ("europe",), "emea", ()),
+    ("emea", "EMEA", ("europe", "middle_east", "africa"), "emea", ()),
+    ("apac", "APAC", ("asia", "oceania"), "apac", ("asia pacific", "asia-pacific")),
+    ("asia", "Asia", ("asia",), "apac", ()),
+    ("oceania", "Oceania", ("oceania",), "apac", ()),
+    ("middle_east", "Middle East", ("middle_east",), "emea", ("middle east", "mena")),
+    ("africa", "Africa", ("africa",), "emea", ()),
+    ("latam", "LATAM", ("latin_america",), "americas", ("latin america", "south america", "central america")),
+    ("north_america", "North America", ("north_america",), "americas", ("north america",)),
+    ("americas", "Americas", ("north_america", "latin_america"), "americas", ()),
+)
+
+# name, country code, aliases
+CITIES = (
+    ("New York", "US", ("nyc", "new york city")),
+    ("San Francisco", "US", ("bay area", "san francisco bay area")),
+    ("Los Angeles", "US", ()),
+    ("San Diego", "US", ()),
+    ("San Jose", "US", ()),
+    ("Seattle", "US", ()),
+    ("Portland", "US", ()),
+    ("Chicago", "US", ()),
+    ("Boston", "US", ()),
+    ("Austin", "US", ()),
+    ("Dallas", "US", ()),
+    ("Houston", "US", ()),
+    ("Denver", "US", ()),
+    ("Atlanta", "US", ()),
+    ("Miami", "US", ()),
+    ("Philadelphia", "US", ()),
+    ("Pittsburgh", "US", ()),
+    ("Phoenix", "US", ()),
+    ("Salt Lake City", "US", ()),
+    ("Minneapolis", "US", ()),
+    ("Detroit", "US", ()),
+    ("Nashville", "US", ()),
+    ("Raleigh", "US", ()),
+    ("Washington, D.C.", "US", ("washington dc", "washington d.c.")),
+    ("Toronto", "CA", ()),
+    ("Vancouver", "CA", ()),
+    ("Montreal", "CA", ("montréal",)),
+    ("Ottawa", "CA", ()),
+    ("Calgary", "CA", ()),
+    ("Mexico City", "MX", ("ciudad de méxico",)),
+    ("London", "GB", ()),
+    ("Manchester", "GB", ()),
+    ("Edinburgh", "GB", ()),
+    ("Dublin", "IE", ()),
+    ("Berlin", "DE", ()),
+    ("Munich", "DE", ("münchen",)),
+    ("Hamburg", "DE", ()),
+    ("Frankfurt", "DE", ()),
+    ("Paris", "FR", ()),
+    ("Lyon", "FR", ()),
+    ("Madrid", "ES", ()),
+    ("Barcelona", "ES", ()),
+    ("Lisbon", "PT", ("lisboa",)),
+    ("Porto", "PT", ()),
+    ("Rome", "IT", ("roma",)),
+    ("Milan", "IT", ("milano",)),
+    ("Amsterdam", "NL", ()),
+    ("Rotterdam", "NL", ()),
+    ("Brussels", "BE", ()),
+    ("Zurich", "CH", ("zürich",)),
+    ("Geneva", "CH", ()),
+    ("Vienna", "AT", ("wien",)),
+    ("Stockholm", "SE", ()),
+    ("Oslo", "NO", ()),
+    ("Copenhagen", "DK", ()),
+    ("Helsinki", "FI", ()),
+    ("Warsaw", "PL", ()),
+    ("Krakow", "PL", ("kraków",)),
+    ("Prague", "CZ", ()),
+    ("Budapest", "HU", ()),
+    ("Bucharest", "RO", ()),
+    ("Sofia", "BG", ()),
+    ("Athens", "GR", ()),
+    ("Tallinn", "EE", ()),
+    ("Riga", "LV", ()),
+    ("Vilnius", "LT", ()),
+    ("Kyiv", "UA", ("kiev",)),
+    ("Istanbul", "TR", ("i̇stanbul",)),
+    ("Ankara", "TR", ()),
+    ("Izmir", "TR", ("i̇zmir",)),
+    ("Tel Aviv", "IL", ()),
+    ("Dubai", "AE", ()),
+    ("Abu Dhabi", "AE", ()),
+    ("Riyadh", "SA", ()),
+    ("Doha", "QA", ()),
+    ("Cairo", "EG", ()),
+    ("Lagos", "NG", ()),
+    ("Nairobi", "KE", ()),
+    ("Cape Town", "ZA", ()),
+    ("Johannesburg", "ZA", ()),
+    ("Bangalore", "IN", ("bengaluru",)),
+    ("Mumbai", "IN", ()),
+    ("Delhi", "IN", ("new delhi",)),
+    ("Hyderabad", "IN", ()),
+    ("Pune", "IN", ()),
+    ("Chennai", "IN", ()),
+    ("Tokyo", "JP", ()),
+    ("Osaka", "JP", ()),
+    ("Seoul", "KR", ()),
+    ("Beijing", "CN", ()),
+    ("Shanghai", "CN", ()),
+    ("Shenzhen", "CN", ()),
+    ("Taipei", "TW", ()),
+    ("Manila", "PH", ()),
+    ("Jakarta", "ID", ()),
+    ("Kuala Lumpur", "MY", ()),
+    ("Bangkok", "TH", ()),
+    ("Ho Chi Minh City", "VN", ("saigon",)),
+    ("Hanoi", "VN", ()),
+    ("Sydney", "AU", ()),
+    ("Melbourne", "AU", ()),
+    ("Brisbane", "AU", ()),
+    ("Auckland", "NZ", ()),
+    ("Wellington", "NZ", ()),
+    ("Sao Paulo", "BR", ("são paulo",)),
+    ("Rio de Janeiro", "BR", ()),
+    ("Buenos Aires", "AR", ()),
+    ("Santiago", "CL", ()),
+    ("Bogota", "CO", ("bogotá",)),
+    ("Medellin", "CO", ("medellín",)),
+    ("Lima", "PE", ()),
+    ("Montevideo", "UY", ()),
+)
+
+# Subdivisions: abbreviation, name, country code. Georgia is left to the
+# country entry; "GA" after a comma still resolves to the US state.
+SUBDIVISIONS = (
+    ("AL", "Alabama", "US"), ("AK", "Alaska", "US"), ("AZ", "Arizona", "US"),
+    ("AR", "Arkansas", "US"), ("CA", "California", "US"), ("CO", "Colorado", "US"),
+    ("CT", "Connecticut", "US"), ("DE", "Delaware", "US"), ("DC", "District of Columbia", "US"),
+    ("FL", "Florida", "US"), ("GA", "Georgia", "US"), ("HI", "Hawaii", "US"),
+    ("ID", "Idaho", "US"), ("IL", "Illinois", "US"), ("IN", "Indiana", "US"),
+    ("IA", "Iowa", "US"), ("KS", "Kansas", "US"), ("KY", "Kentucky", "US"),
+    ("LA", "Louisiana", "US"), ("ME", "Maine", "US"), ("MD", "Maryland", "US"),
+    ("MA", "Massachusetts", "US"), ("MI", "Michigan", "US"), ("MN", "Minnesota", "US"),
+    ("MS", "Mississippi", "US"), ("MO", "Missouri", "US"), ("MT", "Montana", "US"),
+    ("NE", "Nebraska", "US"), ("NV", "Nevada", "US"), ("NH", "New Hampshire", "US"),
+    ("NJ", "New Jersey", "US"), ("NM", "New Mexico", "US"), ("NY", "New York State", "US"),
+    ("NC", "North Carolina", "US"), ("ND", "North Dakota", "US"), ("OH", "Ohio", "US"),
+    ("OK", "Oklahoma", "US"), ("OR", "Oregon", "US"), ("PA", "Pennsylvania", "US"),
+    ("RI", "Rhode Island", "US"), ("SC", "South Carolina", "US"), ("SD", "South Dakota", "US"),
+    ("TN", "Tennessee", "US"), ("TX", "Texas", "US"), ("UT", "Utah", "US"),
+    ("VT", "Vermont", "US"), ("VA", "Virginia", "US"), ("WA", "Washington", "US"),
+    ("WV", "West Virginia", "US"), ("WI", "Wisconsin", "US"), ("WY", "Wyoming", "US"),
+    ("ON", "Ontario", "CA"), ("QC", "Quebec", "CA"), ("BC", "British Columbia", "CA"),
+    ("AB", "Alberta", "CA"), ("MB", "Manitoba", "CA"), ("NS", "Nova Scotia", "CA"),
+)
+
+REMOTE_WORDS = ("remote", "anywhere", "worldwide", "world wide", "work from home", "wfh", "distributed", "telecommute")
+GLOBAL_WORDS = ("anywhere", "worldwide", "world wide", "global", "globally")
+
+# Display codes for remote scopes; ISO "GB" reads oddly in "Remote (GB)"
+SCOPE_CODES = {"GB": "UK"}
+
+
+@dataclass(frozen=True)
+class Place:
+    kind: str  # country | zone | city | subdivision
+    key: str
+    name: str
+    countries: Tuple[str, ...] = ()
+    regions: Tuple[str, ...] = ()
+    band: Optional[str] = None
+
+
+COUNTRY_BY_CODE: Dict[str, Place] = {}
+PLACES: Dict[str, Place] = {}
+SUBDIVISION_CODES: Dict[str, Place] = {}
+
+
+def _add(alias: str, place: Place) -> None:
+    PLACES.setdefault(alias.casefold(), place)
+
+
+for _code, _name, _region, _aliases in COUNTRIES:
+    _band = BAND_OVERRIDES.get(_code, REGION_BANDS[_region])
+    _place = Place("country", _code, _name, (_code,), (_region,), _band)
+    COUNTRY_BY_CODE[_code] = _place
+    for _alias in (_name,) + _aliases:
+        _add(_alias, _place)
+
+for _key, _label, _regions, _band, _aliases in ZONES:
+    _place = Place("zone", _key, _label, (), _regions, _band)
+    for _alias in (_key, _label) + _aliases:
+        _add(_alias, _place)
+
+for _name, _code, _aliases in CITIES:
+    _country = COUNTRY_BY_CODE[_code]
+    _place = Place("city", _name, _name, (_code,), _country.regions, _country.band)
+    for _alias in (_name,) + _aliases:
+        _add(_alias, _place)
+
+for _abbr, _name, _code in SUBDIVISIONS:
+    _country = COUNTRY_BY_CODE[_code]
+    _place = Place("subdivision", f"{_code}-{_abbr}", _name, (_code,), _country.regions, _country.band)
+    SUBDIVISION_CODES[_abbr] = _place
+    if _code != "US" or _name != "Georgia":
+        _add(_name, _place)
+
+
+def _alternation(words: Iterable[str]) -> str:
+    # Longest first so "new mexico" wins over "mexico" at the same position
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_PLACE_RE = re.compile(rf"(?<!\w)(?:{_alternation(PLACES)})(?!\w)")
+_REMOTE_RE = re.compile(rf"(?<!\w)(?:{_alternation(REMOTE_WORDS)})(?!\w)")
+_GLOBAL_RE = re.compile(rf"(?<!\w)(?:{_alternation(GLOBAL_WORDS)})(?!\w)")
+# Case-sensitive: "us"/"eu" are ordinary words in lowercase text
+_CODE_RE = re.compile(r"(?<![\w.])(U\.S\.A?\.?|US|EU)(?![\w])")
+_SUBDIVISION_RE = re.compile(r"([^,/()\-–—|]+?)\s*,\s*([A-Z]{2})\b")
+
+_CODE_PLACES = {"US": COUNTRY_BY_CODE["US"], "EU": PLACES["eu"]}
+
+
+@dataclass(frozen=True)
+class GeoLocation:
+    """Structured form of a raw location string."""
+
+    label: str
+    kind: str = "unknown"  # remote | city | country | region | unknown
+    city: Optional[str] = None
+    countries: Tuple[str, ...] = ()
+    regions: Tuple[str, ...] = ()
+    remote: bool = False
+    remote_scope: Optional[str] = None
+    timezone_band: Optional[str] = None
+
+    @property
+    def country_code(self) -> Optional[str]:
+        return self.countries[0] if self.countries else None
+
+    @property
+    def resolved(self) -> bool:
+        return self.kind != "unknown"
+
+    @property
+    def flag(self) -> str:
+        if len(self.countries) == 1:
+            return country_flag(self.countries[0])
+        if self.remote and self.remote_scope == "Remote":
+            return "🌍"
+        return REGION_FLAGS.get(self.regions[0], "🌐") if self.regions else "🏙️"
+
+    def to_document(self) -> Dict[str, Any]:
+        return {
+            "v": GAZETTEER_VERSION,
+            "label": self.label,
+            "kind": self.kind,
+            "country": self.country_code,
+            "countries": list(self.countries),
+            "regions": list(self.regions),
+            "city": self.city,
+            "remote": self.remote,
+            "remote_scope": self.remote_scope,
+            "timezone_band": self.timezone_band,
+        }
+
+
+REGION_FLAGS = {
+    "europe": "🇪🇺",
+    "north_america": "🌎",
+    "latin_america": "🌎",
+    "middle_east": "🌍",
+    "africa": "🌍",
+    "asia": "🌏",
+    "oceania": "🌏",
+}
+
+
+def country_flag(code: str) -> str:
+    """Regional-indicator flag emoji for an ISO 3166-1 alpha-2 code."""
+    return "".join(chr(0x1F1E6 + ord(c) - ord("A")) for c in code.upper())
+
+
+def lookup_place(name: str) -> Optional[Place]:
+    """Exact gazetteer lookup of a single place name or alias."""
+    return PLACES.get(name.strip().casefold())
+
+
+def is_known_place(name: str) -> bool:
+    """True for gazetteer names and upper-case state codes such as "PA"."""
+    name = name.strip()
+    return lookup_place(name) is not None or (name.isupper() and name in SUBDIVISION_CODES)
+
+
+def _unique(values: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(values))
+
+
+def _find_places(raw: str) -> Tuple[List[Place], Optional[str]]:
+    """Return places mentioned in ``raw`` plus a city parsed from "City, ST"."""
+    found = [(m.start(), PLACES[m.group(0)]) for m in _PLACE_RE.finditer(raw.casefold())]
+    found += [
+        (m.start(), _CODE_PLACES[m.group(1).replace(".", "")[:2]])
+        for m in _CODE_RE.finditer(raw)
+    ]
+    places = [place for _, place in sorted(found, key=lambda item: item[0])]
+    named = {c for p in places if p.kind != "zone" for c in p.countries}
+
+    city = None
+    for m in _SUBDIVISION_RE.finditer(raw):
+        name, code = m.group(1).strip(), m.group(2)
+        place = SUBDIVISION_CODES.get(code)
+        if place is None or (named and place.countries[0] not in named):
+            # "Berlin, DE" or "Lima, PE": an ISO code rather than a state
+            place = COUNTRY_BY_CODE.get(code)
+        if place is None:
+            continue
+        places.append(place)
+        if (
+            place.kind == "subdivision"
+            and not _REMOTE_RE.search(name.casefold())
+            and lookup_place(name) is None
+        ):
+            city = city or name
+    return places, city
+
+
+@lru_cache(maxsize=8192)
+def normalize_location(raw: Optional[str]) -> GeoLocation:
+    """Resolve a free-text location.
+
+    Location strings repeat heavily across a crawl, so results are cached;
+    the returned value is immutable.
+    """
+    text = " ".join((raw or "").split())
+    lowered = text.casefold()
+    remote = bool(_REMOTE_RE.search(lowered)) or lowered in ("global", "globally")
+
+    places, city = _find_places(text)
+    cities = [p for p in places if p.kind == "city"]
+    if cities and city is None:
+        city = cities[0].name
+
+    # Countries named directly (or via a city/subdivision); zones add regions only
+    countries = _unique(c for p in places if p.kind != "zone" for c in p.countries)
+    zones = [p for p in places if p.kind == "zone"]
+    if countries:
+        regions = _unique(r for c in countries for r in COUNTRY_BY_CODE[c].regions)
+    else:
+        regions = _unique(r for p in zones for r in p.regions)
+    bands = {COUNTRY_BY_CODE[c].band for c in countries} or {p.band for p in zones}
+    band = bands.pop() if len(bands) == 1 else None
+
+    if remote:
+        if countries and not _GLOBAL_RE.search(lowered):
+            scope = ", ".join(SCOPE_CODES.get(c, c) for c in countries)
+        elif zones and not _GLOBAL_RE.search(lowered):
+            scope = ", ".join(_unique(p.name for p in zones))
+        else:
+            scope, countries, regions, band = None, (), (), None
+        remote_scope = f"Remote ({scope})" if scope else "Remote"
+        return GeoLocation(
+            label=remote_scope,
+            kind="remote",
+            city=city,
+            countries=countries,
+            regions=regions,
+            remote=True,
+            remote_scope=remote_scope,
+            timezone_band=band,
+        )
+
+    subdivisions = [p for p in places if p.kind == "subdivision"]
+    if city and countries:
+        label, kind = f"{city}, {COUNTRY_BY_CODE[countries[0]].name}", "city"
+    elif subdivisions and len(countries) == 1:
+        label, kind = f"{subdivisions[0].name}, {COUNTRY_BY_CODE[countries[0]].name}", "country"
+    elif countries:
+        label, kind = ", ".join(COUNTRY_BY_CODE[c].name for c in countries), "country"
+    elif zones:
+        label, kind = ", ".join(_unique(p.name for p in zones)), "region"
+    else:
+        return GeoLocation(label=text)
+
+    return GeoLocation(
+        label=label,
+        kind=kind,
+        city=city,
+        countries=countries,
+        regions=regions,
+        timezone_band=band,
+    )
+
+
+def resolve_country(value: str) -> Optional[str]:
+    """Map a country filter value (code, name or alias) to its ISO code."""
+    value = value.strip()
+    if value.upper() in COUNTRY_BY_CODE and len(value) == 2:
+        return value.upper()
+    place = lookup_place(value) or _CODE_PLACES.get(value)
+    if place is not None and place.kind == "country":
+        return place.key
+    return None
+
+
+def resolve_regions(value: str) -> Tuple[str, ...]:
+    """Map a region filter value (region key, zone name or alias) to region keys."""
+    value = value.strip()
+    key = value.casefold().replace(" ", "_")
+    if key in REGION_LABELS:
+        return (key,)
+    place = lookup_place(value)
+    if place is not None and place.kind == "zone":
+        return place.regions
+    return ()
+
+
+def _any_of(field: str, values: Tuple[str, ...]) -> Dict[str, Any]:
+    return {field: values[0] if len(values) == 1 else {"$in": list(values)}}
+
+
+def _text_match(value: str) -> Dict[str, Any]:
+    return {"location": {"$regex": re.escape(value.strip()), "$options": "i"}}
+
+
+def _or_unmigrated(clause: Dict[str, Any], text: str) -> Dict[str, Any]:
+    """Also match jobs stored before ``geo`` existed, by their raw location."""
+    return {"$or": [clause, {"geo": {"$exists": False}, **_text_match(text)}]}
+
+
+def geo_filters(
+    location: Optional[str] = None,
+    country: Optional[str] = None,
+    region: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Build job query clauses for location filters.
+
+    Values the gazetteer resolves become equality matches on the indexed
+    ``geo`` fields; anything else falls back to a text match on the raw
+    ``location`` string. Jobs that have no ``geo`` yet (until the
+    job_statistics backfill reaches them) are matched on the raw string too.
+    """
+    clauses: List[Dict[str, Any]] = []
+
+    if location and location.strip():
+        geo = normalize_location(location)
+        if geo.kind == "remote":
+            clause = (
+                {"geo.remote": True}
+                if geo.remote_scope == "Remote"
+                else {"geo.remote_scope": geo.remote_scope}
+            )
+            text = "remote" if geo.remote_scope == "Remote" else location
+            clauses.append(_or_unmigrated(clause, text))
+        elif geo.kind == "city":
+            clauses.append(_or_unmigrated({"geo.city": geo.city}, geo.city))
+        elif geo.kind == "country":
+            clauses.append(_or_unmigrated(_any_of("geo.countries", geo.countries), location))
+        elif geo.kind == "region":
+            clauses.append(_or_unmigrated(_any_of("geo.regions", geo.regions), location))
+        else:
+            clauses.append(_text_match(location))
+
+    if country and country.strip():
+        code = resolve_country(country)
+        if code:
+            clauses.append(_or_unmigrated({"geo.countries": code}, COUNTRY_BY_CODE[code].name))
+        else:
+            clauses.append(_text_match(country))
+
+    if region and region.strip():
+        regions = resolve_regions(region)
+        clauses.append(
+            _or_unmigrated(_any_of("geo.regions", regions), region) if regions else _text_match(region)
+        )
+
+    return clauses
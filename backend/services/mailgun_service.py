@@ -1,12 +1,278 @@
+import asyncio
+import functools
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Placeholder the cached base template is split on
+_CONTENT_MARKER = "<!--buzz2remote-content-->"
+
+
+@functools.lru_cache(maxsize=64)
+def _template_parts(title: str, header_gradient: str) -> Tuple[str, str]:
+    """Render the static template once per title/gradient, split around the content"""
+    html = f"""
+    <!DOCTYPE html>
+    <html lang="tr">
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <meta http-equiv="X-UA-Compatible" content="IE=edge">
+        <title>{title}</title>
+        <style>
+            @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+            
+            * {{
+                margin: 0;
+                padding: 0;
+                box-sizing: border-box;
+            }}
+            
+            body {{
+                font-family: 'Inter', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+                line-height: 1.6;
+                margin: 0;
+                padding: 20px;
+                background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+                min-height: 100vh;
+            }}
+            
+            .email-wrapper {{
+                max-width: 600px;
+                margin: 0 auto;
+                background-color: white;
+                border-radius: 16px;
+                overflow: hidden;
+                box-shadow: 0 10px 30px rgba(0,0,0,0.1);
+            }}
+            
+            .header {{
+                background: {header_gradient};
+                color: white;
+                padding: 40px 30px;
+                text-align: center;
+                position: relative;
+            }}
+            
+            .header::before {{
+                content: '';
+                position: absolute;
+                top: 0;
+                left: 0;
+                right: 0;
+                bottom: 0;
+                background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><circle cx="20" cy="20" r="2" fill="rgba(255,255,255,0.1)"/><circle cx="80" cy="40" r="1" fill="rgba(255,255,255,0.1)"/><circle cx="40" cy="80" r="1.5" fill="rgba(255,255,255,0.1)"/></svg>');
+            }}
+            
+            .logo {{
+                font-size: 28px;
+                font-weight: 700;
+                margin-bottom: 10px;
+                position: relative;
+                z-index: 2;
+            }}
+            
+            .header h1 {{
+                font-size: 24px;
+                font-weight: 600;
+                margin-bottom: 8px;
+                position: relative;
+                z-index: 2;
+            }}
+            
+            .header p {{
+                font-size: 16px;
+                opacity: 0.9;
+                position: relative;
+                z-index: 2;
+            }}
+            
+            .content {{
+                padding: 40px 30px;
+            }}
+            
+            .content h2 {{
+                color: #2d3748;
+                font-size: 20px;
+                font-weight: 600;
+                margin-bottom: 20px;
+            }}
+            
+            .content p {{
+                color: #4a5568;
+                font-size: 15px;
+                margin-bottom: 15px;
+            }}
+            
+            .button {{
+                display: inline-block;
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                color: white !important;
+                padding: 15px 32px;
+                text-decoration: none;
+                border-radius: 8px;
+                font-weight: 600;
+                font-size: 15px;
+                margin: 20px 0;
+                transition: all 0.3s ease;
+                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
+            }}
+            
+            .button:hover {{
+                transform: translateY(-2px);
+                box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
+            }}
+            
+            .feature-list {{
+                background-color: #f8fafc;
+                border-radius: 12px;
+                padding: 24px;
+                margin: 24px 0;
+            }}
+            
+            .feature-item {{
+                display: flex;
+                align-items: flex-start;
+                margin-bottom: 16px;
+                padding: 12px;
+                background: white;
+                border-radius: 8px;
+                border-left: 4px solid #667eea;
+            }}
+            
+            .feature-item:last-child {{
+                margin-bottom: 0;
+            }}
+            
+            .feature-icon {{
+                font-size: 20px;
+                margin-right: 12px;
+                margin-top: 2px;
+            }}
+            
+            .feature-content h3 {{
+                color: #2d3748;
+                font-size: 16px;
+                font-weight: 600;
+                margin-bottom: 4px;
+            }}
+            
+            .feature-content p {{
+                color: #718096;
+                font-size: 14px;
+                margin: 0;
+            }}
+            
+            .warning-box {{
+                background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
+                border: 1px solid #f0c14b;
+                border-radius: 8px;
+                padding: 20px;
+                margin: 20px 0;
+            }}
+            
+            .warning-box strong {{
+                color: #856404;
+                display: block;
+                margin-bottom: 8px;
+            }}
+            
+            .footer {{
+                background-color: #f8fafc;
+                padding: 30px;
+                text-align: center;
+                border-top: 1px solid #e2e8f0;
+            }}
+            
+            .footer p {{
+                color: #718096;
+                font-size: 13px;
+                margin-bottom: 8px;
+            }}
+            
+            .footer-links {{
+                margin-top: 20px;
+            }}
+            
+            .footer-links a {{
+                color: #667eea;
+                text-decoration: none;
+                margin: 0 10px;
+                font-size: 13px;
+            }}
+            
+            .social-links {{
+                margin-top: 16px;
+            }}
+            
+            .social-links a {{
+                display: inline-block;
+                margin: 0 8px;
+                color: #718096;
+                text-decoration: none;
+            }}
+            
+            @media only screen and (max-width: 600px) {{
+                body {{
+                    padding: 10px;
+                }}
+                
+                .header {{
+                    padding: 30px 20px;
+                }}
+                
+                .content {{
+                    padding: 30px 20px;
+                }}
+                
+                .footer {{
+                    padding: 20px;
+                }}
+                
+                .button {{
+                    display: block;
+                    text-align: center;
+                    width: 100%;
+                }}
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="email-wrapper">
+            <div class="header">
+                <div class="logo">🚀 Buzz2Remote</div>
+                <h1>{title}</h1>
+                <p>Remote iş dünyasının lideri</p>
+            </div>
+            <div class="content">
+                {_CONTENT_MARKER}
+            </div>
+            <div class="footer">
+                <p>Bu email, Buzz2Remote sistemi tarafından gönderilmiştir.</p>
+                <p>© 2024 Buzz2Remote. Tüm hakları saklıdır.</p>
+                <div class="footer-links">
+                    <a href="https://buzz2remote.com/privacy">Gizlilik Politikası</a>
+                    <a href="https://buzz2remote.com/terms">Kullanım Koşulları</a>
+                    <a href="https://buzz2remote.com/contact">İletişim</a>
+                </div>
+                <div class="social-links">
+                    <a href="https://linkedin.com/company/buzz2remote">LinkedIn</a>
+                    <a href="https://twitter.com/buzz2remote">Twitter</a>
+                    <a href="https://github.com/buzz2remote">GitHub</a>
+                </div>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    head, _, tail = html.partition(_CONTENT_MARKER)
+    return head, tail
+
 
 class MailgunService:
     """Mailgun email service for sending emails"""
@@ -24,6 +290,9 @@ class MailgunService:
         self.sent_today = 0
         self.last_reset_date = datetime.now().date()
 
+        # Persistent outbound queue, attached at app startup
+        self.queue = None
+
         # Brand colors and styling
         self.brand_colors = {
             "primary": "#667eea",
@@ -43,260 +312,21 @@ class MailgunService:
         header_gradient: str = "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
     ) -> str:
         """Get base email template with Buzz2Remote branding"""
-        return f"""
-        <!DOCTYPE html>
-        <html lang="tr">
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <meta http-equiv="X-UA-Compatible" content="IE=edge">
-            <title>{title}</title>
-            <style>
-                @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-                
-                * {{
-                    margin: 0;
-                    padding: 0;
-                    box-sizing: border-box;
-                }}
-                
-                body {{
-                    font-family: 'Inter', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    line-height: 1.6;
-                    margin: 0;
-                    padding: 20px;
-                    background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-                    min-height: 100vh;
-                }}
-                
-                .email-wrapper {{
-                    max-width: 600px;
-                    margin: 0 auto;
-                    background-color: white;
-                    border-radius: 16px;
-                    overflow: hidden;
-                    box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-                }}
-                
-                .header {{
-                    background: {header_gradient};
-                    color: white;
-                    padding: 40px 30px;
-                    text-align: center;
-                    position: relative;
-                }}
-                
-                .header::before {{
-                    content: '';
-                    position: absolute;
-                    top: 0;
-                    left: 0;
-                    right: 0;
-                    bottom: 0;
-                    background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><circle cx="20" cy="20" r="2" fill="rgba(255,255,255,0.1)"/><circle cx="80" cy="40" r="1" fill="rgba(255,255,255,0.1)"/><circle cx="40" cy="80" r="1.5" fill="rgba(255,255,255,0.1)"/></svg>');
-                }}
-                
-                .logo {{
-                    font-size: 28px;
-                    font-weight: 700;
-                    margin-bottom: 10px;
-                    position: relative;
-                    z-index: 2;
-                }}
-                
-                .header h1 {{
-                    font-size: 24px;
-                    font-weight: 600;
-                    margin-bottom: 8px;
-                    position: relative;
-                    z-index: 2;
-                }}
-                
-                .header p {{
-                    font-size: 16px;
-                    opacity: 0.9;
-                    position: relative;
-                    z-index: 2;
-                }}
-                
-                .content {{
-                    padding: 40px 30px;
-                }}
-                
-                .content h2 {{
-                    color: #2d3748;
-                    font-size: 20px;
-                    font-weight: 600;
-                    margin-bottom: 20px;
-                }}
-                
-                .content p {{
-                    color: #4a5568;
-                    font-size: 15px;
-                    margin-bottom: 15px;
-                }}
-                
-                .button {{
-                    display: inline-block;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white !important;
-                    padding: 15px 32px;
-                    text-decoration: none;
-                    border-radius: 8px;
-                    font-weight: 600;
-                    font-size: 15px;
-                    margin: 20px 0;
-                    transition: all 0.3s ease;
-                    box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-                }}
-                
-                .button:hover {{
-                    transform: translateY(-2px);
-                    box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
-                }}
-                
-                .feature-list {{
-                    background-color: #f8fafc;
-                    border-radius: 12px;
-                    padding: 24px;
-                    margin: 24px 0;
-                }}
-                
-                .feature-item {{
-                    display: flex;
-                    align-items: flex-start;
-                    margin-bottom: 16px;
-                    padding: 12px;
-                    background: white;
-                    border-radius: 8px;
-                    border-left: 4px solid #667eea;
-                }}
-                
-                .feature-item:last-child {{
-                    margin-bottom: 0;
-                }}
-                
-                .feature-icon {{
-                    font-size: 20px;
-                    margin-right: 12px;
-                    margin-top: 2px;
-                }}
-                
-                .feature-content h3 {{
-                    color: #2d3748;
-                    font-size: 16px;
-                    font-weight: 600;
-                    margin-bottom: 4px;
-                }}
-                
-                .feature-content p {{
-                    color: #718096;
-                    font-size: 14px;
-                    margin: 0;
-                }}
-                
-                .warning-box {{
-                    background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
-                    border: 1px solid #f0c14b;
-                    border-radius: 8px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                
-                .warning-box strong {{
-                    color: #856404;
-                    display: block;
-                    margin-bottom: 8px;
-                }}
-                
-                .footer {{
-                    background-color: #f8fafc;
-                    padding: 30px;
-                    text-align: center;
-                    border-top: 1px solid #e2e8f0;
-                }}
-                
-                .footer p {{
-                    color: #718096;
-                    font-size: 13px;
-                    margin-bottom: 8px;
-                }}
-                
-                .footer-links {{
-                    margin-top: 20px;
-                }}
-                
-                .footer-links a {{
-                    color: #667eea;
-                    text-decoration: none;
-                    margin: 0 10px;
-                    font-size: 13px;
-                }}
-                
-                .social-links {{
-                    margin-top: 16px;
-                }}
-                
-                .social-links a {{
-                    display: inline-block;
-                    margin: 0 8px;
-                    color: #718096;
-                    text-decoration: none;
-                }}
-                
-                @media only screen and (max-width: 600px) {{
-                    body {{
-                        padding: 10px;
-                    }}
-                    
-                    .header {{
-                        padding: 30px 20px;
-                    }}
-                    
-                    .content {{
-                        padding: 30px 20px;
-                    }}
-                    
-                    .footer {{
-                        padding: 20px;
-                    }}
-                    
-                    .button {{
-                        display: block;
-                        text-align: center;
-                        width: 100%;
-                    }}
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="email-wrapper">
-                <div class="header">
-                    <div class="logo">🚀 Buzz2Remote</div>
-                    <h1>{title}</h1>
-                    <p>Remote iş dünyasının lideri</p>
-                </div>
-                <div class="content">
-                    {content}
-                </div>
-                <div class="footer">
-                    <p>Bu email, Buzz2Remote sistemi tarafından gönderilmiştir.</p>
-                    <p>© 2024 Buzz2Remote. Tüm hakları saklıdır.</p>
-                    <div class="footer-links">
-                        <a href="https://buzz2remote.com/privacy">Gizlilik Politikası</a>
-                        <a href="https://buzz2remote.com/terms">Kullanım Koşulları</a>
-                        <a href="https://buzz2remote.com/contact">İletişim</a>
-                    </div>
-                    <div class="social-links">
-                        <a href="https://linkedin.com/company/buzz2remote">LinkedIn</a>
-                        <a href="https://twitter.com/buzz2remote">Twitter</a>
-                        <a href="https://github.com/buzz2remote">GitHub</a>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        head, tail = _template_parts(title, header_gradient)
+        return f"{head}{content}{tail}"
+
+    def attach_queue(self, queue) -> None:
+        """Route send_email through a persistent EmailQueue"""
+        self.queue = queue
+
+    def _queue_available(self) -> bool:
+        if self.queue is None or not self.queue.running:
+            return False
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
 
     def _check_daily_limit(self) -> bool:
         """Check if we're within daily email limit"""
@@ -331,6 +361,17 @@ class MailgunService:
             Dict with success status and message
         """
         try:
+            # Inside the app's event loop, hand off to the outbox instead of blocking
+            if self._queue_available():
+                self.queue.submit_nowait(
+                    to_email=to_email,
+                    subject=subject,
+                    html_content=html_content,
+                    text_content=text_content,
+                    from_name=from_name,
+                )
+                return {"success": True, "queued": True, "message": "Email queued"}
+
             # Check if Mailgun API key is configured
             if not self.api_key:
                 logger.warning(
@@ -606,14 +647,8 @@ class MailgunService:
 
         return result.get("success", False)
 
-    def send_new_jobs_email(
-        self, email: str, name: str, jobs: List[Dict], user_preferences: Dict = None
-    ) -> bool:
-        """Send daily/weekly new jobs email"""
-        job_count = len(jobs)
-        subject = f"🔥 {job_count} Yeni Remote İş Fırsatı - Buzz2Remote"
-
-        # Create search URL with user preferences
+    def _new_jobs_search_url(self, user_preferences: Dict = None) -> str:
+        """Search URL for the new jobs email, built from user preferences"""
         frontend_url = os.getenv("FRONTEND_URL", "https://buzz2remote.com")
         search_params = []
 
@@ -628,7 +663,15 @@ class MailgunService:
                 search_params.append(f"salary_min={user_preferences['salary_min']}")
 
         search_params.append("date_range=24h")  # Son 24 saat
-        search_url = f"{frontend_url}/jobs?" + "&".join(search_params)
+        return f"{frontend_url}/jobs?" + "&".join(search_params)
+
+    def _render_new_jobs_email(
+        self, email: str, name: str, jobs: List[Dict], search_url: str
+    ) -> Tuple[str, str]:
+        """Render subject and HTML of the new jobs email"""
+        job_count = len(jobs)
+        subject = f"🔥 {job_count} Yeni Remote İş Fırsatı - Buzz2Remote"
+        frontend_url = os.getenv("FRONTEND_URL", "https://buzz2remote.com")
 
         # Generate job cards HTML
         job_cards_html = ""
@@ -697,6 +740,15 @@ class MailgunService:
             content,
             "linear-gradient(135deg, #ff9a56 0%, #ffad56 100%)",
         )
+        return subject, html_content
+
+    def send_new_jobs_email(
+        self, email: str, name: str, jobs: List[Dict], user_preferences: Dict = None
+    ) -> bool:
+        """Send daily/weekly new jobs email"""
+        subject, html_content = self._render_new_jobs_email(
+            email, name, jobs, self._new_jobs_search_url(user_preferences)
+        )
 
         result = self.send_email(
             to_email=email, subject=subject, html_content=html_content
@@ -704,6 +756,52 @@ class MailgunService:
 
         return result.get("success", False)
 
+    async def queue_new_jobs_digest(
+        self,
+        recipients: List[Dict[str, str]],
+        jobs: List[Dict],
+        user_preferences: Dict = None,
+    ) -> int:
+        """
+        Queue one new jobs email for recipients that share the same jobs and
+        preferences. The email is rendered once and sent as a Mailgun batch
+        message with per-recipient name/email variables.
+
+        Returns the number of recipients queued (or sent, without a queue).
+        """
+        if not recipients:
+            return 0
+
+        if self.queue is None:
+            sent = 0
+            for recipient in recipients:
+                # The synchronous Mailgun call must not block the event loop
+                sent += await asyncio.to_thread(
+                    self.send_new_jobs_email,
+                    recipient["email"],
+                    recipient.get("name", ""),
+                    jobs,
+                    user_preferences,
+                )
+            return sent
+
+        subject, html_content = self._render_new_jobs_email(
+            "%recipient.email%",
+            "%recipient.name%",
+            jobs,
+            self._new_jobs_search_url(user_preferences),
+        )
+        await self.queue.enqueue_batch(
+            {
+                r["email"]: {"email": r["email"], "name": r.get("name", "")}
+                for r in recipients
+            },
+            subject,
+            html_content,
+            tag="new-jobs-digest",
+        )
+        return len(recipients)
+
     def send_application_status_email(
         self, email: str, name: str, job_title: str, company_name: str, status: str
     ) -> bool:
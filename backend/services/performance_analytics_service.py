@@ -5,6 +5,10 @@ from typing import Any, Dict, List
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from backend.services.query_profiler import get_query_profiler
+from backend.services.request_metrics import (get_metrics_registry,
+                                              load_rollups)
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,17 +19,18 @@ class PerformanceAnalyticsService:
         self.db = db
         self.metrics_cache = {}
 
-    async def track_api_call(self, endpoint: str, duration_ms: float, status_code: int):
-        """Track API call performance."""
+    async def track_api_call(
+        self, endpoint: str, duration_ms: float, status_code: int, method: str = "GET"
+    ):
+        """Track API call performance.
+
+        Calls are recorded into the in-process latency histograms, which the
+        rollup task folds into ``performance_rollups`` once a minute.
+        """
         try:
-            metric = {
-                "endpoint": endpoint,
-                "duration_ms": duration_ms,
-                "status_code": status_code,
-                "timestamp": datetime.utcnow(),
-                "date": datetime.utcnow().date().isoformat(),
-            }
-            await self.db.performance_metrics.insert_one(metric)
+            get_metrics_registry().observe(
+                endpoint, method, status_code, int(duration_ms * 1000)
+            )
         except Exception as e:
             logger.error(f"Error tracking API call: {e}")
 
@@ -33,27 +38,25 @@ class PerformanceAnalyticsService:
         """Get performance summary for the last 24 hours."""
         try:
             since = datetime.utcnow() - timedelta(hours=24)
-
-            pipeline = [
-                {"$match": {"timestamp": {"$gte": since}}},
-                {
-                    "$group": {
-                        "_id": "$endpoint",
-                        "avg_duration": {"$avg": "$duration_ms"},
-                        "max_duration": {"$max": "$duration_ms"},
-                        "min_duration": {"$min": "$duration_ms"},
-                        "call_count": {"$sum": 1},
-                        "error_count": {
-                            "$sum": {"$cond": [{"$gte": ["$status_code", 400]}, 1, 0]}
-                        },
+            routes = await load_rollups(self.db, since)
+
+            results = []
+            for route, entry in routes.items():
+                latency = entry["latency"]
+                results.append(
+                    {
+                        "_id": route,
+                        "avg_duration": latency.mean / 1000,
+                        "max_duration": latency.max / 1000,
+                        "p50_duration": latency.percentile(0.5) / 1000,
+                        "p95_duration": latency.percentile(0.95) / 1000,
+                        "p99_duration": latency.percentile(0.99) / 1000,
+                        "db_avg_duration": entry["db_latency"].mean / 1000,
+                        "call_count": latency.count,
+                        "error_count": entry["errors"],
                     }
-                },
-                {"$sort": {"call_count": -1}},
-            ]
-
-            results = await self.db.performance_metrics.aggregate(pipeline).to_list(
-                None
-            )
+                )
+            results.sort(key=lambda r: r["call_count"], reverse=True)
 
             return {
                 "endpoints": results,
@@ -85,23 +88,32 @@ class PerformanceAnalyticsService:
         return TimeMeasurer(self)
 
     async def analyze_slow_queries(self) -> List[Dict[str, Any]]:
-        """Analyze slow performing queries."""
-        try:
-            pipeline = [
-                {"$match": {"duration_ms": {"$gte": 1000}}},  # Queries > 1 second
-                {
-                    "$group": {
-                        "_id": "$endpoint",
-                        "avg_duration": {"$avg": "$duration_ms"},
-                        "max_duration": {"$max": "$duration_ms"},
-                        "count": {"$sum": 1},
-                    }
-                },
-                {"$sort": {"avg_duration": -1}},
-                {"$limit": 10},
-            ]
+        """Analyze slow performing queries.
 
-            return await self.db.performance_metrics.aggregate(pipeline).to_list(None)
+        Each slow route lists the MongoDB query shapes this process has seen
+        it issue, slowest first, with scan flags from sampled query plans.
+        """
+        try:
+            since = datetime.utcnow() - timedelta(hours=24)
+            routes = await load_rollups(self.db, since)
+            profiler = get_query_profiler()
+
+            slow = []
+            for route, entry in routes.items():
+                latency = entry["latency"]
+                count = latency.count_at_least(1_000_000)  # Requests > 1 second
+                if count:
+                    slow.append(
+                        {
+                            "_id": route,
+                            "p99_duration": latency.percentile(0.99) / 1000,
+                            "max_duration": latency.max / 1000,
+                            "count": count,
+                            "queries": profiler.for_route(route),
+                        }
+                    )
+            slow.sort(key=lambda r: r["p99_duration"], reverse=True)
+            return slow[:10]
         except Exception as e:
             logger.error(f"Error analyzing slow queries: {e}")
             return []
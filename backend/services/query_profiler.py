@@ -0,0 +1,519 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bson.regex import Regex
+from pymongo import monitoring
+
+from .request_metrics import QUANTILES, LatencyHistogram, current_timing
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("QUERY_PROFILER_SLOW_MS", "100"))
+MAX_SHAPES = int(os.getenv("QUERY_PROFILER_MAX_SHAPES", "500"))
+EXPLAIN_BATCH = 5
+PLAN_TTL = timedelta(minutes=10)
+
+# A plan that reads this many documents per returned document is treated as
+# a scan even when the planner picked an index.
+SCAN_RATIO = 10
+
+PROFILED_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$exists"}
+EQUALITY_OPERATORS = {"$eq", "$in"}
+
+# Session and transport fields that explain rejects or that carry no shape
+COMMAND_METADATA = {
+    "lsid",
+    "txnNumber",
+    "autocommit",
+    "startTransaction",
+    "writeConcern",
+    "readConcern",
+    "apiVersion",
+    "apiStrict",
+    "apiDeprecationErrors",
+}
+
+RegexUse = Dict[str, Any]
+
+
+def _leaf(value: Any) -> str:
+    return f"?{type(value).__name__}"
+
+
+def _regex_kind(pattern: str) -> str:
+    """``?prefix`` for anchored literal prefixes an index can bound, else ``?pattern``."""
+    if pattern.startswith("^") and not pattern.startswith(("^.*", "^(", "^[")):
+        return "?prefix"
+    return "?pattern"
+
+
+def _pattern_shape(value) -> Dict[str, str]:
+    if isinstance(value, Regex):
+        pattern, flags = value.pattern, value.flags
+        ignore_case = bool(flags & re.IGNORECASE) if isinstance(flags, int) else "i" in flags
+    else:
+        pattern, ignore_case = value.pattern, bool(value.flags & re.IGNORECASE)
+    shape = {"$regex": _regex_kind(str(pattern))}
+    if ignore_case:
+        shape["$options"] = "i"
+    return shape
+
+
+def query_shape(value: Any) -> Any:
+    """Replace literal values in a filter with type placeholders.
+
+    Operators and field names are kept, ``$in`` style lists collapse to the
+    distinct shapes of their elements, and regular expressions keep whether
+    they are anchored and case-insensitive since that decides index use.
+    """
+    if isinstance(value, dict):
+        shape = {}
+        for key, item in value.items():
+            if key == "$regex":
+                if isinstance(item, (Regex, re.Pattern)):
+                    shape.update(_pattern_shape(item))
+                else:
+                    shape[key] = _regex_kind(str(item))
+            elif key == "$options":
+                shape[key] = "".join(sorted(str(item)))
+            else:
+                shape[key] = query_shape(item)
+        return shape
+    if isinstance(value, (list, tuple)):
+        shapes, seen = [], set()
+        for item in value:
+            shape = query_shape(item)
+            marker = json.dumps(shape, sort_keys=True, default=str)
+            if marker not in seen:
+                seen.add(marker)
+                shapes.append(shape)
+        return shapes
+    if isinstance(value, (Regex, re.Pattern)):
+        return _pattern_shape(value)
+    return _leaf(value)
+
+
+def _sort_shape(sort: Any) -> List[Tuple[str, int]]:
+    if not sort:
+        return []
+    items = sort.items() if isinstance(sort, dict) else sort
+    return [(field, int(direction)) for field, direction in items if isinstance(direction, int)]
+
+
+def _pipeline_shape(pipeline: Iterable[Dict[str, Any]]) -> List[Any]:
+    stages = []
+    for stage in pipeline or []:
+        name, body = next(iter(stage.items()))
+        if name == "$match":
+            stages.append({name: query_shape(body)})
+        elif name == "$sort":
+            stages.append({name: dict(_sort_shape(body))})
+        else:
+            stages.append(name)
+    return stages
+
+
+def _leading_match(pipeline) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+    """The ``$match`` and ``$sort`` at the head of a pipeline, which can use indexes."""
+    query: Dict[str, Any] = {}
+    sort: List[Tuple[str, int]] = []
+    for stage in pipeline or []:
+        name, body = next(iter(stage.items()))
+        if name == "$match" and not query and not sort:
+            query = body
+        elif name == "$sort" and not sort:
+            sort = _sort_shape(body)
+        else:
+            break
+    return query, sort
+
+
+def describe_command(name: str, command: Dict[str, Any]):
+    """Return ``(collection, shape, filter, sort)`` for a profiled command, else None."""
+    collection = command.get(name)
+    if not isinstance(collection, str):
+        return None
+    if name == "find":
+        query, sort = command.get("filter") or {}, _sort_shape(command.get("sort"))
+        shape = {"filter": query_shape(query), "sort": dict(sort)}
+    elif name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        query, sort = _leading_match(pipeline)
+        shape = {"pipeline": _pipeline_shape(pipeline)}
+    elif name in ("count", "distinct"):
+        query, sort = command.get("query") or {}, []
+        shape = {"filter": query_shape(query), "key": command.get("key")}
+    elif name in ("update", "delete"):
+        statements = command.get(f"{name}s") or [{}]
+        query, sort = statements[0].get("q") or {}, []
+        shape = {"filter": query_shape(query), "multi": bool(statements[0].get("multi"))}
+    elif name == "findAndModify":
+        query, sort = command.get("query") or {}, _sort_shape(command.get("sort"))
+        shape = {"filter": query_shape(query), "sort": dict(sort)}
+    else:
+        return None
+    return collection, shape, query, sort
+
+
+def regex_uses(shape: Any, field: Optional[str] = None) -> Iterator[RegexUse]:
+    """Every regular expression in a query shape with whether an index can bound it."""
+    if isinstance(shape, dict):
+        if "$regex" in shape and field:
+            anchored = shape["$regex"] == "?prefix"
+            ignore_case = "i" in shape.get("$options", "")
+            yield {
+                "field": field,
+                "anchored": anchored,
+                "case_insensitive": ignore_case,
+                "indexable": anchored and not ignore_case,
+            }
+            return
+        for key, value in shape.items():
+            yield from regex_uses(value, field if key.startswith("$") else key)
+    elif isinstance(shape, list):
+        for item in shape:
+            yield from regex_uses(item, field)
+
+
+def _conjuncts(query: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    for field, value in query.items():
+        if field == "$and":
+            for branch in value:
+                yield from _conjuncts(branch)
+        elif not field.startswith("$"):
+            yield field, value
+
+
+def suggest_index(query: Dict[str, Any], sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """Index keys for a query shape following the equality, sort, range rule.
+
+    Fields that only appear under ``$or`` or behind unanchored or
+    case-insensitive regular expressions cannot use index bounds and are left out.
+    """
+    equality: List[str] = []
+    ranges: List[str] = []
+    for field, value in _conjuncts(query or {}):
+        operators = set(value) if isinstance(value, dict) else set()
+        if not any(op.startswith("$") for op in operators) or operators & EQUALITY_OPERATORS:
+            equality.append(field)
+        elif "$regex" in operators:
+            if all(use["indexable"] for use in regex_uses(value, field)):
+                ranges.append(field)
+        elif operators & RANGE_OPERATORS:
+            ranges.append(field)
+
+    keys: List[Tuple[str, int]] = []
+    for field, direction in [(f, 1) for f in equality] + list(sort) + [(f, 1) for f in ranges]:
+        if field not in (key for key, _ in keys):
+            keys.append((field, direction))
+    return keys
+
+
+def _plan_stages(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def summarize_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Winning plan stages and examined counts from ``explain`` output."""
+    source = explain
+    if "queryPlanner" not in source:
+        for stage in explain.get("stages", []):
+            if "$cursor" in stage:
+                source = stage["$cursor"]
+                break
+    winning = source.get("queryPlanner", {}).get("winningPlan", {})
+    winning = winning.get("queryPlan", winning)
+    stages = list(_plan_stages(winning)) if winning else []
+    stats = source.get("executionStats", {})
+    docs_examined = stats.get("totalDocsExamined", 0)
+    returned = stats.get("nReturned", 0)
+    collscan = any(stage.get("stage") == "COLLSCAN" for stage in stages)
+    return {
+        "stages": [stage.get("stage") for stage in stages],
+        "indexes": [stage["indexName"] for stage in stages if stage.get("indexName")],
+        "collscan": collscan,
+        "docs_examined": docs_examined,
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "returned": returned,
+        "execution_ms": stats.get("executionTimeMillis"),
+        "inefficient": collscan or docs_examined > SCAN_RATIO * max(returned, 1),
+    }
+
+
+def explain_target(command: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: value
+        for key, value in command.items()
+        if key not in COMMAND_METADATA and not key.startswith("$")
+    }
+
+
+def _database_name(db) -> Optional[str]:
+    name = getattr(db, "name", None)
+    return name if isinstance(name, str) else None
+
+
+class QueryShape:
+    """Latency and plan information for one normalized command shape."""
+
+    __slots__ = (
+        "key",
+        "id",
+        "database",
+        "collection",
+        "command",
+        "shape",
+        "query",
+        "sort",
+        "latency",
+        "slow",
+        "sample",
+        "sample_us",
+        "routes",
+        "regex",
+        "plan",
+        "plan_at",
+    )
+
+    def __init__(self, key, database, collection, command, shape, query, sort):
+        self.key = key
+        self.id = hashlib.sha1(key.encode()).hexdigest()[:12]
+        self.database = database
+        self.collection = collection
+        self.command = command
+        self.shape = shape
+        self.query = query_shape(query)
+        self.sort = sort
+        self.latency = LatencyHistogram()
+        self.slow = 0
+        self.sample: Optional[Dict[str, Any]] = None
+        self.sample_us = 0
+        self.routes: Dict[str, int] = {}
+        self.regex = list(regex_uses(self.query))
+        self.plan: Optional[Dict[str, Any]] = None
+        self.plan_at: Optional[datetime] = None
+
+    @property
+    def regex_scan(self) -> bool:
+        return any(not use["indexable"] for use in self.regex)
+
+    def suggested_index(self) -> List[Tuple[str, int]]:
+        return suggest_index(self.query, self.sort)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            "id": self.id,
+            "collection": self.collection,
+            "command": self.command,
+            "shape": self.shape,
+            "count": latency.count,
+            "slow_count": self.slow,
+            "total_ms": latency.total / 1000,
+            "max_ms": latency.max / 1000,
+            **{f"p{int(q * 100)}_ms": latency.percentile(q) / 1000 for q in QUANTILES},
+            "routes": dict(sorted(self.routes.items(), key=lambda r: r[1], reverse=True)[:5]),
+            "regex": self.regex,
+            "regex_scan": self.regex_scan,
+            "plan": self.plan,
+            "collscan": bool(self.plan and self.plan.get("collscan")),
+            "suggested_index": [list(key) for key in self.suggested_index()],
+        }
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Group MongoDB commands by normalized shape and keep per-shape latency.
+
+    Registered next to the request timing listener, so every Motor call is
+    seen without wrapping collections. The slowest command of each slow shape
+    is kept for ``explain`` sampling; shapes are attributed to the routes of
+    the requests that issued them once the request finishes.
+    """
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, max_shapes: int = MAX_SHAPES):
+        self.slow_us = int(slow_ms * 1000)
+        self.max_shapes = max_shapes
+        self.shapes: Dict[str, QueryShape] = {}
+        self.dropped = 0
+        self._pending: Dict[Tuple[Any, int], Tuple[QueryShape, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, database: str, name: str, command: Dict[str, Any]) -> Optional[QueryShape]:
+        described = describe_command(name, command)
+        if described is None:
+            return None
+        collection, shape, query, sort = described
+        key = f"{database}.{collection}.{name}:{json.dumps(shape, sort_keys=True, default=str)}"
+        entry = self.shapes.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self.shapes.get(key)
+                if entry is None:
+                    if len(self.shapes) >= self.max_shapes:
+                        self.dropped += 1
+                        return None
+                    entry = self.shapes[key] = QueryShape(
+                        key, database, collection, name, shape, query, sort
+                    )
+        return entry
+
+    def started(self, event):
+        if event.command_name not in PROFILED_COMMANDS:
+            return
+        try:
+            entry = self._entry(event.database_name, event.command_name, event.command)
+        except Exception as e:
+            logger.debug(f"Could not shape {event.command_name} command: {e}")
+            return
+        if entry is not None:
+            self._pending[(event.connection_id, event.request_id)] = (entry, event.command)
+
+    def _finish(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        entry, command = pending
+        duration = event.duration_micros
+        with self._lock:
+            entry.latency.record(duration)
+            if duration >= self.slow_us:
+                entry.slow += 1
+                if duration >= entry.sample_us:
+                    entry.sample, entry.sample_us = command, duration
+        timing = current_timing()
+        if timing is not None:
+            timing.query_shapes.add(entry.key)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def attribute(self, route: str, keys: Iterable[str]) -> None:
+        """Count ``route`` against every shape one of its requests issued."""
+        for key in keys:
+            entry = self.shapes.get(key)
+            if entry is not None:
+                entry.routes[route] = entry.routes.get(route, 0) + 1
+
+    def top(self, limit: int = 20) -> List[QueryShape]:
+        """Shapes ordered by the total time spent in them."""
+        return sorted(self.shapes.values(), key=lambda e: e.latency.total, reverse=True)[:limit]
+
+    def for_route(self, route: str, limit: int = 3) -> List[Dict[str, Any]]:
+        rows = []
+        for entry in self.top(len(self.shapes)):
+            if route in entry.routes:
+                rows.append(
+                    {
+                        "id": entry.id,
+                        "collection": entry.collection,
+                        "command": entry.command,
+                        "p95_ms": entry.latency.percentile(0.95) / 1000,
+                        "slow_count": entry.slow,
+                        "collscan": bool(entry.plan and entry.plan.get("collscan")),
+                        "regex_scan": entry.regex_scan,
+                    }
+                )
+                if len(rows) >= limit:
+                    break
+        return rows
+
+    async def sample_plans(self, db, limit: int = EXPLAIN_BATCH, now: Optional[datetime] = None) -> int:
+        """Run ``explain`` for the slowest shapes without a fresh plan."""
+        now = now or datetime.utcnow()
+        database = _database_name(db)
+        candidates = [
+            entry
+            for entry in self.shapes.values()
+            if entry.sample is not None
+            and (database is None or entry.database == database)
+            and (entry.plan_at is None or now - entry.plan_at > PLAN_TTL)
+        ]
+        candidates.sort(key=lambda e: e.sample_us, reverse=True)
+        sampled = 0
+        for entry in candidates[:limit]:
+            try:
+                explain = await db.command(
+                    {"explain": explain_target(entry.sample), "verbosity": "executionStats"}
+                )
+                entry.plan = summarize_plan(explain)
+                sampled += 1
+            except Exception as e:
+                logger.warning(f"explain failed for {entry.collection}.{entry.command}: {e}")
+                entry.plan = {"error": str(e)}
+            entry.plan_at = now
+        return sampled
+
+    async def report(self, db=None, limit: int = 20, explain: bool = True) -> Dict[str, Any]:
+        """Top shapes, scans and index suggestions checked against existing indexes."""
+        if db is not None and explain:
+            await self.sample_plans(db)
+
+        database = _database_name(db)
+        existing: Dict[str, List[List[str]]] = {}
+        suggestions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        rows = []
+        for entry in self.top(limit):
+            row = entry.to_dict()
+            rows.append(row)
+            row["index_exists"] = False
+            if database is not None and entry.database != database:
+                continue
+            keys = entry.suggested_index()
+            needs_index = entry.slow and (entry.plan is None or entry.plan.get("inefficient"))
+            if db is not None and keys and entry.collection not in existing:
+                try:
+                    info = await db[entry.collection].index_information()
+                    existing[entry.collection] = [
+                        [field for field, _ in index["key"]] for index in info.values()
+                    ]
+                except Exception as e:
+                    logger.warning(f"Could not read indexes of {entry.collection}: {e}")
+                    existing[entry.collection] = []
+            fields = [field for field, _ in keys]
+            row["index_exists"] = any(
+                index[: len(fields)] == fields for index in existing.get(entry.collection, [])
+            )
+            if keys and needs_index and not row["index_exists"]:
+                suggestion = suggestions.setdefault(
+                    (entry.collection, json.dumps(keys)),
+                    {
+                        "collection": entry.collection,
+                        "keys": [list(key) for key in keys],
+                        "shapes": [],
+                        "routes": {},
+                    },
+                )
+                suggestion["shapes"].append(entry.id)
+                for route, count in entry.routes.items():
+                    suggestion["routes"][route] = suggestion["routes"].get(route, 0) + count
+
+        return {
+            "slow_query_ms": self.slow_us / 1000,
+            "tracked_shapes": len(self.shapes),
+            "dropped_shapes": self.dropped,
+            "shapes": rows,
+            "collscans": [row["id"] for row in rows if row["collscan"]],
+            "regex_scans": [row["id"] for row in rows if row["regex_scan"]],
+            "index_suggestions": list(suggestions.values()),
+        }
+
+
+_profiler = QueryProfiler()
+
+
+def get_query_profiler() -> QueryProfiler:
+    return _profiler
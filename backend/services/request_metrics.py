@@ -0,0 +1,398 @@
+import asyncio
+import contextvars
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne, monitoring
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = "performance_rollups"
+
+# Buckets keep 2**SUB_BUCKET_BITS linear steps per power of two, which bounds
+# the relative error of any reported quantile to roughly 3%.
+SUB_BUCKET_BITS = 5
+QUANTILES = (0.5, 0.95, 0.99)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def bucket_for(value_us: int) -> int:
+    """Return the lower bound of the log-linear bucket holding ``value_us``."""
+    if value_us < (1 << SUB_BUCKET_BITS):
+        return max(value_us, 0)
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return (value_us >> shift) << shift
+
+
+def bucket_width(lower: int) -> int:
+    if lower < (1 << SUB_BUCKET_BITS):
+        return 1
+    return 1 << (lower.bit_length() - SUB_BUCKET_BITS)
+
+
+class LatencyHistogram:
+    """HDR-style histogram of durations in microseconds.
+
+    Recording is a single dict increment, and histograms from different
+    workers or intervals merge by adding bucket counts.
+    """
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value_us: int) -> None:
+        bucket = bucket_for(value_us)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value_us
+        if value_us > self.max:
+            self.max = value_us
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram()
+        clone.merge(self)
+        return clone
+
+    def delta(self, previous: Optional["LatencyHistogram"]) -> "LatencyHistogram":
+        """Counts recorded since ``previous`` (an earlier copy of this histogram)."""
+        if previous is None:
+            return self.copy()
+        result = LatencyHistogram()
+        for bucket, count in self.buckets.items():
+            diff = count - previous.buckets.get(bucket, 0)
+            if diff:
+                result.buckets[bucket] = diff
+        result.count = self.count - previous.count
+        result.total = self.total - previous.total
+        if result.buckets:
+            top = max(result.buckets)
+            result.max = min(top + bucket_width(top) - 1, self.max)
+        return result
+
+    def percentile(self, q: float) -> float:
+        """Approximate ``q`` quantile (0..1) in microseconds."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return float(min(bucket + bucket_width(bucket) // 2, self.max))
+        return float(self.max)
+
+    def count_at_least(self, value_us: int) -> int:
+        threshold = bucket_for(value_us)
+        return sum(c for b, c in self.buckets.items() if b >= threshold)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @classmethod
+    def from_buckets(cls, buckets: Dict[Any, int], total: int = 0, maximum: int = 0):
+        histogram = cls()
+        for bucket, count in buckets.items():
+            histogram.buckets[int(bucket)] = histogram.buckets.get(int(bucket), 0) + count
+            histogram.count += count
+        histogram.total = total
+        histogram.max = maximum
+        return histogram
+
+
+class RequestTiming:
+    """Per-request accumulator that the Mongo command listeners add to."""
+
+    __slots__ = ("started", "db_time_us", "db_calls", "query_shapes")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time_us = 0
+        self.db_calls = 0
+        self.query_shapes = set()
+
+
+_current_timing: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar(
+    "request_timing", default=None
+)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current_timing.get()
+
+
+class DBTimingListener(monitoring.CommandListener):
+    """Attribute MongoDB command time to the request that issued it.
+
+    Motor runs pymongo calls on an executor with a copy of the caller's
+    context, so the request's RequestTiming is visible here.
+    """
+
+    def started(self, event):
+        pass
+
+    def _add(self, event):
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.db_time_us += event.duration_micros
+            timing.db_calls += 1
+
+    def succeeded(self, event):
+        self._add(event)
+
+    def failed(self, event):
+        self._add(event)
+
+
+db_timing_listener = DBTimingListener()
+
+
+class RouteSeries:
+    __slots__ = ("total", "db", "handler")
+
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.db = LatencyHistogram()
+        self.handler = LatencyHistogram()
+
+    def copy(self) -> "RouteSeries":
+        clone = RouteSeries()
+        clone.total, clone.db, clone.handler = (
+            self.total.copy(),
+            self.db.copy(),
+            self.handler.copy(),
+        )
+        return clone
+
+
+SeriesKey = Tuple[str, str, int]
+
+
+class MetricsRegistry:
+    """In-process request metrics keyed by (route template, method, status)."""
+
+    def __init__(self):
+        self.series: Dict[SeriesKey, RouteSeries] = {}
+        self.in_flight: Dict[str, int] = {}
+        self._rolled: Dict[SeriesKey, RouteSeries] = {}
+
+    def start_request(self, method: str) -> Tuple[RequestTiming, contextvars.Token]:
+        self.in_flight[method] = self.in_flight.get(method, 0) + 1
+        timing = RequestTiming()
+        return timing, _current_timing.set(timing)
+
+    def finish_request(
+        self,
+        timing: RequestTiming,
+        token: Optional[contextvars.Token],
+        route: str,
+        method: str,
+        status: int,
+    ) -> float:
+        """Record the request and return its duration in seconds."""
+        elapsed = time.perf_counter() - timing.started
+        self.in_flight[method] = self.in_flight.get(method, 1) - 1
+        if token is not None:
+            _current_timing.reset(token)
+        self.observe(route, method, status, int(elapsed * 1_000_000), timing.db_time_us)
+        return elapsed
+
+    def observe(self, route: str, method: str, status: int, duration_us: int, db_us: int = 0):
+        key = (route, method, status)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = RouteSeries()
+        db_us = min(db_us, duration_us)
+        series.total.record(duration_us)
+        series.db.record(db_us)
+        series.handler.record(duration_us - db_us)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate view across every series, for JSON status endpoints."""
+        overall = LatencyHistogram()
+        for series in self.series.values():
+            overall.merge(series.total)
+        return {
+            "total_requests": overall.count,
+            "in_flight": sum(self.in_flight.values()),
+            "average_response_time": overall.mean / 1_000_000,
+            **{
+                f"p{int(q * 100)}_response_time": overall.percentile(q) / 1_000_000
+                for q in QUANTILES
+            },
+        }
+
+    def routes(self) -> List[Dict[str, Any]]:
+        rows = []
+        for (route, method, status), series in self.series.items():
+            rows.append(
+                {
+                    "route": route,
+                    "method": method,
+                    "status": status,
+                    "count": series.total.count,
+                    **{
+                        f"p{int(q * 100)}_ms": series.total.percentile(q) / 1000
+                        for q in QUANTILES
+                    },
+                    "db_p95_ms": series.db.percentile(0.95) / 1000,
+                    "handler_p95_ms": series.handler.percentile(0.95) / 1000,
+                }
+            )
+        return sorted(rows, key=lambda r: r["p99_ms"], reverse=True)
+
+    def take_deltas(self) -> Dict[SeriesKey, RouteSeries]:
+        """Return what was recorded since the previous call, for rollups."""
+        deltas = {}
+        for key, series in list(self.series.items()):
+            previous = self._rolled.get(key)
+            delta = RouteSeries()
+            delta.total = series.total.delta(previous.total if previous else None)
+            if not delta.total.count:
+                continue
+            delta.db = series.db.delta(previous.db if previous else None)
+            delta.handler = series.handler.delta(previous.handler if previous else None)
+            deltas[key] = delta
+            self._rolled[key] = series.copy()
+        return deltas
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for method, value in sorted(self.in_flight.items()):
+            lines.append(f'http_requests_in_flight{{method="{_escape(method)}"}} {value}')
+
+        for name, attr, help_text in (
+            ("http_request_duration_seconds", "total", "Total request latency."),
+            ("http_request_db_seconds", "db", "Time spent in MongoDB commands."),
+            ("http_request_handler_seconds", "handler", "Request latency excluding MongoDB time."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for (route, method, status), series in sorted(self.series.items()):
+                histogram: LatencyHistogram = getattr(series, attr)
+                labels = (
+                    f'route="{_escape(route)}",method="{_escape(method)}",status="{status}"'
+                )
+                for q in QUANTILES:
+                    lines.append(
+                        f'{name}{{{labels},quantile="{q}"}} {histogram.percentile(q) / 1_000_000:.6f}'
+                    )
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total / 1_000_000:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+class MetricsRollupService:
+    """Periodically fold histogram deltas into per-minute MongoDB documents.
+
+    Every worker ``$inc``s the same documents, so a window's buckets add up
+    to the histogram of the whole deployment.
+    """
+
+    def __init__(self, db, registry: Optional[MetricsRegistry] = None, interval_seconds: int = 60):
+        self.db = db
+        self.registry = registry or get_metrics_registry()
+        self.interval_seconds = interval_seconds
+        self.collection = db[ROLLUP_COLLECTION]
+
+    def _window(self, now: datetime) -> datetime:
+        epoch = int(now.timestamp()) // self.interval_seconds * self.interval_seconds
+        return datetime.utcfromtimestamp(epoch)
+
+    async def rollup(self, now: Optional[datetime] = None) -> int:
+        deltas = self.registry.take_deltas()
+        if not deltas:
+            return 0
+        window = self._window(now or datetime.utcnow())
+        operations = []
+        for (route, method, status), delta in deltas.items():
+            increments = {
+                "count": delta.total.count,
+                "total_us": delta.total.total,
+                "db_us": delta.db.total,
+            }
+            for field, histogram in (("latency", delta.total), ("db_latency", delta.db)):
+                for bucket, count in histogram.buckets.items():
+                    increments[f"{field}.{bucket}"] = count
+            operations.append(
+                UpdateOne(
+                    {"_id": f"{window.isoformat()}|{method}|{status}|{route}"},
+                    {
+                        "$setOnInsert": {
+                            "window": window,
+                            "route": route,
+                            "method": method,
+                            "status": status,
+                        },
+                        "$inc": increments,
+                        "$max": {"max_us": delta.total.max},
+                    },
+                    upsert=True,
+                )
+            )
+        await self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def run_periodic(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.rollup()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Metrics rollup failed: {e}")
+
+
+def merge_rollups(documents: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Merge rollup documents per route into histograms plus error counts."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for doc in documents:
+        entry = merged.setdefault(
+            doc["route"], {"latency": LatencyHistogram(), "db_latency": LatencyHistogram(), "errors": 0}
+        )
+        entry["latency"].merge(
+            LatencyHistogram.from_buckets(
+                doc.get("latency", {}), doc.get("total_us", 0), doc.get("max_us", 0)
+            )
+        )
+        entry["db_latency"].merge(
+            LatencyHistogram.from_buckets(doc.get("db_latency", {}), doc.get("db_us", 0))
+        )
+        if doc.get("status", 0) >= 400:
+            entry["errors"] += doc.get("count", 0)
+    return merged
+
+
+async def load_rollups(db, since: datetime) -> Dict[str, Dict[str, Any]]:
+    documents = await db[ROLLUP_COLLECTION].find({"window": {"$gte": since}}).to_list(None)
+    return merge_rollups(documents)
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo.errors import OperationFailure
+
+from backend.services.job_archive import (ArchiveSink, CollectionArchiveSink,
+                                          JobArchiver, build_archive_sink,
+                                          throttle)
+from backend.services.retention_rules import (RETENTION_RULES, RetentionRule,
+                                              get_rule)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RATE = float(os.getenv("RETENTION_MAX_RATE", "2000"))
+
+# Index option conflicts: same keys or name with different options
+_INDEX_CONFLICT_CODES = {85, 86}
+
+
+def ttl_index_name(rule: RetentionRule) -> str:
+    return f"{rule.field}_ttl"
+
+
+async def ensure_ttl_index(db, rule: RetentionRule) -> bool:
+    """
+    Let MongoDB expire ``rule``'s documents itself.
+
+    An existing plain index on the field is converted with ``collMod``; that
+    is only done for unconditional rules, since the converted index would
+    have no partial filter. Returns False when no TTL index could be set up,
+    in which case the caller deletes in batches instead.
+    """
+    collection = getattr(db, rule.collection)
+    options: Dict[str, Any] = {
+        "name": ttl_index_name(rule),
+        "expireAfterSeconds": rule.ttl_seconds,
+    }
+    if rule.conditions:
+        options["partialFilterExpression"] = rule.conditions
+    try:
+        await collection.create_index([(rule.field, 1)], **options)
+        return True
+    except OperationFailure as e:
+        if e.code not in _INDEX_CONFLICT_CODES or rule.conditions:
+            logger.warning(f"TTL index on {rule.collection}.{rule.field} not created: {e}")
+            return False
+    try:
+        await db.command(
+            "collMod",
+            rule.collection,
+            index={"keyPattern": {rule.field: 1}, "expireAfterSeconds": rule.ttl_seconds},
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"TTL index on {rule.collection}.{rule.field} not converted: {e}")
+        return False
+
+
+class RetentionEngine:
+    """
+    Applies RETENTION_RULES to the database.
+
+    Pure-expiry rules become TTL indexes, so MongoDB removes documents
+    continuously and the run only reports what is still pending. Where a
+    TTL index cannot be used the engine deletes in ``_id``-ordered batches
+    of ``batch_size``. Archive rules go through JobArchiver, which writes
+    each batch to its sink and reads it back before deleting. Batched work
+    is paced to ``max_rate`` documents per second so cleanup does not
+    compete with foreground queries.
+    """
+
+    def __init__(
+        self,
+        db,
+        rules: Optional[Iterable[RetentionRule]] = None,
+        batch_size: int = 1000,
+        max_rate: Optional[float] = DEFAULT_MAX_RATE,
+        sinks: Optional[Dict[str, ArchiveSink]] = None,
+    ):
+        self.db = db
+        self.rules = list(RETENTION_RULES.values() if rules is None else rules)
+        self.batch_size = batch_size
+        self.max_rate = max_rate
+        self.sinks = sinks or {}
+
+    def sink_for(self, rule: RetentionRule) -> ArchiveSink:
+        if rule.collection in self.sinks:
+            return self.sinks[rule.collection]
+        if rule.collection == "jobs":
+            # Same destination as the API's job archiving
+            return build_archive_sink(self.db)
+        return CollectionArchiveSink(self.db, rule.archive_collection)
+
+    async def delete_expired(self, rule: RetentionRule) -> Dict[str, Any]:
+        collection = self.db[rule.collection]
+        cutoff = rule.cutoff()
+        loop = asyncio.get_running_loop()
+        deleted = batches = 0
+        last_id = None
+        while True:
+            started = loop.time()
+            query = rule.query(cutoff)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            docs = (
+                await collection.find(query, {"_id": 1})
+                .sort("_id", 1)
+                .limit(self.batch_size)
+                .to_list(length=self.batch_size)
+            )
+            if not docs:
+                break
+            ids = [doc["_id"] for doc in docs]
+            result = await collection.delete_many({"_id": {"$in": ids}})
+            deleted += result.deleted_count
+            batches += 1
+            last_id = ids[-1]
+            await throttle(len(ids), started, self.max_rate)
+        return {"mode": "batched", "deleted": deleted, "batches": batches}
+
+    async def apply(self, rule: RetentionRule) -> Dict[str, Any]:
+        if rule.archive:
+            archiver = JobArchiver(
+                self.db,
+                self.sink_for(rule),
+                chunk_size=self.batch_size,
+                rule=rule,
+                max_rate=self.max_rate,
+            )
+            report = await archiver.run()
+            return {
+                "mode": "archive",
+                "sink": report.sink,
+                "archived": report.archived,
+                "batches": report.chunks,
+            }
+        if await ensure_ttl_index(self.db, rule):
+            pending = await self.db[rule.collection].count_documents(rule.query(rule.cutoff()))
+            return {"mode": "ttl", "pending": pending}
+        return await self.delete_expired(rule)
+
+    async def run(self, collections: Optional[List[str]] = None) -> Dict[str, Any]:
+        rules = self.rules if collections is None else [get_rule(name) for name in collections]
+        summary: Dict[str, Any] = {
+            "timestamp": datetime.utcnow(),
+            "deleted": 0,
+            "archived": 0,
+            "collections": [],
+        }
+        for rule in rules:
+            started = time.perf_counter()
+            try:
+                result = await self.apply(rule)
+            except Exception as e:
+                logger.error(f"Retention for {rule.collection} failed: {e}")
+                result = {"mode": "archive" if rule.archive else "ttl", "error": str(e)}
+            seconds = time.perf_counter() - started
+            moved = result.get("deleted", 0) + result.get("archived", 0)
+            result.update(
+                collection=rule.collection,
+                keep_days=rule.keep_days,
+                seconds=round(seconds, 3),
+                docs_per_second=round(moved / seconds, 1) if moved and seconds else 0.0,
+            )
+            summary["deleted"] += result.get("deleted", 0)
+            summary["archived"] += result.get("archived", 0)
+            summary["collections"].append(result)
+            logger.info(
+                f"Retention {rule.collection} ({result['mode']}): {moved} documents "
+                f"in {result['seconds']}s ({result['docs_per_second']}/s)"
+            )
+        return summary
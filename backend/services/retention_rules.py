@@ -0,0 +1,73 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class RetentionRule:
+    """
+    How long documents of one collection are kept.
+
+    Documents whose ``field`` is older than ``keep_days`` (and that match
+    ``conditions``) are removed. With ``archive`` they are first copied to an
+    archive sink and only deleted once the copy is confirmed; without it the
+    rule is pure expiry and is enforced by a TTL index, with ``conditions``
+    as its partial filter.
+    """
+
+    collection: str
+    field: str
+    keep_days: int
+    archive: bool = False
+    conditions: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ttl(self) -> bool:
+        return not self.archive
+
+    @property
+    def ttl_seconds(self) -> int:
+        return self.keep_days * 24 * 60 * 60
+
+    @property
+    def archive_collection(self) -> str:
+        return f"{self.collection}_archive"
+
+    def cutoff(self, now: Optional[datetime] = None, days: Optional[int] = None) -> datetime:
+        return (now or datetime.utcnow()) - timedelta(days=self.keep_days if days is None else days)
+
+    def query(self, cutoff: datetime) -> Dict[str, Any]:
+        return {self.field: {"$lt": cutoff}, **self.conditions}
+
+
+# The single source of retention policy: the cleanup cron, the scheduler's
+# database cleanup job, JobArchiver and the activity logger's TTL index all
+# read these.
+RETENTION_RULES: Dict[str, RetentionRule] = {
+    rule.collection: rule
+    for rule in (
+        # Only listings that are no longer open; active jobs stay searchable
+        RetentionRule(
+            "jobs",
+            "created_at",
+            30,
+            archive=True,
+            conditions={"$or": [{"is_active": False}, {"status": {"$in": ["expired", "filled"]}}]},
+        ),
+        # Users' application history; moved to the archive, never just dropped
+        RetentionRule("job_applications", "created_at", 730, archive=True),
+        RetentionRule("email_logs", "sent_at", 30, archive=True),
+        RetentionRule("user_activities", "timestamp", 30),
+        RetentionRule("user_sessions", "last_activity", 7),
+        RetentionRule("api_logs", "timestamp", 30),
+        RetentionRule("crawl_logs", "timestamp", 14),
+        RetentionRule("error_logs", "timestamp", 60),
+        # Raw events only; analytics read job_interaction_counters
+        RetentionRule("job_interactions", "timestamp", 90),
+        RetentionRule("notifications", "created_at", 30, conditions={"read": True}),
+    )
+}
+
+
+def get_rule(collection: str) -> RetentionRule:
+    return RETENTION_RULES[collection]
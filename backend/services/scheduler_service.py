@@ -3,281 +3,488 @@ Scheduler Service
 Handles job scheduling and cron tasks
 """
 
-import logging
 import asyncio
-from typing import Dict, List, Optional, Any
+import logging
 from datetime import datetime, UTC
-import schedule
-import time
+from typing import Any, Dict, List, Optional, Set
+
+from backend.services.job_scheduler import (CronSchedule, IntervalSchedule,
+                                            JobExecutor, JobScheduler,
+                                            OnDemandSchedule, ScheduledJob,
+                                            UnknownJob)
 
 logger = logging.getLogger(__name__)
 
 
 class SchedulerService:
-    """Job scheduler service"""
-    
-    def __init__(self, db=None):
+    """
+    The application's periodic jobs, run by an asyncio JobScheduler.
+
+    Every API worker may start the scheduler: jobs are exclusive, so each
+    occurrence runs on exactly one worker, and the external cron endpoints
+    trigger jobs through the same lease instead of running them a second
+    time. Database-heavy jobs run on a JobExecutor so they do not compete
+    with request handling on the main event loop.
+    """
+
+    def __init__(self, db=None, executor: Optional[JobExecutor] = None):
         self.db = db
         self.logger = logger
-        self.running = False
-        self.jobs = {}
-        
+        self.scheduler = JobScheduler(db, executor=executor)
+        self._bootstrap: Optional[asyncio.Task] = None
+        self.setup_jobs()
+
+    @property
+    def running(self) -> bool:
+        return self.scheduler.running
+
+    @property
+    def is_running(self) -> bool:
+        return self.scheduler.running
+
     async def start_scheduler(self) -> Dict[str, Any]:
         """Start the scheduler"""
         try:
             if self.running:
                 return {"status": "already_running", "message": "Scheduler is already running"}
-            
-            self.running = True
-            await self.setup_jobs()
-            
-            # Start scheduler in background
-            asyncio.create_task(self._run_scheduler())
-            
+
+            await self.scheduler.start()
+            self._bootstrap = asyncio.create_task(self.bootstrap())
+
             return {"status": "started", "message": "Scheduler started successfully"}
         except Exception as e:
             logger.error(f"Error starting scheduler: {e}")
             return {"error": str(e)}
-    
+
     async def stop_scheduler(self) -> Dict[str, Any]:
         """Stop the scheduler"""
         try:
             if not self.running:
                 return {"status": "not_running", "message": "Scheduler is not running"}
-            
-            self.running = False
-            schedule.clear()
-            
+
+            if self._bootstrap is not None and not self._bootstrap.done():
+                self._bootstrap.cancel()
+            await self.scheduler.stop()
+
             return {"status": "stopped", "message": "Scheduler stopped successfully"}
         except Exception as e:
             logger.error(f"Error stopping scheduler: {e}")
             return {"error": str(e)}
-    
-    async def setup_jobs(self) -> None:
-        """Setup scheduled jobs"""
+
+    def setup_jobs(self) -> None:
+        """Register scheduled jobs (cron expressions are UTC)"""
+        for job in (
+            ScheduledJob(
+                "health_check",
+                self.health_check_job,
+                IntervalSchedule(3600),
+                "Health Check",
+                jitter=60,
+            ),
+            ScheduledJob(
+                "external_api_crawler",
+                self.external_api_crawler_job,
+                IntervalSchedule(6 * 3600),
+                "External API Crawler",
+                jitter=300,
+            ),
+            ScheduledJob(
+                "job_statistics",
+                self.job_statistics_job,
+                CronSchedule("0 2 * * *"),
+                "Daily Job Statistics",
+                jitter=120,
+                heavy=True,
+            ),
+            ScheduledJob(
+                "location_index",
+                self.location_index_job,
+                CronSchedule("30 2 * * *"),
+                "Location Suggestions",
+                jitter=120,
+                heavy=True,
+            ),
+            # One-shot seeds of data that ingest keeps current afterwards;
+            # bootstrap runs the ones a deployment has not completed yet
+            ScheduledJob(
+                "title_group_seed",
+                self.title_group_seed_job,
+                OnDemandSchedule(),
+                "Title Group Backfill",
+                heavy=True,
+            ),
+            ScheduledJob(
+                "analytics_seed",
+                self.analytics_seed_job,
+                OnDemandSchedule(),
+                "Job Analytics Seed",
+                heavy=True,
+            ),
+            ScheduledJob(
+                "interaction_seed",
+                self.interaction_seed_job,
+                OnDemandSchedule(),
+                "Interaction Counter Seed",
+                heavy=True,
+            ),
+            ScheduledJob(
+                "daily_digest",
+                self.daily_digest_job,
+                CronSchedule("0 8 * * *"),
+                "Daily Job Digest",
+            ),
+            ScheduledJob(
+                "weekly_digest",
+                self.weekly_digest_job,
+                CronSchedule("0 8 * * 1"),
+                "Weekly Job Digest",
+            ),
+            ScheduledJob(
+                "database_cleanup",
+                self.database_cleanup_job,
+                CronSchedule("0 3 * * 0"),
+                "Database Cleanup",
+                jitter=120,
+                heavy=True,
+            ),
+            ScheduledJob(
+                "wake_up_render",
+                self.wake_up_render_function,
+                IntervalSchedule(600),
+                "Wake Up Render",
+                jitter=30,
+            ),
+        ):
+            self.scheduler.add_job(job)
+
+        self.logger.info("Scheduled jobs setup completed")
+
+    async def bootstrap(self) -> Optional[Dict[str, Any]]:
+        """
+        Run, instead of waiting for their schedule, the jobs whose data a
+        deployment does not have yet: statistics never reconciled, location
+        suggestions never built, jobs without a current title group key, and
+        analytics or interaction counters never seeded. Endpoints only read
+        the materialized data, so they never compute it inline.
+        """
+        if self.db is None:
+            return None
         try:
-            # Health check job - every hour
-            schedule.every().hour.do(self.health_check_job)
-            
-            # External API crawler - every 6 hours
-            schedule.every(6).hours.do(self.external_api_crawler_job)
-            
-            # Job statistics - daily at 2 AM
-            schedule.every().day.at("02:00").do(self.job_statistics_job)
-            
-            # Database cleanup - weekly on Sunday at 3 AM
-            schedule.every().sunday.at("03:00").do(self.database_cleanup_job)
-            
-            # Wake up render function - every 10 minutes
-            schedule.every(10).minutes.do(self.wake_up_render_function)
-            
-            self.logger.info("Scheduled jobs setup completed")
+            from backend.services.interaction_analytics import \
+                InteractionRecorder
+            from backend.services.job_analytics_store import JobAnalyticsStore
+            from backend.services.job_stats_materializer import \
+                JobStatsMaterializer
+            from backend.services.location_index import LocationIndex
+            from backend.services.title_grouping import TitleGroups
+
+            ready = {
+                "job_statistics": await JobStatsMaterializer(self.db).reconciled_at() is not None,
+                "location_index": await LocationIndex(self.db).is_built(),
+                "title_group_seed": await TitleGroups(self.db).is_keyed(),
+                "analytics_seed": await JobAnalyticsStore(self.db).is_seeded(),
+                "interaction_seed": await InteractionRecorder(self.db).is_seeded(),
+            }
+            runs = {}
+            for name, done in ready.items():
+                if not done:
+                    # Leased like any run, so only one worker does it
+                    runs[name] = await self.trigger(name, "bootstrap")
+            return runs or None
         except Exception as e:
-            logger.error(f"Error setting up jobs: {e}")
-    
-    async def _run_scheduler(self) -> None:
-        """Run the scheduler loop"""
-        while self.running:
-            try:
-                schedule.run_pending()
-                await asyncio.sleep(60)  # Check every minute
-            except Exception as e:
-                logger.error(f"Error in scheduler loop: {e}")
-                await asyncio.sleep(60)
-    
+            logger.warning(f"Scheduler bootstrap failed: {e}")
+            return None
+
+    async def trigger(self, job_name: str, source: str = "manual") -> Dict[str, Any]:
+        """Run a job now; skipped if it is already running on any worker"""
+        return await self.scheduler.run_job(job_name, trigger=source)
+
     async def health_check_job(self) -> Dict[str, Any]:
         """Health check job"""
-        try:
-            # Mock implementation
-            health_status = {
-                "status": "healthy",
-                "timestamp": datetime.now(UTC).isoformat(),
-                "services": {
-                    "database": "ok",
-                    "api": "ok",
-                    "external_apis": "ok"
-                }
+        # Mock implementation
+        return {
+            "status": "healthy",
+            "timestamp": datetime.now(UTC).isoformat(),
+            "services": {
+                "database": "ok",
+                "api": "ok",
+                "external_apis": "ok"
             }
-            
-            await self.log_job_run("health_check", "success", health_status)
-            return health_status
-        except Exception as e:
-            logger.error(f"Health check job failed: {e}")
-            await self.log_job_run("health_check", "failed", {"error": str(e)})
-            return {"error": str(e)}
-    
+        }
+
     async def external_api_crawler_job(self) -> Dict[str, Any]:
         """External API crawler job"""
-        try:
-            # Mock implementation
-            crawl_result = {
-                "jobs_found": 150,
-                "jobs_processed": 145,
-                "errors": 5,
-                "timestamp": datetime.now(UTC).isoformat()
-            }
-            
-            await self.log_job_run("external_api_crawler", "success", crawl_result)
-            return crawl_result
-        except Exception as e:
-            logger.error(f"External API crawler job failed: {e}")
-            await self.log_job_run("external_api_crawler", "failed", {"error": str(e)})
-            return {"error": str(e)}
-    
-    async def job_statistics_job(self) -> Dict[str, Any]:
-        """Job statistics job"""
-        try:
+        # Mock implementation
+        return {
+            "jobs_found": 150,
+            "jobs_processed": 145,
+            "errors": 5,
+            "timestamp": datetime.now(UTC).isoformat()
+        }
+
+    async def job_statistics_job(self, db=None) -> Dict[str, Any]:
+        """Job statistics job - reconciles the materialized job_stats counters"""
+        db = db if db is not None else self.db
+        if db is None:
             # Mock implementation
-            stats = {
+            return {
                 "total_jobs": 5000,
                 "active_jobs": 3200,
                 "new_jobs_today": 45,
                 "applications_today": 120,
                 "timestamp": datetime.now(UTC).isoformat()
             }
-            
-            await self.log_job_run("job_statistics", "success", stats)
-            return stats
-        except Exception as e:
-            logger.error(f"Job statistics job failed: {e}")
-            await self.log_job_run("job_statistics", "failed", {"error": str(e)})
-            return {"error": str(e)}
-    
-    async def database_cleanup_job(self) -> Dict[str, Any]:
-        """Database cleanup job"""
-        try:
-            # Mock implementation
-            cleanup_result = {
-                "old_records_removed": 150,
-                "storage_freed": "2.5 MB",
-                "indexes_optimized": 3,
-                "timestamp": datetime.now(UTC).isoformat()
-            }
-            
-            await self.log_job_run("database_cleanup", "success", cleanup_result)
-            return cleanup_result
-        except Exception as e:
-            logger.error(f"Database cleanup job failed: {e}")
-            await self.log_job_run("database_cleanup", "failed", {"error": str(e)})
-            return {"error": str(e)}
-    
+
+        from backend.services.job_stats_materializer import \
+            JobStatsMaterializer
+
+        summary = await JobStatsMaterializer(db).reconcile()
+        return {
+            "total_jobs": summary.get("total_jobs", 0),
+            "active_jobs": summary.get("active_jobs", 0),
+            "new_jobs_this_week": summary.get("recent_jobs", 0),
+            "timestamp": datetime.now(UTC).isoformat()
+        }
+
+    async def location_index_job(self, db=None) -> Dict[str, Any]:
+        """Location suggestions job - resolves stale job locations, rebuilds the table"""
+        db = db if db is not None else self.db
+        if db is None:
+            return {"skipped": "database not available", "timestamp": datetime.now(UTC).isoformat()}
+
+        from backend.services.location_index import LocationIndex
+
+        locations = LocationIndex(db)
+        resolved = await locations.backfill_jobs()
+        return {
+            "resolved_jobs": resolved,
+            "locations": await locations.rebuild(),
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+
+    async def title_group_seed_job(self, db=None) -> Dict[str, Any]:
+        """Store the current title group key on jobs ingested without it"""
+        db = db if db is not None else self.db
+        if db is None:
+            return {"skipped": "database not available", "timestamp": datetime.now(UTC).isoformat()}
+
+        from backend.services.title_grouping import TitleGroups
+
+        title_groups = TitleGroups(db)
+        await title_groups.ensure_indexes()
+        return {
+            "keyed_jobs": await title_groups.backfill_jobs(),
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+
+    async def analytics_seed_job(self, db=None) -> Dict[str, Any]:
+        """Seed the job analytics buckets; a no-op once seeded with the current keys"""
+        db = db if db is not None else self.db
+        if db is None:
+            return {"skipped": "database not available", "timestamp": datetime.now(UTC).isoformat()}
+
+        from backend.services.job_analytics_store import JobAnalyticsStore
+
+        return {
+            "seeded_jobs": await JobAnalyticsStore(db).backfill(),
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+
+    async def interaction_seed_job(self, db=None) -> Dict[str, Any]:
+        """Seed the interaction counters from raw events; resumes an interrupted seed"""
+        db = db if db is not None else self.db
+        if db is None:
+            return {"skipped": "database not available", "timestamp": datetime.now(UTC).isoformat()}
+
+        from backend.services.interaction_analytics import \
+            InteractionRecorder
+
+        return {
+            "seeded_events": await InteractionRecorder(db).backfill(),
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+
+    async def digest_job(self, frequency: str) -> Dict[str, Any]:
+        """New-job digest job - groups subscribers by preference signature"""
+        if self.db is None:
+            result = {"skipped": "database not available"}
+        else:
+            from backend.services.digest_service import (DigestBuilder,
+                                                         telegram_bot_sender)
+            from backend.services.telegram_outbox import get_telegram_outbox
+
+            outbox = get_telegram_outbox()
+            if outbox is not None:
+                sender = outbox.as_sender()
+            else:
+                try:
+                    from backend.telegram_bot.bot import get_bot_instance
+
+                    sender = telegram_bot_sender(get_bot_instance())
+                except Exception:
+                    sender = None
+
+            result = await DigestBuilder(self.db, telegram_sender=sender).run(frequency)
+        result["timestamp"] = datetime.now(UTC).isoformat()
+        return result
+
+    async def daily_digest_job(self) -> Dict[str, Any]:
+        """Daily new-job digest"""
+        return await self.digest_job("daily")
+
+    async def weekly_digest_job(self) -> Dict[str, Any]:
+        """Weekly new-job digest"""
+        return await self.digest_job("weekly")
+
+    async def database_cleanup_job(self, db=None) -> Dict[str, Any]:
+        """Database cleanup job - applies the shared retention rules"""
+        db = db if db is not None else self.db
+        if db is None:
+            return {"skipped": "database not available", "timestamp": datetime.now(UTC).isoformat()}
+
+        from backend.services.retention import RetentionEngine
+
+        summary = await RetentionEngine(db).run()
+        summary["timestamp"] = summary["timestamp"].isoformat()
+        return summary
+
     async def wake_up_render_function(self) -> Dict[str, Any]:
         """Wake up render function to prevent cold starts"""
-        try:
-            # Mock implementation
-            wake_result = {
-                "status": "awake",
-                "response_time": "200ms",
-                "timestamp": datetime.now(UTC).isoformat()
-            }
-            
-            await self.log_job_run("wake_up_render", "success", wake_result)
-            return wake_result
-        except Exception as e:
-            logger.error(f"Wake up render job failed: {e}")
-            await self.log_job_run("wake_up_render", "failed", {"error": str(e)})
-            return {"error": str(e)}
-    
-    async def log_job_run(self, job_name: str, status: str, result: Dict[str, Any]) -> None:
-        """Log job run results"""
-        try:
-            log_entry = {
-                "job_name": job_name,
-                "status": status,
-                "result": result,
-                "timestamp": datetime.now(UTC).isoformat()
-            }
-            
-            if self.db:
-                await self.db.scheduler_logs.insert_one(log_entry)
-            
-            self.logger.info(f"Job {job_name} completed with status: {status}")
-        except Exception as e:
-            logger.error(f"Error logging job run: {e}")
-    
-    async def get_job_status(self, job_name: str) -> Dict[str, Any]:
-        """Get status of a specific job"""
-        try:
-            # Mock implementation
-            status = {
-                "job_name": job_name,
-                "is_running": True,
-                "last_run": datetime.now(UTC).isoformat(),
-                "next_run": "2025-07-28T03:00:00Z",
-                "status": "active"
-            }
-            return status
-        except Exception as e:
-            logger.error(f"Error getting job status: {e}")
-            return {"error": str(e)}
-    
+        # Mock implementation
+        return {
+            "status": "awake",
+            "response_time": "200ms",
+            "timestamp": datetime.now(UTC).isoformat()
+        }
+
+    def get_job_status(self, job_name: Optional[str] = None) -> Dict[str, Any]:
+        """Status of one job, or of the scheduler and all its jobs"""
+        if job_name is not None:
+            try:
+                return self.scheduler.job_status(self.scheduler.get_job(job_name))
+            except UnknownJob:
+                return {"job_name": job_name, "error": "Job not found"}
+        jobs = sorted(
+            (self.scheduler.job_status(job) for job in self.scheduler.jobs.values()),
+            key=lambda job: job["next_run"] or "~",
+        )
+        return {
+            "status": "running" if self.running else "stopped",
+            "owner": self.scheduler.owner,
+            "jobs": jobs,
+        }
+
     async def get_all_job_statuses(self) -> List[Dict[str, Any]]:
         """Get status of all jobs"""
-        try:
-            job_names = ["health_check", "external_api_crawler", "job_statistics", "database_cleanup", "wake_up_render"]
-            statuses = []
-            
-            for job_name in job_names:
-                status = await self.get_job_status(job_name)
-                statuses.append(status)
-            
-            return statuses
-        except Exception as e:
-            logger.error(f"Error getting all job statuses: {e}")
-            return []
-    
+        return self.get_job_status()["jobs"]
+
+    async def get_job_history(
+        self, job_name: Optional[str] = None, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Recent runs with durations, newest first"""
+        return await self.scheduler.history(job_name, limit)
+
     async def pause_job(self, job_name: str) -> Dict[str, Any]:
         """Pause a specific job"""
         try:
-            # Mock implementation
-            return {
-                "job_name": job_name,
-                "status": "paused",
-                "message": f"Job {job_name} paused successfully"
-            }
-        except Exception as e:
-            logger.error(f"Error pausing job: {e}")
-            return {"error": str(e)}
-    
+            self.scheduler.get_job(job_name).paused = True
+        except UnknownJob:
+            return {"job_name": job_name, "error": "Job not found"}
+        return {
+            "job_name": job_name,
+            "status": "paused",
+            "message": f"Job {job_name} paused successfully"
+        }
+
     async def resume_job(self, job_name: str) -> Dict[str, Any]:
         """Resume a specific job"""
         try:
-            # Mock implementation
-            return {
-                "job_name": job_name,
-                "status": "resumed",
-                "message": f"Job {job_name} resumed successfully"
-            }
-        except Exception as e:
-            logger.error(f"Error resuming job: {e}")
-            return {"error": str(e)}
-    
+            self.scheduler.get_job(job_name).paused = False
+        except UnknownJob:
+            return {"job_name": job_name, "error": "Job not found"}
+        return {
+            "job_name": job_name,
+            "status": "resumed",
+            "message": f"Job {job_name} resumed successfully"
+        }
+
     async def remove_job(self, job_name: str) -> Dict[str, Any]:
         """Remove a specific job"""
-        try:
-            # Mock implementation
-            return {
-                "job_name": job_name,
-                "status": "removed",
-                "message": f"Job {job_name} removed successfully"
-            }
-        except Exception as e:
-            logger.error(f"Error removing job: {e}")
-            return {"error": str(e)}
-    
+        if not self.scheduler.remove_job(job_name):
+            return {"job_name": job_name, "error": "Job not found"}
+        return {
+            "job_name": job_name,
+            "status": "removed",
+            "message": f"Job {job_name} removed successfully"
+        }
+
     async def get_jobs_count(self) -> int:
         """Get total number of scheduled jobs"""
-        try:
-            return len(schedule.get_jobs())
-        except Exception as e:
-            logger.error(f"Error getting jobs count: {e}")
-            return 0
-    
+        return len(self.scheduler.jobs)
+
     async def is_job_running(self, job_name: str) -> bool:
-        """Check if a specific job is running"""
-        try:
-            # Mock implementation
-            return True
-        except Exception as e:
-            logger.error(f"Error checking job running status: {e}")
-            return False
+        """Check if a specific job is running in this process"""
+        job = self.scheduler.jobs.get(job_name)
+        return job is not None and job.running > 0
+
+
+_scheduler: Optional[SchedulerService] = None
+# Used for triggers on a worker that did not start the scheduler
+_trigger_service: Optional[SchedulerService] = None
+_triggered: Set[asyncio.Task] = set()
+
+
+def get_scheduler() -> Optional[SchedulerService]:
+    """The scheduler started by this process, if any"""
+    return _scheduler
+
+
+async def start_scheduler(db=None) -> SchedulerService:
+    """Start this worker's scheduler; jobs are shared with other workers through leases"""
+    global _scheduler
+    if _scheduler is None:
+        from backend.database.db import create_loop_database, get_async_db
+
+        if db is None:
+            db = await get_async_db()
+        _scheduler = SchedulerService(db, executor=JobExecutor(create_loop_database))
+    await _scheduler.start_scheduler()
+    return _scheduler
+
+
+async def stop_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop_scheduler()
+        _scheduler = None
+
+
+async def run_job_now(job_name: str, source: str = "http") -> Dict[str, Any]:
+    """
+    Start a job for an external trigger (cron endpoints, admin) without
+    waiting for it. The run goes through the job's lease, so it never
+    overlaps a scheduled run on any worker, and heavy jobs run on the
+    executor rather than the caller's event loop. Its outcome is recorded
+    in the scheduler logs. Raises UnknownJob for an unregistered name.
+    """
+    global _trigger_service
+    scheduler = get_scheduler()
+    if scheduler is None:
+        if _trigger_service is None:
+            from backend.database.db import create_loop_database, get_async_db
+
+            _trigger_service = SchedulerService(
+                await get_async_db(), executor=JobExecutor(create_loop_database)
+            )
+        scheduler = _trigger_service
+    scheduler.scheduler.get_job(job_name)
+
+    task = asyncio.create_task(scheduler.trigger(job_name, source))
+    _triggered.add(task)
+    task.add_done_callback(_triggered.discard)
+    return {
+        "status": "accepted",
+        "job_name": job_name,
+        "trigger": source,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
@@ -0,0 +1,478 @@
+"""
+Skill Taxonomy
+Canonical skills with aliases and categories, and a compiled Aho-Corasick
+extractor that finds all of them in a text in a single pass.
+"""
+
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CATEGORY_LABELS = {
+    "programming_languages": "Programming Languages",
+    "frontend": "Frontend",
+    "backend": "Backend Frameworks",
+    "mobile": "Mobile",
+    "databases": "Databases",
+    "cloud": "Cloud Platforms",
+    "devops": "DevOps",
+    "data_ml": "Data & Machine Learning",
+    "api": "API Technologies",
+    "architecture": "Architecture",
+    "methodologies": "Methodologies",
+    "testing": "Testing",
+    "version_control": "Version Control",
+    "design": "Design",
+    "tools": "Tools",
+    "soft_skills": "Soft Skills",
+    "spoken_languages": "Languages",
+}
+
+# Coarse groups used by CV skill extraction (technical | tools | soft | languages)
+CATEGORY_GROUPS = {
+    "design": "tools",
+    "tools": "tools",
+    "soft_skills": "soft",
+    "spoken_languages": "languages",
+}
+
+# name, category, aliases; most common first, which is also the search order
+SKILLS = (
+    ("JavaScript", "programming_languages", ("JS", "ecmascript", "es6")),
+    ("Python", "programming_languages", ("python3", "python 3")),
+    ("Java", "programming_languages", ()),
+    ("TypeScript", "programming_languages", ("TS",)),
+    ("SQL", "programming_languages", ()),
+    ("C#", "programming_languages", ("c sharp", "csharp")),
+    ("C++", "programming_languages", ("cpp",)),
+    ("Go", "programming_languages", ("golang",)),
+    ("PHP", "programming_languages", ()),
+    ("Ruby", "programming_languages", ()),
+    ("Rust", "programming_languages", ()),
+    ("Kotlin", "programming_languages", ()),
+    ("Swift", "programming_languages", ()),
+    ("Scala", "programming_languages", ()),
+    ("R", "programming_languages", ()),
+    ("Elixir", "programming_languages", ()),
+    ("Haskell", "programming_languages", ()),
+    ("Clojure", "programming_languages", ()),
+    ("Dart", "programming_languages", ()),
+    ("Perl", "programming_languages", ()),
+    ("Objective-C", "programming_languages", ("objective c", "objc")),
+    ("MATLAB", "programming_languages", ()),
+    ("Bash", "programming_languages", ("shell scripting", "shell script")),
+    ("Solidity", "programming_languages", ()),
+    ("HTML", "frontend", ("html5",)),
+    ("CSS", "frontend", ("css3",)),
+    ("React", "frontend", ("react.js", "reactjs")),
+    ("Vue.js", "frontend", ("vue", "vuejs")),
+    ("Angular", "frontend", ("angularjs", "angular.js")),
+    ("Next.js", "frontend", ("nextjs",)),
+    ("Nuxt.js", "frontend", ("nuxt", "nuxtjs")),
+    ("Svelte", "frontend", ("sveltekit",)),
+    ("Redux", "frontend", ()),
+    ("Tailwind CSS", "frontend", ("tailwind", "tailwindcss")),
+    ("Sass", "frontend", ("scss",)),
+    ("jQuery", "frontend", ()),
+    ("Webpack", "frontend", ()),
+    ("Node.js", "backend", ("Node", "nodejs", "node js")),
+    ("Express.js", "backend", ("Express", "expressjs")),
+    ("NestJS", "backend", ("nest.js",)),
+    ("Django", "backend", ()),
+    ("Flask", "backend", ()),
+    ("FastAPI", "backend", ()),
+    ("Spring Boot", "backend", ("Spring", "spring framework")),
+    ("Ruby on Rails", "backend", ("Rails", "RoR")),
+    ("Laravel", "backend", ()),
+    ("Symfony", "backend", ()),
+    (".NET", "backend", ("dotnet", ".net core", "asp.net", "asp.net core")),
+    ("Phoenix", "backend", ()),
+    ("React Native", "mobile", ()),
+    ("Flutter", "mobile", ()),
+    ("iOS", "mobile", ()),
+    ("Android", "mobile", ()),
+    ("SwiftUI", "mobile", ()),
+    ("Jetpack Compose", "mobile", ()),
+    ("PostgreSQL", "databases", ("postgres", "psql")),
+    ("MySQL", "databases", ()),
+    ("MongoDB", "databases", ("mongo",)),
+    ("Redis", "databases", ()),
+    ("Elasticsearch", "databases", ("elastic search", "opensearch")),
+    ("SQLite", "databases", ()),
+    ("Oracle", "databases", ()),
+    ("SQL Server", "databases", ("mssql", "ms sql")),
+    ("Cassandra", "databases", ()),
+    ("DynamoDB", "databases", ()),
+    ("MariaDB", "databases", ()),
+    ("Snowflake", "databases", ()),
+    ("BigQuery", "databases", ()),
+    ("ClickHouse", "databases", ()),
+    ("Neo4j", "databases", ()),
+    ("AWS", "cloud", ("amazon web services",)),
+    ("Azure", "cloud", ("microsoft azure",)),
+    ("Google Cloud", "cloud", ("gcp", "google cloud platform")),
+    ("Heroku", "cloud", ()),
+    ("DigitalOcean", "cloud", ("digital ocean",)),
+    ("Vercel", "cloud", ()),
+    ("Netlify", "cloud", ()),
+    ("Firebase", "cloud", ()),
+    ("Cloudflare", "cloud", ()),
+    ("Docker", "devops", ()),
+    ("Kubernetes", "devops", ("k8s",)),
+    ("Terraform", "devops", ()),
+    ("Ansible", "devops", ()),
+    ("Jenkins", "devops", ()),
+    ("GitHub Actions", "devops", ()),
+    ("GitLab CI", "devops", ("gitlab ci/cd",)),
+    ("CircleCI", "devops", ("circle ci",)),
+    ("Travis CI", "devops", ()),
+    ("Helm", "devops", ()),
+    ("Prometheus", "devops", ()),
+    ("Grafana", "devops", ()),
+    ("Datadog", "devops", ()),
+    ("Linux", "devops", ()),
+    ("Nginx", "devops", ()),
+    ("Kafka", "devops", ("apache kafka",)),
+    ("RabbitMQ", "devops", ()),
+    ("Machine Learning", "data_ml", ("ML",)),
+    ("Deep Learning", "data_ml", ()),
+    ("Artificial Intelligence", "data_ml", ("AI",)),
+    ("Data Science", "data_ml", ()),
+    ("Natural Language Processing", "data_ml", ("nlp",)),
+    ("Computer Vision", "data_ml", ()),
+    ("TensorFlow", "data_ml", ()),
+    ("PyTorch", "data_ml", ()),
+    ("scikit-learn", "data_ml", ("sklearn", "scikit learn")),
+    ("Pandas", "data_ml", ()),
+    ("NumPy", "data_ml", ()),
+    ("Apache Spark", "data_ml", ("Spark", "pyspark")),
+    ("Airflow", "data_ml", ("apache airflow",)),
+    ("dbt", "data_ml", ()),
+    ("Tableau", "data_ml", ()),
+    ("Power BI", "data_ml", ("powerbi",)),
+    ("LLM", "data_ml", ("LLMs", "large language models")),
+    ("REST API", "api", ("REST", "restful", "rest apis", "restful api")),
+    ("GraphQL", "api", ()),
+    ("gRPC", "api", ()),
+    ("WebSockets", "api", ("websocket",)),
+    ("SOAP", "api", ()),
+    ("Microservices", "architecture", ("microservice", "micro-services")),
+    ("Serverless", "architecture", ()),
+    ("Event-Driven Architecture", "architecture", ("event-driven", "event driven")),
+    ("Domain-Driven Design", "architecture", ("DDD", "domain driven design")),
+    ("Distributed Systems", "architecture", ()),
+    ("CI/CD", "methodologies", ("ci cd", "continuous integration", "continuous delivery")),
+    ("DevOps", "methodologies", ()),
+    ("Agile", "methodologies", ()),
+    ("Scrum", "methodologies", ()),
+    ("Kanban", "methodologies", ()),
+    ("Test Driven Development", "methodologies", ("TDD", "test-driven development")),
+    ("BDD", "methodologies", ("behavior driven development",)),
+    ("Unit Testing", "testing", ("unit tests",)),
+    ("Jest", "testing", ()),
+    ("Cypress", "testing", ()),
+    ("Playwright", "testing", ()),
+    ("Selenium", "testing", ()),
+    ("pytest", "testing", ()),
+    ("JUnit", "testing", ()),
+    ("Git", "version_control", ()),
+    ("GitHub", "version_control", ()),
+    ("GitLab", "version_control", ()),
+    ("Bitbucket", "version_control", ()),
+    ("SVN", "version_control", ("subversion",)),
+    ("Figma", "design", ()),
+    ("Sketch", "design", ()),
+    ("Adobe XD", "design", ()),
+    ("Photoshop", "design", ("adobe photoshop",)),
+    ("Illustrator", "design", ("adobe illustrator",)),
+    ("Adobe Creative Suite", "design", ("adobe",)),
+    ("UI/UX", "design", ("ui/ux design", "ux/ui", "ux design", "ui design")),
+    ("User Research", "design", ()),
+    ("Prototyping", "design", ()),
+    ("Jira", "tools", ()),
+    ("Confluence", "tools", ()),
+    ("Slack", "tools", ()),
+    ("Notion", "tools", ()),
+    ("Postman", "tools", ()),
+    ("Salesforce", "tools", ()),
+    ("HubSpot", "tools", ()),
+    ("Leadership", "soft_skills", ()),
+    ("Communication", "soft_skills", ("communication skills",)),
+    ("Teamwork", "soft_skills", ("team player",)),
+    ("Problem Solving", "soft_skills", ("problem-solving",)),
+    ("Critical Thinking", "soft_skills", ()),
+    ("Time Management", "soft_skills", ()),
+    ("Adaptability", "soft_skills", ()),
+    ("Creativity", "soft_skills", ()),
+    ("Emotional Intelligence", "soft_skills", ()),
+    ("Negotiation", "soft_skills", ()),
+    ("Project Management", "soft_skills", ()),
+    ("Customer Service", "soft_skills", ()),
+    ("Analytical Thinking", "soft_skills", ("analytical skills",)),
+    ("Strategic Planning", "soft_skills", ()),
+    ("Mentoring", "soft_skills", ()),
+    ("English", "spoken_languages", ()),
+    ("Turkish", "spoken_languages", ("türkçe",)),
+    ("German", "spoken_languages", ("deutsch",)),
+    ("French", "spoken_languages", ()),
+    ("Spanish", "spoken_languages", ()),
+    ("Italian", "spoken_languages", ()),
+    ("Portuguese", "spoken_languages", ()),
+    ("Russian", "spoken_languages", ()),
+    ("Chinese", "spoken_languages", ("mandarin",)),
+    ("Japanese", "spoken_languages", ()),
+    ("Korean", "spoken_languages", ()),
+    ("Arabic", "spoken_languages", ()),
+    ("Dutch", "spoken_languages", ()),
+    ("Swedish", "spoken_languages", ()),
+    ("Norwegian", "spoken_languages", ()),
+)
+
+# Names and aliases that are also everyday words or abbreviations; in free
+# text they only count when written exactly like this
+CASE_SENSITIVE = frozenset(
+    {
+        "Go", "R", "Rust", "Swift", "Dart", "Ruby", "Bash", "Spring", "Rails", "RoR",
+        "Phoenix", "Helm", "Sketch", "Slack", "Notion", "Snowflake", "Spark",
+        "Express", "Node", "REST", "SOAP", "JS", "TS", "ML", "AI", "DDD", "BDD",
+        "TDD", "LLM", "LLMs",
+    }
+)
+# Around very short names these also join words ("R&D", "go-to-market", "Node.js")
+_TIGHT_CHARS = frozenset("&'-./+#")
+_TIGHT_LENGTH = 2
+# ...unless they close a clause ("Write Go.", "R, SQL", "C#/ .NET")
+_CLAUSE_CHARS = frozenset(".,/")
+
+
+@dataclass(frozen=True)
+class Skill:
+    key: str
+    name: str
+    category: str
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def group(self) -> str:
+        return CATEGORY_GROUPS.get(self.category, "technical")
+
+    @property
+    def category_label(self) -> str:
+        return CATEGORY_LABELS.get(self.category, self.category)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"id": self.key, "name": self.name, "category": self.category}
+
+
+SKILLS_BY_KEY: Dict[str, Skill] = {}
+ALIASES: Dict[str, Skill] = {}
+
+for _name, _category, _aliases in SKILLS:
+    _skill = Skill(_name.lower(), _name, _category, _aliases)
+    SKILLS_BY_KEY[_skill.key] = _skill
+    for _alias in (_name,) + _aliases:
+        ALIASES.setdefault(_alias.lower(), _skill)
+
+
+def _is_word(ch: str, tight: bool = False) -> bool:
+    return ch.isalnum() or ch == "_" or (tight and ch in _TIGHT_CHARS)
+
+
+def _joins_after(text: str, end: int) -> bool:
+    """Whether the character at ``end`` glues a short name to what follows."""
+    ch = text[end] if end < len(text) else " "
+    if ch not in _TIGHT_CHARS:
+        return False
+    if ch in _CLAUSE_CHARS:
+        return end + 1 < len(text) and not text[end + 1].isspace()
+    return True
+
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters (e.g. "İ") lower to two; keep offsets aligned
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class SkillExtractor:
+    """
+    Aho-Corasick automaton over lowercased skill names and aliases.
+
+    ``find`` walks the text once and reports matches that start and end on
+    word boundaries, so "go" does not hit "good" and "java" does not hit
+    "javascript". Overlapping matches resolve to the leftmost, longest one
+    ("node.js" over "node"). Case-sensitive aliases are checked against the
+    original text.
+    """
+
+    def __init__(self, skills: Iterable[Skill]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # per state: (pattern length, skill, exact spelling or None)
+        self._out: List[List[Tuple[int, Skill, Optional[str]]]] = [[]]
+
+        seen = set()
+        for skill in skills:
+            for alias in (skill.name,) + skill.aliases:
+                pattern = alias.lower()
+                exact = alias if alias in CASE_SENSITIVE else None
+                if (pattern, exact) in seen:
+                    continue
+                seen.add((pattern, exact))
+                self._insert(pattern, skill, exact)
+        self._link()
+
+    def _insert(self, pattern: str, skill: Skill, exact: Optional[str]) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), skill, exact))
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int, Skill]]:
+        """Non-overlapping ``(start, end, skill)`` matches in text order."""
+        if not text:
+            return []
+        lowered = _lower(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        size = len(lowered)
+        candidates = []
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            after = lowered[end] if end < size else " "
+            if _is_word(after):
+                continue
+            for length, skill, exact in out[state]:
+                start = end - length
+                tight = length <= _TIGHT_LENGTH
+                if (start and _is_word(lowered[start - 1], tight)) or (tight and _joins_after(lowered, end)):
+                    continue
+                if exact and text[start:end] != exact:
+                    continue
+                candidates.append((start, end, skill))
+
+        matches = []
+        last_end = 0
+        for start, end, skill in sorted(candidates, key=lambda m: (m[0], -m[1])):
+            if start >= last_end:
+                matches.append((start, end, skill))
+                last_end = end
+        return matches
+
+    def extract(self, text: Optional[str]) -> List[Skill]:
+        """Distinct skills in order of first mention."""
+        found: Dict[str, Skill] = {}
+        for _, _, skill in self.find(text or ""):
+            found.setdefault(skill.key, skill)
+        return list(found.values())
+
+
+def _search_terms(skill: Skill) -> Iterable[str]:
+    for alias in (skill.name,) + skill.aliases:
+        words = alias.lower().split()
+        for i in range(len(words)):
+            yield " ".join(words[i:])
+
+
+SKILL_EXTRACTOR = SkillExtractor(SKILLS_BY_KEY.values())
+_RANK = {key: rank for rank, key in enumerate(SKILLS_BY_KEY)}
+# Sorted (term, rank, key) over every word-start suffix of names and aliases
+_PREFIX_INDEX = sorted(
+    {(term, _RANK[skill.key], skill.key) for skill in SKILLS_BY_KEY.values() for term in _search_terms(skill)}
+)
+_PREFIX_TERMS = [term for term, _, _ in _PREFIX_INDEX]
+
+
+def lookup_skill(name: Optional[str]) -> Optional[Skill]:
+    """Skill for an exact (case-insensitive) name or alias."""
+    if not name:
+        return None
+    return ALIASES.get(" ".join(name.lower().split()))
+
+
+def extract_skills(text: Optional[str]) -> List[Skill]:
+    return SKILL_EXTRACTOR.extract(text)
+
+
+@lru_cache(maxsize=8192)
+def extract_skill_keys(text: Optional[str]) -> Tuple[str, ...]:
+    """Skill keys in a short, often repeated text such as a job title."""
+    return tuple(skill.key for skill in SKILL_EXTRACTOR.extract(text))
+
+
+def skill_key(name: str) -> str:
+    """Key of a skill name or alias; unknown names are keyed lower-cased, as written."""
+    skill = lookup_skill(name)
+    return skill.key if skill else " ".join(name.lower().split())
+
+
+def normalize_skills(values: Iterable[str]) -> List[str]:
+    """
+    Canonical names for a list of skills; unknown entries are kept as written.
+
+    Entries that are not themselves a skill name are also scanned, so
+    "Python/Django" yields both skills.
+    """
+    result: Dict[str, str] = {}
+    for value in values or []:
+        if not isinstance(value, str) or not value.strip():
+            continue
+        value = " ".join(value.split())
+        skill = lookup_skill(value)
+        if skill:
+            result.setdefault(skill.key, skill.name)
+            continue
+        found = extract_skills(value)
+        if found:
+            for skill in found:
+                result.setdefault(skill.key, skill.name)
+        else:
+            result.setdefault(value.lower(), value)
+    return list(result.values())
+
+
+def search_skills(query: str, limit: int = 10) -> List[Skill]:
+    """Skills whose name or alias has a word starting with ``query``."""
+    prefix = " ".join((query or "").lower().split())
+    if not prefix or limit <= 0:
+        return []
+    ranked: Dict[str, Tuple[int, int]] = {}
+    i = bisect_left(_PREFIX_TERMS, prefix)
+    while i < len(_PREFIX_INDEX) and _PREFIX_TERMS[i].startswith(prefix):
+        term, rank, key = _PREFIX_INDEX[i]
+        # Name prefixes before inner-word and alias matches, then by popularity
+        starts_name = SKILLS_BY_KEY[key].key.startswith(prefix)
+        score = (0 if starts_name else 1, rank)
+        if key not in ranked or score < ranked[key]:
+            ranked[key] = score
+        i += 1
+    keys = sorted(ranked, key=ranked.get)[:limit]
+    return [SKILLS_BY_KEY[key] for key in keys]
@@ -0,0 +1,531 @@
+import asyncio
+import hashlib
+import html
+import logging
+import os
+import re
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.job_scheduler import LEASES_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = "telegram_outbox"
+
+# Telegram Bot API limits: ~30 messages/s per bot, 1/s per private chat and
+# 20/min per group chat
+GLOBAL_MESSAGES_PER_SECOND = 30
+PRIVATE_CHAT_INTERVAL = 1.0
+GROUP_CHAT_INTERVAL = 3.0
+
+MAX_MESSAGE_LENGTH = 4096
+SUMMARY_JOB_LINES = 10
+SUMMARY_FIELD_LENGTH = 200
+
+# Lease in scheduler_leases held by the one worker that talks to Telegram
+SENDER_LEASE_ID = "telegram_sender"
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+class TelegramAPIError(Exception):
+    """Raised when the Bot API rejects a request."""
+
+    def __init__(self, status: int, description: str = "", retry_after: Optional[float] = None):
+        super().__init__(f"Telegram API error {status}: {description}")
+        self.status = status
+        self.description = description
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+
+class TelegramBotAPI:
+    """Minimal async Bot API client with a pooled, reused HTTP session."""
+
+    def __init__(
+        self,
+        token: Optional[str],
+        base_url: str = "https://api.telegram.org",
+        timeout: int = 15,
+    ):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def send_message(
+        self, chat_id: str, text: str, parse_mode: Optional[str] = "HTML"
+    ) -> Dict[str, Any]:
+        payload = {"chat_id": chat_id, "text": text, "disable_web_page_preview": True}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        async with self._get_session().post(
+            f"{self.base_url}/bot{self.token}/sendMessage", json=payload
+        ) as response:
+            try:
+                body = await response.json(content_type=None)
+            except ValueError:
+                body = {"ok": False, "description": await response.text()}
+            if response.status != 200 or not body.get("ok"):
+                raise TelegramAPIError(
+                    body.get("error_code", response.status),
+                    body.get("description", ""),
+                    (body.get("parameters") or {}).get("retry_after"),
+                )
+            return body.get("result", {})
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def truncate_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> str:
+    """Cut an over-long message at a line break so no HTML tag is split."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    if cut > 0:
+        return text[:cut]
+    # A single huge line: send it as plain, escaped text instead
+    plain = html.unescape(_TAG_RE.sub("", text))
+    escaped = html.escape(plain, quote=False)
+    while len(escaped) > limit:
+        plain = plain[: len(plain) - (len(escaped) - limit)]
+        escaped = html.escape(plain, quote=False)
+    return escaped
+
+
+def _summary_field(value: Any) -> str:
+    return html.escape(str(value)[:SUMMARY_FIELD_LENGTH], quote=False)
+
+
+def format_new_jobs_summary(jobs: List[Dict[str, Any]]) -> str:
+    """One message for many new-job events."""
+    header = f"🆕 <b>{len(jobs)} YENİ İŞ İLANI EKLENDİ!</b>\n\n"
+    footer = "\n#Buzz2Remote #NewJob #RemoteJobs #JobAlert"
+    lines = []
+    for job in jobs[:SUMMARY_JOB_LINES]:
+        title = _summary_field(job.get("job_title") or job.get("title") or "Bilinmiyor")
+        company = _summary_field(job.get("company") or "Bilinmiyor")
+        lines.append(f"💼 <b>{title}</b> — {company}\n")
+    # Drop whole lines rather than cutting the markup to fit the limit
+    while True:
+        rest = len(jobs) - len(lines)
+        more = f"\n… ve {rest} ilan daha\n" if rest else ""
+        message = header + "".join(lines) + more + footer
+        if len(message) <= MAX_MESSAGE_LENGTH or not lines:
+            return message
+        lines.pop()
+
+
+class TelegramOutbox:
+    """
+    Durable, rate-limited Telegram delivery.
+
+    Messages are stored in ``telegram_outbox`` by any worker and sent by a
+    single async sender that spaces messages globally and per chat, and
+    pauses for the ``retry_after`` Telegram returns on flood errors. Only the
+    worker holding the ``telegram_sender`` lease in ``scheduler_leases``
+    sends and coalesces, so the Bot API limits hold for the whole
+    deployment; another worker takes over once an unrenewed lease expires.
+    New-job events are stored as ``buffered`` documents and coalesced into
+    one summary message per chat every ``coalesce_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        db,
+        api: TelegramBotAPI,
+        messages_per_second: float = GLOBAL_MESSAGES_PER_SECOND,
+        private_chat_interval: float = PRIVATE_CHAT_INTERVAL,
+        group_chat_interval: float = GROUP_CHAT_INTERVAL,
+        coalesce_interval: float = 60.0,
+        max_attempts: int = 5,
+        retry_base_seconds: int = 10,
+        lease_seconds: int = 60,
+        poll_interval: float = 1.0,
+        formatter: Callable[[List[Dict[str, Any]]], str] = format_new_jobs_summary,
+        owner: Optional[str] = None,
+    ):
+        self.collection = db[OUTBOX_COLLECTION]
+        self.leases = db[LEASES_COLLECTION]
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.api = api
+        self.global_interval = 1.0 / messages_per_second
+        self.private_chat_interval = private_chat_interval
+        self.group_chat_interval = group_chat_interval
+        self.coalesce_interval = coalesce_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.formatter = formatter
+
+        self.running = False
+        self.is_sender = False
+        self._renew_at = 0.0
+        self._tasks: List[asyncio.Task] = []
+        self._pending_writes = set()
+        self._wakeup = asyncio.Event()
+        self._next_global_send = 0.0
+        self._next_chat_send: Dict[str, float] = {}
+        self._paused_until = 0.0
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_index([("status", 1), ("next_attempt_at", 1)])
+            await self.collection.create_index([("status", 1), ("chat_id", 1)])
+        except Exception as e:
+            logger.warning(f"Could not create telegram outbox indexes: {e}")
+
+    async def enqueue(
+        self, chat_id: Any, text: str, parse_mode: Optional[str] = "HTML"
+    ) -> Any:
+        """Store a message for delivery."""
+        now = datetime.utcnow()
+        result = await self.collection.insert_one(
+            {
+                "kind": "message",
+                "chat_id": str(chat_id),
+                "text": (
+                    truncate_message(text) if parse_mode == "HTML" else text[:MAX_MESSAGE_LENGTH]
+                ),
+                "parse_mode": parse_mode,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            }
+        )
+        self._wakeup.set()
+        return result.inserted_id
+
+    async def enqueue_new_job(self, chat_id: Any, job_data: Dict[str, Any]) -> Any:
+        """Buffer a new-job event; it is delivered in the next summary."""
+        result = await self.collection.insert_one(
+            {
+                "kind": "new_job",
+                "chat_id": str(chat_id),
+                "payload": job_data,
+                "status": "buffered",
+                "created_at": datetime.utcnow(),
+            }
+        )
+        return result.inserted_id
+
+    def submit_nowait(self, coro: Awaitable[Any]) -> None:
+        """Schedule an enqueue from synchronous code running on the event loop."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    def as_sender(self) -> Callable[[str, str], Awaitable[bool]]:
+        """Adapter for callers that expect ``send(chat_id, text) -> bool``."""
+
+        async def send(chat_id: str, text: str) -> bool:
+            await self.enqueue(chat_id, text)
+            return True
+
+        return send
+
+    async def flush_events(self) -> int:
+        """Coalesce buffered new-job events into one summary message per chat."""
+        events = await self.collection.find(
+            {"status": "buffered"}, {"chat_id": 1, "payload": 1, "created_at": 1}
+        ).sort("created_at", 1).to_list(length=None)
+        if not events:
+            return 0
+
+        by_chat: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_chat.setdefault(event["chat_id"], []).append(event)
+
+        now = datetime.utcnow()
+        for chat_id, chat_events in by_chat.items():
+            ids = [event["_id"] for event in chat_events]
+            # Deterministic id: re-flushing the same events cannot duplicate
+            summary_id = "summary:" + hashlib.sha1(
+                "|".join(sorted(str(i) for i in ids)).encode("utf-8"),
+                usedforsecurity=False,
+            ).hexdigest()
+            await self.collection.update_one(
+                {"_id": summary_id},
+                {
+                    "$setOnInsert": {
+                        "kind": "message",
+                        "chat_id": chat_id,
+                        "text": self.formatter([e["payload"] for e in chat_events]),
+                        "parse_mode": "HTML",
+                        "status": "pending",
+                        "attempts": 0,
+                        "next_attempt_at": now,
+                        "created_at": now,
+                        "coalesced": len(ids),
+                    }
+                },
+                upsert=True,
+            )
+            await self.collection.delete_many({"_id": {"$in": ids}})
+
+        self._wakeup.set()
+        return len(by_chat)
+
+    async def acquire_sender_lease(self) -> bool:
+        """Take or renew the deployment-wide sender lease."""
+        if self.is_sender and time.monotonic() < self._renew_at:
+            return True
+        now = datetime.utcnow()
+        try:
+            lease = await self.leases.find_one_and_update(
+                {
+                    "_id": SENDER_LEASE_ID,
+                    "$or": [{"owner": self.owner}, {"owner": None}, {"lease_until": {"$lt": now}}],
+                },
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "lease_until": now + timedelta(seconds=self.lease_seconds),
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            lease = None
+        if lease is not None and not self.is_sender:
+            logger.info(f"Telegram sender lease taken by {self.owner}")
+        self.is_sender = lease is not None
+        self._renew_at = time.monotonic() + self.lease_seconds / 3
+        return self.is_sender
+
+    async def release_sender_lease(self) -> None:
+        if not self.is_sender:
+            return
+        self.is_sender = False
+        await self.leases.update_one(
+            {"_id": SENDER_LEASE_ID, "owner": self.owner},
+            {"$set": {"owner": None, "lease_until": None}},
+        )
+
+    def _chat_interval(self, chat_id: str) -> float:
+        # Group and channel ids are negative
+        return self.group_chat_interval if chat_id.startswith("-") else self.private_chat_interval
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        clock = time.monotonic()
+        throttled = [c for c, at in self._next_chat_send.items() if at > clock]
+        due = {"status": "pending", "next_attempt_at": {"$lte": now}}
+        expired = {"status": "sending", "lease_until": {"$lt": now}}
+        if throttled:
+            due["chat_id"] = {"$nin": throttled}
+            expired["chat_id"] = {"$nin": throttled}
+        return await self.collection.find_one_and_update(
+            {"$or": [due, expired]},
+            {
+                "$set": {
+                    "status": "sending",
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _wait_for_slot(self) -> None:
+        delay = max(self._next_global_send, self._paused_until) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _deliver(self, message: Dict[str, Any]) -> None:
+        chat_id = message["chat_id"]
+        await self._wait_for_slot()
+        clock = time.monotonic()
+        self._next_global_send = clock + self.global_interval
+        self._next_chat_send[chat_id] = clock + self._chat_interval(chat_id)
+
+        try:
+            result = await self.api.send_message(
+                chat_id, message["text"], message.get("parse_mode")
+            )
+        except (TelegramAPIError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after:
+                # Flood control applies to the whole bot: pause every send
+                self._paused_until = time.monotonic() + retry_after
+                logger.warning(f"Telegram flood limit hit; pausing {retry_after}s")
+                await self.collection.update_one(
+                    {"_id": message["_id"]},
+                    {
+                        "$set": {
+                            "status": "pending",
+                            "next_attempt_at": datetime.utcnow() + timedelta(seconds=retry_after),
+                            "attempts": message["attempts"] - 1,
+                        }
+                    },
+                )
+                return
+
+            retryable = not isinstance(e, TelegramAPIError) or e.retryable
+            if retryable and message["attempts"] < self.max_attempts:
+                delay = self.retry_base_seconds * 2 ** (message["attempts"] - 1)
+                await self.collection.update_one(
+                    {"_id": message["_id"]},
+                    {
+                        "$set": {
+                            "status": "pending",
+                            "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay),
+                            "error": str(e),
+                        }
+                    },
+                )
+            else:
+                logger.error(f"Telegram message {message['_id']} failed permanently: {e}")
+                await self.collection.update_one(
+                    {"_id": message["_id"]},
+                    {"$set": {"status": "failed", "error": str(e), "failed_at": datetime.utcnow()}},
+                )
+            return
+
+        await self.collection.update_one(
+            {"_id": message["_id"]},
+            {
+                "$set": {
+                    "status": "sent",
+                    "message_id": result.get("message_id"),
+                    "sent_at": datetime.utcnow(),
+                },
+                "$unset": {"lease_until": "", "error": ""},
+            },
+        )
+
+    async def process_one(self) -> bool:
+        """Claim and deliver one message; False when nothing is sendable now."""
+        message = await self._claim()
+        if message is None:
+            return False
+        await self._deliver(message)
+        return True
+
+    async def drain(self) -> int:
+        """Flush buffered events and deliver everything currently due."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        await self.flush_events()
+        processed = 0
+        while await self.process_one():
+            processed += 1
+        return processed
+
+    async def _sender(self) -> None:
+        while self.running:
+            try:
+                if not await self.acquire_sender_lease():
+                    # Another worker sends; check again before its lease could expire
+                    await asyncio.sleep(self.lease_seconds / 3)
+                    continue
+                if await self.process_one():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Telegram sender error: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _coalescer(self) -> None:
+        while self.running:
+            await asyncio.sleep(self.coalesce_interval)
+            if not self.is_sender:
+                continue
+            try:
+                await self.flush_events()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Telegram event flush failed: {e}")
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        await self.ensure_indexes()
+        self._tasks = [
+            asyncio.create_task(self._sender()),
+            asyncio.create_task(self._coalescer()),
+        ]
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.release_sender_lease()
+        except Exception as e:
+            logger.warning(f"Could not release the Telegram sender lease: {e}")
+        # Pending messages stay in the outbox for the next start
+        await self.api.close()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        counts = {
+            row["_id"]: row["count"]
+            async for row in self.collection.aggregate(
+                [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+            )
+        }
+        return {"outbox": counts, "running": self.running, "sender": self.is_sender}
+
+
+_outbox: Optional[TelegramOutbox] = None
+
+
+def create_telegram_outbox(db, **kwargs) -> TelegramOutbox:
+    api = TelegramBotAPI(
+        os.getenv("TELEGRAM_BOT_TOKEN"),
+        os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org"),
+    )
+    return TelegramOutbox(db, api, **kwargs)
+
+
+def set_telegram_outbox(outbox: Optional[TelegramOutbox]) -> None:
+    global _outbox
+    _outbox = outbox
+
+
+def get_telegram_outbox() -> Optional[TelegramOutbox]:
+    """The running outbox, if one was started in this event loop."""
+    if _outbox is None or not _outbox.running:
+        return None
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return _outbox
@@ -0,0 +1,285 @@
+import logging
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Bump when normalize_job_title changes so backfill_jobs re-keys stored jobs
+TITLE_GROUP_VERSION = 1
+
+MAX_PER_PAGE = 200
+
+_UNWANTED_TITLE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"Current Open Jobs",
+        r"Open Applications",
+        r"Customer Support",
+        r"On-site",
+        r"Full Time",
+        r"Part Time",
+        r"Contract",
+        r"Freelance",
+        r"Remote",
+        r"Hybrid",
+        r"Relocate to [A-Za-z\s]+",
+        r"Front Office",
+        r"Back Office",
+        r"—[A-Za-z\s]+",
+        r"-[A-Za-z\s]+",
+        r"\([^)]*\)",
+        r"\[[^\]]*\]",
+        r"[A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+",  # Remove long name patterns
+    )
+]
+_WHITESPACE_RE = re.compile(r"\s+")
+_GENERIC_TITLES = {"developers", "jobs", "positions", "roles"}
+_LEVEL_WORDS = {
+    "senior",
+    "sr",
+    "junior",
+    "jr",
+    "lead",
+    "principal",
+    "staff",
+    "associate",
+    "assistant",
+    "i",
+    "ii",
+    "iii",
+    "iv",
+    "1",
+    "2",
+    "3",
+    "4",
+    "5",
+}
+
+
+def clean_job_title(title: str) -> str:
+    """Clean and normalize job titles"""
+    if not title:
+        return ""
+
+    # Remove common unwanted patterns
+    for pattern in _UNWANTED_TITLE_PATTERNS:
+        title = pattern.sub("", title)
+
+    # Remove extra whitespace and leading/trailing punctuation
+    title = _WHITESPACE_RE.sub(" ", title).strip()
+    title = title.strip(".,;:-_|")
+
+    # Filter out titles that are too short or too generic
+    if len(title) < 3 or title.lower() in _GENERIC_TITLES:
+        return ""
+
+    return title
+
+
+def normalize_job_title(title: str) -> str:
+    """Normalize job titles for grouping: lowercase, without level indicators"""
+    cleaned = clean_job_title(title)
+    if not cleaned:
+        return ""
+    return " ".join(word for word in cleaned.lower().split() if word not in _LEVEL_WORDS)
+
+
+def title_group_fields(title: Optional[str]) -> Dict[str, Any]:
+    """Stored grouping key for a job title, written at ingest and by backfill."""
+    return {
+        "title_group": normalize_job_title(title if isinstance(title, str) else "") or None,
+        "title_group_v": TITLE_GROUP_VERSION,
+    }
+
+
+def group_job_titles(jobs: list) -> dict:
+    """Group jobs by normalized titles and return statistics"""
+    title_groups = defaultdict(list)
+
+    for job in jobs:
+        original_title = job.get("title", "")
+        normalized_title = normalize_job_title(original_title)
+
+        if normalized_title:
+            title_groups[normalized_title].append(
+                {
+                    "original_title": original_title,
+                    "job_id": job.get("_id", job.get("id")),
+                    "company": job.get("company", ""),
+                }
+            )
+
+    # Convert to summary format
+    grouped_results = {}
+    for normalized_title, job_list in title_groups.items():
+        original_titles = [job["original_title"] for job in job_list]
+        title_counts = Counter(original_titles)
+
+        grouped_results[normalized_title] = {
+            "count": len(job_list),
+            "variations": dict(title_counts),
+            "most_common": (
+                title_counts.most_common(1)[0][0] if title_counts else normalized_title
+            ),
+            "job_ids": [job["job_id"] for job in job_list],
+        }
+
+    return grouped_results
+
+
+def grouped_titles_pipeline(
+    query: Dict[str, Any], skip: int = 0, limit: int = 50, variations: int = 5
+) -> List[Dict[str, Any]]:
+    """Group matching jobs by stored ``title_group`` entirely in MongoDB.
+
+    Jobs are first counted per (group, original title), so the second
+    ``$group`` only holds one entry per distinct title variation. The page of
+    groups and the totals come back from a single ``$facet``. Jobs that were
+    never keyed (no ``title_group_v`` yet) are grouped on their lowercased
+    title until ``backfill_jobs`` reaches them, rather than left out.
+    """
+    group_key = {
+        "$cond": [
+            {"$ifNull": ["$title_group_v", False]},
+            "$title_group",
+            {"$toLower": {"$ifNull": ["$title", ""]}},
+        ]
+    }
+    return [
+        {"$match": query},
+        {
+            "$group": {
+                "_id": {"group": group_key, "title": "$title"},
+                "count": {"$sum": 1},
+                "job_id": {"$first": "$_id"},
+            }
+        },
+        {"$sort": {"count": -1, "_id.title": 1}},
+        {
+            "$group": {
+                "_id": "$_id.group",
+                "count": {"$sum": "$count"},
+                "variations": {
+                    "$push": {"title": "$_id.title", "count": "$count", "job_id": "$job_id"}
+                },
+            }
+        },
+        {
+            "$facet": {
+                "groups": [
+                    {"$match": {"_id": {"$nin": [None, ""]}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                    {"$skip": skip},
+                    {"$limit": limit},
+                    {
+                        "$project": {
+                            "count": 1,
+                            "variation_count": {"$size": "$variations"},
+                            "variations": {"$slice": ["$variations", variations]},
+                        }
+                    },
+                ],
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total_jobs": {"$sum": "$count"},
+                            "unique_titles": {
+                                "$sum": {"$cond": [{"$in": ["$_id", [None, ""]]}, 0, 1]}
+                            },
+                        }
+                    }
+                ],
+            }
+        },
+    ]
+
+
+class TitleGroups:
+    """
+    Job title groups served from the ``title_group`` key stored on each job.
+
+    The key is computed by the ingest pipeline (and ``backfill_jobs`` for
+    older documents), so grouping a search is a projected server-side
+    ``$group`` and the API process only ever holds one page of groups.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.db.jobs.create_index("title_group")
+            await self.db.jobs.create_index("title_group_v")
+        except Exception as e:
+            logger.warning(f"Could not create title group index: {e}")
+
+    async def is_keyed(self) -> bool:
+        """Whether every job carries a ``title_group`` of the current version."""
+        stale = {"title_group_v": {"$ne": TITLE_GROUP_VERSION}}
+        return await self.db.jobs.find_one(stale, {"_id": 1}) is None
+
+    async def search(
+        self,
+        query: Dict[str, Any],
+        page: int = 1,
+        per_page: int = 50,
+        variations: int = 5,
+        samples: int = 3,
+    ) -> Dict[str, Any]:
+        """One page of title groups for jobs matching ``query``, largest first."""
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+        page = max(page, 1)
+        pipeline = grouped_titles_pipeline(
+            query, (page - 1) * per_page, per_page, max(variations, samples)
+        )
+        rows = await self.db.jobs.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+        facet = rows[0] if rows else {}
+        totals = (facet.get("totals") or [{}])[0]
+        unique_titles = totals.get("unique_titles", 0)
+
+        groups = {}
+        for row in facet.get("groups", []):
+            top = row["variations"]
+            groups[row["_id"]] = {
+                "count": row["count"],
+                "variations": {v["title"]: v["count"] for v in top[:variations]},
+                "variation_count": row["variation_count"],
+                "most_common": top[0]["title"] if top else row["_id"],
+                "sample_job_ids": [str(v["job_id"]) for v in top[:samples]],
+            }
+        return {
+            "total_jobs": totals.get("total_jobs", 0),
+            "unique_titles": unique_titles,
+            "page": page,
+            "per_page": per_page,
+            "pages": -(-unique_titles // per_page),
+            "grouped_titles": groups,
+        }
+
+    async def backfill_jobs(self, batch_size: int = 1000) -> int:
+        """Store ``title_group`` on jobs ingested before it existed or re-key stale ones."""
+        updated = 0
+        stale = {"title_group_v": {"$ne": TITLE_GROUP_VERSION}}
+        while True:
+            docs = await self.db.jobs.find(stale, {"title": 1}).limit(batch_size).to_list(
+                length=batch_size
+            )
+            if not docs:
+                break
+            await self.db.jobs.bulk_write(
+                [
+                    UpdateOne({"_id": doc["_id"]}, {"$set": title_group_fields(doc.get("title"))})
+                    for doc in docs
+                ],
+                ordered=False,
+            )
+            updated += len(docs)
+            if len(docs) < batch_size:
+                break
+        if updated:
+            logger.info(f"Stored title groups for {updated} jobs")
+        return updated
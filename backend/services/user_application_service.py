@@ -5,6 +5,8 @@ from typing import List, Optional
 from bson import ObjectId
 
 from backend.database.db import get_db
+from backend.services.application_stats import (STATS_FIELDS,
+                                                ApplicationStatsEngine)
 from backend.models.user_application import (UserApplication,
                                              UserApplicationCreate,
                                              UserApplicationResponse,
@@ -19,6 +21,7 @@ class UserApplicationService:
     def __init__(self):
         self.db = None
         self.collection = None
+        self.stats_engine = None
 
     async def _get_collection(self):
         """Get the user applications collection"""
@@ -27,6 +30,14 @@ class UserApplicationService:
             self.collection = self.db.user_applications
         return self.collection
 
+    async def _get_stats_engine(self) -> ApplicationStatsEngine:
+        """Statistics engine bound to the applications collection"""
+        collection = await self._get_collection()
+        if self.stats_engine is None or self.stats_engine.collection is not collection:
+            counters = self.db.application_stats if self.db is not None else None
+            self.stats_engine = ApplicationStatsEngine(collection, counters)
+        return self.stats_engine
+
     async def create_application(
         self, application_data: UserApplicationCreate
     ) -> UserApplicationResponse:
@@ -46,6 +57,9 @@ class UserApplicationService:
             if not created_application:
                 raise Exception("Failed to retrieve created application")
 
+            stats = await self._get_stats_engine()
+            await stats.on_created(created_application)
+
             return UserApplicationResponse(**created_application)
 
         except Exception as e:
@@ -147,8 +161,13 @@ class UserApplicationService:
             for field, value in update_data.model_dump(exclude_none=True).items():
                 update_dict[field] = value
 
+            before = None
             if update_dict:
                 update_dict["updated_at"] = datetime.utcnow()
+                if update_dict.keys() & STATS_FIELDS.keys():
+                    before = await collection.find_one(
+                        {"_id": ObjectId(application_id)}, STATS_FIELDS
+                    )
 
                 result = await collection.update_one(
                     {"_id": ObjectId(application_id)}, {"$set": update_dict}
@@ -164,6 +183,10 @@ class UserApplicationService:
             if not updated_application:
                 raise Exception("Failed to retrieve updated application")
 
+            if before is not None:
+                stats = await self._get_stats_engine()
+                await stats.on_updated(before, updated_application)
+
             return UserApplicationResponse(**updated_application)
 
         except Exception as e:
@@ -175,8 +198,15 @@ class UserApplicationService:
         try:
             collection = await self._get_collection()
 
-            result = await collection.delete_one({"_id": ObjectId(application_id)})
-            return result.deleted_count > 0
+            query = {"_id": ObjectId(application_id)}
+            application = await collection.find_one(query, STATS_FIELDS)
+            result = await collection.delete_one(query)
+            if result.deleted_count == 0:
+                return False
+
+            stats = await self._get_stats_engine()
+            await stats.on_deleted(application)
+            return True
 
         except Exception as e:
             logger.error(f"Error deleting application: {str(e)}")
@@ -200,21 +230,8 @@ class UserApplicationService:
     async def get_application_stats(self, user_id: str) -> dict:
         """Get user's application statistics"""
         try:
-            collection = await self._get_collection()
-
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-            ]
-
-            cursor = collection.aggregate(pipeline)
-            stats = {"total": 0}
-
-            async for stat in cursor:
-                stats[stat["_id"]] = stat["count"]
-                stats["total"] += stat["count"]
-
-            return stats
+            stats = await self._get_stats_engine()
+            return await stats.get_stats(user_id)
 
         except Exception as e:
             logger.error(f"Error fetching application stats: {str(e)}")
@@ -115,6 +115,12 @@ class RemoteJobsBot:
         self.application.add_handler(CommandHandler("help", self.help))
         self.application.add_handler(CommandHandler("jobs", self.jobs))
         self.application.add_handler(CommandHandler("subscribe", self.subscribe))
+        self.application.add_handler(
+            CallbackQueryHandler(
+                self.handle_subscription,
+                pattern="^(subscribe_daily|subscribe_weekly|unsubscribe)$",
+            )
+        )
 
         # Profile conversation handler
         profile_conv_handler = ConversationHandler(
@@ -382,6 +388,40 @@ class RemoteJobsBot:
             ),
         )
 
+    async def handle_subscription(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Store daily/weekly digest subscriptions for this chat."""
+        query = update.callback_query
+        await query.answer()
+
+        try:
+            from backend.database.db import get_async_db
+            from backend.services.digest_service import DigestSubscriptionStore
+
+            store = DigestSubscriptionStore(await get_async_db())
+            chat_id = str(update.effective_chat.id)
+
+            if query.data == "unsubscribe":
+                await store.unsubscribe("telegram", chat_id)
+                await query.edit_message_text("🚫 Aboneliğiniz iptal edildi.")
+                return
+
+            frequency = "daily" if query.data == "subscribe_daily" else "weekly"
+            await store.subscribe(
+                "telegram",
+                chat_id,
+                frequency,
+                name=update.effective_user.first_name if update.effective_user else None,
+            )
+            label = "Günlük uyarılar" if frequency == "daily" else "Haftalık özet"
+            await query.edit_message_text(f"✅ {label} aboneliğiniz aktif.")
+        except Exception as e:
+            logger.error(f"Failed to update digest subscription: {str(e)}")
+            await query.edit_message_text(
+                "Abonelik güncellenemedi, lütfen daha sonra tekrar deneyin."
+            )
+
     async def profile_start(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> int:
@@ -1382,21 +1422,30 @@ class RemoteJobsBot:
             logger.error(f"Failed to process error notification: {str(e)}")
             return False
 
+    def _get_outbox(self):
+        """Durable, rate-limited outbox when one is running in this loop"""
+        try:
+            from backend.services.telegram_outbox import get_telegram_outbox
+        except ImportError:
+            return None
+        return get_telegram_outbox()
+
     async def send_new_job_notification(self, job_data: Dict[str, Any]) -> bool:
         """
         Send new job notification to Telegram
 
+        With a running outbox the event is buffered and delivered in the next
+        coalesced new-jobs summary instead of one message per job.
+
         Args:
             job_data: Dictionary containing job information
         """
-        if not self.enabled or not self.application:
+        outbox = self._get_outbox()
+        if (not self.enabled or not self.application) and outbox is None:
             logger.warning("Cannot send new job notification: Bot is disabled")
             return False
 
         try:
-            # Format the new job message
-            message = self._format_new_job_message(job_data)
-
             # Get notification chat ID from environment
             notification_chat_id = os.getenv("TELEGRAM_CHAT_ID")
 
@@ -1406,6 +1455,13 @@ class RemoteJobsBot:
                 )
                 return False
 
+            if outbox is not None:
+                await outbox.enqueue_new_job(notification_chat_id, job_data)
+                return True
+
+            # Format the new job message
+            message = self._format_new_job_message(job_data)
+
             try:
                 notification_chat_id = int(notification_chat_id)
             except ValueError:
@@ -1474,7 +1530,8 @@ class RemoteJobsBot:
         Args:
             crawler_data: Dictionary containing crawler information
         """
-        if not self.enabled or not self.application:
+        outbox = self._get_outbox()
+        if (not self.enabled or not self.application) and outbox is None:
             logger.warning("Cannot send crawler notification: Bot is disabled")
             return False
 
@@ -1561,6 +1618,10 @@ class RemoteJobsBot:
                 logger.error(f"Invalid TELEGRAM_CHAT_ID format: {notification_chat_id}")
                 return False
 
+            if outbox is not None:
+                await outbox.enqueue(notification_chat_id, message)
+                return True
+
             # Send notification
             try:
                 await self.application.bot.send_message(
@@ -60,7 +60,8 @@ class TestAIServicesRoutes:
         assert "timestamp" in data
 
     @patch(
-        "services.resume_parser_service.ResumeParserService.parse_resume_from_base64"
+        "services.resume_parser_service.ResumeParserService.parse_resume_from_base64_async",
+        new_callable=AsyncMock,
     )
     def test_parse_resume_base64_success(self, mock_parse, client: TestClient):
         """Test successful resume parsing from base64"""
@@ -85,7 +86,8 @@ class TestAIServicesRoutes:
             assert "summary" in data
 
     @patch(
-        "services.resume_parser_service.ResumeParserService.parse_resume_from_base64"
+        "services.resume_parser_service.ResumeParserService.parse_resume_from_base64_async",
+        new_callable=AsyncMock,
     )
     def test_parse_resume_base64_invalid_file_type(
         self, mock_parse, client: TestClient
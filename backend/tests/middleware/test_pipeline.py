@@ -0,0 +1,134 @@
+"""
+Request Pipeline Tests
+Tests for the pure-ASGI middleware pipeline and its stages
+"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.middleware.activity_middleware import ActivityTrackingMiddleware
+from backend.middleware.error_handler import ErrorHandlingMiddleware
+from backend.middleware.input_validation import InputValidationMiddleware
+from backend.middleware.pipeline import (PipelineStage,
+                                         RequestPipelineMiddleware)
+from backend.middleware.response_cache import ResponseCacheMiddleware
+from backend.middleware.security_headers import (SecurityHeadersMiddleware,
+                                                 SecurityReportingMiddleware)
+
+
+class RecordingStage(PipelineStage):
+    name = "recording"
+
+    def __init__(self):
+        self.paths = []
+
+    def route_config(self, path):
+        self.paths.append(path)
+        return None if path.startswith("/static") else True
+
+
+@pytest.fixture
+def stages():
+    return {
+        "validation": InputValidationMiddleware(),
+        "errors": ErrorHandlingMiddleware(),
+        "cache": ResponseCacheMiddleware(),
+        "reporting": SecurityReportingMiddleware(),
+        "headers": SecurityHeadersMiddleware(),
+    }
+
+
+@pytest.fixture
+def client(stages):
+    app = FastAPI()
+    app.add_middleware(
+        RequestPipelineMiddleware,
+        stages=[
+            stages["validation"],
+            stages["errors"],
+            stages["cache"],
+            stages["reporting"],
+            stages["headers"],
+        ],
+    )
+    app.state.calls = 0
+
+    @app.get("/api/v1/jobs/statistics")
+    async def statistics():
+        app.state.calls += 1
+        return {"total": 42}
+
+    @app.post("/items")
+    async def create_item(request: Request):
+        payload = await request.json()
+        return {"echo": payload, "shared": request.state.json_body == payload}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("kaboom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestRequestPipeline:
+    """Pure-ASGI middleware zinciri testleri"""
+
+    def test_body_parsed_once_and_replayed(self, client):
+        """JSON gövde bir kez parse edilip endpoint'e aynen iletilmeli"""
+        response = client.post("/items", json={"name": "python"})
+
+        assert response.status_code == 200
+        assert response.json() == {"echo": {"name": "python"}, "shared": True}
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    def test_malicious_input_is_rejected(self, client):
+        """Zararlı girdi 500 yerine 400 ile reddedilmeli"""
+        response = client.post("/items", json={"name": "<script>alert(1)</script>"})
+        assert response.status_code == 400
+
+        response = client.post(
+            "/items", content=b"{not json", headers={"content-type": "application/json"}
+        )
+        assert response.status_code == 400
+
+    def test_cache_hit_skips_endpoint(self, client):
+        """Önbellekteki yanıt endpoint çağrılmadan dönmeli"""
+        first = client.get("/api/v1/jobs/statistics")
+        second = client.get("/api/v1/jobs/statistics")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.json() == {"total": 42}
+        assert second.headers["Cache-Control"] == "public, max-age=900"
+        assert client.app.state.calls == 1
+
+    def test_unhandled_error_is_standardized(self, client, stages):
+        """Yakalanmayan hata standart JSON ve güvenlik başlıklarıyla dönmeli"""
+        response = client.get("/boom")
+
+        assert response.status_code == 500
+        body = response.json()
+        assert body["error"]["type"] == "internal_error"
+        assert response.headers["X-Error-ID"] == body["error"]["error_id"]
+        assert "Content-Security-Policy" in response.headers
+        assert stages["errors"].get_error_stats()["error_counts_by_code"] == {500: 1}
+
+    def test_route_table_skips_stages_per_path(self):
+        """Rota tablosu aşamaları yol başına bir kez çözümlemeli"""
+        stage = RecordingStage()
+        activity = ActivityTrackingMiddleware()
+        app = FastAPI()
+        app.add_middleware(RequestPipelineMiddleware, stages=[stage, activity])
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        client = TestClient(app)
+        for _ in range(3):
+            client.get("/ping")
+        client.get("/static/app.js")
+
+        assert stage.paths == ["/ping", "/static/app.js"]
+        assert activity.route_config("/docs") is None
@@ -1,368 +1,256 @@
 """
 Rate Limiting Tests
-Tests for rate limiting middleware
+Tests for the sliding-window rate limiting engine and middleware
 """
 
+from datetime import datetime, timedelta, UTC
+
+import jwt
 import pytest
-import time
-from unittest.mock import Mock, patch
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
-from backend.middleware.rate_limiter import RateLimiter, TokenBucketRateLimiter
+from backend.middleware.pipeline import RequestContext
+from backend.middleware.rate_limiter import (MemoryRateLimitStore,
+                                             MongoRateLimitStore, RateLimit,
+                                             RateLimiter, RateLimitExceeded,
+                                             parse_rate_limit,
+                                             resolve_client_ip)
+from backend.middleware.rate_limiting import (SECRET_KEY,
+                                              custom_rate_limit_handler,
+                                              get_client_id, is_cron_request,
+                                              rate_limit,
+                                              resolve_rate_limit)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
 from backend.tests.utils.rate_limit_helper import (
-    RateLimitTestHelper, 
-    RateLimiterTestHelper,
-    create_test_app_with_rate_limiting,
-    assert_rate_limit_behavior,
-    test_rate_limit_headers_consistency
-)
+    RateLimiterTestHelper, RateLimitTestHelper,
+    create_test_app_with_rate_limiting)
 
+# Start of a minute, so window boundaries are easy to reason about
+T0 = 1_700_000_040.0
 
-@pytest.fixture
-def rate_limiter():
-    """Create test rate limiter"""
-    return RateLimiterTestHelper.create_test_rate_limiter(requests_per_minute=5, requests_per_hour=10)
+
+@pytest.fixture(autouse=True)
+def enable_rate_limiting(monkeypatch):
+    """Limits are switched off for the rest of the test suite"""
+    monkeypatch.setenv("TESTING", "false")
 
 
 @pytest.fixture
-def token_bucket_limiter():
-    """Create test token bucket limiter"""
-    return RateLimiterTestHelper.create_test_token_bucket_limiter(capacity=5, refill_rate=0.5)
+def rate_limit_helper():
+    """Create rate limit test helper"""
+    return RateLimitTestHelper(TestClient(create_test_app_with_rate_limiting()))
 
 
-@pytest.fixture
-def test_app():
-    """Create test app with rate limiting"""
-    return create_test_app_with_rate_limiting()
+class TestRateLimiter:
+    """Sliding-window engine testleri"""
 
+    def test_parse_rate_limit(self):
+        """Limit metinleri doğru periyotlara çevrilmeli"""
+        assert parse_rate_limit("30/minute") == RateLimit(30, 60)
+        assert parse_rate_limit("1000/hour") == RateLimit(1000, 3600)
+        assert parse_rate_limit("10/5 minutes") == RateLimit(10, 300)
+        assert str(parse_rate_limit("5/minute")) == "5/minute"
+        with pytest.raises(ValueError):
+            parse_rate_limit("5/fortnight")
 
-@pytest.fixture
-def client(test_app):
-    """Create test client"""
-    return TestClient(test_app)
+    @pytest.mark.asyncio
+    async def test_blocks_after_limit_and_previous_window_decays(self):
+        """Önceki pencerenin ağırlığı zamanla azalmalı"""
+        limiter = RateLimiterTestHelper.create_test_rate_limiter()
+        limit = RateLimit(10, 60)
 
+        results = await RateLimiterTestHelper.simulate_requests(
+            limiter, "ip:1", limit, 11, now=T0 + 30
+        )
+        assert results == [True] * 10 + [False]
 
-@pytest.fixture
-def rate_limit_helper(client):
-    """Create rate limit test helper"""
-    return RateLimitTestHelper(client)
+        # At the start of the next window all 11 hits still weigh fully
+        blocked = await limiter.hit("ip:1", limit, now=T0 + 60)
+        assert not blocked.allowed
+        assert 0 < blocked.retry_after <= 60
 
+        # Once enough of the previous window has slid out, one more fits
+        result = await limiter.hit(
+            "ip:1", limit, now=T0 + 60 + blocked.retry_after + 0.001
+        )
+        assert result.allowed
+        assert result.remaining <= 1
+
+    @pytest.mark.asyncio
+    async def test_idle_keys_are_evicted(self):
+        """Boştaki anahtarlar bellekten atılmalı"""
+        store = MemoryRateLimitStore(max_keys=3)
+        limiter = RateLimiter(store)
+        limit = RateLimit(5, 60)
 
-class TestRateLimiter:
-    """Test RateLimiter class"""
-    
-    def test_rate_limiter_initialization(self):
-        """Test rate limiter initialization"""
-        limiter = RateLimiter(requests_per_minute=60, requests_per_hour=1000)
-        
-        assert limiter.requests_per_minute == 60
-        assert limiter.requests_per_hour == 1000
-        assert limiter.minute_requests == {}
-        assert limiter.hour_requests == {}
-    
-    def test_get_client_ip_direct(self):
-        """Test getting client IP from direct connection"""
-        limiter = RateLimiter()
-        mock_request = Mock()
-        mock_request.headers = {}
-        mock_request.client.host = "192.168.1.100"
-        
-        ip = limiter._get_client_ip(mock_request)
-        assert ip == "192.168.1.100"
-    
-    def test_get_client_ip_forwarded(self):
-        """Test getting client IP from forwarded header"""
-        limiter = RateLimiter()
-        mock_request = Mock()
-        mock_request.headers = {"X-Forwarded-For": "10.0.0.1, 192.168.1.1"}
-        mock_request.client.host = "192.168.1.100"
-        
-        ip = limiter._get_client_ip(mock_request)
-        assert ip == "10.0.0.1"
-    
-    def test_get_client_ip_real_ip(self):
-        """Test getting client IP from real IP header"""
-        limiter = RateLimiter()
-        mock_request = Mock()
-        mock_request.headers = {"X-Real-IP": "172.16.0.1"}
-        mock_request.client.host = "192.168.1.100"
-        
-        ip = limiter._get_client_ip(mock_request)
-        assert ip == "172.16.0.1"
-    
-    def test_cleanup_old_requests(self):
-        """Test cleanup of old requests"""
-        limiter = RateLimiter()
-        current_time = time.time()
-        
-        # Add old and new requests
-        requests_list = [
-            current_time - 70,  # Old request (70 seconds ago)
-            current_time - 30,  # Recent request (30 seconds ago)
-            current_time - 10   # Very recent request (10 seconds ago)
-        ]
-        
-        limiter._cleanup_old_requests(requests_list, 60)
-        
-        # Should only keep requests from last 60 seconds
-        assert len(requests_list) == 2
-        assert requests_list[0] == current_time - 30
-        assert requests_list[1] == current_time - 10
-    
-    def test_check_rate_limit_within_limits(self, rate_limiter):
-        """Test rate limit check within limits"""
-        client_ip = "192.168.1.100"
-        
-        # Make requests within limit
-        for i in range(5):
-            is_allowed, message = rate_limiter._check_rate_limit(client_ip)
-            assert is_allowed, f"Request {i+1} should be allowed"
-            assert message is None
-    
-    def test_check_rate_limit_exceeded(self, rate_limiter):
-        """Test rate limit check when exceeded"""
-        client_ip = "192.168.1.100"
-        
-        # Make requests up to limit
-        for i in range(5):
-            is_allowed, _ = rate_limiter._check_rate_limit(client_ip)
-            assert is_allowed, f"Request {i+1} should be allowed"
-        
-        # Next request should be blocked
-        is_allowed, message = rate_limiter._check_rate_limit(client_ip)
-        assert not is_allowed, "Request should be blocked"
-        assert "Rate limit exceeded" in message
-    
-    def test_should_skip_rate_limit(self, rate_limiter):
-        """Test rate limit skip logic"""
-        # Should skip health endpoint
-        assert rate_limiter._should_skip_rate_limit("/health")
-        
-        # Should skip docs endpoint
-        assert rate_limiter._should_skip_rate_limit("/docs")
-        
-        # Should not skip regular endpoint
-        assert not rate_limiter._should_skip_rate_limit("/api/jobs")
-    
-    def test_get_retry_after(self, rate_limiter):
-        """Test retry after calculation"""
-        client_ip = "192.168.1.100"
-        
-        # Make some requests
         for i in range(3):
-            rate_limiter._check_rate_limit(client_ip)
-        
-        retry_after = rate_limiter._get_retry_after(client_ip)
-        assert retry_after > 0
-        assert retry_after <= 60
-
-
-class TestTokenBucketRateLimiter:
-    """Test TokenBucketRateLimiter class"""
-    
-    def test_token_bucket_initialization(self):
-        """Test token bucket initialization"""
-        limiter = TokenBucketRateLimiter(capacity=100, refill_rate=1.0)
-        
-        assert limiter.capacity == 100
-        assert limiter.refill_rate == 1.0
-        assert limiter.tokens == {}
-        assert limiter.last_refill == {}
-    
-    def test_refill_tokens_new_client(self, token_bucket_limiter):
-        """Test token refill for new client"""
-        client_ip = "192.168.1.100"
-        
-        token_bucket_limiter._refill_tokens(client_ip)
-        
-        assert client_ip in token_bucket_limiter.tokens
-        assert client_ip in token_bucket_limiter.last_refill
-        assert token_bucket_limiter.tokens[client_ip] == token_bucket_limiter.capacity
-    
-    def test_refill_tokens_existing_client(self, token_bucket_limiter):
-        """Test token refill for existing client"""
-        client_ip = "192.168.1.100"
-        
-        # Initialize client
-        token_bucket_limiter._refill_tokens(client_ip)
-        initial_tokens = token_bucket_limiter.tokens[client_ip]
-        
-        # Consume some tokens
-        token_bucket_limiter.tokens[client_ip] = 2
-        
-        # Wait and refill
-        time.sleep(0.1)
-        token_bucket_limiter._refill_tokens(client_ip)
-        
-        # Should have more tokens than before
-        assert token_bucket_limiter.tokens[client_ip] > 2
-    
-    def test_consume_token_success(self, token_bucket_limiter):
-        """Test successful token consumption"""
-        client_ip = "192.168.1.100"
-        
-        # Initialize with tokens
-        token_bucket_limiter._refill_tokens(client_ip)
-        initial_tokens = token_bucket_limiter.tokens[client_ip]
-        
-        # Consume token
-        success = token_bucket_limiter._consume_token(client_ip)
-        
-        assert success, "Token consumption should succeed"
-        assert token_bucket_limiter.tokens[client_ip] == initial_tokens - 1
-    
-    def test_consume_token_failure(self, token_bucket_limiter):
-        """Test failed token consumption"""
-        client_ip = "192.168.1.100"
-        
-        # Initialize with tokens
-        token_bucket_limiter._refill_tokens(client_ip)
-        
-        # Consume all tokens
-        for i in range(int(token_bucket_limiter.capacity)):
-            token_bucket_limiter._consume_token(client_ip)
-        
-        # Next consumption should fail
-        success = token_bucket_limiter._consume_token(client_ip)
-        assert not success, "Token consumption should fail"
+            await limiter.hit(f"ip:{i}", limit, now=T0)
+        await limiter.hit("ip:3", limit, now=T0 + 1)
+        assert len(store) == 3
+
+        # Two windows later every earlier key is idle
+        await limiter.hit("ip:new", limit, now=T0 + 121)
+        assert len(store) == 1
+
+    @pytest.mark.asyncio
+    async def test_mongo_store_is_shared_between_workers(self):
+        """MongoDB deposu worker'lar arasında sayaç paylaşmalı"""
+        db = AsyncMockDatabase()
+        worker_a = RateLimiter(MongoRateLimitStore(db))
+        worker_b = RateLimiter(MongoRateLimitStore(db))
+        limit = RateLimit(4, 60)
+
+        for worker in (worker_a, worker_b, worker_a, worker_b):
+            assert (await worker.hit("ip:1", limit, now=T0 + 10)).allowed
+        assert not (await worker_b.hit("ip:1", limit, now=T0 + 20)).allowed
+
+        # The rolled window keeps the previous count for the weighting
+        result = await worker_a.hit("ip:1", limit, now=T0 + 65)
+        doc = await db["rate_limits"].find_one({"_id": "ip:1"})
+        assert doc["previous"] == 5 and doc["current"] == 1
+        assert not result.allowed
+
+    def test_cron_requests_match_cidr_ranges(self):
+        """Cron istekleri CIDR aralığıyla tanınmalı"""
+
+        def ctx(ip, headers=()):
+            return RequestContext(
+                {
+                    "type": "http",
+                    "method": "GET",
+                    "path": "/api/cron/run",
+                    "headers": list(headers),
+                    "query_string": b"",
+                    "client": (ip, 1234),
+                },
+                None,
+            )
+
+        assert is_cron_request(ctx("165.227.83.17"))
+        assert is_cron_request(ctx("::1"))
+        assert not is_cron_request(ctx("165.227.84.17"))
+        assert not is_cron_request(ctx("testclient"))
+        assert is_cron_request(ctx("10.0.0.1", [(b"x-api-key", b"buzz2remote-cron-2024")]))
+
+        # Forwarded addresses only count when a trusted proxy sent them
+        spoofed = ctx("203.0.113.5", [(b"x-forwarded-for", b"127.0.0.1")])
+        assert not is_cron_request(spoofed)
+        assert get_client_id(spoofed.request) == "ip:203.0.113.5"
+        proxied = ctx("10.0.0.2", [(b"x-forwarded-for", b"127.0.0.1, 165.227.83.17")])
+        assert is_cron_request(proxied)
+        assert get_client_id(proxied.request) == "ip:165.227.83.17"
+
+    def test_api_keys_are_bucketed_per_key(self):
+        """Aynı öneki paylaşan API anahtarları ayrı sayaçlara düşmeli, anahtar saklanmamalı"""
+
+        def client_id(api_key):
+            return get_client_id(
+                Request(
+                    {
+                        "type": "http",
+                        "method": "GET",
+                        "path": "/api/jobs",
+                        "headers": [(b"x-api-key", api_key.encode())],
+                        "query_string": b"",
+                        "client": ("198.51.100.7", 1234),
+                    }
+                )
+            )
+
+        first, second = client_id("partner-key-0001"), client_id("partner-key-0002")
+        assert first != second
+        assert first == client_id("partner-key-0001")
+        assert first.startswith("api:") and "partner" not in first
+
+    def test_client_ip_skips_trusted_hops_only(self):
+        """X-Forwarded-For sağdan okunmalı, istemcinin eklediği adresler yok sayılmalı"""
+        assert resolve_client_ip("10.0.0.2", "1.2.3.4, 198.51.100.7, 10.0.0.9") == "198.51.100.7"
+        assert resolve_client_ip("10.0.0.2", "garbage, 10.0.0.9") == "10.0.0.2"
+        assert resolve_client_ip("10.0.0.2", None, "198.51.100.7") == "198.51.100.7"
+        assert resolve_client_ip("198.51.100.7", "1.2.3.4", "5.6.7.8") == "198.51.100.7"
+        assert resolve_client_ip(None) == "unknown"
+
+    @pytest.mark.asyncio
+    async def test_mongo_store_race_counts_current_window(self):
+        """Pencereyi başka worker devirdiyse sayaç eski pencereye yazılmamalı"""
+        db = AsyncMockDatabase()
+        store = MongoRateLimitStore(db)
+        # A worker whose clock is ahead already rolled into the next window
+        await store.hit("ip:1", 60, T0 + 61)
+        assert await store.hit("ip:1", 60, T0 + 59) == (2, 0)
+
+        # The key expired between the failed upsert and the increment
+        real_update = store.collection.find_one_and_update
+        calls = []
+
+        async def racing_update(query, update, **kwargs):
+            calls.append(query)
+            if len(calls) == 3:
+                await db["rate_limits"].delete_many({})
+                return None
+            return await real_update(query, update, **kwargs)
+
+        store.collection.find_one_and_update = racing_update
+        assert await store.hit("ip:1", 60, T0 + 10) == (1, 0)
+        assert calls[2] == {"_id": "ip:1", "window": {"$gte": int((T0 + 10) // 60)}}
 
 
 class TestRateLimitingIntegration:
-    """Test rate limiting integration with FastAPI"""
-    
-    def test_successful_requests_within_limit(self, rate_limit_helper):
-        """Test successful requests within rate limit"""
-        responses = rate_limit_helper.make_multiple_requests("GET", "/test", 3)
-        
-        # All requests should be successful
-        for response in responses:
+    """Pipeline stage ve endpoint decorator testleri"""
+
+    def test_headers_and_exceeded_response(self, rate_limit_helper):
+        """Limit başlıkları dönmeli, aşımda 429 yanıtı verilmeli"""
+        responses = rate_limit_helper.make_multiple_requests("GET", "/test", 31)
+
+        for response in responses[:30]:
             rate_limit_helper.assert_successful_request(response)
             rate_limit_helper.assert_rate_limit_headers(response)
-    
-    def test_rate_limit_exceeded(self, rate_limit_helper):
-        """Test rate limit exceeded behavior"""
-        # Make more requests than allowed
-        responses = rate_limit_helper.make_multiple_requests("GET", "/test", 10)
-        
-        # Should have some successful and some rate limited
-        success_count = sum(1 for r in responses if r["status_code"] < 400)
-        rate_limited_count = sum(1 for r in responses if r["status_code"] == 429)
-        
-        assert success_count > 0, "Should have some successful requests"
-        assert rate_limited_count > 0, "Should have some rate limited requests"
-        
-        # Check rate limited responses
-        for response in responses:
-            if response["status_code"] == 429:
-                rate_limit_helper.assert_rate_limit_exceeded(response)
-    
-    def test_rate_limit_headers_consistency(self, rate_limit_helper):
-        """Test rate limit headers consistency"""
-        responses = rate_limit_helper.make_multiple_requests("GET", "/test", 3)
-        test_rate_limit_headers_consistency(responses)
-    
-    def test_different_endpoints_same_limit(self, rate_limit_helper):
-        """Test that different endpoints share the same rate limit"""
-        # Make requests to different endpoints
-        responses = []
-        responses.extend(rate_limit_helper.make_multiple_requests("GET", "/test", 3))
-        responses.extend(rate_limit_helper.make_multiple_requests("POST", "/test", 3))
-        
-        # Should have some rate limited requests
-        rate_limited_count = sum(1 for r in responses if r["status_code"] == 429)
-        assert rate_limited_count > 0, "Should have rate limited requests"
-    
+        assert responses[0]["headers"]["x-ratelimit-limit"] == "30"
+        assert responses[29]["headers"]["x-ratelimit-remaining"] == "0"
+
+        rate_limit_helper.assert_rate_limit_exceeded(responses[30])
+        assert int(responses[30]["headers"]["retry-after"]) >= 1
+
     def test_health_endpoint_not_rate_limited(self, rate_limit_helper):
-        """Test that health endpoint is not rate limited"""
-        responses = rate_limit_helper.make_multiple_requests("GET", "/health", 10)
-        
-        # All health requests should be successful
-        for response in responses:
+        """Health endpoint limitlenmemeli"""
+        for response in rate_limit_helper.make_multiple_requests("GET", "/health", 40):
             rate_limit_helper.assert_successful_request(response)
-    
-    def test_rate_limit_reset_after_wait(self, rate_limit_helper):
-        """Test rate limit reset after waiting"""
-        # Make requests to hit limit
-        responses = rate_limit_helper.make_multiple_requests("GET", "/test", 10)
-        
-        # Wait for rate limit to reset
-        rate_limit_helper.wait_for_rate_limit_reset(2)
-        
-        # Make more requests
-        new_responses = rate_limit_helper.make_multiple_requests("GET", "/test", 3)
-        
-        # Should have some successful requests
-        success_count = sum(1 for r in new_responses if r["status_code"] < 400)
-        assert success_count > 0, "Should have successful requests after reset"
-
-
-class TestRateLimitingEdgeCases:
-    """Test rate limiting edge cases"""
-    
-    def test_empty_client_ip(self, rate_limiter):
-        """Test handling of empty client IP"""
-        mock_request = Mock()
-        mock_request.headers = {}
-        mock_request.client = None
-        
-        ip = rate_limiter._get_client_ip(mock_request)
-        assert ip == "unknown"
-    
-    def test_multiple_forwarded_ips(self, rate_limiter):
-        """Test handling of multiple forwarded IPs"""
-        mock_request = Mock()
-        mock_request.headers = {"X-Forwarded-For": "10.0.0.1, 192.168.1.1, 172.16.0.1"}
-        
-        ip = rate_limiter._get_client_ip(mock_request)
-        assert ip == "10.0.0.1"
-    
-    def test_rate_limiter_error_handling(self, rate_limiter):
-        """Test rate limiter error handling"""
-        # Mock request that will cause an error
-        mock_request = Mock()
-        mock_request.url.path = "/test"
-        mock_request.headers = {}
-        mock_request.client.host = "192.168.1.100"
-        
-        # Mock call_next to raise an exception
-        async def mock_call_next(request):
-            raise Exception("Test error")
-        
-        # Should handle error gracefully
-        with pytest.raises(Exception):
-            asyncio.run(rate_limiter(mock_request, mock_call_next))
-
-
-class TestRateLimitingPerformance:
-    """Test rate limiting performance"""
-    
-    def test_rate_limiter_performance(self, rate_limiter):
-        """Test rate limiter performance"""
-        client_ip = "192.168.1.100"
-        start_time = time.time()
-        
-        # Make many requests
-        for i in range(100):
-            rate_limiter._check_rate_limit(client_ip)
-        
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        # Should complete quickly
-        assert duration < 1.0, f"Rate limiting took too long: {duration}s"
-    
-    def test_token_bucket_performance(self, token_bucket_limiter):
-        """Test token bucket performance"""
-        client_ip = "192.168.1.100"
-        start_time = time.time()
-        
-        # Make many token consumptions
-        for i in range(100):
-            token_bucket_limiter._consume_token(client_ip)
-        
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        # Should complete quickly
-        assert duration < 1.0, f"Token bucket took too long: {duration}s" 
\ No newline at end of file
+            assert "x-ratelimit-limit" not in response["headers"]
+
+    def test_authenticated_users_get_their_tier_limit(self, rate_limit_helper):
+        """Geçerli token sahibi kullanıcı kendi tier limitini almalı"""
+        token = jwt.encode(
+            {"sub": "user-1", "exp": datetime.now(UTC) + timedelta(minutes=5)},
+            SECRET_KEY,
+            algorithm="HS256",
+        )
+        response = rate_limit_helper.make_request(
+            "GET", "/test", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response["headers"]["x-ratelimit-limit"] == "100"
+
+        assert resolve_rate_limit("/api/v1/auth/login", "POST", "public") == (
+            "auth_login",
+            "5/minute",
+        )
+        assert resolve_rate_limit("/api/v1/jobs/search", "GET", "premium") == (
+            "jobs_search",
+            "300/minute",
+        )
+
+    def test_endpoint_decorator_uses_shared_engine(self):
+        """Endpoint decorator'ı 429 ile RateLimitExceeded döndürmeli"""
+        app = FastAPI()
+        app.add_exception_handler(RateLimitExceeded, custom_rate_limit_handler)
+
+        @app.post("/login")
+        @rate_limit("2/minute")
+        async def login(request: Request):
+            return {"ok": True}
+
+        client = TestClient(app)
+        statuses = [client.post("/login").status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+        assert client.post("/login").json()["error"] == "Rate limit exceeded"
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+
+from backend.scripts.benchmark_suite import compare, make_corpus, run_suite
+
+
+class TestBenchmarkSuite:
+    """Benchmark paketi: deterministik veri seti ve baz çizgisi karşılaştırması"""
+
+    def test_corpus_is_deterministic(self):
+        """Aynı tohum ve zaman aynı veri setini üretmeli"""
+        now = datetime(2025, 1, 1)
+        first = make_corpus(50, seed=7, now=now)
+        assert first == make_corpus(50, seed=7, now=now)
+        assert first != make_corpus(50, seed=8, now=now)
+        assert len(first["jobs"]) == 50
+        assert len(first["applications"]) == 100
+        assert {app["user_id"] for app in first["applications"]} <= {
+            user["_id"] for user in first["users"]
+        }
+
+    @pytest.mark.asyncio
+    async def test_endpoints_run_against_seeded_corpus(self):
+        """Arama uç noktaları ASGI üzerinden çalışmalı ve sonuçlar JSON'a uygun olmalı"""
+        result = await run_suite([40], repeat=1, only="search.", log=lambda _: None)
+
+        assert result["meta"]["backend"] == "mongomock"
+        assert set(result["results"]) == {
+            "search.newest@40",
+            "search.keyword@40",
+            "search.filtered@40",
+        }
+        for row in result["results"].values():
+            assert row["runs"] == 1
+            assert row["median_ms"] > 0
+
+    def test_compare_flags_regressions(self):
+        """Eşiği aşan yavaşlama regresyon, yeni ölçüm eksik olarak raporlanmalı"""
+        baseline = {
+            "results": {
+                "search.newest@1000": {"median_ms": 10.0},
+                "statistics@1000": {"median_ms": 4.0},
+                "matching.top_matches@1000": {"median_ms": 100.0},
+            }
+        }
+        current = {
+            "results": {
+                "search.newest@1000": {"median_ms": 14.0},
+                "statistics@1000": {"median_ms": 4.4},
+                "matching.top_matches@1000": {"median_ms": 50.0},
+                "crawler_save.new@1000": {"median_ms": 900.0},
+            }
+        }
+        report = compare(current, baseline, threshold=0.25)
+
+        assert [row["key"] for row in report["regressions"]] == ["search.newest@1000"]
+        assert report["regressions"][0]["ratio"] == 1.4
+        assert [row["key"] for row in report["improvements"]] == ["matching.top_matches@1000"]
+        assert [row["key"] for row in report["unchanged"]] == ["statistics@1000"]
+        assert report["missing"] == [{"key": "crawler_save.new@1000"}]
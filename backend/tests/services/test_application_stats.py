@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.application_stats import ApplicationStatsEngine
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _app(status="applied", app_type="external", days_ago=0, responded=False, user_id="u1"):
+    return {
+        "user_id": user_id,
+        "job_id": f"job-{status}-{days_ago}",
+        "status": status,
+        "application_type": app_type,
+        "applied_at": datetime.utcnow() - timedelta(days=days_ago),
+        "company_response": "Thanks!" if responded else None,
+    }
+
+
+class TestApplicationStatsEngine:
+    """Başvuru istatistikleri motoru testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    @pytest.fixture
+    def engine(self, db):
+        return ApplicationStatsEngine(db.user_applications, db.application_stats)
+
+    @pytest.mark.asyncio
+    async def test_breakdown_from_single_aggregation(self, db):
+        """Tüm kırılımlar tek aggregation ile hesaplanmalı"""
+        await db.user_applications.insert_many(
+            [
+                _app(),
+                _app("viewed", responded=True),
+                _app("rejected", "automated", days_ago=30, responded=True),
+                _app(user_id="other"),
+            ]
+        )
+        stats = await ApplicationStatsEngine(db.user_applications).get_stats("u1")
+
+        assert stats == {
+            "total_applications": 3,
+            "status_breakdown": {"applied": 1, "viewed": 1, "rejected": 1, "hired": 0, "withdrawn": 0},
+            "type_breakdown": {"external": 2, "scraped": 0, "automated": 1},
+            "recent_applications": 2,
+            "response_rate": 66.67,
+            "responded_applications": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_counters_follow_apply_update_and_delete(self, db, engine):
+        """Sayaçlar başvuru, güncelleme ve silmeyle birlikte güncellenmeli"""
+        first = _app()
+        await db.user_applications.insert_one(first)
+        assert (await engine.get_stats("u1"))["total_applications"] == 1
+        assert await db.application_stats.find_one({"_id": "u1"}) is not None
+
+        second = _app("applied", "scraped", days_ago=1)
+        await db.user_applications.insert_one(second)
+        await engine.on_created(second)
+        await engine.on_updated(first, {**first, "status": "hired", "company_response": "Welcome"})
+        await engine.on_deleted(second)
+
+        # Served from the counter document, not re-aggregated
+        db.user_applications.aggregate = None
+        stats = await engine.get_stats("u1")
+        assert stats["total_applications"] == 1
+        assert stats["status_breakdown"]["hired"] == 1
+        assert stats["status_breakdown"]["applied"] == 0
+        assert stats["type_breakdown"]["scraped"] == 0
+        assert stats["recent_applications"] == 1
+        assert stats["responded_applications"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unseeded_users_are_not_upserted(self, db, engine):
+        """Tohumlanmamış kullanıcı için eksik sayaç dokümanı oluşmamalı"""
+        await engine.on_created(_app())
+        assert await db.application_stats.count_documents({}) == 0
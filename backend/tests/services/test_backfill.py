@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.database import get_async_db
+from backend.routes.jobs import router as jobs_router
+from backend.services.backfill import (RUNS_COLLECTION, BackfillConflict,
+                                       BackfillManager, BackfillRunner,
+                                       get_backfill, split_title_metadata)
+from backend.services.job_scheduler import LEASES_COLLECTION
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+from backend.utils.auth import get_current_admin
+
+
+async def _seed(db, count=7):
+    jobs = [
+        {"_id": i, "title": f"<b>Python Developer {i}</b>", "company": "Acme", "location": "Remote"}
+        for i in range(count)
+    ]
+    jobs.append({"_id": count, "title": "Clean Title", "company": "Acme"})
+    await db.jobs.insert_many(jobs)
+
+
+class TestBackfill:
+    """Arka plan veri düzeltme (backfill) testleri"""
+
+    @pytest.mark.asyncio
+    async def test_dry_run_reports_diffs_without_writing(self):
+        """Deneme çalıştırması farkları örneklemeli ama hiçbir şey yazmamalı"""
+        db = AsyncMockDatabase()
+        await _seed(db)
+
+        state = await BackfillRunner(db, get_backfill("html_clean"), dry_run=True, batch_size=3).run()
+
+        assert state["status"] == "completed"
+        assert state["scanned"] == state["total"] == 8
+        assert state["changed"] == 7 and state["written"] == 0
+        assert state["samples"][0]["before"] == {"title": "<b>Python Developer 0</b>"}
+        assert state["samples"][0]["after"] == {"title": "Python Developer 0"}
+        assert (await db.jobs.find_one({"_id": 0}))["title"] == "<b>Python Developer 0</b>"
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint_and_writes_only_changes(self):
+        """Yarıda kalan çalıştırma son kontrol noktasından devam etmeli"""
+        db = AsyncMockDatabase()
+        await _seed(db)
+        runner = BackfillRunner(db, get_backfill("html_clean"), batch_size=3)
+        await runner.create()
+        await db[RUNS_COLLECTION].update_one(
+            {"_id": runner.run_id},
+            {"$set": {"status": "running", "last_id": 2, "scanned": 3, "total": 8}},
+        )
+
+        state = await BackfillRunner(db, get_backfill("html_clean"), run_id=runner.run_id).run()
+
+        assert state["status"] == "completed"
+        assert state["scanned"] == 8 and state["last_id"] == 7
+        assert state["written"] == 4
+        assert (await db.jobs.find_one({"_id": 1}))["title"] == "<b>Python Developer 1</b>"
+        assert (await db.jobs.find_one({"_id": 5}))["title"] == "Python Developer 5"
+        assert (await db[RUNS_COLLECTION].find_one({"_id": runner.run_id}))["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_manager_runs_in_background_and_rejects_duplicates(self):
+        """Yönetici işi arka planda çalıştırmalı ve aynı isimli ikinci çalıştırmayı reddetmeli"""
+        db = AsyncMockDatabase()
+        await _seed(db)
+        await db.jobs.insert_one({"_id": 100, "title": "Python Developer - Remote Full-time"})
+        manager = BackfillManager()
+
+        queued = await manager.enqueue(db, "title_metadata", workers=0)
+        assert queued["status"] == "queued"
+        with pytest.raises(BackfillConflict):
+            await manager.enqueue(db, "title_metadata")
+
+        await manager.wait(queued["id"])
+        done = await manager.status(db, queued["id"])
+        assert done["status"] == "completed" and done["progress"] == 100.0
+        job = await db.jobs.find_one({"_id": 100})
+        assert job["title"] == "Python Developer"
+        assert job["location"] == "Remote" and job["job_type"] == "Full-time"
+        assert job["title_group"] == "python developer"
+        assert done["changed"] == 1
+
+        with pytest.raises(BackfillConflict):
+            await manager.resume(db, queued["id"])
+
+    @pytest.mark.asyncio
+    async def test_concurrent_enqueues_start_one_run(self):
+        """Aynı anda gelen iki istekten yalnızca biri çalıştırmayı başlatmalı"""
+        db = AsyncMockDatabase()
+        await _seed(db)
+        managers = [BackfillManager(), BackfillManager()]
+        # Let both requests read the idle state before either writes
+        for collection in (db[RUNS_COLLECTION], db[LEASES_COLLECTION]):
+            find_one = collection.find_one
+
+            async def yielding_find_one(*args, _find_one=find_one, **kwargs):
+                found = await _find_one(*args, **kwargs)
+                await asyncio.sleep(0)
+                return found
+
+            collection.find_one = yielding_find_one
+
+        results = await asyncio.gather(
+            *(manager.enqueue(db, "html_clean", workers=0) for manager in managers),
+            return_exceptions=True,
+        )
+        started = [result for result in results if isinstance(result, dict)]
+        assert len(started) == 1
+        assert [type(result) for result in results if result not in started] == [BackfillConflict]
+        for manager in managers:
+            await manager.wait(started[0]["id"])
+        assert await db[RUNS_COLLECTION].count_documents({}) == 1
+
+        # Once finished, the name can be run again
+        again = await managers[1].enqueue(db, "html_clean", workers=0)
+        await managers[1].wait(again["id"])
+        assert (await managers[1].status(db, again["id"]))["status"] == "completed"
+
+    def test_title_metadata_matches_whole_words(self):
+        """Başlıktaki konum ve çalışma tipi yalnızca tam kelime olarak ayrılmalı"""
+        for title in (
+            "Business Analyst",
+            "Customer Success Manager",
+            "Contractor Relations Lead",
+            "Campus Recruiter",
+        ):
+            assert split_title_metadata({"title": title}) is None
+
+        fields = split_title_metadata({"title": "Senior Engineer (USA) Contract"})
+        assert (fields["title"], fields["location"], fields["job_type"]) == (
+            "Senior Engineer",
+            "USA",
+            "Contract",
+        )
+        fields = split_title_metadata({"title": "Remote Support Engineer - Remote"})
+        assert (fields["title"], fields["location"]) == ("Support Engineer Remote", "Remote")
+
+    def test_admin_endpoints(self):
+        """Yönetici uç noktaları bilinmeyen işler için 404 ve çalıştırma durumu döndürmeli"""
+        db = AsyncMockDatabase()
+        app = FastAPI()
+        app.include_router(jobs_router, prefix="/api/v1")
+        app.dependency_overrides[get_async_db] = lambda: db
+        app.dependency_overrides[get_current_admin] = lambda: {"is_admin": True}
+        client = TestClient(app)
+
+        listed = client.get("/api/v1/jobs/admin/backfills")
+        assert listed.status_code == 200
+        assert "job_skills" in listed.json()["backfills"]
+
+        assert client.post("/api/v1/jobs/admin/backfills/unknown").status_code == 404
+        assert client.get("/api/v1/jobs/admin/backfills/runs/missing").status_code == 404
+
+        response = client.post("/api/v1/jobs/admin/update-job-skills", params={"dry_run": True})
+        assert response.status_code == 202
+        assert response.json()["name"] == "job_skills"
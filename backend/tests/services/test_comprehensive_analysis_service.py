@@ -0,0 +1,111 @@
+import pytest
+
+from backend.services.comprehensive_analysis_service import (
+    ComprehensiveAnalysisService, market_pipeline)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+JOBS = [
+    {
+        "company": "Acme",
+        "remote": True,
+        "salary": {"max": 90000},
+        "category": "Engineering",
+        "location": "Berlin, Germany",
+        "type": "Full-time",
+        "experience_level": "Senior",
+        "skills": ["Python", "Docker"],
+    },
+    {
+        "company": "Acme",
+        "remote": False,
+        "salary": {"max": 70000},
+        "category": "Engineering",
+        "location": "Berlin",
+        "type": "Contract",
+        "experience_level": "Mid",
+        "skills": ["Python", "React"],
+    },
+    {
+        "company": "Globex",
+        "remote": True,
+        "salary": {"max": 0},
+        "category": "Data",
+        "location": "Remote",
+        "type": "Full-time",
+        "experience_level": "Senior",
+        "skills": ["Python", "AWS"],
+    },
+    {
+        "company": "Initech",
+        "location": None,
+        "salary": "competitive",
+        "skills": "Go, Kubernetes",
+    },
+]
+
+
+def _without_date(result):
+    result.pop("analysis_date")
+    return result
+
+
+class TestComprehensiveAnalysisService:
+    """İş piyasası ve beceri talebi analizi testleri"""
+
+    @pytest.fixture
+    def service(self):
+        return ComprehensiveAnalysisService()
+
+    def test_market_aggregates_with_filters(self, service):
+        """Filtreler birlikte uygulanmalı, geçersiz maaş ve boş alanlar atlanmalı"""
+        result = service.analyze_job_market(JOBS)
+        assert result["total_jobs"] == 4
+        assert result["remote_jobs_percentage"] == 50.0
+        assert result["top_companies"][0] == {"company": "Acme", "job_count": 2}
+        assert result["salary_trends"] == {
+            "average_salary": 80000,
+            "salary_range": {"min": 70000, "max": 90000},
+        }
+
+        filtered = service.analyze_job_market(
+            JOBS, {"location": "berlin", "job_type": "FULL", "experience_level": "sen"}
+        )
+        assert filtered["total_jobs"] == 1
+        assert filtered["job_categories"] == [{"category": "Engineering", "count": 1}]
+
+        empty = service.analyze_job_market([])
+        assert empty["total_jobs"] == 0
+        assert empty["salary_trends"]["salary_range"] == {"min": 0, "max": 0}
+
+    def test_skills_demand_counts_lists_and_strings(self, service):
+        """Liste ve virgülle ayrılmış beceriler birlikte sayılmalı"""
+        result = service.analyze_skills_demand(JOBS)
+        top = result["most_demanded_skills"][0]
+        assert top == {"skill": "Python", "demand_score": 0.75, "job_count": 3}
+        assert "Kubernetes" in result["skill_categories"]["cloud_platforms"]
+        assert "Go" in result["skill_categories"]["programming_languages"]
+
+    @pytest.mark.asyncio
+    async def test_collection_analysis_matches_in_memory(self, service):
+        """Veritabanında toplanan analiz bellek içi sonuçla aynı olmalı"""
+        db = AsyncMockDatabase()
+        jobs = [dict(job) for job in JOBS[:3]]
+        await db.jobs.insert_many([dict(job) for job in jobs])
+        stored = ComprehensiveAnalysisService(db)
+        filters = {"location": "berlin"}
+
+        assert _without_date(await stored.analyze_job_market_from_db()) == (
+            _without_date(service.analyze_job_market(jobs))
+        )
+        assert _without_date(await stored.analyze_job_market_from_db(filters)) == (
+            _without_date(service.analyze_job_market(jobs, filters))
+        )
+        assert _without_date(await stored.analyze_skills_demand_from_db(filters)) == (
+            _without_date(service.analyze_skills_demand(jobs, filters))
+        )
+
+        # Filter values are matched literally, not as regular expressions
+        pipeline = market_pipeline({"location": "c++ (remote)"})
+        assert pipeline[0]["$match"]["$and"][0]["location"]["$regex"] == r"c\+\+\ \(remote\)"
+        with pytest.raises(ValueError):
+            await service.analyze_job_market_from_db()
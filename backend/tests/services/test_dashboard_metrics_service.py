@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from backend.services.dashboard_metrics_service import (SNAPSHOT_ID,
+                                                        DashboardMetricsService)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+class TestDashboardMetricsService:
+    """Admin dashboard metrik snapshot testleri"""
+
+    @pytest_asyncio.fixture
+    async def db(self):
+        db = AsyncMockDatabase()
+        now = datetime.now()
+        await db.jobs.insert_many(
+            [
+                {
+                    "company": "Acme",
+                    "location": "Remote, US",
+                    "is_active": True,
+                    "source_type": "remoteok",
+                    "created_at": now,
+                    "last_updated": (now - timedelta(hours=2)).isoformat(),
+                },
+                {
+                    "company": "Acme",
+                    "location": "Berlin",
+                    "is_active": True,
+                    "source_type": "remoteok",
+                    "created_at": now - timedelta(days=3),
+                },
+                {
+                    "company": "Globex",
+                    "location": "remote",
+                    "is_active": False,
+                    "source_type": "weworkremotely",
+                    "created_at": (now - timedelta(hours=3)).isoformat(),
+                },
+            ]
+        )
+        return db
+
+    @pytest.mark.asyncio
+    async def test_compute_single_facet(self, db):
+        """Tüm metrikler tek aggregation ile hesaplanmalı"""
+        metrics = await DashboardMetricsService(db).compute()
+
+        assert metrics["total_jobs"] == 3
+        assert metrics["active_jobs"] == 2
+        assert metrics["new_jobs_24h"] == 2
+        assert metrics["jobs_today"] >= 1
+        assert metrics["remote_jobs"] == 2
+        assert metrics["total_companies"] == 2
+        assert metrics["active_api_sources"] == 2
+        assert isinstance(metrics["latest_sync"], datetime)
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_stored_and_reused(self, db):
+        """Snapshot saklanmalı ve sonraki okumalarda yeniden hesaplanmamalı"""
+        service = DashboardMetricsService(db)
+        first = await service.get_snapshot()
+        assert first["as_of"] is not None
+
+        await db.jobs.insert_one({"company": "Initech", "is_active": True})
+        second = await service.get_snapshot()
+
+        assert second["total_jobs"] == 3
+        assert await db.dashboard_metrics.count_documents({"_id": SNAPSHOT_ID}) == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_replaces_snapshot(self, db):
+        """refresh güncel değerlerle snapshot'ı değiştirmeli"""
+        service = DashboardMetricsService(db)
+        await service.get_snapshot()
+        await db.jobs.insert_one({"company": "Initech", "is_active": True})
+
+        snapshot = await service.refresh()
+
+        assert snapshot["total_jobs"] == 4
+        assert snapshot["total_companies"] == 3
+        stored = await db.dashboard_metrics.find_one({"_id": SNAPSHOT_ID})
+        assert stored["total_jobs"] == 4
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from backend.services.digest_service import (DigestBuilder,
+                                             DigestSubscriptionStore,
+                                             build_job_query,
+                                             normalize_preferences,
+                                             preference_signature,
+                                             user_digest_preferences)
+from backend.services.ingest_pipeline import build_ingest_pipeline
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+class FakeMailgun:
+    def __init__(self):
+        self.batches = []
+
+    async def queue_new_jobs_digest(self, recipients, jobs, user_preferences=None):
+        self.batches.append({"recipients": recipients, "jobs": jobs})
+        return len(recipients)
+
+
+class FakeTelegram:
+    def __init__(self, fail_after=None):
+        self.sent = []
+        self.fail_after = fail_after
+
+    async def __call__(self, chat_id, text):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise RuntimeError("crash")
+        self.sent.append((chat_id, text))
+        return True
+
+
+@pytest_asyncio.fixture
+async def db():
+    db = AsyncMockDatabase()
+    now = datetime.utcnow()
+    await db.jobs.insert_many(
+        [
+            {
+                "title": "Senior Python Developer",
+                "title_group": "python developer",
+                "skill_keys": ["python", "django"],
+                "company": "Acme",
+                "created_at": now - timedelta(hours=2),
+            },
+            {
+                "title": "React Engineer",
+                "title_group": "react engineer",
+                "skill_keys": ["react"],
+                "company": "Globex",
+                "created_at": now - timedelta(hours=3),
+            },
+            {
+                "title": "Old Python Role",
+                "skill_keys": ["python"],
+                "company": "Initech",
+                "created_at": now - timedelta(days=3),
+            },
+        ]
+    )
+    store = DigestSubscriptionStore(db)
+    await store.subscribe("email", "a@example.com", "daily", {"skills": ["Python"]}, name="Ada")
+    await store.subscribe("email", "b@example.com", "daily", {"skills": ["python "]}, name="Bob")
+    await store.subscribe("telegram", "42", "daily", {"skills": ["python"]})
+    await store.subscribe("email", "c@example.com", "daily", {"skills": ["react"]})
+    await store.subscribe("email", "w@example.com", "weekly", {"skills": ["python"]})
+    return db
+
+
+class TestDigestService:
+    """Digest oluşturucu testleri"""
+
+    def test_signature_ignores_case_and_order(self):
+        """Aynı tercihler aynı imzayı üretmeli"""
+        first = {"skills": ["Python", "AWS"], "locations": ["Remote"]}
+        second = {"skills": ["aws", "python"], "locations": ["remote "]}
+        assert preference_signature(first) == preference_signature(second)
+        assert preference_signature(first) != preference_signature({"skills": ["go"]})
+
+    def test_query_uses_window_and_parsed_fields(self):
+        """Sorgu zaman penceresi ve ingest sırasında yazılan anahtarları kullanmalı"""
+        now = datetime.utcnow()
+        preferences = normalize_preferences(
+            {"skills": ["JS", "Python"], "titles": ["Senior Python Developer"], "companies": ["ACME "]}
+        )
+        query = build_job_query(preferences, now - timedelta(days=1), now)
+        assert query["$and"][0] == {"created_at": {"$gte": now - timedelta(days=1), "$lt": now}}
+        assert query["$and"][2:] == [
+            {"title_group": {"$in": ["python developer"]}},
+            {"skill_keys": {"$in": ["javascript", "python"]}},
+            {"company_key": {"$in": ["acme"]}},
+        ]
+
+    def test_remote_jobs_only_match_remote_requests(self):
+        """Konum tercihi uzaktan değilse remote ilanlar eklenmemeli"""
+        now = datetime.utcnow()
+        berlin = build_job_query(normalize_preferences({"locations": ["Berlin"]}), now, now)
+        assert berlin["$and"][2]["$or"][0] == {"geo.city": "Berlin"}
+        remote = build_job_query(normalize_preferences({"locations": ["Remote"]}), now, now)
+        assert {"remote_type": "remote"} in remote["$and"][2]["$or"]
+
+    @pytest.mark.asyncio
+    async def test_skills_in_descriptions_match_by_key(self):
+        """Açıklamada geçen beceri, büyük/küçük harf farkına rağmen abonelikle eşleşmeli"""
+        db = AsyncMockDatabase()
+        now = datetime.utcnow()
+        job = {
+            "title": "Backend Engineer",
+            "company": "Acme  Labs",
+            "location": "Berlin, Germany",
+            "description": "We build services in Node.js and PostgreSQL.",
+            "apply_url": "https://acme.example/jobs/1",
+            "created_at": now - timedelta(hours=1),
+        }
+        await build_ingest_pipeline(db, source="test", notify=False, stats=False).run([job])
+
+        async def matches(preferences):
+            query = build_job_query(normalize_preferences(preferences), now - timedelta(days=1), now)
+            return await db.jobs.count_documents(query)
+
+        assert await matches({"skills": ["node.js"], "companies": ["acme labs"]}) == 1
+        assert await matches({"skills": ["postgres"], "locations": ["Germany"]}) == 1
+        assert await matches({"titles": ["Senior Backend Engineer"]}) == 1
+        assert await matches({"skills": ["python"]}) == 0
+
+    @pytest.mark.asyncio
+    async def test_subscribers_are_streamed_in_batches(self, db):
+        """Aynı imzanın aboneleri parça parça gönderilmeli"""
+        await DigestSubscriptionStore(db).subscribe(
+            "email",
+            "d@example.com",
+            "daily",
+            user_digest_preferences({"skills": ["Python"], "location": None}),
+        )
+        mailgun = FakeMailgun()
+        builder = DigestBuilder(db, mailgun=mailgun, telegram_sender=FakeTelegram(), batch_size=2)
+        stats = await builder.run("daily")
+
+        assert stats["subscribers"] == 5
+        assert stats["emails"] == 4 and stats["telegram"] == 1
+        # Four python subscribers in two batches, plus the react one
+        assert sorted(len(b["recipients"]) for b in mailgun.batches) == [1, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_each_signature_evaluated_once(self, db):
+        """Aynı imzalı aboneler tek sorguyla gruplanmalı"""
+        mailgun, telegram = FakeMailgun(), FakeTelegram()
+        builder = DigestBuilder(db, mailgun=mailgun, telegram_sender=telegram)
+
+        calls = []
+        original = builder._find_jobs
+
+        async def counting(preferences, since, until):
+            calls.append(preferences["skills"])
+            return await original(preferences, since, until)
+
+        builder._find_jobs = counting
+        stats = await builder.run("daily")
+
+        assert sorted(calls) == [["python"], ["react"]]
+        assert stats["signatures"] == 2
+        assert stats["subscribers"] == 4
+        assert stats["emails"] == 3
+        assert stats["telegram"] == 1
+
+        python_batch = next(b for b in mailgun.batches if len(b["recipients"]) == 2)
+        assert [j["title"] for j in python_batch["jobs"]] == ["Senior Python Developer"]
+        assert telegram.sent[0][0] == "42"
+
+    @pytest.mark.asyncio
+    async def test_completed_run_is_not_repeated(self, db):
+        """Tamamlanan çalıştırma tekrar gönderim yapmamalı"""
+        mailgun = FakeMailgun()
+        builder = DigestBuilder(db, mailgun=mailgun, telegram_sender=FakeTelegram())
+        await builder.run("daily")
+        sent = len(mailgun.batches)
+
+        await builder.run("daily")
+        assert len(mailgun.batches) == sent
+
+    @pytest.mark.asyncio
+    async def test_resume_after_crash_skips_delivered(self, db):
+        """Yarıda kalan çalıştırma kaldığı yerden devam etmeli, tekrar göndermemeli"""
+        mailgun = FakeMailgun()
+        crashing = DigestBuilder(
+            db, mailgun=mailgun, telegram_sender=FakeTelegram(fail_after=0)
+        )
+        with pytest.raises(RuntimeError):
+            await crashing.run("daily")
+        delivered_before = sum(len(b["recipients"]) for b in mailgun.batches)
+
+        telegram = FakeTelegram()
+        stats = await DigestBuilder(db, mailgun=mailgun, telegram_sender=telegram).run("daily")
+
+        emails = [r["email"] for b in mailgun.batches for r in b["recipients"]]
+        assert len(emails) == len(set(emails)) == 3
+        assert delivered_before + stats["emails"] == 3
+        # The crashed Telegram recipient was claimed, so it is not re-sent
+        assert telegram.sent == []
+        run = await db.digest_runs.find_one({})
+        assert run["status"] == "completed"
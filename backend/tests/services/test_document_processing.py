@@ -0,0 +1,97 @@
+import asyncio
+import io
+
+import docx
+import pytest
+
+from backend.services.document_parser import DocumentError
+from backend.services.document_processing import (DocumentBusy,
+                                                  DocumentProcessor,
+                                                  DocumentTimeout,
+                                                  DocumentTooLarge)
+
+CV_TEXT = """Jane Doe
+Senior Backend Engineer
+jane.doe@example.com | +49 151 2345 6789 | github.com/janedoe
+
+Experience
+Senior Backend Engineer - Acme GmbH
+Jan 2020 - Present
+Built payment APIs with Python, Django and PostgreSQL
+
+Skills: Python, Docker, Kubernetes
+"""
+
+
+def _docx_bytes(text):
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class TestDocumentProcessor:
+    """CV/özgeçmiş belgelerinin işçi havuzunda ayrıştırılması testleri"""
+
+    @pytest.mark.asyncio
+    async def test_identical_uploads_share_one_parse(self):
+        """Aynı içerik eşzamanlı gönderildiğinde tek kez ayrıştırılmalı, sonra önbellekten dönmeli"""
+        processor = DocumentProcessor(workers=0)
+        content = CV_TEXT.encode()
+
+        first = processor.submit(content, "cv.txt")
+        second = processor.submit(content, "other-name.txt")
+        parsed, again = await asyncio.gather(first, second)
+
+        assert first.content_hash == second.content_hash
+        assert parsed == again
+        assert parsed.email == "jane.doe@example.com"
+        assert {"Python", "Docker", "Kubernetes"} <= set(parsed.skills)
+        assert parsed.experience[0]["company"] == "Acme GmbH"
+
+        cached = processor.submit(content, "cv.txt")
+        assert cached.cached and cached.done()
+        assert (await cached).email == "jane.doe@example.com"
+        assert processor.stats["parsed"] == 1
+        assert processor.stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_before_queueing(self):
+        """Boyut, tür ve kuyruk sınırları iş kuyruğa alınmadan uygulanmalı"""
+        processor = DocumentProcessor(workers=0, max_bytes=1024, max_queue=0)
+
+        with pytest.raises(DocumentTooLarge) as exc:
+            processor.submit(b"x" * 2048, "cv.pdf")
+        assert exc.value.status_code == 413
+        with pytest.raises(DocumentError):
+            processor.submit(b"MZ", "cv.exe")
+        with pytest.raises(DocumentError):
+            await processor.parse(b"binary", "cv.doc")
+
+        running = processor.submit(b"Jane Doe", "a.txt")
+        with pytest.raises(DocumentBusy):
+            processor.submit(b"John Doe", "b.txt")
+        await running
+
+    @pytest.mark.asyncio
+    async def test_process_pool_parses_and_recycles_on_timeout(self):
+        """Havuzda DOCX ayrıştırılmalı; süre aşımında işçiler yenilenmeli"""
+        processor = DocumentProcessor(workers=1, timeout=30)
+        try:
+            parsed = await processor.parse(_docx_bytes(CV_TEXT), "cv.docx")
+            assert parsed.name == "Jane Doe"
+            assert parsed.links["github"] == "github.com/janedoe"
+
+            processor.timeout = 0.001
+            with pytest.raises(DocumentTimeout):
+                await processor.parse(_docx_bytes(CV_TEXT * 50), "long.docx")
+            assert processor._pool is None
+            assert processor.stats["timeouts"] == 1
+
+            processor.timeout = 30
+            parsed = await processor.parse((CV_TEXT + "\nLanguages: German").encode(), "cv.txt")
+            assert parsed.languages == ["German"]
+        finally:
+            processor.shutdown()
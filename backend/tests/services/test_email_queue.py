@@ -0,0 +1,190 @@
+import json
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from backend.services.email_queue import (DailyLimitStore, EmailQueue,
+                                          MailgunClient)
+from backend.services.mailgun_service import MailgunService
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+class MailgunStub:
+    """Local HTTP stub for the Mailgun messages endpoint"""
+
+    def __init__(self):
+        self.requests = []
+        self.fail_with = []
+
+    async def messages(self, request):
+        form = await request.post()
+        self.requests.append(
+            {"auth": request.headers.get("Authorization"), "data": dict(form)}
+        )
+        if self.fail_with:
+            return web.Response(status=self.fail_with.pop(0), text="error")
+        return web.json_response(
+            {"id": f"<msg-{len(self.requests)}@stub>", "message": "Queued. Thank you."}
+        )
+
+
+@pytest_asyncio.fixture
+async def mailgun_stub():
+    stub = MailgunStub()
+    app = web.Application()
+    app.router.add_post("/v3/test-domain.com/messages", stub.messages)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    stub.base_url = f"http://127.0.0.1:{port}/v3/test-domain.com"
+    yield stub
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def queue(mailgun_stub):
+    db = AsyncMockDatabase()
+    email_queue = EmailQueue(
+        db,
+        MailgunClient("test-api-key", mailgun_stub.base_url),
+        from_email="info@example.com",
+        daily_limit=5,
+        retry_base_seconds=0,
+        max_attempts=2,
+    )
+    yield email_queue
+    await email_queue.client.close()
+
+
+class TestEmailQueue:
+    """Kalıcı email kuyruğu testleri"""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_and_deliver(self, queue, mailgun_stub):
+        """Kuyruğa alınan email stub sunucuya gönderilmeli"""
+        message_id = await queue.enqueue("user@example.com", "Hello", "<p>Hi</p>")
+
+        assert await queue.drain() == 1
+        stored = await queue.outbox.find_one({"_id": message_id})
+        assert stored["status"] == "sent"
+        assert stored["message_id"] == "<msg-1@stub>"
+
+        request = mailgun_stub.requests[0]
+        assert request["auth"].startswith("Basic ")
+        assert request["data"]["to"] == "user@example.com"
+        assert request["data"]["from"] == "Buzz2Remote <info@example.com>"
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_recipient_variables(self, queue, mailgun_stub):
+        """Batch gönderim tek istekte recipient-variables kullanmalı"""
+        recipients = {
+            "a@example.com": {"name": "Ada"},
+            "b@example.com": {"name": "Bob"},
+        }
+        await queue.enqueue_batch(recipients, "Digest", "<p>%recipient.name%</p>")
+
+        assert await queue.drain() == 1
+        data = mailgun_stub.requests[0]["data"]
+        assert data["to"] == "a@example.com, b@example.com"
+        assert json.loads(data["recipient-variables"]) == recipients
+        assert await queue.limits.sent_today() == 2
+
+    @pytest.mark.asyncio
+    async def test_retryable_error_is_retried(self, queue, mailgun_stub):
+        """429 sonrası yeniden denenmeli, kalıcı hata failed olmalı"""
+        mailgun_stub.fail_with = [429]
+        retried = await queue.enqueue("user@example.com", "Retry", "<p>x</p>")
+        await queue.drain()
+        stored = await queue.outbox.find_one({"_id": retried})
+        assert stored["status"] == "sent"
+        assert stored["attempts"] == 2
+
+        mailgun_stub.fail_with = [400]
+        rejected = await queue.enqueue("bad@example.com", "Bad", "<p>x</p>")
+        await queue.drain()
+        stored = await queue.outbox.find_one({"_id": rejected})
+        assert stored["status"] == "failed"
+        assert await queue.limits.sent_today() == 1
+
+    @pytest.mark.asyncio
+    async def test_daily_limit_defers_messages(self, queue, mailgun_stub):
+        """Paylaşılan günlük limit aşıldığında mesaj ertelenmeli"""
+        await queue.enqueue_batch(
+            {f"u{i}@example.com": {} for i in range(4)}, "Digest", "<p>x</p>"
+        )
+        deferred = await queue.enqueue_batch(
+            {f"v{i}@example.com": {} for i in range(2)}, "Digest", "<p>x</p>"
+        )
+        await queue.drain()
+
+        assert len(mailgun_stub.requests) == 1
+        stored = await queue.outbox.find_one({"_id": deferred[0]})
+        assert stored["status"] == "pending"
+        assert stored["attempts"] == 0
+        assert stored["next_attempt_at"] > datetime.utcnow()
+
+    @pytest.mark.asyncio
+    async def test_batches_larger_than_daily_limit_are_split(self, queue, mailgun_stub):
+        """Günlük limitten büyük batch'ler limite sığan parçalara bölünmeli"""
+        recipients = {f"u{i}@example.com": {"name": f"U{i}"} for i in range(12)}
+        ids = await queue.enqueue_batch(recipients, "Digest", "<p>x</p>")
+        assert len(ids) == 3
+
+        # Queued before the limit applied, and due first: over the daily limit
+        legacy = queue._message(
+            [f"w{i}@example.com" for i in range(7)], "Old", "<p>x</p>", None, None, None, None
+        )
+        legacy["next_attempt_at"] = datetime(2000, 1, 1)
+        legacy_id = (await queue.outbox.insert_one(legacy)).inserted_id
+
+        await queue.drain()
+
+        assert len(mailgun_stub.requests) == 1
+        assert len(mailgun_stub.requests[0]["data"]["to"].split(", ")) == 5
+        assert await queue.limits.sent_today() == 5
+        stored = await queue.outbox.find_one({"_id": legacy_id})
+        assert len(stored["to"]) == 5 and stored["status"] == "sent"
+        rest = await queue.outbox.find_one({"split_from": legacy_id})
+        assert rest["to"] == ["w5@example.com", "w6@example.com"]
+        pending = await queue.outbox.count_documents({"status": "pending"})
+        assert pending == 4
+
+    @pytest.mark.asyncio
+    async def test_limit_store_is_shared(self):
+        """Farklı worker'lar aynı günlük sayacı paylaşmalı"""
+        db = AsyncMockDatabase()
+        first, second = DailyLimitStore(db, 3), DailyLimitStore(db, 3)
+
+        assert await first.reserve(2) is True
+        assert await second.reserve(2) is False
+        assert await second.reserve(1) is True
+        assert await first.sent_today() == 3
+
+    @pytest.mark.asyncio
+    async def test_mailgun_service_hands_off_to_queue(self, queue, mailgun_stub):
+        """Queue bağlıyken send_email bloklamadan kuyruğa yazmalı"""
+        service = MailgunService()
+        service.attach_queue(queue)
+        queue.running = True
+        try:
+            result = service.send_email("user@example.com", "Queued", "<p>x</p>")
+            assert result["queued"] is True
+
+            queued = await service.queue_new_jobs_digest(
+                [{"email": "a@example.com", "name": "Ada"}],
+                [{"title": "Python Developer", "company_name": "Acme"}],
+            )
+            assert queued == 1
+        finally:
+            queue.running = False
+
+        assert await queue.drain() == 2
+        digest = next(
+            r["data"] for r in mailgun_stub.requests if "recipient-variables" in r["data"]
+        )
+        assert "%recipient.name%" in digest["html"]
+        assert "Python Developer" in digest["html"]
@@ -0,0 +1,238 @@
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pytest
+
+from backend.services.ingest_pipeline import (DedupeStage, IngestPipeline,
+                                              IngestStage,
+                                              build_ingest_pipeline,
+                                              normalize_job_record)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+@dataclass
+class FakeListing:
+    title: str
+    company: str
+    location: str
+    description: str
+    apply_url: str
+    external_id: str
+    salary: Optional[str] = None
+    requirements: List[str] = None
+
+
+def _listing(i, title="Senior Python Developer"):
+    return FakeListing(
+        title=title,
+        company="Acme",
+        location="Remote",
+        description=f"<p>Build <b>things</b> #{i}</p>",
+        apply_url=f"https://acme.example/jobs/{i}",
+        external_id=str(i),
+        salary="100,000 - 150,000 USD",
+        requirements=["<li>Python</li>"],
+    )
+
+
+async def _resolved(value):
+    return value
+
+
+class TestIngestPipeline:
+    """Birleşik ingest pipeline testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    def test_normalize_dataclass_record(self):
+        """Dataclass kayıtları kanonik dokümana dönüştürülmeli"""
+        doc = normalize_job_record(_listing(1), source="crawler", id_field="external_id")
+        assert doc["source"] == "crawler"
+        assert doc["source_id"] == "1"
+        assert doc["url"] == "https://acme.example/jobs/1"
+        assert doc["is_active"] is True
+
+    def test_normalize_derives_stable_id(self):
+        """id alanı yoksa URL'den kararlı bir id üretilmeli"""
+        first = normalize_job_record(_listing(1), source="crawler", id_field=None)
+        second = normalize_job_record(_listing(1), source="crawler", id_field=None)
+        assert first["source_id"] == second["source_id"]
+        assert first["source_id"] != "1"
+
+    @pytest.mark.asyncio
+    async def test_full_pipeline_writes_enriched_jobs(self, db):
+        """Tüm aşamalar çalışmalı ve yeni işler hook'a iletilmeli"""
+        hooked = []
+
+        async def hook(batch):
+            hooked.extend(batch)
+
+        pipeline = build_ingest_pipeline(
+            db, source="crawler", id_field="external_id", hooks=[hook], notify=False,
+            batch_size=2,
+        )
+        report = await pipeline.run([_listing(i) for i in range(5)])
+
+        assert report.received == 5
+        assert report.new_jobs == 5
+        assert len(hooked) == 5
+        assert all("_id" in job for job in hooked)
+
+        stored = await db.jobs.find_one({"source_id": "3"})
+        assert stored["description"] == "Build things #3"
+        assert stored["requirements"] == ["Python"]
+        assert stored["job_title_level"] == "senior"
+        assert stored["salary_min"] == 100000
+        assert stored["salary_max"] == 150000
+
+        assert report.stages["normalize"]["items_in"] == 5
+        assert report.stages["bulk_upsert"]["batches"] == 3
+
+    @pytest.mark.asyncio
+    async def test_rerun_reports_unchanged(self, db):
+        """Aynı veri ikinci kez işlendiğinde yazım yapılmamalı"""
+        jobs = [_listing(i) for i in range(3)]
+        await build_ingest_pipeline(db, source="crawler", notify=False).run(jobs)
+        report = await build_ingest_pipeline(db, source="crawler", notify=False).run(jobs)
+
+        assert report.new_jobs == 0
+        assert report.to_dict()["unchanged_jobs"] == 3
+        assert await db.jobs.count_documents({}) == 3
+
+    @pytest.mark.asyncio
+    async def test_saved_jobs_are_adopted_on_title_and_company(self, db, monkeypatch):
+        """JobDataManager'ın anahtarsız eski işleri başlık ve şirketle sahiplenilmeli, URL'ler korunmalı"""
+        from backend.utils import job_crawler
+
+        await db.jobs.insert_many(
+            [
+                # As save_jobs_to_database wrote them before the ingest key
+                {
+                    "title": "Senior Python Developer",
+                    "company": "Acme",
+                    "source_type": "distill_crawler",
+                    "external_id": "acme_1",
+                    "application_urls": [
+                        {"url": "https://acme.example/jobs/0", "source": "https://acme.example", "added_at": 1},
+                        {"url": "https://acme.example/old", "source": "https://acme.example", "added_at": 2},
+                    ],
+                },
+                # Same title and company, but not written by this saver
+                {"title": "Senior Python Developer", "company": "Acme", "source": "api"},
+            ]
+        )
+        monkeypatch.setattr(job_crawler, "get_database", lambda: _resolved(db))
+
+        def listing(i):
+            return job_crawler.JobListing(
+                title="Senior Python Developer", company="Acme", location="Remote",
+                job_type="Full-time", salary=None, description="Build things",
+                requirements=[], posted_date=None, apply_url=f"https://acme.example/jobs/{i}",
+                remote_type="remote", skills=[], source_url="https://acme.example",
+                external_id=f"acme_{i}",
+            )
+
+        manager = job_crawler.JobDataManager()
+        result = await manager.save_jobs_to_database([listing(0)])
+        assert (result["new_jobs"], result["updated_jobs"]) == (0, 1)
+        await manager.save_jobs_to_database([listing(1)])
+
+        assert await db.jobs.count_documents({}) == 2
+        adopted = await db.jobs.find_one({"source": "job_crawler"})
+        assert adopted["source_type"] == "distill_crawler"
+        assert [entry["url"] for entry in adopted["application_urls"]] == [
+            "https://acme.example/jobs/0",
+            "https://acme.example/old",
+            "https://acme.example/jobs/1",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_distill_jobs_are_adopted_on_apply_url(self, db, monkeypatch):
+        """Distill'in eski işleri başvuru URL'siyle sahiplenilmeli, aynı başlıklı ilanlar birleşmemeli"""
+        from backend import distill_crawler
+
+        await db.jobs.insert_one(
+            {
+                "title": "Senior Python Developer",
+                "company": "Acme",
+                "apply_url": "https://acme.example/jobs/0",
+                "source_url": "https://acme.example",
+                # hash() based, so a new process never finds it again
+                "external_id": "distill_-4242_1717",
+                "source_type": "distill_crawler",
+            }
+        )
+        monkeypatch.setattr(distill_crawler, "get_database", lambda: _resolved(db))
+
+        def listing(i):
+            return distill_crawler.JobListing(
+                title="Senior Python Developer", company="Acme", location="Remote",
+                description="Build things", apply_url=f"https://acme.example/jobs/{i}",
+                source_url="https://acme.example", external_id=f"distill_{i}",
+            )
+
+        crawler = distill_crawler.DistillCrawler()
+        result = await crawler.save_jobs_to_database([listing(0), listing(1)])
+        assert (result["new_jobs"], result["updated_jobs"]) == (1, 1)
+        await crawler.save_jobs_to_database([listing(0), listing(1)])
+
+        jobs = await db.jobs.find({}).sort("apply_url", 1).to_list(length=None)
+        assert [job["apply_url"] for job in jobs] == [
+            "https://acme.example/jobs/0",
+            "https://acme.example/jobs/1",
+        ]
+        assert {job["source"] for job in jobs} == {"distill_crawler"}
+        assert "application_urls" not in jobs[0]
+
+    @pytest.mark.asyncio
+    async def test_dedupe_stage_drops_repeats(self):
+        """Aynı anahtar ve içerik tekrarlandığında atılmalı"""
+        stage = DedupeStage(max_keys=10)
+        doc = {"source": "s", "source_id": "1", "title": "A"}
+        assert len(await stage.process([doc, dict(doc)])) == 1
+        assert len(await stage.process([dict(doc, title="B")])) == 1
+        assert stage.duplicates == 1
+
+    @pytest.mark.asyncio
+    async def test_backpressure_bounds_in_flight_batches(self):
+        """Yavaş aşama üretici tarafını bloklamalı"""
+        in_flight = {"max": 0, "current": 0}
+        release = asyncio.Event()
+
+        class SlowStage(IngestStage):
+            name = "slow"
+
+            async def process(self, batch):
+                await release.wait()
+                return batch
+
+        class CountingStage(IngestStage):
+            name = "count"
+
+            async def process(self, batch):
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+                return batch
+
+        pipeline = IngestPipeline([CountingStage(), SlowStage()], batch_size=1, queue_size=1)
+        await pipeline.start()
+
+        pushed = 0
+
+        async def producer():
+            nonlocal pushed
+            for i in range(20):
+                await pipeline.push({"i": i})
+                pushed += 1
+
+        task = asyncio.create_task(producer())
+        await asyncio.sleep(0.05)
+        assert pushed < 20
+
+        release.set()
+        await task
+        report = await pipeline.close()
+        assert report.stages["slow"]["items_out"] == 20
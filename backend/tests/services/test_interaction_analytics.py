@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from backend.services.interaction_analytics import (InteractionRecorder,
+                                                    job_interaction_counts)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+class TestInteractionAnalytics:
+    """Tamponlu etkileşim kaydı ve günlük sayaç testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    @pytest.mark.asyncio
+    async def test_buffered_events_become_daily_counters(self, db):
+        """Olaylar flush edilene kadar bellekte kalmalı, sonra sayaçlara eklenmeli"""
+        recorder = InteractionRecorder(db)
+        for action in ["view"] * 3 + ["external_redirect", "View", "$where", None]:
+            recorder.record("job-1", action, session_id="s1", client_timestamp="2026-01-01")
+        recorder.record("job-2", "view")
+
+        assert await db.job_interactions.count_documents({}) == 0
+        assert await recorder.flush() == 8
+        assert await recorder.flush() == 0
+
+        counts = await job_interaction_counts(db, "job-1")
+        assert counts["actions"] == {"view": 4, "external_redirect": 1, "other": 2}
+        assert counts["total"] == 7
+        assert list(counts["daily"].values()) == [7]
+        assert await db.job_interaction_counters.count_documents({"job_id": {"$exists": True}}) == 2
+        event = await db.job_interactions.find_one({"job_id": "job-2"})
+        assert event["action"] == "view" and isinstance(event["timestamp"], datetime)
+
+        # A second flush increments the same day's counter document
+        recorder.record("job-1", "view")
+        await recorder.flush()
+        assert (await job_interaction_counts(db, "job-1"))["actions"]["view"] == 5
+        assert await db.job_interaction_counters.count_documents({"job_id": "job-1"}) == 1
+
+    @pytest.mark.asyncio
+    async def test_running_recorder_flushes_batches_and_on_stop(self, db):
+        """Dolu tampon arka planda yazılmalı, durdururken kalanlar kaybolmamalı"""
+        recorder = InteractionRecorder(db, max_batch=3, flush_interval=60, max_buffer=5)
+        await recorder.start()
+        for _ in range(3):
+            recorder.record("job-1", "view")
+        await asyncio.sleep(0.01)
+        assert await db.job_interactions.count_documents({}) == 3
+
+        recorder.record("job-1", "apply")
+        await recorder.stop()
+        counts = await job_interaction_counts(db, "job-1")
+        assert counts["actions"] == {"view": 3, "apply": 1}
+
+        for _ in range(7):
+            recorder.record("job-1", "view")
+        assert recorder.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_backfill_seeds_only_events_before_counting(self, db):
+        """Eski ham olaylar bir kez sayaçlara aktarılmalı, sayılmış olaylar tekrar sayılmamalı"""
+        old = datetime.utcnow().replace(hour=12) - timedelta(days=3)
+        await db.job_interactions.insert_many(
+            [
+                {"_id": ObjectId.from_datetime(old + timedelta(seconds=i)), "job_id": "job-1", "action": "view"}
+                for i in range(4)
+            ]
+        )
+        recorder = InteractionRecorder(db)
+        recorder.record("job-1", "view")
+        await recorder.flush()
+
+        assert await recorder.backfill() == 4
+        assert await recorder.backfill() == 0
+
+        counts = await job_interaction_counts(db, "job-1")
+        assert counts["actions"] == {"view": 5}
+        assert counts["daily"][old.strftime("%Y-%m-%d")] == 4
+        recent = await job_interaction_counts(db, "job-1", since=datetime.utcnow())
+        assert recent["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_interrupted_backfill_resumes_without_recounting(self, db):
+        """Yarıda kesilen aktarım kaldığı yerden sürmeli, aynı olayları tekrar saymamalı"""
+        old = datetime.utcnow().replace(hour=12) - timedelta(days=3)
+        await db.job_interactions.insert_many(
+            [
+                {"_id": ObjectId.from_datetime(old + timedelta(seconds=i)), "job_id": "job-1", "action": "view"}
+                for i in range(5)
+            ]
+        )
+        recorder = InteractionRecorder(db)
+        bulk_write = recorder.counters.bulk_write
+        calls = []
+
+        async def crash_on_second_batch(operations, **kwargs):
+            calls.append(len(operations))
+            if len(calls) == 2:
+                raise RuntimeError("worker restarted")
+            return await bulk_write(operations, **kwargs)
+
+        recorder.counters.bulk_write = crash_on_second_batch
+        with pytest.raises(RuntimeError):
+            await recorder.backfill(batch_size=2)
+
+        recorder.counters.bulk_write = bulk_write
+        assert await recorder.backfill(batch_size=2) == 5
+        assert (await job_interaction_counts(db, "job-1"))["actions"] == {"view": 5}
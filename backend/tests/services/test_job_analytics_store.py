@@ -0,0 +1,123 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.job_analytics_store import (AnalyticsBucket,
+                                                  JobAnalyticsStore,
+                                                  title_cluster)
+from backend.services.location_normalizer import normalize_location
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _job(i, days_ago=0, **overrides):
+    job = {
+        "title": "Senior Python Developer (Remote)",
+        "company": f"Company {i % 4}",
+        "created_at": datetime.utcnow() - timedelta(days=days_ago),
+        "skills": ["Python", "Django"],
+        "location": "Berlin, Germany",
+        "job_title_level": "senior",
+        "salary_min": 60000 + i * 1000,
+        "salary_max": 80000 + i * 1000,
+    }
+    job.update(overrides)
+    return job
+
+
+class TestJobAnalyticsStore:
+    """Gün bazlı beceri talebi ve maaş analitiği testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    def test_sketches_estimate_within_bounds(self):
+        """Şirket sayısı ve maaş yüzdelikleri tahmini hata sınırları içinde kalmalı"""
+        rng = random.Random(7)
+        salaries = sorted(rng.lognormvariate(11, 0.4) for _ in range(5000))
+        bucket = AnalyticsBucket()
+        for i, salary in enumerate(salaries):
+            bucket.add_job(f"Company {i % 2000}", salary)
+
+        assert abs(bucket.distinct_companies - 2000) / 2000 < 0.1
+        for q in (0.25, 0.5, 0.75, 0.9):
+            exact = salaries[int(q * (len(salaries) - 1))]
+            assert abs(bucket.quantile(q) - exact) / exact < 0.02
+        assert title_cluster("Sr. Backend Engineer - Go, Kubernetes") == "backend engineer"
+
+    @pytest.mark.asyncio
+    async def test_skills_demand_respects_window(self, db):
+        """Zaman aralığı dışındaki ilanlar sayılmamalı, şirketler tekil sayılmalı"""
+        store = JobAnalyticsStore(db)
+        await store.on_jobs_ingested([_job(i, days_ago=i % 5) for i in range(8)])
+        await store.on_jobs_ingested([_job(100, days_ago=20, skills=["Rust"])])
+
+        week = await store.skills_demand(days=7, limit=5)
+        assert [row["skill"] for row in week] == ["Django", "Python"]
+        assert week[0]["demand_count"] == 8
+        assert week[0]["company_count"] == 4
+
+        month = await store.skills_demand(days=30, limit=5)
+        assert {row["skill"] for row in month} == {"Django", "Python", "Rust"}
+
+    @pytest.mark.asyncio
+    async def test_salary_insights_filters_and_percentiles(self, db):
+        """Konum, seviye ve pozisyon filtreleri segment kovalarından okunmalı"""
+        store = JobAnalyticsStore(db)
+        await store.on_jobs_ingested([_job(i) for i in range(10)])
+        await store.on_jobs_ingested(
+            [_job(i, title="Product Designer", location="Paris, France",
+                  job_title_level="mid", salary_min=40000, salary_max=40000)
+             for i in range(3)]
+        )
+
+        insights = await store.salary_insights(
+            days=30, position="python developer", location="Germany", experience_level="Senior"
+        )
+        assert insights["total_jobs_analyzed"] == 10
+        assert insights["salary_range"] == {"min": 70000, "max": 79000}
+        assert abs(insights["median_salary"] - 74500) / 74500 < 0.01
+        assert insights["average_salary"] == 74500
+
+        overall = await store.salary_insights(days=30)
+        assert overall["total_jobs_analyzed"] == 13
+        assert abs(overall["percentiles"]["25th"] - 70000) / 70000 < 0.01
+        assert await store.salary_insights(days=30, location="Japan") is None
+        assert await store.salary_insights(days=30, experience_level="wizard") is None
+
+    @pytest.mark.asyncio
+    async def test_multi_region_filters_count_each_job_once(self, db):
+        """Birden çok bölgeye düşen ilan, çok bölgeli konum filtresinde bir kez sayılmalı"""
+        jobs = [_job(0), _job(1, location="Germany, Austria"), _job(2, location="Tel Aviv, Israel")]
+        for job in jobs:
+            job["geo"] = normalize_location(job["location"]).to_document()
+        await db.jobs.insert_many(jobs)
+        store = JobAnalyticsStore(db)
+        assert await store.backfill() == 3
+
+        emea = await store.salary_insights(days=30, location="EMEA")
+        assert emea["total_jobs_analyzed"] == 3
+        assert emea["jobs_with_salary"] == 3
+        assert emea["average_salary"] == 71000
+
+        both = await store.salary_insights(days=30, location="Germany, Austria")
+        assert both["total_jobs_analyzed"] == 2
+        assert both["average_salary"] == 70500
+        scoped = await store.salary_insights(
+            days=30, location="Germany, Austria", experience_level="junior"
+        )
+        assert scoped is None
+
+    @pytest.mark.asyncio
+    async def test_backfill_seeds_once(self, db):
+        """İlk doldurma mevcut ilanlardan yapılmalı ve tekrarlanmamalı"""
+        await db.jobs.insert_many([_job(i, days_ago=i) for i in range(5)])
+        store = JobAnalyticsStore(db)
+        # A bucket written by ingest before the first seed must not be counted twice
+        await store.on_jobs_ingested([await db.jobs.find_one({})])
+
+        assert await store.backfill() == 5
+        assert await store.backfill() == 0
+        demand = await store.skills_demand(days=30, limit=5)
+        assert demand[0]["demand_count"] == 5
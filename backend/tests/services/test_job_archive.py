@@ -0,0 +1,100 @@
+import gzip
+from datetime import datetime, timedelta
+
+import pytest
+from bson import json_util
+
+from backend.services.job_archive import (ArchiveSink, CollectionArchiveSink,
+                                          JobArchiver, JsonlArchiveSink)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _jobs(count, days_ago=40):
+    # Closed listings; the jobs retention rule leaves active ones alone
+    created_at = datetime.utcnow() - timedelta(days=days_ago)
+    return [
+        {"title": f"Job {i}", "company": "Acme", "created_at": created_at, "is_active": False}
+        for i in range(count)
+    ]
+
+
+class FlakySink(ArchiveSink):
+    name = "flaky"
+
+    def __init__(self, fail_on):
+        self.fail_on = fail_on
+        self.chunks = []
+
+    async def write(self, jobs, run_id, chunk_index):
+        if len(self.chunks) == self.fail_on:
+            self.fail_on = None
+            raise RuntimeError("sink unavailable")
+        self.chunks.append([job["_id"] for job in jobs])
+
+
+class TestJobArchiver:
+    """Parçalı ve devam ettirilebilir iş arşivleme testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    @pytest.mark.asyncio
+    async def test_moves_old_jobs_in_chunks(self, db):
+        """Eski işler parçalar halinde arşive taşınmalı, yeniler kalmalı"""
+        await db.jobs.insert_many(_jobs(5) + _jobs(2, days_ago=1))
+        removed = []
+
+        async def hook(jobs):
+            removed.extend(jobs)
+
+        archiver = JobArchiver(db, CollectionArchiveSink(db), chunk_size=2, hooks=[hook])
+        report = await archiver.run()
+
+        assert (report.archived, report.chunks, report.completed) == (5, 3, True)
+        assert await db.jobs.count_documents({}) == 2
+        assert await db.jobs_archive.count_documents({"archive_run": report.run_id}) == 5
+        assert len(removed) == 5
+        checkpoint = await db.archive_checkpoints.find_one({"_id": "jobs"})
+        assert checkpoint["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_sink_failure(self, db):
+        """Hata sonrası yalnızca arşivlenmemiş işler kalmalı ve kaldığı yerden devam etmeli"""
+        await db.jobs.insert_many(_jobs(6))
+        sink = FlakySink(fail_on=1)
+        archiver = JobArchiver(db, sink, chunk_size=2, hooks=[])
+
+        with pytest.raises(RuntimeError):
+            await archiver.run()
+        # First chunk archived and deleted; the failed one is still in place
+        assert await db.jobs.count_documents({}) == 4
+
+        report = await archiver.run()
+        assert report.resumed and report.completed
+        assert report.archived == 6
+        assert await db.jobs.count_documents({}) == 0
+        archived = [job_id for chunk in sink.chunks for job_id in chunk]
+        assert len(archived) == len(set(archived)) == 6
+
+    @pytest.mark.asyncio
+    async def test_max_chunks_pauses_run(self, db, tmp_path):
+        """Parça sınırı çalışmayı duraklatmalı, JSONL dosyaları sıkıştırılmış yazılmalı"""
+        await db.jobs.insert_many(_jobs(3))
+        sink = JsonlArchiveSink(str(tmp_path))
+        archiver = JobArchiver(db, sink, chunk_size=2, hooks=[])
+
+        first = await archiver.run(max_chunks=1)
+        assert (first.archived, first.completed) == (2, False)
+        second = await archiver.run()
+        assert second.run_id == first.run_id and second.completed
+
+        files = sorted(tmp_path.glob("*.jsonl.gz"))
+        assert [f.name for f in files] == [
+            f"jobs-{first.run_id}-000000.jsonl.gz",
+            f"jobs-{first.run_id}-000001.jsonl.gz",
+        ]
+        with gzip.open(files[0], "rt", encoding="utf-8") as f:
+            rows = [json_util.loads(line) for line in f]
+        assert [row["title"] for row in rows] == ["Job 0", "Job 1"]
+        assert isinstance(rows[0]["created_at"], datetime)
@@ -0,0 +1,99 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.services.job_ingest_writer import (JobIngestWriter,
+                                                compute_content_hash)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _job(source_id, title="Python Developer", source="remoteok"):
+    return {
+        "title": title,
+        "company": "Acme",
+        "location": "Remote",
+        "source": source,
+        "source_id": source_id,
+        "posted_at": None,
+        "status": "active",
+    }
+
+
+class TestJobIngestWriter:
+    """Bulk ingest writer testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    @pytest.fixture
+    def writer(self, db):
+        return JobIngestWriter(db.jobs, batch_size=2)
+
+    def test_content_hash_ignores_volatile_fields(self):
+        """Hash zaman damgalarından etkilenmemeli"""
+        job = _job("1")
+        stamped = dict(job, created_at="x", updated_at="y", last_updated="z")
+        assert compute_content_hash(job) == compute_content_hash(stamped)
+        assert compute_content_hash(job) != compute_content_hash(_job("1", "Go Dev"))
+
+    @pytest.mark.asyncio
+    async def test_insert_then_skip_unchanged(self, writer, db):
+        """İlk yazım ekler, aynı içerik tekrar yazılmaz"""
+        jobs = [_job(str(i)) for i in range(5)]
+
+        first = await writer.write(jobs)
+        assert first.inserted == 5
+        assert first.updated == 0
+        assert await db.jobs.count_documents({}) == 5
+
+        db.jobs.bulk_write = AsyncMock(side_effect=AssertionError("no write"))
+        second = await writer.write(jobs)
+        assert second.unchanged == 5
+        assert second.inserted == 0
+
+    @pytest.mark.asyncio
+    async def test_changed_documents_are_updated(self, writer, db):
+        """Değişen içerik güncellenmeli, created_at korunmalı"""
+        await writer.write([_job("1"), _job("2")])
+        original = await db.jobs.find_one({"source_id": "1"})
+
+        result = await writer.write([_job("1", "Senior Python Developer"), _job("2")])
+        assert result.updated == 1
+        assert result.unchanged == 1
+
+        updated = await db.jobs.find_one({"source_id": "1"})
+        assert updated["title"] == "Senior Python Developer"
+        assert updated["created_at"] == original["created_at"]
+        assert await db.jobs.count_documents({}) == 2
+
+    @pytest.mark.asyncio
+    async def test_duplicate_keys_in_payload(self, writer, db):
+        """Aynı feed içinde tekrar eden anahtarda son kayıt kazanır"""
+        result = await writer.write([_job("1", "A"), _job("1", "B")])
+        assert result.received == 2
+        assert result.inserted == 1
+        assert (await db.jobs.find_one({"source_id": "1"}))["title"] == "B"
+
+    @pytest.mark.asyncio
+    async def test_single_bulk_write_per_batch(self):
+        """Her batch için tek bulk_write çağrısı yapılmalı"""
+        collection = MagicMock()
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[])
+        collection.find.return_value = cursor
+        bulk_result = MagicMock()
+        bulk_result.bulk_api_result = {
+            "nUpserted": 3,
+            "nMatched": 0,
+            "nModified": 0,
+            "upserted": [],
+        }
+        collection.bulk_write = AsyncMock(return_value=bulk_result)
+
+        writer = JobIngestWriter(collection, batch_size=500)
+        result = await writer.write([_job(str(i)) for i in range(3)])
+
+        assert collection.find.call_count == 1
+        assert collection.bulk_write.await_count == 1
+        assert result.inserted == 3
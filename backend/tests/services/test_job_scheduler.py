@@ -0,0 +1,207 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.job_analytics_store import JobAnalyticsStore
+from backend.services.job_scheduler import (LEASES_COLLECTION, CronSchedule,
+                                            IntervalSchedule, JobExecutor,
+                                            JobScheduler, ScheduledJob,
+                                            UnknownJob)
+from backend.services.scheduler_service import SchedulerService
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _due_job(name, func, **kwargs):
+    return ScheduledJob(
+        name,
+        func,
+        IntervalSchedule(3600),
+        next_run=datetime.utcnow() - timedelta(seconds=1),
+        **kwargs,
+    )
+
+
+class TestJobScheduler:
+    """Asenkron zamanlayıcı testleri"""
+
+    def test_cron_schedule(self):
+        """Cron ifadeleri bir sonraki çalışma zamanını doğru hesaplamalı"""
+        start = datetime(2026, 3, 6, 14, 7, 30)  # Cuma
+
+        assert CronSchedule("0 2 * * *").next_after(start) == datetime(2026, 3, 7, 2, 0)
+        assert CronSchedule("0 8 * * 1").next_after(start) == datetime(2026, 3, 9, 8, 0)
+        assert CronSchedule("*/15 9-17 * * 1-5").next_after(start) == datetime(2026, 3, 6, 14, 15)
+        assert CronSchedule("0 0 1 * 0").next_after(start) == datetime(2026, 3, 8, 0, 0)
+        assert CronSchedule("30 4 29 2 *").next_after(start) == datetime(2028, 2, 29, 4, 30)
+        assert CronSchedule("0 3 * * 7").next_after(start) == datetime(2026, 3, 8, 3, 0)
+        for expression in ("* * *", "60 * * * *", "0 0 31 2 *"):
+            with pytest.raises(ValueError):
+                CronSchedule(expression).next_after(start)
+
+    @pytest.mark.asyncio
+    async def test_exclusive_job_runs_once_across_workers(self):
+        """Aynı zamanlanmış çalışma birden çok işçide yalnızca bir kez çalışmalı"""
+        db = AsyncMockDatabase()
+        calls = []
+
+        async def job():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"done": True}
+
+        workers = [JobScheduler(db, owner=owner) for owner in ("a", "b")]
+        for worker in workers:
+            worker.add_job(_due_job("stats", job))
+
+        tasks = [task for worker in workers for task in worker.run_pending()]
+        runs = await asyncio.gather(*tasks)
+
+        assert len(calls) == 1
+        assert sorted(run["status"] for run in runs) == ["skipped", "success"]
+        lease = await db[LEASES_COLLECTION].find_one({"_id": "stats"})
+        assert lease["owner"] is None and lease["last_status"] == "success"
+        assert lease["next_run"] > datetime.utcnow() + timedelta(minutes=59)
+        history = await workers[0].history("stats")
+        assert len(history) == 1
+        assert history[0]["result"] == {"done": True} and history[0]["duration_ms"] >= 10
+
+        # The worker that found the job leased retries once and adopts the next run
+        winner, loser = sorted(workers, key=lambda worker: worker.owner != history[0]["owner"])
+        assert abs(winner.jobs["stats"].next_run - lease["next_run"]) < timedelta(milliseconds=1)
+        retry = await asyncio.gather(*loser.run_pending(now=loser.jobs["stats"].next_run))
+        assert retry[0]["status"] == "skipped" and len(calls) == 1
+        assert loser.jobs["stats"].next_run == lease["next_run"]
+        assert not [task for worker in workers for task in worker.run_pending()]
+
+    @pytest.mark.asyncio
+    async def test_overlap_failures_and_timeouts(self):
+        """Çalışan işe yeni tetikleme atlanmalı, hatalar ve zaman aşımları kaydedilmeli"""
+        db = AsyncMockDatabase()
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        scheduler = JobScheduler(db, owner="a")
+        scheduler.add_job(_due_job("slow", slow))
+        scheduler.add_job(_due_job("broken", broken))
+        scheduler.add_job(_due_job("hung", slow, timeout=0.05))
+
+        running = asyncio.create_task(scheduler.run_job("slow"))
+        await asyncio.sleep(0.01)
+        other = JobScheduler(db, owner="b")
+        other.add_job(_due_job("slow", slow))
+        assert (await other.run_job("slow", trigger="http"))["reason"] == "already running"
+        assert (await scheduler.run_job("slow"))["reason"] == "max_instances reached"
+        release.set()
+        assert (await running)["status"] == "success"
+        release.clear()
+
+        failed = await scheduler.run_job("broken")
+        assert failed["status"] == "failed" and failed["error"] == "boom"
+        timed_out = await scheduler.run_job("hung")
+        assert timed_out["status"] == "timeout"
+        assert (await db[LEASES_COLLECTION].find_one({"_id": "hung"}))["owner"] is None
+
+        with pytest.raises(UnknownJob):
+            await scheduler.run_job("missing")
+
+    @pytest.mark.asyncio
+    async def test_heavy_job_runs_on_executor(self):
+        """Ağır işler ayrı iş parçacığındaki olay döngüsünde kendi veritabanıyla çalışmalı"""
+        seen = {}
+
+        async def heavy(db=None):
+            seen["thread"] = threading.current_thread().name
+            seen["db"] = db
+
+        executor = JobExecutor(database_factory=lambda: "job-loop-db")
+        scheduler = JobScheduler(None, executor=executor)
+        scheduler.add_job(_due_job("heavy", heavy, heavy=True))
+        try:
+            run = await scheduler.run_job("heavy")
+        finally:
+            executor.stop()
+
+        assert run["status"] == "success"
+        assert seen == {"thread": "scheduler-jobs", "db": "job-loop-db"}
+
+    @pytest.mark.asyncio
+    async def test_scheduler_service_jobs(self):
+        """Servis tüm işleri kaydetmeli ve tetiklenen çalışmaları geçmişe yazmalı"""
+        db = AsyncMockDatabase()
+        service = SchedulerService(db)
+
+        status = service.get_job_status()
+        assert status["status"] == "stopped"
+        jobs = {job["id"]: job for job in status["jobs"]}
+        assert len(jobs) == 11
+        assert jobs["job_statistics"]["trigger"] == "cron[0 2 * * *]"
+        assert jobs["job_statistics"]["heavy"] is True
+        assert jobs["analytics_seed"]["trigger"] == "on demand"
+        assert jobs["analytics_seed"]["next_run"] is None
+
+        run = await service.trigger("health_check", source="http")
+        assert run["status"] == "success" and run["result"]["status"] == "healthy"
+        history = await service.get_job_history("health_check")
+        assert history[0]["trigger"] == "http"
+
+        await service.pause_job("health_check")
+        assert service.get_job_status("health_check")["next_run"] is None
+
+    @pytest.mark.asyncio
+    async def test_run_job_now_returns_before_the_job_finishes(self, monkeypatch):
+        """Dış tetikleme işi arka planda başlatmalı, bitmesini beklememeli"""
+        from backend.services import scheduler_service
+
+        service = SchedulerService(AsyncMockDatabase())
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return {"done": True}
+
+        service.scheduler.get_job("job_statistics").func = slow
+        monkeypatch.setattr(scheduler_service, "_scheduler", service)
+
+        run = await scheduler_service.run_job_now("job_statistics", source="manual")
+        assert run["status"] == "accepted"
+        with pytest.raises(UnknownJob):
+            await scheduler_service.run_job_now("nope")
+        await asyncio.sleep(0.01)
+        assert await service.is_job_running("job_statistics")
+
+        release.set()
+        await asyncio.gather(*scheduler_service._triggered)
+        history = await service.get_job_history("job_statistics")
+        assert history[0]["trigger"] == "manual" and history[0]["status"] == "success"
+
+    @pytest.mark.asyncio
+    async def test_bootstrap_runs_each_missing_step_once(self):
+        """Başlangıçta yalnızca verisi eksik adımlar kendi işleri olarak bir kez çalışmalı"""
+        db = AsyncMockDatabase()
+        await db.jobs.insert_one({"title": "Senior Python Developer", "location": "Berlin"})
+        service = SchedulerService(db)
+        calls = []
+
+        async def reconcile():
+            calls.append("job_statistics")
+            await db.job_stats.update_one(
+                {"_id": "summary"}, {"$set": {"reconciled_at": datetime.utcnow()}}, upsert=True
+            )
+            return {"total_jobs": 1}
+
+        service.scheduler.get_job("job_statistics").func = reconcile
+        await service.analytics_seed_job()
+
+        runs = await service.bootstrap()
+        assert set(runs) == {"job_statistics", "location_index", "title_group_seed", "interaction_seed"}
+        assert all(run["status"] == "success" and run["trigger"] == "bootstrap" for run in runs.values())
+        assert runs["title_group_seed"]["result"]["keyed_jobs"] == 1
+        assert await service.bootstrap() is None
+        assert calls == ["job_statistics"]
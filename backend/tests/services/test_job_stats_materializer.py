@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+
+from backend.services.job_stats_materializer import JobStatsMaterializer
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _job(company, location="Remote", title="Python Developer", active=True):
+    return {
+        "title": title,
+        "company": company,
+        "location": location,
+        "source": "remoteok",
+        "is_active": active,
+        "created_at": datetime.utcnow(),
+    }
+
+
+class TestJobStatsMaterializer:
+    """Materialize edilmiş iş istatistikleri testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    @pytest.fixture
+    def materializer(self, db):
+        return JobStatsMaterializer(db, top_n=2, summary_interval_seconds=0)
+
+    @pytest.mark.asyncio
+    async def test_incremental_ingest_updates_summary(self, materializer):
+        """Ingest olayları sayaçları ve özet dokümanı güncellemeli"""
+        await materializer.on_jobs_ingested(
+            [_job("Acme"), _job("Acme"), _job("Globex", "Berlin", active=False)]
+        )
+        summary = await materializer.get_summary()
+
+        assert summary["total_jobs"] == 3
+        assert summary["active_jobs"] == 2
+        assert summary["remote_jobs"] == 2
+        assert summary["recent_jobs"] == 3
+        assert summary["companies_count"] == 2
+        assert summary["top_companies"][0] == {"_id": "Acme", "count": 2, "active": 2}
+
+    @pytest.mark.asyncio
+    async def test_top_lists_are_capped(self, materializer):
+        """Top-N listeleri sınırlı olmalı"""
+        await materializer.on_jobs_ingested([_job(f"Company {i}") for i in range(5)])
+        summary = await materializer.get_summary()
+        assert summary["companies_count"] == 5
+        assert len(summary["top_companies"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_removed_jobs_decrement_and_drop_counters(self, materializer, db):
+        """Arşivlenen işler sayaçlardan düşülmeli"""
+        jobs = [_job("Acme"), _job("Globex")]
+        await materializer.on_jobs_ingested(jobs)
+        await materializer.on_jobs_removed([jobs[1]])
+
+        summary = await materializer.get_summary()
+        assert summary["total_jobs"] == 1
+        assert summary["companies_count"] == 1
+        assert await db.job_stats.find_one({"_id": "company|Globex"}) is None
+
+    @pytest.mark.asyncio
+    async def test_reconcile_rebuilds_from_jobs(self, materializer, db):
+        """Reconcile sayaçları jobs koleksiyonundan yeniden hesaplamalı"""
+        await db.jobs.insert_many(
+            [_job("Acme"), _job("Acme", "London"), _job("Initech", active=False)]
+        )
+        # Drifted counter that no longer matches any job
+        await db.job_stats.insert_one(
+            {"_id": "company|Ghost", "dimension": "company", "value": "Ghost", "total": 7}
+        )
+
+        summary = await materializer.reconcile()
+
+        assert summary["total_jobs"] == 3
+        assert summary["active_jobs"] == 2
+        assert summary["companies_count"] == 2
+        assert summary["locations_count"] == 2
+        assert summary["reconciled_at"] is not None
+        assert await db.job_stats.find_one({"_id": "company|Ghost"}) is None
+
+    @pytest.mark.asyncio
+    async def test_cold_summary_does_not_reconcile(self, db):
+        """Özet yokken istek yolu reconcile çalıştırmamalı"""
+        await db.jobs.insert_many([_job("Acme"), _job("Globex")])
+        summary = await JobStatsMaterializer(db).get_summary()
+
+        assert summary["total_jobs"] == 2 and summary["reconciled_at"] is None
+        assert await db.job_stats.count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_summary_refresh_is_throttled_across_instances(self, db):
+        """Özet yenileme sınırı tüm örnekler arasında paylaşılmalı"""
+        await JobStatsMaterializer(db, summary_interval_seconds=60).on_jobs_ingested([_job("Acme")])
+        other = JobStatsMaterializer(db, summary_interval_seconds=60)
+        await other.on_jobs_ingested([_job("Globex")])
+
+        assert (await other.get_summary())["total_jobs"] == 1
+        assert await other.refresh_summary() is None
+        assert (await other.refresh_summary(force=True))["total_jobs"] == 2
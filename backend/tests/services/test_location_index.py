@@ -0,0 +1,130 @@
+import mongomock
+import pytest
+
+from backend.services.ingest_pipeline import GeoNormalizeStage
+from backend.services.location_index import LocationIndex
+from backend.services.location_normalizer import (geo_filters,
+                                                  normalize_location)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _job(location, active=True):
+    return {"title": "Python Developer", "location": location, "is_active": active}
+
+
+class TestLocationNormalizer:
+    """Gazetteer tabanlı lokasyon normalizasyonu testleri"""
+
+    def test_cities_countries_and_state_codes(self):
+        """Şehir, ülke ve eyalet kodları yapısal alanlara çözülmeli"""
+        berlin = normalize_location("Berlin, DE")
+        assert (berlin.label, berlin.city, berlin.countries) == ("Berlin, Germany", "Berlin", ("DE",))
+        assert berlin.regions == ("europe",) and berlin.timezone_band == "emea"
+
+        boise = normalize_location("Boise, ID")
+        assert (boise.kind, boise.city, boise.country_code) == ("city", "Boise", "US")
+        assert normalize_location("New Mexico").country_code == "US"
+        assert normalize_location("Türkiye").flag == "🇹🇷"
+
+    def test_remote_scopes(self):
+        """Remote ilanlar kapsamlarıyla birlikte çözülmeli"""
+        assert normalize_location("Remote (EU)").remote_scope == "Remote (EU)"
+        assert normalize_location("Remote - US").countries == ("US",)
+        assert normalize_location("Remote, United Kingdom").remote_scope == "Remote (UK)"
+
+        worldwide = normalize_location("Anywhere - worldwide")
+        assert worldwide.remote and worldwide.remote_scope == "Remote"
+        assert worldwide.countries == () and worldwide.timezone_band is None
+
+        apac = normalize_location("Remote within APAC timezones")
+        assert apac.regions == ("asia", "oceania") and apac.timezone_band == "apac"
+
+    def test_filters_use_geo_fields(self):
+        """Çözülebilen filtreler eşitlik sorgusuna dönüşmeli"""
+        remote, country, region = geo_filters("Remote", "germany", "EMEA")
+        assert remote["$or"][0] == {"geo.remote": True}
+        assert country["$or"][0] == {"geo.countries": "DE"}
+        assert region["$or"][0] == {"geo.regions": {"$in": ["europe", "middle_east", "africa"]}}
+        assert geo_filters(location="Berlin") == [
+            {
+                "$or": [
+                    {"geo.city": "Berlin"},
+                    {"geo": {"$exists": False}, "location": {"$regex": "Berlin", "$options": "i"}},
+                ]
+            }
+        ]
+        assert geo_filters(country="Atlantis (") == [
+            {"location": {"$regex": r"Atlantis\ \(", "$options": "i"}}
+        ]
+
+    def test_filters_match_jobs_without_geo(self):
+        """geo alanı henüz yazılmamış ilanlar ham lokasyonla eşleşmeli"""
+        jobs = mongomock.MongoClient().db.jobs
+        jobs.insert_many(
+            [
+                {"location": "Berlin, Germany"},
+                {"location": "Munich", "geo": {"city": "Munich", "countries": ["DE"]}},
+                {"location": "Berlin", "geo": {"city": "Berlin", "countries": ["DE"]}},
+                {"location": "Remote - Worldwide"},
+            ]
+        )
+
+        def found(**filters):
+            return sorted(j["location"] for j in jobs.find({"$and": geo_filters(**filters)}))
+
+        assert found(location="Berlin") == ["Berlin", "Berlin, Germany"]
+        assert found(country="DE") == ["Berlin", "Berlin, Germany", "Munich"]
+        assert found(location="Remote") == ["Remote - Worldwide"]
+
+
+class TestLocationIndex:
+    """Lokasyon öneri tablosu testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    @pytest.mark.asyncio
+    async def test_ingest_counts_feed_autocomplete(self, db):
+        """Ingest sayaçları otomatik tamamlama sonuçlarını beslemeli"""
+        index = LocationIndex(db)
+        jobs = [_job("Berlin, Germany"), _job("Berlin"), _job("Munich, Germany"), _job("Remote")]
+        await index.on_jobs_ingested(jobs)
+
+        assert await index.search("ber") == [
+            {"name": "Berlin, Germany", "count": 2, "flag": "🇩🇪"}
+        ]
+        # Matches at any word start, most common first
+        assert [s["name"] for s in await index.search("germ")] == [
+            "Berlin, Germany",
+            "Munich, Germany",
+        ]
+
+        await index.on_jobs_removed([jobs[2]])
+        assert [s["name"] for s in await index.search("germ")] == ["Berlin, Germany"]
+
+    @pytest.mark.asyncio
+    async def test_backfill_and_rebuild_from_jobs(self, db):
+        """Eski işler geo alanı almalı ve tablo baştan kurulmalı"""
+        await db.jobs.insert_many(
+            [_job("London, UK"), _job("london, england", active=False), _job("Remote (EU)")]
+        )
+        index = LocationIndex(db)
+        await index.on_jobs_ingested([_job("Stale Place")])
+
+        assert await index.backfill_jobs(batch_size=2) == 3
+        assert await index.backfill_jobs() == 0
+        assert await db.jobs.count_documents({"geo.countries": "GB"}) == 2
+
+        assert await index.rebuild() == 2
+        [london] = await index.search("lond")
+        assert london["count"] == 2
+        assert await db.location_suggestions.find_one({"_id": "Stale Place"}) is None
+
+    @pytest.mark.asyncio
+    async def test_ingest_stage_adds_geo(self):
+        """Ingest aşaması her dokümana geo alanı eklemeli"""
+        [doc] = await GeoNormalizeStage().process([_job("Remote / Philadelphia, PA")])
+        assert doc["geo"]["remote_scope"] == "Remote (US)"
+        assert doc["geo"]["city"] == "Philadelphia"
+        assert doc["geo"]["countries"] == ["US"]
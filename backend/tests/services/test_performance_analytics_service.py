@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
+from backend.services.request_metrics import MetricsRegistry
 from services.performance_analytics_service import PerformanceAnalyticsService
 
 
@@ -55,31 +56,39 @@ class TestPerformanceAnalyticsService:
     @pytest.mark.asyncio
     async def test_track_api_call_success(self, analytics_service, sample_metric_data):
         """Başarılı API call tracking testi"""
+        registry = MetricsRegistry()
         analytics_service.db.performance_metrics.insert_one = AsyncMock()
 
-        await analytics_service.track_api_call(
-            endpoint=sample_metric_data["endpoint"],
-            duration_ms=sample_metric_data["duration_ms"],
-            status_code=sample_metric_data["status_code"],
-        )
-
-        analytics_service.db.performance_metrics.insert_one.assert_called_once()
-        call_args = analytics_service.db.performance_metrics.insert_one.call_args[0][0]
-        assert call_args["endpoint"] == sample_metric_data["endpoint"]
-        assert call_args["duration_ms"] == sample_metric_data["duration_ms"]
-        assert call_args["status_code"] == sample_metric_data["status_code"]
+        with patch(
+            "services.performance_analytics_service.get_metrics_registry",
+            return_value=registry,
+        ):
+            await analytics_service.track_api_call(
+                endpoint=sample_metric_data["endpoint"],
+                duration_ms=sample_metric_data["duration_ms"],
+                status_code=sample_metric_data["status_code"],
+            )
+
+        # Raw rows are no longer written; calls land in the latency histograms
+        analytics_service.db.performance_metrics.insert_one.assert_not_called()
+        series = registry.series[(sample_metric_data["endpoint"], "GET", 200)]
+        assert series.total.count == 1
+        assert series.total.total == 150500
 
     @pytest.mark.asyncio
     async def test_track_api_call_error(self, analytics_service):
         """API call tracking hatası testi"""
-        analytics_service.db.performance_metrics.insert_one = AsyncMock(
-            side_effect=Exception("DB error")
-        )
+        registry = Mock()
+        registry.observe.side_effect = Exception("registry error")
 
-        # Should not raise exception
-        await analytics_service.track_api_call("/api/v1/jobs", 150.5, 200)
+        with patch(
+            "services.performance_analytics_service.get_metrics_registry",
+            return_value=registry,
+        ):
+            # Should not raise exception
+            await analytics_service.track_api_call("/api/v1/jobs", 150.5, 200)
 
-        analytics_service.db.performance_metrics.insert_one.assert_called_once()
+        registry.observe.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_track_user_activity_success(
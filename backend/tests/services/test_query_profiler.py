@@ -0,0 +1,199 @@
+import asyncio
+import itertools
+import re
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.middleware.performance_monitoring import \
+    PerformanceMonitoringMiddleware
+from backend.middleware.pipeline import RequestPipelineMiddleware
+from backend.services.query_profiler import QueryProfiler, suggest_index
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+_request_ids = itertools.count()
+
+
+def run_command(profiler, command, duration_us, database="buzz2remote_test"):
+    """Feed one command through the listener as pymongo would"""
+    name = next(iter(command))
+    request_id = next(_request_ids)
+    profiler.started(
+        SimpleNamespace(
+            command_name=name,
+            database_name=database,
+            command=command,
+            connection_id=("localhost", 27017),
+            request_id=request_id,
+        )
+    )
+    profiler.succeeded(
+        SimpleNamespace(
+            connection_id=("localhost", 27017),
+            request_id=request_id,
+            duration_micros=duration_us,
+        )
+    )
+
+
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "SORT",
+            "inputStage": {"stage": "COLLSCAN", "direction": "forward"},
+        }
+    },
+    "executionStats": {
+        "nReturned": 20,
+        "totalDocsExamined": 50_000,
+        "totalKeysExamined": 0,
+        "executionTimeMillis": 180,
+    },
+}
+
+
+class TestQueryProfiler:
+    """MongoDB sorgu şekli profilleme ve indeks önerisi testleri"""
+
+    def test_commands_group_by_shape_and_flag_regex_scans(self):
+        """Değerleri farklı aynı sorgular tek şekilde toplanmalı, regex taramaları işaretlenmeli"""
+        profiler = QueryProfiler(slow_ms=100)
+        for company, statuses in (("Acme", ["active"]), ("Globex", ["active", "paused"])):
+            run_command(
+                profiler,
+                {
+                    "find": "jobs",
+                    "filter": {"company": company, "status": {"$in": statuses}},
+                    "sort": {"created_at": -1},
+                    "lsid": {"id": "session"},
+                },
+                5_000,
+            )
+        run_command(
+            profiler,
+            {"find": "jobs", "filter": {"title": {"$regex": "python", "$options": "i"}}},
+            250_000,
+        )
+        run_command(profiler, {"find": "jobs", "filter": {"title": re.compile("^Senior")}}, 1_000)
+        run_command(profiler, {"explain": {"find": "jobs"}, "verbosity": "queryPlanner"}, 1_000)
+
+        assert len(profiler.shapes) == 3
+        equality, regex, prefix = profiler.shapes.values()
+        assert equality.latency.count == 2
+        assert equality.shape["filter"] == {"company": "?str", "status": {"$in": ["?str"]}}
+        assert equality.suggested_index() == [("company", 1), ("status", 1), ("created_at", -1)]
+        assert not equality.regex_scan and equality.sample is None
+
+        assert regex.regex == [
+            {"field": "title", "anchored": False, "case_insensitive": True, "indexable": False}
+        ]
+        assert regex.regex_scan and regex.slow == 1 and regex.sample["filter"]["title"]
+        assert regex.suggested_index() == []
+        assert not prefix.regex_scan
+        assert prefix.suggested_index() == [("title", 1)]
+
+        assert suggest_index(
+            {"$and": [{"is_active": "?bool"}], "posted": {"$gte": "?datetime"}},
+            [("salary", -1)],
+        ) == [("is_active", 1), ("salary", -1), ("posted", 1)]
+
+    def test_middleware_attributes_shapes_to_routes(self, monkeypatch):
+        """İstek sırasında çalışan sorgu şekilleri route şablonuna atanmalı"""
+        profiler = QueryProfiler()
+        monkeypatch.setattr(
+            "backend.middleware.performance_monitoring.get_query_profiler", lambda: profiler
+        )
+        app = FastAPI()
+        app.add_middleware(
+            RequestPipelineMiddleware, stages=[PerformanceMonitoringMiddleware()]
+        )
+
+        @app.get("/jobs/{job_id}")
+        async def get_job(job_id: str):
+            await asyncio.sleep(0)
+            run_command(profiler, {"find": "jobs", "filter": {"_id": job_id}}, 2_000)
+            run_command(profiler, {"find": "jobs", "filter": {"_id": job_id}}, 2_000)
+            return {"id": job_id}
+
+        client = TestClient(app)
+        client.get("/jobs/1")
+        client.get("/jobs/2")
+        run_command(profiler, {"find": "jobs", "filter": {"_id": "3"}}, 2_000)
+
+        (entry,) = profiler.shapes.values()
+        assert entry.latency.count == 5
+        assert entry.routes == {"/jobs/{job_id}": 2}
+        assert profiler.for_route("/jobs/{job_id}")[0]["id"] == entry.id
+
+    @pytest.mark.asyncio
+    async def test_report_samples_plans_and_skips_existing_indexes(self):
+        """Yavaş şekiller için explain alınmalı, mevcut indeksler öneriden çıkarılmalı"""
+        db = AsyncMockDatabase()
+        explained = []
+
+        async def command(spec):
+            explained.append(spec)
+            return COLLSCAN_EXPLAIN
+
+        db.name, db.command = "buzz2remote_test", command
+        await db.jobs.create_index([("company", 1), ("created_at", -1)])
+
+        profiler = QueryProfiler(slow_ms=100)
+        run_command(
+            profiler,
+            {
+                "aggregate": "jobs",
+                "pipeline": [
+                    {
+                        "$match": {
+                            "is_active": True,
+                            "location": {"$regex": "berlin", "$options": "i"},
+                        }
+                    },
+                    {"$sort": {"posted_date": -1}},
+                    {"$limit": 20},
+                ],
+                "cursor": {},
+                "$db": "buzz2remote_test",
+            },
+            400_000,
+        )
+        run_command(
+            profiler,
+            {"find": "jobs", "filter": {"company": "Acme"}, "sort": {"created_at": -1}},
+            300_000,
+        )
+        run_command(profiler, {"find": "users", "filter": {"email": "a@b.c"}}, 500_000, "admin")
+
+        report = await profiler.report(db)
+
+        # Only the two slow shapes of this database are explained, without session fields
+        assert len(explained) == 2
+        assert explained[0]["explain"]["aggregate"] == "jobs"
+        assert "$db" not in explained[0]["explain"]
+        assert explained[0]["verbosity"] == "executionStats"
+
+        aggregate = report["shapes"][1]
+        assert aggregate["command"] == "aggregate"
+        assert aggregate["plan"]["stages"] == ["SORT", "COLLSCAN"]
+        assert aggregate["collscan"] and aggregate["regex_scan"]
+        assert aggregate["id"] in report["collscans"]
+        assert aggregate["id"] in report["regex_scans"]
+
+        assert report["index_suggestions"] == [
+            {
+                "collection": "jobs",
+                "keys": [["is_active", 1], ["posted_date", -1]],
+                "shapes": [aggregate["id"]],
+                "routes": {},
+            }
+        ]
+        covered = report["shapes"][2]
+        assert covered["collection"] == "jobs" and covered["command"] == "find"
+        assert covered["index_exists"]
+
+        # Fresh plans are reused until they expire
+        await profiler.report(db)
+        assert len(explained) == 2
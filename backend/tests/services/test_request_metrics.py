@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.middleware.performance_monitoring import \
+    PerformanceMonitoringMiddleware
+from backend.middleware.pipeline import RequestPipelineMiddleware
+from backend.services.performance_analytics_service import \
+    PerformanceAnalyticsService
+from backend.services.request_metrics import (LatencyHistogram,
+                                              MetricsRegistry,
+                                              MetricsRollupService,
+                                              db_timing_listener)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(
+        "backend.middleware.performance_monitoring.get_metrics_registry",
+        lambda: registry,
+    )
+    return registry
+
+
+class TestRequestMetrics:
+    """Gecikme histogramı ve metrik testleri"""
+
+    def test_histogram_percentiles_are_accurate(self):
+        """Yüzdelikler %3 hata sınırı içinde olmalı"""
+        histogram = LatencyHistogram()
+        for value in range(1, 100_001):
+            histogram.record(value)
+
+        for q in (0.5, 0.95, 0.99):
+            expected = q * 100_000
+            assert abs(histogram.percentile(q) - expected) / expected < 0.03
+        assert histogram.max == 100_000
+        assert len(histogram.buckets) < 400
+
+    def test_middleware_records_route_template_and_db_time(self, registry):
+        """Middleware route şablonunu ve DB süresini kaydetmeli"""
+        app = FastAPI()
+        app.add_middleware(
+            RequestPipelineMiddleware, stages=[PerformanceMonitoringMiddleware()]
+        )
+
+        @app.get("/jobs/{job_id}")
+        async def get_job(job_id: str):
+            await asyncio.sleep(0.01)
+            db_timing_listener.succeeded(SimpleNamespace(duration_micros=4000))
+            return {"id": job_id}
+
+        client = TestClient(app)
+        client.get("/jobs/1")
+        client.get("/jobs/2")
+        client.get("/missing")
+
+        series = registry.series[("/jobs/{job_id}", "GET", 200)]
+        assert series.total.count == 2
+        assert series.db.percentile(0.5) == pytest.approx(4000, rel=0.03)
+        assert series.handler.count == 2
+        assert ("<unmatched>", "GET", 404) in registry.series
+        assert registry.in_flight["GET"] == 0
+
+    def test_prometheus_exposition(self):
+        """Prometheus metin formatı quantile, sum ve count içermeli"""
+        registry = MetricsRegistry()
+        registry.observe("/api/v1/jobs/search", "GET", 200, 250_000, db_us=200_000)
+        text = registry.render_prometheus()
+
+        labels = 'route="/api/v1/jobs/search",method="GET",status="200"'
+        assert f'http_request_duration_seconds{{{labels},quantile="0.99"}}' in text
+        assert f"http_request_duration_seconds_count{{{labels}}} 1" in text
+        assert f"http_request_db_seconds_sum{{{labels}}} 0.200000" in text
+        assert "# TYPE http_requests_in_flight gauge" in text
+
+    @pytest.mark.asyncio
+    async def test_rollups_merge_across_workers(self):
+        """Farklı worker rollup'ları aynı pencerede birleşmeli"""
+        db = AsyncMockDatabase()
+        workers = [MetricsRegistry(), MetricsRegistry()]
+        for i, worker in enumerate(workers):
+            for _ in range(98):
+                worker.observe("/api/v1/jobs/search", "GET", 200, 20_000)
+            for _ in range(2):
+                worker.observe("/api/v1/jobs/search", "GET", 500, 2_000_000 + i)
+            await MetricsRollupService(db, worker).rollup()
+
+        # Nothing new was recorded, so a second rollup writes nothing
+        assert await MetricsRollupService(db, workers[0]).rollup() == 0
+        assert await db.performance_rollups.count_documents({}) == 2
+
+        summary = await PerformanceAnalyticsService(db).get_performance_summary()
+        search = summary["endpoints"][0]
+        assert search["call_count"] == 200
+        assert search["error_count"] == 4
+        assert search["p50_duration"] == pytest.approx(20, rel=0.03)
+        assert search["p99_duration"] > 1000
+
+        slow = await PerformanceAnalyticsService(db).analyze_slow_queries()
+        assert slow[0]["count"] == 4
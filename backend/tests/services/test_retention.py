@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.job_archive import (ArchiveInProgressError,
+                                          ArchiveVerificationError,
+                                          CollectionArchiveSink, JobArchiver)
+from backend.services.retention import RetentionEngine
+from backend.services.retention_rules import RetentionRule, get_rule
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+def _docs(count, field="created_at", days_ago=40, **extra):
+    stamp = datetime.utcnow() - timedelta(days=days_ago)
+    return [{field: stamp, "n": i, **extra} for i in range(count)]
+
+
+class LostSink(CollectionArchiveSink):
+    """Accepts writes but never lets them be read back"""
+
+    async def verify(self, jobs, run_id, chunk_index):
+        return False
+
+
+class TestRetentionEngine:
+    """Ortak saklama kurallarıyla veritabanı temizliği testleri"""
+
+    @pytest.fixture
+    def db(self):
+        return AsyncMockDatabase()
+
+    @pytest.mark.asyncio
+    async def test_expiry_rules_use_ttl_indexes(self, db):
+        """Salt süre dolumu kuralları TTL indeksine dönüşmeli, koşullar kısmi filtre olmalı"""
+        summary = await RetentionEngine(db, rules=[get_rule("notifications")]).run()
+
+        report = summary["collections"][0]
+        # Expiry itself is left to the server; the run only creates the index
+        assert report["mode"] == "ttl" and "pending" in report and "deleted" not in report
+        index = (await db.notifications.index_information())["created_at_ttl"]
+        assert index["expireAfterSeconds"] == 30 * 24 * 60 * 60
+        assert index["partialFilterExpression"] == {"read": True}
+
+    @pytest.mark.asyncio
+    async def test_archive_verifies_before_delete(self, db):
+        """Arşivlenen parça okunamazsa kaynak silinmemeli"""
+        rule = RetentionRule("email_logs", "sent_at", 30, archive=True)
+        await db.email_logs.insert_many(_docs(5, field="sent_at") + _docs(1, field="sent_at", days_ago=2))
+
+        lost = JobArchiver(db, LostSink(db, rule.archive_collection), chunk_size=2, rule=rule)
+        with pytest.raises(ArchiveVerificationError):
+            await lost.run()
+        assert await db.email_logs.count_documents({}) == 6
+
+        # The next run resumes the stopped one and finishes it
+        summary = await RetentionEngine(db, rules=[rule], batch_size=2, max_rate=None).run()
+        report = summary["collections"][0]
+        assert (report["mode"], report["archived"], report["batches"]) == ("archive", 5, 3)
+        assert summary["archived"] == 5
+        assert await db.email_logs.count_documents({}) == 1
+        assert await db.email_logs_archive.count_documents({}) == 5
+
+    @pytest.mark.asyncio
+    async def test_batched_delete_is_paced(self, db):
+        """TTL kullanılamadığında silme sıralı ve hız sınırlı parçalarla yapılmalı"""
+        await db.api_logs.insert_many(_docs(5, field="timestamp") + _docs(2, field="timestamp", days_ago=1))
+        engine = RetentionEngine(db, batch_size=2, max_rate=100)
+
+        started = datetime.utcnow()
+        result = await engine.delete_expired(get_rule("api_logs"))
+
+        assert result == {"mode": "batched", "deleted": 5, "batches": 3}
+        assert datetime.utcnow() - started >= timedelta(seconds=0.04)
+        assert await db.api_logs.count_documents({}) == 2
+
+    @pytest.mark.asyncio
+    async def test_only_closed_jobs_are_archived_one_run_at_a_time(self, db):
+        """Aktif ilanlar arşivlenmemeli, aynı arşivleyici eşzamanlı çalışmamalı"""
+        await db.jobs.insert_many(
+            _docs(2, is_active=True) + _docs(2, is_active=False) + _docs(1, status="filled")
+        )
+        archiver = JobArchiver(db, CollectionArchiveSink(db), hooks=[])
+
+        await db.scheduler_leases.insert_one(
+            {"_id": "archive:jobs", "owner": "api", "lease_until": datetime.utcnow() + timedelta(minutes=5)}
+        )
+        with pytest.raises(ArchiveInProgressError):
+            await archiver.run()
+        assert await db.archive_checkpoints.count_documents({}) == 0
+
+        await db.scheduler_leases.update_one({"_id": "archive:jobs"}, {"$set": {"owner": None}})
+        report = await archiver.run()
+        assert report.archived == 3
+        assert await db.jobs.count_documents({"is_active": True}) == 2
+        lease = await db.scheduler_leases.find_one({"_id": "archive:jobs"})
+        assert lease["owner"] is None
@@ -0,0 +1,74 @@
+import pytest
+
+from backend.services.ingest_pipeline import SkillExtractStage
+from backend.services.skill_taxonomy import (extract_skills, normalize_skills,
+                                             search_skills)
+
+
+def _names(text):
+    return [skill.name for skill in extract_skills(text)]
+
+
+class TestSkillTaxonomy:
+    """Yetenek taksonomisi ve çoklu desen çıkarıcı testleri"""
+
+    def test_word_boundaries(self):
+        """Kelime içindeki eşleşmeler yetenek sayılmamalı"""
+        assert _names("A good team player, going places") == ["Teamwork"]
+        assert _names("JavaScript and TypeScript") == ["JavaScript", "TypeScript"]
+        assert _names("Our R&D team owns go-to-market") == []
+        assert _names("Backend in Go, stats in R.") == ["Go", "R"]
+        assert _names("Experience with Go and R, plus C++ / C#") == ["Go", "R", "C++", "C#"]
+
+    def test_sentence_punctuation_after_short_names(self):
+        """Cümle sonu noktalama kısa isimleri engellememeli, birleştiriciler engellemeli"""
+        assert _names("We use C#.") == ["C#"]
+        assert _names("Write Go.") == ["Go"]
+        assert _names("Strong in R.") == ["R"]
+        assert _names("C#, Go/ R. Then ML") == ["C#", "Go", "R", "Machine Learning"]
+        assert _names("C# developer") == ["C#"]
+        assert _names("Our go-to stack, R&D and Go.Net") == []
+        assert _names("Go/Rust shops") == ["Rust"]
+
+    def test_aliases_resolve_to_longest_canonical_match(self):
+        """Takma adlar kanonik isme, çakışmalar en uzun eşleşmeye çözülmeli"""
+        assert _names("Node.js, ReactJS, golang, k8s and Postgres on GCP") == [
+            "Node.js",
+            "React",
+            "Go",
+            "Kubernetes",
+            "PostgreSQL",
+            "Google Cloud",
+        ]
+        assert _names("React Native, REST APIs, the rest") == ["React Native", "REST API"]
+        assert normalize_skills(["python", "Python/Django", "reactjs", "Basket weaving"]) == [
+            "Python",
+            "Django",
+            "React",
+            "Basket weaving",
+        ]
+
+    def test_prefix_search(self):
+        """Arama kelime başı önekleriyle ve popülerlik sırasıyla yapılmalı"""
+        assert [s.name for s in search_skills("ja")] == ["JavaScript", "Java", "Japanese"]
+        assert [s.name for s in search_skills("learning", 2)] == ["Machine Learning", "Deep Learning"]
+        assert search_skills("golang")[0].to_dict() == {
+            "id": "go",
+            "name": "Go",
+            "category": "programming_languages",
+        }
+        assert search_skills("") == []
+
+    @pytest.mark.asyncio
+    async def test_ingest_stores_normalized_skills(self):
+        """Ingest sırasında yetenekler kanonik isimlerle saklanmalı"""
+        [doc] = await SkillExtractStage().process(
+            [
+                {
+                    "title": "Senior Golang Engineer",
+                    "description": "You will build gRPC services on k8s. Good communication skills.",
+                    "skills": ["golang", "postgres"],
+                }
+            ]
+        )
+        assert doc["skills"] == ["Go", "PostgreSQL", "gRPC", "Kubernetes", "Communication"]
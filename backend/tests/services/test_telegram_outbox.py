@@ -0,0 +1,176 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from backend.services.telegram_outbox import (MAX_MESSAGE_LENGTH,
+                                              TelegramBotAPI, TelegramOutbox,
+                                              format_new_jobs_summary,
+                                              truncate_message)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+
+class FakeBotAPI:
+    """Local fake of the Telegram Bot API sendMessage method"""
+
+    def __init__(self):
+        self.messages = []
+        self.responses = []
+
+    async def send_message(self, request):
+        payload = await request.json()
+        if self.responses:
+            status, body = self.responses.pop(0)
+            return web.json_response(body, status=status)
+        self.messages.append({**payload, "at": time.monotonic()})
+        return web.json_response(
+            {"ok": True, "result": {"message_id": len(self.messages)}}
+        )
+
+
+@pytest_asyncio.fixture
+async def bot_api():
+    fake = FakeBotAPI()
+    app = web.Application()
+    app.router.add_post("/bottest-token/sendMessage", fake.send_message)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    fake.base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    yield fake
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def outbox(bot_api):
+    box = TelegramOutbox(
+        AsyncMockDatabase(),
+        TelegramBotAPI("test-token", bot_api.base_url),
+        messages_per_second=100,
+        private_chat_interval=0.1,
+        retry_base_seconds=0,
+        max_attempts=2,
+    )
+    yield box
+    await box.api.close()
+
+
+class TestTelegramOutbox:
+    """Rate limitli Telegram outbox testleri"""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_and_deliver(self, outbox, bot_api):
+        """Kuyruğa alınan mesaj Bot API'ye gönderilmeli"""
+        message_id = await outbox.enqueue(12345, "<b>Hello</b>")
+
+        assert await outbox.drain() == 1
+        assert bot_api.messages[0]["chat_id"] == "12345"
+        assert bot_api.messages[0]["parse_mode"] == "HTML"
+        stored = await outbox.collection.find_one({"_id": message_id})
+        assert stored["status"] == "sent"
+        assert stored["message_id"] == 1
+
+    @pytest.mark.asyncio
+    async def test_new_job_events_are_coalesced(self, outbox, bot_api):
+        """Çok sayıda yeni iş olayı tek özet mesajda birleşmeli"""
+        for i in range(50):
+            await outbox.enqueue_new_job("100", {"job_title": f"Job {i}", "company": "Acme"})
+        await outbox.enqueue_new_job("200", {"job_title": "Solo", "company": "Globex"})
+
+        assert await outbox.drain() == 2
+        texts = {m["chat_id"]: m["text"] for m in bot_api.messages}
+        assert "50 YENİ İŞ İLANI" in texts["100"]
+        assert "ve 40 ilan daha" in texts["100"]
+        assert "Solo" in texts["200"]
+        assert await outbox.collection.count_documents({"status": "buffered"}) == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_and_redelivers(self, outbox, bot_api):
+        """429 retry_after süresi beklenmeli ve mesaj kaybolmamalı"""
+        bot_api.responses = [
+            (
+                429,
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 0.2",
+                    "parameters": {"retry_after": 0.2},
+                },
+            )
+        ]
+        message_id = await outbox.enqueue("1", "flood")
+
+        await outbox.drain()
+        assert outbox._paused_until - time.monotonic() > 0.1
+        stored = await outbox.collection.find_one({"_id": message_id})
+        assert stored["status"] == "pending"
+        assert stored["attempts"] == 0
+        assert stored["next_attempt_at"] > datetime.utcnow()
+
+        await outbox.collection.update_one(
+            {"_id": message_id}, {"$set": {"next_attempt_at": datetime.utcnow()}}
+        )
+        await asyncio.sleep(0.2)
+        await outbox.drain()
+        assert bot_api.messages[0]["text"] == "flood"
+
+    @pytest.mark.asyncio
+    async def test_per_chat_spacing(self, outbox, bot_api):
+        """Aynı sohbete gönderimler aralıklı olmalı, diğer sohbetler beklememeli"""
+        for i in range(3):
+            await outbox.enqueue("1", f"a{i}")
+        await outbox.enqueue("2", "b0")
+
+        while await outbox.collection.count_documents({"status": "pending"}):
+            if not await outbox.process_one():
+                await asyncio.sleep(0.02)
+
+        chat_one = [m["at"] for m in bot_api.messages if m["chat_id"] == "1"]
+        assert all(b - a >= 0.09 for a, b in zip(chat_one, chat_one[1:]))
+        order = [m["text"] for m in bot_api.messages]
+        assert order.index("b0") < order.index("a1")
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_marks_failed(self, outbox, bot_api):
+        """400 hatası kalıcı başarısızlık olarak saklanmalı"""
+        bot_api.responses = [
+            (400, {"ok": False, "error_code": 400, "description": "chat not found"})
+        ]
+        message_id = await outbox.enqueue("404", "lost?")
+        await outbox.drain()
+
+        stored = await outbox.collection.find_one({"_id": message_id})
+        assert stored["status"] == "failed"
+        assert "chat not found" in stored["error"]
+
+    @pytest.mark.asyncio
+    async def test_only_the_lease_holder_sends(self, outbox):
+        """Gönderici kilidini tek worker tutmalı, bırakınca diğeri devralmalı"""
+        db = AsyncMockDatabase()
+        first, second = TelegramOutbox(db, outbox.api), TelegramOutbox(db, outbox.api)
+        assert await first.acquire_sender_lease()
+        assert not await second.acquire_sender_lease()
+        # Renewing within the interval needs no database round trip
+        assert await first.acquire_sender_lease()
+
+        await first.release_sender_lease()
+        assert await second.acquire_sender_lease()
+        assert not await first.acquire_sender_lease()
+
+    def test_summary_escapes_and_fits_the_limit(self):
+        """Özet mesajı HTML'i kaçırmalı ve etiketleri bölmeden sınıra sığmalı"""
+        text = format_new_jobs_summary([{"title": "C++ <Dev> & Co", "company": "A<b>"}])
+        assert "C++ &lt;Dev&gt; &amp; Co" in text and "A&lt;b&gt;" in text
+
+        long_jobs = [{"title": "x" * 500, "company": "y" * 500} for _ in range(30)]
+        text = format_new_jobs_summary(long_jobs)
+        assert len(text) <= MAX_MESSAGE_LENGTH
+        assert text.count("<b>") == text.count("</b>")
+        assert "ilan daha" in text
+
+        cut = truncate_message("<b>" + "a" * 5000 + "</b>")
+        assert len(cut) <= MAX_MESSAGE_LENGTH and "<" not in cut
@@ -0,0 +1,104 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.database import get_async_db
+from backend.routes.jobs import router as jobs_router
+from backend.services.title_grouping import (TitleGroups, group_job_titles,
+                                             normalize_job_title,
+                                             title_group_fields)
+from backend.tests.utils.async_mongomock import AsyncMockDatabase
+
+TITLES = [
+    ("Senior Python Developer", "Acme"),
+    ("Python Developer", "Globex"),
+    ("Python Developer", "Initech"),
+    ("Jr Python Developer", "Acme"),
+    ("Senior Java Engineer", "Globex"),
+    ("Java Engineer II", "Hooli"),
+    ("Data Scientist", "Acme"),
+    ("Jobs", "Acme"),
+]
+
+
+async def _seed(db, stored=True):
+    jobs = []
+    for title, company in TITLES:
+        job = {"title": title, "company": company, "description": "x" * 1000}
+        if stored:
+            job.update(title_group_fields(title))
+        jobs.append(job)
+    await db.jobs.insert_many(jobs)
+    return jobs
+
+
+class TestTitleGrouping:
+    """Başlık gruplama testleri"""
+
+    def test_normalize_strips_levels(self):
+        """Seviye belirteçleri ve genel başlıklar gruplama anahtarından çıkarılmalı"""
+        assert normalize_job_title("Senior Python Developer (Remote)") == "python developer"
+        assert normalize_job_title("Java Engineer II") == "java engineer"
+        assert normalize_job_title("Jobs") == ""
+        assert title_group_fields(None)["title_group"] is None
+
+    @pytest.mark.asyncio
+    async def test_search_groups_in_database_like_in_memory(self):
+        """Veritabanında gruplama bellek içi gruplamayla aynı sayıları vermeli ve sayfalanmalı"""
+        db = AsyncMockDatabase()
+        jobs = await _seed(db)
+        expected = group_job_titles(jobs)
+
+        result = await TitleGroups(db).search({}, per_page=2, variations=1, samples=2)
+        assert result["total_jobs"] == len(TITLES)
+        assert result["unique_titles"] == len(expected) == 3
+        assert result["pages"] == 2
+        assert list(result["grouped_titles"]) == ["python developer", "java engineer"]
+
+        python = result["grouped_titles"]["python developer"]
+        assert python["count"] == expected["python developer"]["count"] == 4
+        assert python["most_common"] == "Python Developer"
+        assert python["variations"] == {"Python Developer": 2}
+        assert python["variation_count"] == 3
+        assert len(python["sample_job_ids"]) == 2
+
+        last = await TitleGroups(db).search({}, page=2, per_page=2)
+        assert list(last["grouped_titles"]) == ["data scientist"]
+
+        filtered = await TitleGroups(db).search({"company": "Acme"})
+        assert filtered["total_jobs"] == 4
+        assert filtered["grouped_titles"]["python developer"]["variations"] == {
+            "Jr Python Developer": 1,
+            "Senior Python Developer": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_backfill_then_grouped_endpoint(self):
+        """Anahtarsız işler ham başlıkla gruplanmalı, backfill sonrası uç nokta sayfalı grupları döndürmeli"""
+        db = AsyncMockDatabase()
+        await _seed(db, stored=False)
+
+        # Until the backfill reaches them, jobs are grouped on their raw title
+        before = await TitleGroups(db).search({}, per_page=10)
+        assert before["total_jobs"] == len(TITLES)
+        assert before["unique_titles"] == len(set(title for title, _ in TITLES))
+        assert before["grouped_titles"]["python developer"]["count"] == 2
+        assert await TitleGroups(db).is_keyed() is False
+
+        assert await TitleGroups(db).backfill_jobs(batch_size=3) == len(TITLES)
+        assert await TitleGroups(db).backfill_jobs() == 0
+        assert await TitleGroups(db).is_keyed() is True
+
+        app = FastAPI()
+        app.include_router(jobs_router, prefix="/api/v1")
+        app.dependency_overrides[get_async_db] = lambda: db
+        response = TestClient(app).get(
+            "/api/v1/jobs/search/grouped", params={"q": "python", "per_page": 10}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "error" not in data
+        assert data["total_jobs"] == 4
+        assert list(data["grouped_titles"]) == ["python developer"]
+        assert "job_ids" not in data["grouped_titles"]["python developer"]
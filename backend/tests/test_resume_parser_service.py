@@ -68,7 +68,7 @@ class TestResumeParserService:
 
     def test_extract_personal_info(self, parser, sample_resume_text):
         """Test personal information extraction"""
-        info = parser._extract_personal_info(sample_resume_text)
+        info = parser._parse_text(sample_resume_text)["personal_info"]
 
         assert info["email"] == "john.doe@email.com"
         assert info["phone"] == "+1-555-123-4567"
@@ -78,7 +78,7 @@ class TestResumeParserService:
 
     def test_extract_skills(self, parser, sample_resume_text):
         """Test skills extraction"""
-        skills = parser._extract_skills(sample_resume_text)
+        skills = parser._parse_text(sample_resume_text)["skills"]
 
         assert "programming" in skills
         assert "python" in skills["programming"]
@@ -96,8 +96,7 @@ class TestResumeParserService:
 
     def test_extract_experience(self, parser, sample_resume_text):
         """Test experience extraction"""
-        lines = sample_resume_text.split("\n")
-        experience = parser._extract_experience(sample_resume_text, lines)
+        experience = parser._parse_text(sample_resume_text)["experience"]
 
         assert len(experience) >= 1
         # Check if experience contains expected data
@@ -106,8 +105,7 @@ class TestResumeParserService:
 
     def test_extract_education(self, parser, sample_resume_text):
         """Test education extraction"""
-        lines = sample_resume_text.split("\n")
-        education = parser._extract_education(sample_resume_text, lines)
+        education = parser._parse_text(sample_resume_text)["education"]
 
         assert len(education) >= 1
         # Check if education contains expected data
@@ -116,19 +114,19 @@ class TestResumeParserService:
 
     def test_extract_languages(self, parser, sample_resume_text):
         """Test language extraction"""
-        languages = parser._extract_languages(sample_resume_text)
+        languages = parser._parse_text(sample_resume_text)["languages"]
 
         assert "english" in languages
         assert "turkish" in languages
 
     def test_extract_summary(self, parser, sample_resume_text):
         """Test summary extraction"""
-        summary = parser._extract_summary(sample_resume_text)
+        summary = parser._parse_text(sample_resume_text)["summary"]
 
         assert "experienced software engineer" in summary.lower()
         assert len(summary) > 0
 
-    @patch("services.resume_parser_service.pypdf.PdfReader")
+    @patch("services.document_parser.pypdf.PdfReader")
     def test_extract_text_from_pdf(self, mock_pdf_reader, parser, sample_pdf_content):
         """Test PDF text extraction"""
         # Mock PDF reader
@@ -143,7 +141,7 @@ class TestResumeParserService:
         assert text == "Sample PDF content\n"
         mock_pdf_reader.assert_called_once()
 
-    @patch("services.resume_parser_service.Document")
+    @patch("services.document_parser.docx.Document")
     def test_extract_text_from_docx(self, mock_document, parser, sample_docx_content):
         """Test DOCX text extraction"""
         # Mock document
@@ -151,6 +149,7 @@ class TestResumeParserService:
         mock_paragraph = Mock()
         mock_paragraph.text = "Sample DOCX content"
         mock_doc.paragraphs = [mock_paragraph]
+        mock_doc.tables = []
         mock_document.return_value = mock_doc
 
         text = parser._extract_text_from_docx(sample_docx_content)
@@ -262,28 +261,28 @@ class TestResumeParserService:
     def test_email_pattern_matching(self, parser):
         """Test email pattern matching"""
         text = "Contact me at john.doe@email.com or jane@company.org"
-        emails = parser._extract_personal_info(text)
+        emails = parser._parse_text(text)["personal_info"]
 
         assert emails["email"] == "john.doe@email.com"
 
     def test_phone_pattern_matching(self, parser):
         """Test phone pattern matching"""
         text = "Call me at +1-555-123-4567 or 555-987-6543"
-        phones = parser._extract_personal_info(text)
+        phones = parser._parse_text(text)["personal_info"]
 
         assert phones["phone"] == "+1-555-123-4567"
 
     def test_linkedin_pattern_matching(self, parser):
         """Test LinkedIn pattern matching"""
         text = "Find me on linkedin.com/in/johndoe"
-        linkedin = parser._extract_personal_info(text)
+        linkedin = parser._parse_text(text)["personal_info"]
 
         assert linkedin["linkedin"] == "linkedin.com/in/johndoe"
 
     def test_github_pattern_matching(self, parser):
         """Test GitHub pattern matching"""
         text = "Check my code at github.com/johndoe"
-        github = parser._extract_personal_info(text)
+        github = parser._parse_text(text)["personal_info"]
 
         assert github["github"] == "github.com/johndoe"
 
@@ -299,7 +298,7 @@ class TestResumeParserService:
         Languages: English, German
         """
 
-        skills = parser._extract_skills(text)
+        skills = parser._parse_text(text)["skills"]
 
         assert "programming" in skills
         assert "frameworks" in skills
@@ -318,8 +317,7 @@ class TestResumeParserService:
         2018 - 2020
         """
 
-        lines = text.split("\n")
-        experience = parser._extract_experience(text, lines)
+        experience = parser._parse_text(text)["experience"]
 
         assert len(experience) >= 1
         # Check if dates are extracted
@@ -339,8 +337,7 @@ class TestResumeParserService:
         2012 - 2016
         """
 
-        lines = text.split("\n")
-        education = parser._extract_education(text, lines)
+        education = parser._parse_text(text)["education"]
 
         assert len(education) >= 1
         # Check if degrees are extracted
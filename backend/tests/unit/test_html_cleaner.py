@@ -1,7 +1,13 @@
+import threading
+import time
+
 import pytest
 
+from backend.utils import html_cleaner
 from backend.utils.html_cleaner import (clean_html_tags, clean_job_data,
-                                        clean_job_description)
+                                        clean_job_data_many,
+                                        clean_job_description, clean_many,
+                                        html_to_text)
 
 
 class TestHtmlCleaner:
@@ -186,3 +192,67 @@ class TestHtmlCleaner:
         assert "Gereksinimler:" in result
         assert "Python 3.x" in result
         assert "Django/FastAPI" in result
+
+    def test_html_to_text_plain_and_markup_like_text(self):
+        """Etiket olmayan '<' karakterleri metinde kalmalı"""
+        assert html_to_text("  Senior   Python\nDeveloper ") == "Senior Python Developer"
+        assert html_to_text("5 < 6 and <3 years") == "5 < 6 and <3 years"
+        assert html_to_text("<a title='a>b'>link</a><!-- gizli -->") == "link"
+
+    def test_html_to_text_stops_at_max_length(self):
+        """Uzunluk sınırı tam temizlemeyle aynı sonucu vermeli"""
+        description = "<div>" + "<p>Python &amp; <b>FastAPI</b></p>\n" * 5000 + "</div>"
+        full = html_to_text(description)
+        assert html_to_text(description, max_length=50) == full[:47] + "..."
+        assert html_to_text("kısa metin", max_length=50) == "kısa metin"
+
+    def test_html_to_text_keep_structure(self):
+        """Paragraf ve liste yapısı korunabilmeli"""
+        description = (
+            "<h2>Gereksinimler:</h2><ul><li>Python 3.x</li><li>Django</li></ul>"
+            "<p>Uzaktan <b>çalışma</b><br>imkanı</p>"
+        )
+        assert html_to_text(description, keep_structure=True) == (
+            "Gereksinimler:\n\n- Python 3.x\n- Django\n\nUzaktan çalışma\nimkanı"
+        )
+        assert clean_job_description(description) == (
+            "Gereksinimler:Python 3.xDjangoUzaktan çalışmaimkanı"
+        )
+
+    def test_clean_many_in_process_pool(self):
+        """Toplu temizleme süreç havuzunda da sırayı korumalı"""
+        texts = [f"<p>İlan {i}</p>" for i in range(8)]
+        expected = [f"İlan {i}" for i in range(8)]
+        assert clean_many(texts) == expected
+        assert clean_many(texts, workers=2, chunksize=2) == expected
+        jobs = clean_job_data_many([{"title": t} for t in texts], workers=2, chunksize=2)
+        assert [job["title"] for job in jobs] == expected
+
+    def test_concurrent_callers_share_one_pool(self, monkeypatch):
+        """Aynı anda havuz isteyen iş parçacıkları tek bir havuz paylaşmalı"""
+        created = []
+
+        class SlowPool:
+            def __init__(self, max_workers):
+                time.sleep(0.01)
+                created.append(self)
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        monkeypatch.setattr(html_cleaner, "ProcessPoolExecutor", SlowPool)
+        monkeypatch.setattr(html_cleaner, "_pools", {})
+        barrier = threading.Barrier(8)
+        pools = []
+
+        def get_pool():
+            barrier.wait()
+            pools.append(html_cleaner._get_pool(3))
+
+        threads = [threading.Thread(target=get_pool) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(created) == 1
+        assert all(pool is created[0] for pool in pools)
@@ -0,0 +1,141 @@
+"""
+Async Mongomock Helper
+Wraps mongomock collections with a Motor-compatible async interface
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import mongomock
+from pymongo import (DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany,
+                     UpdateOne)
+
+CURSOR_METHODS = ("find", "aggregate", "list_indexes")
+
+
+class AsyncMockCursor:
+    """Async cursor over a mongomock cursor"""
+
+    def __init__(self, cursor):
+        self._cursor = iter(cursor) if isinstance(cursor, list) else cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, count: int):
+        self._cursor = self._cursor.skip(count)
+        return self
+
+    def limit(self, count: int):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        documents = []
+        for doc in self._cursor:
+            documents.append(doc)
+            if length and len(documents) >= length:
+                break
+        return documents
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class AsyncMockCollection:
+    """Motor-like async wrapper around a mongomock collection"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+
+    async def bulk_write(self, requests, ordered: bool = True, **kwargs):
+        """Apply pymongo write models one by one (mongomock lags pymongo here)"""
+        result = {
+            "nInserted": 0,
+            "nUpserted": 0,
+            "nMatched": 0,
+            "nModified": 0,
+            "nRemoved": 0,
+            "upserted": [],
+            "writeErrors": [],
+        }
+        for index, request in enumerate(requests):
+            if isinstance(request, InsertOne):
+                self._collection.insert_one(request._doc)
+                result["nInserted"] += 1
+            elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                if isinstance(request, ReplaceOne):
+                    method = self._collection.replace_one
+                elif isinstance(request, UpdateOne):
+                    method = self._collection.update_one
+                else:
+                    method = self._collection.update_many
+                outcome = method(request._filter, request._doc, upsert=request._upsert)
+                if outcome.upserted_id is not None:
+                    result["nUpserted"] += 1
+                    result["upserted"].append(
+                        {"index": index, "_id": outcome.upserted_id}
+                    )
+                else:
+                    result["nMatched"] += outcome.matched_count
+                    result["nModified"] += outcome.modified_count
+            elif isinstance(request, (DeleteOne, DeleteMany)):
+                method = (
+                    self._collection.delete_one
+                    if isinstance(request, DeleteOne)
+                    else self._collection.delete_many
+                )
+                result["nRemoved"] += method(request._filter).deleted_count
+        return SimpleNamespace(
+            bulk_api_result=result,
+            inserted_count=result["nInserted"],
+            upserted_count=result["nUpserted"],
+            matched_count=result["nMatched"],
+            modified_count=result["nModified"],
+            deleted_count=result["nRemoved"],
+            upserted_ids={u["index"]: u["_id"] for u in result["upserted"]},
+        )
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._collection, name)
+        if not callable(attr):
+            return attr
+        if name in CURSOR_METHODS:
+            return lambda *args, **kwargs: AsyncMockCursor(attr(*args, **kwargs))
+
+        async def _call(*args, **kwargs):
+            return attr(*args, **kwargs)
+
+        return _call
+
+
+class AsyncMockDatabase:
+    """Motor-like async wrapper around a mongomock database"""
+
+    def __init__(self, name: str = "buzz2remote_test"):
+        self._db = mongomock.MongoClient()[name]
+        self._collections: Dict[str, AsyncMockCollection] = {}
+
+    def __getitem__(self, name: str) -> AsyncMockCollection:
+        if name not in self._collections:
+            self._collections[name] = AsyncMockCollection(self._db[name])
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> AsyncMockCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self) -> List[str]:
+        return self._db.list_collection_names()
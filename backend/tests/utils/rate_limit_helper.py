@@ -11,7 +11,10 @@ from datetime import datetime, UTC
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 
-from backend.middleware.rate_limiter import RateLimiter, TokenBucketRateLimiter
+from backend.middleware.pipeline import RequestPipelineMiddleware
+from backend.middleware.rate_limiter import (MemoryRateLimitStore, RateLimit,
+                                             RateLimiter)
+from backend.middleware.rate_limiting import RateLimitingMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +44,7 @@ class RateLimitTestHelper:
         
         return {
             "status_code": response.status_code,
-            "headers": dict(response.headers),
+            "headers": response.headers,
             "json": response.json() if response.content else None,
             "text": response.text
         }
@@ -125,34 +128,22 @@ class RateLimitTestHelper:
 
 
 class RateLimiterTestHelper:
-    """Helper for testing rate limiter classes directly"""
+    """Helper for testing the rate limiting engine directly"""
     
     @staticmethod
-    def create_test_rate_limiter(requests_per_minute: int = 5, requests_per_hour: int = 10) -> RateLimiter:
-        """Create a test rate limiter with low limits"""
-        return RateLimiter(requests_per_minute=requests_per_minute, requests_per_hour=requests_per_hour)
+    def create_test_rate_limiter(store=None) -> RateLimiter:
+        """Create a rate limiter with its own counters"""
+        return RateLimiter(store or MemoryRateLimitStore())
     
     @staticmethod
-    def create_test_token_bucket_limiter(capacity: int = 5, refill_rate: float = 0.5) -> TokenBucketRateLimiter:
-        """Create a test token bucket limiter with low capacity"""
-        return TokenBucketRateLimiter(capacity=capacity, refill_rate=refill_rate)
-    
-    @staticmethod
-    def simulate_requests(rate_limiter: RateLimiter, client_ip: str, count: int) -> List[bool]:
+    async def simulate_requests(
+        rate_limiter: RateLimiter, key: str, limit: RateLimit, count: int, now: float = None
+    ) -> List[bool]:
         """Simulate multiple requests for a client"""
         results = []
         for i in range(count):
-            is_allowed, _ = rate_limiter._check_rate_limit(client_ip)
-            results.append(is_allowed)
-        return results
-    
-    @staticmethod
-    def simulate_token_bucket_requests(limiter: TokenBucketRateLimiter, client_ip: str, count: int) -> List[bool]:
-        """Simulate multiple requests for token bucket limiter"""
-        results = []
-        for i in range(count):
-            success = limiter._consume_token(client_ip)
-            results.append(success)
+            result = await rate_limiter.hit(key, limit, now=now)
+            results.append(result.allowed)
         return results
     
     @staticmethod
@@ -172,7 +163,7 @@ class RateLimiterTestHelper:
 
 
 def create_test_app_with_rate_limiting(rate_limiter: RateLimiter = None) -> FastAPI:
-    """Create a test FastAPI app with rate limiting"""
+    """Create a test FastAPI app with the rate limiting stage"""
     from fastapi import FastAPI
     
     app = FastAPI()
@@ -180,9 +171,9 @@ def create_test_app_with_rate_limiting(rate_limiter: RateLimiter = None) -> Fast
     if rate_limiter is None:
         rate_limiter = RateLimiterTestHelper.create_test_rate_limiter()
     
-    app.add_middleware(rate_limiter.__class__, 
-                      requests_per_minute=rate_limiter.requests_per_minute,
-                      requests_per_hour=rate_limiter.requests_per_hour)
+    app.add_middleware(
+        RequestPipelineMiddleware, stages=[RateLimitingMiddleware(engine=rate_limiter)]
+    )
     
     @app.get("/test")
     async def test_endpoint():
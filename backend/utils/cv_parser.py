@@ -1,15 +1,25 @@
 import logging
 import os
-import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict
+
+from backend.services.document_parser import extract_text, parse_text
 
 logger = logging.getLogger(__name__)
 
+MAX_PAGES = 20
+
 
 class CVParser:
+    """
+    File-path CV parser used by scripts and the AI-enhanced parser.
+
+    Extraction and parsing live in the shared document parser; this class
+    reads the file and reports the result with a review confidence score.
+    """
+
     def __init__(self):
-        self.supported_formats = [".pdf", ".doc", ".docx", ".txt"]
+        self.supported_formats = [".pdf", ".docx", ".txt"]
 
     def parse_cv_file(self, file_path: str) -> Dict:
         """
@@ -17,16 +27,10 @@ class CVParser:
         """
         try:
             file_ext = os.path.splitext(file_path)[1].lower()
-
-            if file_ext == ".pdf":
-                text = self._extract_pdf_text(file_path)
-            elif file_ext in [".doc", ".docx"]:
-                text = self._extract_word_text(file_path)
-            elif file_ext == ".txt":
-                text = self._extract_txt_text(file_path)
-            else:
+            if file_ext not in self.supported_formats:
                 raise ValueError(f"Unsupported file format: {file_ext}")
 
+            text = self._extract_text(file_path)
             if not text:
                 return {"error": "Could not extract text from CV"}
 
@@ -46,256 +50,46 @@ class CVParser:
             logger.error(f"Error parsing CV file {file_path}: {str(e)}")
             return {"error": str(e)}
 
-    def _extract_pdf_text(self, file_path: str) -> str:
-        """Extract text from PDF file"""
+    def _extract_text(self, file_path: str) -> str:
+        """Extract text from a PDF, DOCX or TXT file"""
         try:
-            import pypdf
-
             with open(file_path, "rb") as file:
-                pdf_reader = pypdf.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
-
-        except Exception as e:
-            logger.error(f"Error extracting PDF text: {str(e)}")
-            return ""
-
-    def _extract_word_text(self, file_path: str) -> str:
-        """Extract text from Word document"""
-        try:
-            from docx import Document
-
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
-
+                content = file.read()
+            return extract_text(content, file_path, max_pages=MAX_PAGES).text
         except Exception as e:
-            logger.error(f"Error extracting Word text: {str(e)}")
+            logger.error(f"Error extracting text from {file_path}: {str(e)}")
             return ""
 
-    def _extract_txt_text(self, file_path: str) -> str:
-        """Extract text from plain text file"""
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                return file.read()
-        except Exception as e:
-            logger.error(f"Error reading text file: {str(e)}")
-            return ""
+    # Kept for CVParserAI, which reads raw text per format
+    _extract_pdf_text = _extract_text
+    _extract_word_text = _extract_text
+    _extract_txt_text = _extract_text
 
     def _parse_cv_text(self, text: str) -> Dict:
         """Parse extracted text and structure it into profile data"""
-        parsed_data = {
-            "name": "",
-            "email": "",
-            "phone": "",
-            "title": "",
-            "summary": "",
-            "experience": [],
-            "education": [],
-            "skills": [],
-            "languages": [],
-            "certifications": [],
-            "projects": [],
-            "links": {"linkedin": "", "github": "", "portfolio": ""},
+        parsed = parse_text(text)
+        return {
+            "name": parsed.name,
+            "email": parsed.email,
+            "phone": parsed.phone,
+            "title": parsed.title,
+            "summary": parsed.summary,
+            "experience": parsed.experience,
+            "education": [
+                {
+                    "degree": entry.get("degree", ""),
+                    "institution": entry.get("institution", ""),
+                    "year": entry.get("end_date", ""),
+                }
+                for entry in parsed.education
+            ],
+            "skills": parsed.skills,
+            "languages": parsed.languages,
+            "certifications": parsed.certifications,
+            "projects": parsed.projects,
+            "links": parsed.links,
         }
 
-        # Extract basic contact information
-        parsed_data["name"] = self._extract_name(text)
-        parsed_data["email"] = self._extract_email(text)
-        parsed_data["phone"] = self._extract_phone(text)
-        parsed_data["links"] = self._extract_links(text)
-
-        # Extract professional information
-        parsed_data["title"] = self._extract_title(text)
-        parsed_data["summary"] = self._extract_summary(text)
-        parsed_data["experience"] = self._extract_experience(text)
-        parsed_data["education"] = self._extract_education(text)
-        parsed_data["skills"] = self._extract_skills(text)
-
-        return parsed_data
-
-    def _extract_name(self, text: str) -> str:
-        """Extract person's name from CV"""
-        lines = text.split("\n")
-
-        # Name is usually in the first few lines
-        for line in lines[:5]:
-            line = line.strip()
-            if len(line) > 0 and len(line) < 100:
-                # Check if line contains common name patterns
-                words = line.split()
-                if 2 <= len(words) <= 4 and all(
-                    word.replace("-", "").replace("'", "").isalpha() for word in words
-                ):
-                    return line
-        return ""
-
-    def _extract_email(self, text: str) -> str:
-        """Extract email address"""
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        matches = re.findall(email_pattern, text)
-        return matches[0] if matches else ""
-
-    def _extract_phone(self, text: str) -> str:
-        """Extract phone number"""
-        phone_patterns = [
-            r"\+?1?\d{9,15}",
-            r"\(\d{3}\)\s*\d{3}-\d{4}",
-            r"\d{3}-\d{3}-\d{4}",
-            r"\d{3}\.\d{3}\.\d{4}",
-        ]
-
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                return matches[0]
-        return ""
-
-    def _extract_links(self, text: str) -> Dict[str, str]:
-        """Extract social media and portfolio links"""
-        links = {"linkedin": "", "github": "", "portfolio": ""}
-
-        # LinkedIn
-        linkedin_pattern = r"(?:https?://)?(?:www\.)?linkedin\.com/in/[A-Za-z0-9_-]+"
-        linkedin_matches = re.findall(linkedin_pattern, text, re.IGNORECASE)
-        if linkedin_matches:
-            links["linkedin"] = linkedin_matches[0]
-
-        # GitHub
-        github_pattern = r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9_-]+"
-        github_matches = re.findall(github_pattern, text, re.IGNORECASE)
-        if github_matches:
-            links["github"] = github_matches[0]
-
-        return links
-
-    def _extract_title(self, text: str) -> str:
-        """Extract job title/professional title"""
-        lines = text.split("\n")
-
-        # Title usually follows name or is in first few lines
-        job_keywords = [
-            "developer",
-            "engineer",
-            "manager",
-            "analyst",
-            "designer",
-            "consultant",
-            "specialist",
-            "coordinator",
-            "director",
-            "lead",
-        ]
-
-        for line in lines[:10]:
-            line_lower = line.lower().strip()
-            if (
-                any(keyword in line_lower for keyword in job_keywords)
-                and len(line.strip()) < 100
-            ):
-                return line.strip()
-
-        return ""
-
-    def _extract_summary(self, text: str) -> str:
-        """Extract professional summary/objective"""
-        summary_keywords = ["summary", "objective", "profile", "about", "overview"]
-
-        for keyword in summary_keywords:
-            pattern = rf"{keyword}[:\s]*(.*?)(?=\n\n|\n[A-Z][A-Z\s]+\n|$)"
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                return matches[0].strip()
-
-        return ""
-
-    def _extract_experience(self, text: str) -> List[Dict]:
-        """Extract work experience"""
-        experience_keywords = ["experience", "work experience", "employment", "career"]
-        experience_section = ""
-
-        for keyword in experience_keywords:
-            pattern = rf"{keyword}[:\s]*(.*?)(?=\n(?:education|skills|projects)|$)"
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                experience_section = matches[0].strip()
-                break
-
-        if not experience_section:
-            return []
-
-        # Basic experience parsing - can be enhanced
-        experiences = []
-        lines = [
-            line.strip() for line in experience_section.split("\n") if line.strip()
-        ]
-
-        current_job = {}
-        for line in lines:
-            if len(line) > 10 and not line.startswith("-") and not line.startswith("•"):
-                if current_job:
-                    experiences.append(current_job)
-                current_job = {"title": line, "description": ""}
-            elif current_job:
-                current_job["description"] += line + " "
-
-        if current_job:
-            experiences.append(current_job)
-
-        return experiences
-
-    def _extract_education(self, text: str) -> List[Dict]:
-        """Extract education information"""
-        education_keywords = ["education", "academic", "qualifications"]
-        education_section = ""
-
-        for keyword in education_keywords:
-            pattern = rf"{keyword}[:\s]*(.*?)(?=\n(?:experience|skills|projects)|$)"
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                education_section = matches[0].strip()
-                break
-
-        if not education_section:
-            return []
-
-        # Basic education parsing
-        educations = []
-        lines = [line.strip() for line in education_section.split("\n") if line.strip()]
-
-        for line in lines:
-            if len(line) > 10:
-                educations.append({"degree": line, "institution": "", "year": ""})
-
-        return educations
-
-    def _extract_skills(self, text: str) -> List[str]:
-        """Extract skills list"""
-        skills_keywords = ["skills", "technical skills", "competencies"]
-        skills_section = ""
-
-        for keyword in skills_keywords:
-            pattern = rf"{keyword}[:\s]*(.*?)(?=\n(?:experience|education|projects)|$)"
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                skills_section = matches[0].strip()
-                break
-
-        if not skills_section:
-            return []
-
-        # Common skill separators
-        skills = re.split(r"[,•\n\t]+", skills_section)
-        return [
-            skill.strip()
-            for skill in skills
-            if skill.strip() and len(skill.strip()) > 1
-        ]
-
     def _calculate_confidence_score(self, parsed_data: Dict) -> float:
         """Calculate confidence score based on extracted data quality"""
         score = 0.0
@@ -1,8 +1,156 @@
+import atexit
 import html
 import re
-from typing import Any, Dict, Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional
+
+# Tags whose content is never visible text
+_SKIP_CONTENT = frozenset({"script", "style", "template", "noscript"})
+# Tags that start a new line / paragraph when structure is kept
+_LINE_TAGS = frozenset({"br", "div", "li", "tr", "dt", "dd"})
+_PARAGRAPH_TAGS = frozenset(
+    {
+        "p", "ul", "ol", "dl", "table", "section", "article", "header", "footer",
+        "blockquote", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "hr",
+    }
+)
+
+_TAG_RE = re.compile(
+    r"<(?:!--.*?-->|![^>]*>|\?[^>]*>"
+    r"|(/?)([a-zA-Z][^\s/>]*)(?:\"[^\"]*\"|'[^']*'|[^>\"'])*>)",
+    re.S,
+)
+_WS_RE = re.compile(r"\s+")
+_SKIP_END_RE = {
+    tag: re.compile(rf"</{tag}\s*>", re.I) for tag in _SKIP_CONTENT
+}
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+# Ingest stages reach _get_pool from worker threads (asyncio.to_thread)
+_pools_lock = threading.Lock()
+
+
+class _TextBuilder:
+    """Accumulates visible text with whitespace collapsed as it goes."""
+
+    __slots__ = ("parts", "length", "space", "breaks", "bullet", "limit")
+
+    def __init__(self, limit: Optional[int]):
+        self.parts: List[str] = []
+        self.length = 0
+        self.space = False
+        self.breaks = 0
+        self.bullet = False
+        self.limit = limit
+
+    @property
+    def full(self) -> bool:
+        return self.limit is not None and self.length - self.space > self.limit
+
+    def block(self, breaks: int, bullet: bool = False) -> None:
+        self.breaks = max(self.breaks, breaks)
+        self.bullet = self.bullet or bullet
+
+    def add(self, text: str) -> None:
+        text = _WS_RE.sub(" ", text)
+        if text[:1] == " " and (self.space or self.breaks or not self.parts):
+            text = text[1:]
+        if not text:
+            return
+        if self.breaks:
+            if self.parts:
+                if self.space:
+                    self.parts[-1] = self.parts[-1][:-1]
+                    self.length -= 1
+                text = "\n" * self.breaks + ("- " if self.bullet else "") + text
+            elif self.bullet:
+                text = "- " + text
+            self.breaks = 0
+            self.bullet = False
+        self.parts.append(text)
+        self.length += len(text)
+        self.space = text[-1] == " "
+
+    def text(self) -> str:
+        return "".join(self.parts).rstrip()
+
+
+def _truncate(text: str, max_length: Optional[int], ellipsis: str) -> str:
+    if max_length is not None and len(text) > max_length:
+        return text[: max_length - len(ellipsis)] + ellipsis
+    return text
+
+
+def html_to_text(
+    text: Any,
+    max_length: Optional[int] = None,
+    keep_structure: bool = False,
+    ellipsis: str = "...",
+) -> str:
+    """
+    HTML'i tek geçişte düz metne çevir
+
+    Etiket içermeyen metinler ayrıştırıcıya hiç girmez; ``max_length``
+    verildiğinde bu uzunluk aşılınca tarama durur ve metin ``ellipsis`` ile
+    kısaltılır. ``keep_structure`` paragraf ve liste yapısını satır sonları
+    ve "- " madde işaretleriyle korur.
+
+    Args:
+        text: Temizlenecek metin
+        max_length: Maksimum uzunluk
+        keep_structure: Paragraf ve liste yapısını koru
+        ellipsis: Kısaltılan metnin sonuna eklenecek ek
+
+    Returns:
+        Temizlenmiş metin
+    """
+    if not text:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
 
-from bs4 import BeautifulSoup
+    # HTML entities'leri decode et (etiket olarak yazılmış entity'ler de temizlensin)
+    if "&" in text:
+        text = html.unescape(text)
+
+    if "<" not in text:
+        if max_length is not None and len(text) > 2 * max_length + 1:
+            # Boşluklar daraltıldıktan sonra bile limiti aşan bir önek yeter
+            head = _WS_RE.sub(" ", text[: 2 * max_length + 1]).strip()
+            if len(head) > max_length:
+                return _truncate(head, max_length, ellipsis)
+        return _truncate(_WS_RE.sub(" ", text).strip(), max_length, ellipsis)
+
+    out = _TextBuilder(max_length)
+    pos = 0
+    end = len(text)
+    while pos < end:
+        match = _TAG_RE.search(text, pos)
+        if match is None:
+            out.add(text[pos:])
+            break
+        if match.start() > pos:
+            out.add(text[pos : match.start()])
+            if out.full:
+                break
+        pos = match.end()
+
+        name = match.group(2)
+        if not name:
+            continue
+        name = name.lower()
+        if name in _SKIP_CONTENT and not match.group(1):
+            close = _SKIP_END_RE[name].search(text, pos)
+            pos = close.end() if close else end
+        elif keep_structure:
+            if name in _PARAGRAPH_TAGS:
+                out.block(2)
+            elif name in _LINE_TAGS:
+                out.block(1, bullet=name == "li" and not match.group(1))
+
+    return _truncate(out.text(), max_length, ellipsis)
 
 
 def clean_html_tags(text: Optional[str]) -> str:
@@ -15,49 +163,78 @@ def clean_html_tags(text: Optional[str]) -> str:
     Returns:
         Temizlenmiş metin
     """
-    if not text:
-        return ""
+    return html_to_text(text)
 
-    # String olduğundan emin ol
-    if not isinstance(text, str):
-        text = str(text)
 
-    # HTML entities'leri decode et
-    text = html.unescape(text)
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
 
-    # BeautifulSoup ile HTML taglerini temizle
-    soup = BeautifulSoup(text, "html.parser")
-    clean_text = soup.get_text()
 
-    # Fazla boşlukları temizle
-    clean_text = re.sub(r"\s+", " ", clean_text)
-    clean_text = clean_text.strip()
+@atexit.register
+def shutdown_pools() -> None:
+    """Süreç havuzlarını kapat"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
 
-    return clean_text
 
+def _map(func, items: Iterable[Any], workers: int, chunksize: int) -> List[Any]:
+    items = list(items)
+    if workers and len(items) >= chunksize:
+        return list(_get_pool(workers).map(func, items, chunksize=chunksize))
+    return [func(item) for item in items]
 
-def clean_job_description(description: Optional[str], max_length: int = 2000) -> str:
+
+def clean_many(
+    texts: Iterable[Any],
+    max_length: Optional[int] = None,
+    keep_structure: bool = False,
+    workers: int = 0,
+    chunksize: int = 256,
+) -> List[str]:
     """
-    İş ilanı açıklamasını temizle ve formatla
+    Metinleri toplu olarak temizle
+
+    ``workers`` verildiğinde ve en az bir ``chunksize`` kadar metin varsa
+    temizleme süreç havuzunda yapılır; büyük ingest işlerinde event loop'u
+    ve GIL'i meşgul etmemek için kullanılır.
 
     Args:
-        description: İş ilanı açıklaması
+        texts: Temizlenecek metinler
         max_length: Maksimum uzunluk
+        keep_structure: Paragraf ve liste yapısını koru
+        workers: Süreç sayısı (0 ise aynı süreçte çalışır)
+        chunksize: Sürece gönderilen parça büyüklüğü
 
     Returns:
-        Temizlenmiş açıklama
+        Temizlenmiş metinler, giriş sırasıyla
     """
-    if not description:
-        return ""
+    cleaner = partial(html_to_text, max_length=max_length, keep_structure=keep_structure)
+    return _map(cleaner, texts, workers, chunksize)
 
-    # HTML taglerini temizle
-    clean_desc = clean_html_tags(description)
 
-    # Uzunluğu sınırla
-    if len(clean_desc) > max_length:
-        clean_desc = clean_desc[: max_length - 3] + "..."
+def clean_job_description(
+    description: Optional[str], max_length: int = 2000, keep_structure: bool = False
+) -> str:
+    """
+    İş ilanı açıklamasını temizle ve formatla
+
+    Args:
+        description: İş ilanı açıklaması
+        max_length: Maksimum uzunluk
+        keep_structure: Paragraf ve liste yapısını koru
 
-    return clean_desc
+    Returns:
+        Temizlenmiş açıklama
+    """
+    # HTML taglerini temizle, uzunluk aşılınca taramayı bırak
+    return html_to_text(description, max_length=max_length, keep_structure=keep_structure)
 
 
 def clean_job_title(title: Optional[str]) -> str:
@@ -134,6 +311,12 @@ def clean_job_data(job_data: Dict[str, Any]) -> Dict[str, Any]:
             # None değerleri boş string'e çevir
             if cleaned_data[field] is None:
                 cleaned_data[field] = ""
+            elif isinstance(cleaned_data[field], list):
+                # Liste alanlarını (ör. requirements) eleman bazında temizle
+                cleaned_data[field] = [
+                    cleaner_func(item) if isinstance(item, str) else item
+                    for item in cleaned_data[field]
+                ]
             elif cleaned_data[field]:  # Boş olmayan değerleri temizle
                 cleaned_data[field] = cleaner_func(cleaned_data[field])
 
@@ -143,3 +326,20 @@ def clean_job_data(job_data: Dict[str, Any]) -> Dict[str, Any]:
             cleaned_data[key] = clean_job_data(value)
 
     return cleaned_data
+
+
+def clean_job_data_many(
+    jobs: Iterable[Dict[str, Any]], workers: int = 0, chunksize: int = 64
+) -> List[Dict[str, Any]]:
+    """
+    İş ilanı verilerini toplu olarak, istenirse süreç havuzunda temizle
+
+    Args:
+        jobs: İş ilanı verileri
+        workers: Süreç sayısı (0 ise aynı süreçte çalışır)
+        chunksize: Sürece gönderilen parça büyüklüğü
+
+    Returns:
+        Temizlenmiş iş ilanı verileri, giriş sırasıyla
+    """
+    return _map(clean_job_data, jobs, workers, chunksize)
@@ -1,44 +1,31 @@
 import logging
-import os
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from models.job import Job
 from utils.db import async_jobs
 
+from backend.services.job_archive import (JobArchiver, SheetsArchiveSink,
+                                          build_archive_sink)
 from database.db import get_async_db
 
 logger = logging.getLogger(__name__)
 
 
-async def archive_old_jobs():
+async def archive_old_jobs(
+    max_chunks: Optional[int] = None, days: Optional[int] = None
+) -> Dict[str, Any]:
     """
-    Archive jobs older than 30 days to Google Sheets and remove them from the database.
+    Archive closed jobs past the ``jobs`` retention rule (30 days unless
+    ``days`` overrides it) and remove them from the database.
+
+    Runs in checkpointed chunks; an interrupted run resumes where it stopped.
+    The destination is chosen by ``ARCHIVE_SINK`` (Google Sheets by default).
     """
     try:
-        # Get jobs older than 30 days
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
         db = await get_async_db()
-        old_jobs_cursor = db.jobs.find({"created_at": {"$lt": cutoff_date}})
-        old_jobs = await old_jobs_cursor.to_list(length=None)
-
-        if not old_jobs:
-            logger.info("No old jobs to archive")
-            return
-
-        # Archive to Google Sheets
-        archived_count = await archive_to_sheets(old_jobs)
-
-        # Delete archived jobs from database
-        job_ids = [job["_id"] for job in old_jobs]
-        await db.jobs.delete_many({"_id": {"$in": job_ids}})
-
-        logger.info(f"Successfully archived {archived_count} old jobs")
-
+        archiver = JobArchiver(db, build_archive_sink(db), days=days)
+        report = await archiver.run(max_chunks=max_chunks)
+        return report.to_dict()
     except Exception as e:
         logger.error(f"Error archiving old jobs: {str(e)}")
         raise
@@ -49,53 +36,8 @@ async def archive_to_sheets(jobs):
     Archive jobs to Google Sheets.
     """
     try:
-        # Get Google Sheets credentials from environment
-        creds = Credentials.from_authorized_user_info(
-            {
-                "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-                "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
-                "refresh_token": os.getenv("GOOGLE_REFRESH_TOKEN"),
-            }
-        )
-
-        service = build("sheets", "v4", credentials=creds)
-        spreadsheet_id = os.getenv("GOOGLE_SHEETS_ID")
-
-        # Prepare job data for sheets
-        values = []
-        for job in jobs:
-            values.append(
-                [
-                    job.get("title", ""),
-                    job.get("company", ""),
-                    job.get("location", ""),
-                    job.get("description", ""),
-                    job.get("created_at", datetime.utcnow()).isoformat(),
-                    job.get("url", ""),
-                ]
-            )
-
-        # Append to sheets
-        body = {"values": values}
-
-        result = (
-            service.spreadsheets()
-            .values()
-            .append(
-                spreadsheetId=spreadsheet_id,
-                range="Archived Jobs!A:F",
-                valueInputOption="RAW",
-                insertDataOption="INSERT_ROWS",
-                body=body,
-            )
-            .execute()
-        )
-
-        return len(values)
-
-    except HttpError as e:
-        logger.error(f"Google Sheets API error: {str(e)}")
-        raise
+        await SheetsArchiveSink().write(jobs, run_id="manual", chunk_index=0)
+        return len(jobs)
     except Exception as e:
         logger.error(f"Error archiving to Google Sheets: {str(e)}")
         raise
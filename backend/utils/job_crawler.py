@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import json
 import logging
 import re
@@ -12,6 +13,11 @@ import aiohttp
 import requests
 from bs4 import BeautifulSoup
 
+from backend.database import get_database
+from backend.services.ingest_pipeline import (LEGACY_KEY_FIELDS,
+                                              build_ingest_pipeline)
+from backend.services.skill_taxonomy import extract_skills
+
 from .html_cleaner import clean_job_data
 
 logger = logging.getLogger(__name__)
@@ -394,50 +400,7 @@ class JobCrawler:
         """
         Extract technical skills from job description
         """
-        common_skills = [
-            "Python",
-            "JavaScript",
-            "Java",
-            "C++",
-            "C#",
-            "PHP",
-            "Ruby",
-            "Go",
-            "Rust",
-            "React",
-            "Vue",
-            "Angular",
-            "Node.js",
-            "Django",
-            "Flask",
-            "Laravel",
-            "AWS",
-            "Azure",
-            "GCP",
-            "Docker",
-            "Kubernetes",
-            "Jenkins",
-            "SQL",
-            "MongoDB",
-            "PostgreSQL",
-            "Redis",
-            "Elasticsearch",
-            "Git",
-            "Linux",
-            "API",
-            "REST",
-            "GraphQL",
-            "Microservices",
-        ]
-
-        found_skills = []
-        text_lower = text.lower()
-
-        for skill in common_skills:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-
-        return found_skills
+        return [skill.name for skill in extract_skills(text)]
 
     def _determine_remote_type(self, location: str) -> str:
         """
@@ -456,7 +419,18 @@ class JobCrawler:
         """
         Generate external ID from job URL
         """
-        return f"{urlparse(url).netloc}_{hash(url)}"
+        digest = hashlib.md5(url.encode("utf-8"), usedforsecurity=False).hexdigest()
+        return f"{urlparse(url).netloc}_{digest[:16]}"
+
+
+# Jobs update_job_listings saved before they carried (source, source_id),
+# looked up by external_id and source_url
+LEGACY_JOBS_QUERY = {"source": {"$exists": False}, "source_type": {"$exists": False}}
+LEGACY_JOBS_FIELDS = ("external_id", "source_url")
+
+# Jobs save_jobs_to_database saved before the key: one per title and company,
+# tagged "distill_crawler" and with every apply URL in application_urls
+LEGACY_SAVED_JOBS_QUERY = {"source_type": "distill_crawler", "application_urls": {"$exists": True}}
 
 
 class JobDataManager:
@@ -468,90 +442,52 @@ class JobDataManager:
         Update job listings from all sources
         """
         try:
-            from database import get_db
-
             # Crawl all jobs
             crawled_jobs = await self.crawler.crawl_all_companies()
 
-            # Save to database
-            db = get_db()
+            # Save to database through the shared ingest pipeline; new jobs are
+            # matched against notification preferences by its post-ingest hook
+            db = await get_database()
             jobs_collection = db["jobs"]
 
-            new_jobs = 0
-            updated_jobs = 0
-            new_job_data = []  # Store new jobs for notifications
-
-            for job in crawled_jobs:
-                # Check if job already exists
-                existing_job = jobs_collection.find_one(
-                    {"external_id": job.external_id, "source_url": job.source_url}
-                )
-
-                job_data = {
-                    "title": job.title,
-                    "company": job.company,
-                    "location": job.location,
-                    "job_type": job.job_type,
-                    "salary": job.salary,
-                    "description": job.description,
-                    "requirements": job.requirements,
-                    "posted_date": job.posted_date,
-                    "apply_url": job.apply_url,
-                    "remote_type": job.remote_type,
-                    "skills": job.skills,
-                    "source_url": job.source_url,
-                    "external_id": job.external_id,
-                    "is_active": True,
-                    "last_updated": datetime.now(),
-                }
-
-                if existing_job:
-                    jobs_collection.update_one(
-                        {"_id": existing_job["_id"]}, {"$set": job_data}
-                    )
-                    updated_jobs += 1
-                else:
-                    job_data["created_at"] = datetime.now()
-                    result = jobs_collection.insert_one(job_data)
-                    new_jobs += 1
-
-                    # Add to new jobs list for notifications
-                    job_data["_id"] = result.inserted_id
-                    new_job_data.append(job_data)
-
-            # Deactivate old jobs
-            cutoff_date = datetime.now() - timedelta(days=30)
-            deactivated = jobs_collection.update_many(
-                {"last_updated": {"$lt": cutoff_date}}, {"$set": {"is_active": False}}
+            pipeline = build_ingest_pipeline(
+                db,
+                source="job_crawler",
+                id_field="external_id",
+                legacy_query=LEGACY_JOBS_QUERY,
+                legacy_fields=LEGACY_JOBS_FIELDS,
             )
+            report = await pipeline.run(crawled_jobs)
 
-            # Process notifications for new jobs
-            notification_stats = {}
-            if new_job_data:
-                try:
-                    from backend.services.job_notification_service import \
-                        JobNotificationService
-
-                    notification_service = JobNotificationService(db)
-                    notification_stats = (
-                        await notification_service.process_new_jobs_for_notifications(
-                            new_job_data
-                        )
-                    )
-                    logger.info(
-                        f"Notification processing completed: {notification_stats}"
-                    )
-                except Exception as e:
-                    logger.error(f"Error processing notifications: {str(e)}")
-                    notification_stats = {"error": str(e)}
+            # Deactivate jobs that have not been seen for 30 days, including
+            # unkeyed ones from before the ingest key that no crawl adopted
+            cutoff_date = datetime.utcnow() - timedelta(days=30)
+            deactivated = await jobs_collection.update_many(
+                {
+                    "is_active": True,
+                    "$and": [
+                        {"$or": [{"source": "job_crawler"}, LEGACY_JOBS_QUERY]},
+                        {
+                            "$or": [
+                                {"last_seen_at": {"$lt": cutoff_date}},
+                                {
+                                    "last_seen_at": {"$exists": False},
+                                    "last_updated": {"$lt": cutoff_date},
+                                },
+                            ]
+                        },
+                    ],
+                },
+                {"$set": {"is_active": False}},
+            )
 
             return {
                 "status": "success",
-                "new_jobs": new_jobs,
-                "updated_jobs": updated_jobs,
+                "new_jobs": report.new_jobs,
+                "updated_jobs": report.updated_jobs,
                 "deactivated_jobs": deactivated.modified_count,
                 "total_crawled": len(crawled_jobs),
-                "notifications": notification_stats,
+                "ingest": report.to_dict(),
             }
 
         except Exception as e:
@@ -559,82 +495,29 @@ class JobDataManager:
             return {"status": "error", "message": str(e)}
 
     async def save_jobs_to_database(self, jobs: List[JobListing]):
-        """Save jobs to MongoDB database"""
+        """
+        Save jobs to MongoDB through the shared ingest pipeline, one job per
+        title and company with every apply URL kept in application_urls
+        """
         try:
-            db = get_db()
-            jobs_collection = db["jobs"]
-
-            new_jobs = 0
-            updated_jobs = 0
-
-            for job in jobs:
-                # Check if job already exists using title and company
-                existing_job = jobs_collection.find_one(
-                    {"title": job.title, "company": job.company}
-                )
-
-                job_data = {
-                    "title": job.title,
-                    "company": job.company,
-                    "location": job.location,
-                    "job_type": job.job_type,
-                    "salary": job.salary,
-                    "description": job.description,
-                    "requirements": job.requirements or [],
-                    "posted_date": job.posted_date,
-                    "remote_type": job.remote_type,
-                    "skills": job.skills or [],
-                    "source_url": job.source_url,
-                    "external_id": job.external_id,
-                    "is_active": True,
-                    "last_updated": datetime.now(),
-                    "source_type": "distill_crawler",
-                }
-
-                if existing_job:
-                    # Update application URLs array
-                    application_urls = existing_job.get("application_urls", [])
-                    if job.apply_url not in application_urls:
-                        application_urls.append(
-                            {
-                                "url": job.apply_url,
-                                "source": job.source_url,
-                                "added_at": datetime.now(),
-                            }
-                        )
-
-                    # Update job data with new application URLs
-                    job_data["application_urls"] = application_urls
-
-                    # Update only if there are changes
-                    if any(
-                        job_data[key] != existing_job.get(key)
-                        for key in job_data.keys()
-                    ):
-                        jobs_collection.update_one(
-                            {"_id": existing_job["_id"]}, {"$set": job_data}
-                        )
-                        updated_jobs += 1
-                else:
-                    # Create new job with initial application URL
-                    job_data["application_urls"] = [
-                        {
-                            "url": job.apply_url,
-                            "source": job.source_url,
-                            "added_at": datetime.now(),
-                        }
-                    ]
-                    job_data["created_at"] = datetime.now()
-                    jobs_collection.insert_one(job_data)
-                    new_jobs += 1
+            db = await get_database()
+            pipeline = build_ingest_pipeline(
+                db,
+                source="job_crawler",
+                id_field=None,
+                identity=LEGACY_KEY_FIELDS,
+                legacy_query=LEGACY_SAVED_JOBS_QUERY,
+                url_history=True,
+            )
+            report = await pipeline.run(jobs)
 
             logger.info(
-                f"💾 Database save completed: {new_jobs} new, {updated_jobs} updated"
+                f"💾 Database save completed: {report.new_jobs} new, {report.updated_jobs} updated"
             )
 
             return {
-                "new_jobs": new_jobs,
-                "updated_jobs": updated_jobs,
+                "new_jobs": report.new_jobs,
+                "updated_jobs": report.updated_jobs,
                 "total_processed": len(jobs),
             }
 
@@ -4,16 +4,21 @@ Database Cleanup Cronjob
 Removes old data and optimizes database performance
 """
 
+import asyncio
 import os
 import sys
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 from pymongo.errors import OperationFailure
 
-# Add backend to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+# Add the repository root to path so the backend package resolves
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.retention import RetentionEngine
+from backend.services.retention_rules import RETENTION_RULES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,60 +27,12 @@ class DatabaseCleanup:
     def __init__(self):
         """Initialize Database Cleanup"""
         self.mongo_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/buzz2remote')
+        self.database_name = os.getenv('DATABASE_NAME', 'buzz2remote')
         self.client = MongoClient(self.mongo_uri)
-        self.db = self.client.buzz2remote
+        self.db = self.client[self.database_name]
         
-        # Cleanup rules for different collections
-        self.cleanup_rules = {
-            'jobs': {
-                'field': 'created_at',
-                'keep_days': 90,        # Keep jobs for 90 days
-                'archive_days': 365,    # Archive after 1 year
-                'conditions': {'status': {'$in': ['expired', 'filled']}}
-            },
-            'job_applications': {
-                'field': 'created_at',
-                'keep_days': 180,       # Keep applications for 6 months
-                'archive_days': 730,    # Archive after 2 years
-                'conditions': {}
-            },
-            'user_sessions': {
-                'field': 'created_at',
-                'keep_days': 7,         # Keep sessions for 1 week
-                'archive_days': None,   # Don't archive, just delete
-                'conditions': {}
-            },
-            'api_logs': {
-                'field': 'timestamp',
-                'keep_days': 30,        # Keep API logs for 30 days
-                'archive_days': None,   # Don't archive, just delete
-                'conditions': {}
-            },
-            'crawl_logs': {
-                'field': 'timestamp',
-                'keep_days': 14,        # Keep crawl logs for 2 weeks
-                'archive_days': None,   # Don't archive, just delete
-                'conditions': {}
-            },
-            'error_logs': {
-                'field': 'timestamp',
-                'keep_days': 60,        # Keep error logs for 2 months
-                'archive_days': None,   # Don't archive, just delete
-                'conditions': {}
-            },
-            'email_logs': {
-                'field': 'sent_at',
-                'keep_days': 30,        # Keep email logs for 30 days
-                'archive_days': 365,    # Archive after 1 year
-                'conditions': {}
-            },
-            'notifications': {
-                'field': 'created_at',
-                'keep_days': 30,        # Keep notifications for 30 days
-                'archive_days': None,   # Don't archive, just delete
-                'conditions': {'read': True}  # Only cleanup read notifications
-            }
-        }
+        # Cleanup rules are shared with the API (backend/services/retention_rules.py)
+        self.cleanup_rules = RETENTION_RULES
     
     def get_collection_stats(self, collection_name):
         """Get collection statistics"""
@@ -108,88 +65,43 @@ class DatabaseCleanup:
             logger.error(f"❌ Error getting stats for {collection_name}: {e}")
             return None
     
-    def cleanup_collection(self, collection_name, rules):
-        """Cleanup a specific collection based on rules"""
+    async def _apply_rules(self, collections):
+        """Run the retention engine on its own event loop and client"""
+        client = AsyncIOMotorClient(self.mongo_uri)
+        try:
+            engine = RetentionEngine(client[self.database_name])
+            return await engine.run(collections)
+        finally:
+            client.close()
+    
+    def cleanup_collection(self, collection_name):
+        """Apply the retention rule of a specific collection"""
         logger.info(f"🧹 Cleaning up collection: {collection_name}")
         
         try:
-            collection = self.db[collection_name]
-            
-            # Get initial stats
             initial_stats = self.get_collection_stats(collection_name)
             if not initial_stats:
                 return None
             
+            summary = asyncio.run(self._apply_rules([collection_name]))
+            result = summary['collections'][0]
+            
             cleanup_result = {
-                'collection': collection_name,
+                **result,
                 'initial_documents': initial_stats['total_documents'],
                 'initial_size_mb': initial_stats['size_mb'],
-                'deleted_documents': 0,
-                'archived_documents': 0,
-                'final_documents': 0,
-                'final_size_mb': 0,
+                'deleted_documents': result.get('deleted', 0),
+                'archived_documents': result.get('archived', 0),
+                'final_documents': initial_stats['total_documents'],
+                'final_size_mb': initial_stats['size_mb'],
                 'space_saved_mb': 0
             }
             
-            # Calculate cutoff dates
-            keep_cutoff = datetime.now() - timedelta(days=rules['keep_days'])
-            archive_cutoff = None
-            if rules.get('archive_days'):
-                archive_cutoff = datetime.now() - timedelta(days=rules['archive_days'])
-            
-            # Build query for old documents
-            query = {rules['field']: {'$lt': keep_cutoff}}
-            if rules.get('conditions'):
-                query.update(rules['conditions'])
-            
-            # Count documents to be cleaned
-            docs_to_cleanup = collection.count_documents(query)
-            
-            if docs_to_cleanup == 0:
-                logger.info(f"✅ No documents to cleanup in {collection_name}")
-                cleanup_result['final_documents'] = initial_stats['total_documents']
-                cleanup_result['final_size_mb'] = initial_stats['size_mb']
-                return cleanup_result
-            
-            logger.info(f"📊 Found {docs_to_cleanup} documents to cleanup in {collection_name}")
-            
-            # Archive old documents if archive_days is specified
-            if archive_cutoff:
-                archive_query = {rules['field']: {'$lt': archive_cutoff}}
-                if rules.get('conditions'):
-                    archive_query.update(rules['conditions'])
-                
-                # Find documents to archive
-                docs_to_archive = list(collection.find(archive_query))
-                
-                if docs_to_archive:
-                    # Create archive collection name
-                    archive_collection_name = f"{collection_name}_archive"
-                    archive_collection = self.db[archive_collection_name]
-                    
-                    # Insert into archive
-                    archive_collection.insert_many(docs_to_archive)
-                    cleanup_result['archived_documents'] = len(docs_to_archive)
-                    
-                    # Delete from original collection
-                    delete_result = collection.delete_many(archive_query)
-                    logger.info(f"📦 Archived {len(docs_to_archive)} documents from {collection_name}")
-            
-            # Delete old documents that don't need archiving
-            delete_query = query.copy()
-            if archive_cutoff:
-                # Only delete documents newer than archive cutoff but older than keep cutoff
-                delete_query[rules['field']] = {
-                    '$gte': archive_cutoff,
-                    '$lt': keep_cutoff
-                }
-            
-            delete_result = collection.delete_many(delete_query)
-            cleanup_result['deleted_documents'] = delete_result.deleted_count
-            
-            logger.info(f"🗑️ Deleted {delete_result.deleted_count} documents from {collection_name}")
+            logger.info(
+                f"🗑️ {collection_name} ({result['mode']}): deleted {cleanup_result['deleted_documents']}, "
+                f"archived {cleanup_result['archived_documents']}, {result['docs_per_second']} docs/s"
+            )
             
-            # Get final stats
             final_stats = self.get_collection_stats(collection_name)
             if final_stats:
                 cleanup_result['final_documents'] = final_stats['total_documents']
@@ -368,14 +280,14 @@ class DatabaseCleanup:
         }
         
         # 1. Cleanup collections based on rules
-        for collection_name, rules in self.cleanup_rules.items():
+        for collection_name in self.cleanup_rules:
             try:
                 # Check if collection exists
                 if collection_name not in self.db.list_collection_names():
                     logger.info(f"⏭️ Collection {collection_name} does not exist, skipping")
                     continue
                 
-                result = self.cleanup_collection(collection_name, rules)
+                result = self.cleanup_collection(collection_name)
                 
                 if result:
                     cleanup_summary['cleanup_results'].append(result)
@@ -42,8 +42,35 @@ class JobStatistics:
                 'created_at': {'$gte': yesterday_start, '$lt': today_start}
             })
             
-            # Total jobs
-            total_jobs = self.jobs_collection.count_documents({})
+            # Totals and top lists come from the materialized job_stats summary
+            # maintained by the API; fall back to aggregating when it is missing
+            summary = self.db.job_stats.find_one({'_id': 'summary'})
+            if summary and 'total_jobs' in summary:
+                total_jobs = summary['total_jobs']
+                locations = [
+                    {'_id': item['_id'], 'count': item['count']}
+                    for item in summary.get('top_locations', [])[:10]
+                ]
+                companies = [
+                    {'_id': item['_id'], 'count': item['count']}
+                    for item in summary.get('top_companies', [])[:10]
+                ]
+            else:
+                total_jobs = self.jobs_collection.count_documents({})
+                
+                # Jobs by location
+                locations = list(self.jobs_collection.aggregate([
+                    {'$group': {'_id': '$location', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1}},
+                    {'$limit': 10}
+                ]))
+                
+                # Jobs by company
+                companies = list(self.jobs_collection.aggregate([
+                    {'$group': {'_id': '$company', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1}},
+                    {'$limit': 10}
+                ]))
             
             # Jobs by type
             job_types = list(self.jobs_collection.aggregate([
@@ -51,20 +78,6 @@ class JobStatistics:
                 {'$sort': {'count': -1}}
             ]))
             
-            # Jobs by location
-            locations = list(self.jobs_collection.aggregate([
-                {'$group': {'_id': '$location', 'count': {'$sum': 1}}},
-                {'$sort': {'count': -1}},
-                {'$limit': 10}
-            ]))
-            
-            # Jobs by company
-            companies = list(self.jobs_collection.aggregate([
-                {'$group': {'_id': '$company', 'count': {'$sum': 1}}},
-                {'$sort': {'count': -1}},
-                {'$limit': 10}
-            ]))
-            
             # Remote vs On-site
             remote_count = self.jobs_collection.count_documents({
                 '$or': [